@@ -0,0 +1,41 @@
+"""add contract clause analyses
+
+Revision ID: contract_clause_analyses_20261018
+Revises: employee_skill_index_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "contract_clause_analyses_20261018"
+down_revision: Union[str, None] = "employee_skill_index_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "contract_clause_analyses",
+        sa.Column("contract_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("segment_hash", sa.String(64), nullable=False),
+        sa.Column("org_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("context_hash", sa.String(64), nullable=False),
+        sa.Column("items", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default="[]"),
+        sa.Column("analyzed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["contract_id"], ["contracts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["org_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("contract_id", "segment_hash"),
+    )
+    op.create_index(
+        "ix_contract_clause_analyses_org_id", "contract_clause_analyses", ["org_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contract_clause_analyses_org_id", table_name="contract_clause_analyses")
+    op.drop_table("contract_clause_analyses")
@@ -0,0 +1,75 @@
+"""add employee skill index
+
+Revision ID: employee_skill_index_20261018
+Revises: fix_contract_risk_level_20250131
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.utils.skills import normalize_skill
+
+
+revision: str = "employee_skill_index_20261018"
+down_revision: Union[str, None] = "fix_contract_risk_level_20250131"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    employee_skills = op.create_table(
+        "employee_skills",
+        sa.Column("employee_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("skill", sa.String(100), nullable=False),
+        sa.Column("org_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("label", sa.String(255), nullable=False),
+        sa.Column("source", sa.String(20), nullable=False, server_default="declared"),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["org_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("employee_id", "skill"),
+    )
+    op.create_index("ix_employee_skills_org_skill", "employee_skills", ["org_id", "skill"])
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_employees_skills_gin ON employees USING gin (skills)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_employees_ai_suggested_skills_gin ON employees USING gin (ai_suggested_skills)"
+    )
+
+    # Backfill the index from existing employees
+    bind = op.get_bind()
+    result = bind.execute(sa.text(
+        """
+        SELECT id, company_id, skills, ai_suggested_skills
+        FROM employees
+        WHERE company_id IS NOT NULL
+        """
+    ))
+    rows = []
+    for employee_id, org_id, skills, ai_skills in result:
+        seen = set()
+        for source, values in (("declared", skills or []), ("ai", ai_skills or [])):
+            for raw in values:
+                token = normalize_skill(raw)
+                if not token or len(token) > 100 or token in seen:
+                    continue
+                seen.add(token)
+                rows.append({
+                    "employee_id": employee_id,
+                    "skill": token,
+                    "org_id": org_id,
+                    "label": raw.strip()[:255],
+                    "source": source,
+                })
+    if rows:
+        op.bulk_insert(employee_skills, rows)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_employees_ai_suggested_skills_gin")
+    op.execute("DROP INDEX IF EXISTS ix_employees_skills_gin")
+    op.drop_index("ix_employee_skills_org_skill", table_name="employee_skills")
+    op.drop_table("employee_skills")
@@ -0,0 +1,56 @@
+"""add stable line keys to finance budget lines
+
+Revision ID: finance_budget_line_keys_20261018
+Revises: finance_monthly_actuals_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "finance_budget_line_keys_20261018"
+down_revision: Union[str, None] = "finance_monthly_actuals_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, label column, ordering of duplicates)
+_TABLES = (
+    ("finance_revenue_lines", "label", "display_order, id"),
+    ("finance_expense_lines", "label", "display_order, id"),
+    ("finance_business_units", "name", "id"),
+)
+
+
+def upgrade() -> None:
+    for table, label_column, order_by in _TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN line_key VARCHAR(255)")
+        # Same keys the service derives: normalized label, repeats suffixed "#2", "#3"...
+        op.execute(
+            f"""
+            UPDATE {table} AS t
+            SET line_key = CASE WHEN k.rn = 1 THEN k.base ELSE k.base || '#' || k.rn END
+            FROM (
+                SELECT id,
+                       left(lower(regexp_replace(trim({label_column}), '\\s+', ' ', 'g')), 200) AS base,
+                       row_number() OVER (
+                           PARTITION BY budget_id, left(lower(regexp_replace(trim({label_column}), '\\s+', ' ', 'g')), 200)
+                           ORDER BY {order_by}
+                       ) AS rn
+                FROM {table}
+            ) AS k
+            WHERE k.id = t.id
+            """
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN line_key SET NOT NULL")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT uq_{table}_budget_line_key UNIQUE (budget_id, line_key)"
+        )
+
+
+def downgrade() -> None:
+    for table, _, _ in _TABLES:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS uq_{table}_budget_line_key")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS line_key")
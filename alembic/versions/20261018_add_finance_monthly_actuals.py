@@ -0,0 +1,78 @@
+"""add finance monthly actuals
+
+Revision ID: finance_monthly_actuals_20261018
+Revises: opportunity_scheduler_runs_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "finance_monthly_actuals_20261018"
+down_revision: Union[str, None] = "opportunity_scheduler_runs_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE finance_monthly_actuals (
+            org_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+            category_id INTEGER NOT NULL,
+            month DATE NOT NULL,
+            expense_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            expense_count INTEGER NOT NULL DEFAULT 0,
+            invoice_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            invoice_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT now(),
+            PRIMARY KEY (org_id, category_id, month)
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_finance_monthly_actuals_org_month ON finance_monthly_actuals (org_id, month)"
+    )
+    # Backfill from approved/reimbursed expenses and approved/paid invoices
+    op.execute(
+        """
+        WITH categories AS (
+            SELECT DISTINCT ON (lower(name)) lower(name) AS name_key, id
+            FROM expense_categories
+            ORDER BY lower(name), (parent_id IS NOT NULL), id
+        ),
+        contributions AS (
+            SELECT e.org_id,
+                   lower(trim(e.category)) AS name_key,
+                   date_trunc('month', e.expense_date AT TIME ZONE 'UTC')::date AS month,
+                   e.amount AS expense_amount, 1 AS expense_count,
+                   0::numeric AS invoice_amount, 0 AS invoice_count
+            FROM employee_expenses e
+            WHERE e.status IN ('APPROVED', 'REIMBURSED')
+            UNION ALL
+            SELECT i.org_id,
+                   lower(trim(r.category)),
+                   date_trunc('month', i.invoice_date AT TIME ZONE 'UTC')::date,
+                   0::numeric, 0,
+                   i.amount, 1
+            FROM vendor_invoices i
+            LEFT JOIN purchase_orders po ON po.id = i.po_id
+            LEFT JOIN purchase_requisitions r ON r.id = po.requisition_id
+            WHERE i.status IN ('APPROVED', 'PAID')
+        )
+        INSERT INTO finance_monthly_actuals
+            (org_id, category_id, month, expense_amount, expense_count, invoice_amount, invoice_count, updated_at)
+        SELECT c.org_id, COALESCE(cat.id, 0), c.month,
+               SUM(c.expense_amount), SUM(c.expense_count), SUM(c.invoice_amount), SUM(c.invoice_count), now()
+        FROM contributions c
+        LEFT JOIN categories cat ON cat.name_key = c.name_key
+        GROUP BY c.org_id, COALESCE(cat.id, 0), c.month
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_finance_monthly_actuals_org_month")
+    op.execute("DROP TABLE IF EXISTS finance_monthly_actuals")
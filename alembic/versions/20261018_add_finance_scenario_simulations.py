@@ -0,0 +1,42 @@
+"""add finance scenario simulations
+
+Revision ID: finance_scenario_simulations_20261018
+Revises: finance_budget_line_keys_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "finance_scenario_simulations_20261018"
+down_revision: Union[str, None] = "finance_budget_line_keys_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE finance_scenario_simulations (
+            id SERIAL PRIMARY KEY,
+            scenario_id INTEGER NOT NULL REFERENCES finance_planning_scenarios(id) ON DELETE CASCADE,
+            draws INTEGER NOT NULL,
+            seed INTEGER,
+            parameters JSONB NOT NULL,
+            summary JSONB NOT NULL,
+            created_by UUID,
+            created_at TIMESTAMP DEFAULT now()
+        );
+        """
+    )
+    op.execute("CREATE INDEX ix_finance_scenario_simulations_id ON finance_scenario_simulations (id)")
+    op.execute(
+        "CREATE INDEX ix_finance_scenario_simulations_scenario_created "
+        "ON finance_scenario_simulations (scenario_id, created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS finance_scenario_simulations")
@@ -0,0 +1,90 @@
+"""add per-organization id counters
+
+Revision ID: id_counters_20261018
+Revises: keyset_pagination_indexes_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "id_counters_20261018"
+down_revision: Union[str, None] = "keyset_pagination_indexes_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same rule as IDGenerator.get_org_prefix: first two letters of the org name, upper-cased
+ORG_PREFIX = "CASE WHEN length(coalesce(o.name, '')) >= 2 THEN upper(left(o.name, 2)) ELSE 'OR' END"
+
+# entity -> (table, column, ID prefix before the org prefix)
+ORG_PREFIXED = {
+    "opportunity": ("opportunities", "custom_id", "OPP-NY"),
+    "account": ("accounts", "custom_id", "AC-NY"),
+    "requisition": ("purchase_requisitions", "custom_id", "REQ-"),
+    "purchase_order": ("purchase_orders", "custom_id", "PO-"),
+    "rfq": ("rfqs", "custom_id", "RFQ-"),
+    "expense": ("employee_expenses", "custom_id", "EXP-"),
+}
+
+# entity -> (table, column, ID prefix before the year), counted per year
+YEARLY = {
+    "contract": ("contracts", "contract_id", "CNT-"),
+    "proposal": ("proposals", "proposal_number", "PROP-"),
+}
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE id_counters (
+            org_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+            entity VARCHAR(32) NOT NULL,
+            scope VARCHAR(16) NOT NULL DEFAULT '',
+            last_value BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (org_id, entity, scope)
+        )
+        """
+    )
+
+    # Seed each counter with the highest number already issued. Runs of six or
+    # more digits are timestamp fallbacks, not sequence numbers, and are skipped.
+    for entity, (table, column, code) in ORG_PREFIXED.items():
+        op.execute(
+            f"""
+            INSERT INTO id_counters (org_id, entity, scope, last_value)
+            SELECT org_id, '{entity}', '', max(number)
+            FROM (
+                SELECT t.org_id,
+                       substring(substring(t.{column} from length(p.prefix) + 1) from '^(\\d{{1,5}})(?:-|$)')::bigint AS number
+                FROM {table} t
+                JOIN organizations o ON o.id = t.org_id
+                CROSS JOIN LATERAL (SELECT '{code}' || {ORG_PREFIX} AS prefix) p
+                WHERE left(t.{column}, length(p.prefix)) = p.prefix
+            ) issued
+            WHERE number IS NOT NULL
+            GROUP BY org_id
+            """
+        )
+
+    for entity, (table, column, code) in YEARLY.items():
+        op.execute(
+            f"""
+            INSERT INTO id_counters (org_id, entity, scope, last_value)
+            SELECT t.org_id,
+                   '{entity}',
+                   substring(t.{column} from '^{code}(\\d{{4}})-'),
+                   max(substring(t.{column} from '^{code}\\d{{4}}-(\\d{{1,5}})(?:-|$)')::bigint)
+            FROM {table} t
+            WHERE t.org_id IS NOT NULL
+              AND t.{column} ~ '^{code}\\d{{4}}-\\d{{1,5}}(-|$)'
+            GROUP BY t.org_id, substring(t.{column} from '^{code}(\\d{{4}})-')
+            """
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS id_counters")
@@ -0,0 +1,42 @@
+"""add keyset pagination indexes
+
+Revision ID: keyset_pagination_indexes_20261018
+Revises: search_indexes_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "keyset_pagination_indexes_20261018"
+down_revision: Union[str, None] = "search_indexes_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# List endpoints page with WHERE org_id = ? AND (sort, id) < (?, ?) ORDER BY sort DESC, id DESC
+KEYSET_INDEXES = {
+    "ix_opportunities_org_created_keyset": "opportunities (org_id, created_at DESC, id DESC)",
+    "ix_opportunities_org_value_keyset": "opportunities (org_id, (coalesce(project_value, 0)) DESC, id DESC)",
+    "ix_opportunities_org_match_keyset": "opportunities (org_id, (coalesce(match_score, 0)) DESC, id DESC)",
+    "ix_purchase_requisitions_org_created_keyset": "purchase_requisitions (org_id, created_at DESC, id DESC)",
+    "ix_purchase_orders_org_created_keyset": "purchase_orders (org_id, created_at DESC, id DESC)",
+    "ix_rfqs_org_created_keyset": "rfqs (org_id, created_at DESC, id DESC)",
+    "ix_employee_expenses_org_created_keyset": "employee_expenses (org_id, created_at DESC, id DESC)",
+    "ix_vendor_invoices_org_created_keyset": "vendor_invoices (org_id, created_at DESC, id DESC)",
+    "ix_grns_org_created_keyset": "grns (org_id, created_at DESC, id DESC)",
+    "ix_contracts_org_created_keyset": "contracts (org_id, created_at DESC, id DESC)",
+    "ix_proposals_org_created_keyset": "proposals (org_id, created_at DESC, id DESC)",
+}
+
+
+def upgrade() -> None:
+    for name, definition in KEYSET_INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    for name in KEYSET_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,70 @@
+"""add opportunity scheduler runs
+
+Revision ID: opportunity_scheduler_runs_20261018
+Revises: contract_clause_analyses_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "opportunity_scheduler_runs_20261018"
+down_revision: Union[str, None] = "contract_clause_analyses_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DO $$ BEGIN
+            CREATE TYPE opportunity_scheduler_run_kind AS ENUM ('sources', 'agents', 'all');
+        EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+        """
+    )
+    op.execute(
+        """
+        DO $$ BEGIN
+            CREATE TYPE opportunity_scheduler_run_status AS ENUM ('queued', 'running', 'succeeded', 'failed');
+        EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE opportunity_scheduler_runs (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            kind opportunity_scheduler_run_kind NOT NULL,
+            status opportunity_scheduler_run_status NOT NULL DEFAULT 'queued',
+            requested_by UUID REFERENCES users(id) ON DELETE SET NULL,
+            lease_owner VARCHAR(255),
+            lease_expires_at TIMESTAMPTZ,
+            results JSONB,
+            error_message TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            started_at TIMESTAMPTZ,
+            finished_at TIMESTAMPTZ
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_opportunity_scheduler_runs_status ON opportunity_scheduler_runs (status, created_at)"
+    )
+    # Due-item lookups made by the worker's claim queries
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_opportunity_sources_due ON opportunity_sources (next_run_at) "
+        "WHERE status = 'active' AND is_auto_discovery_enabled"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_opportunity_agents_due ON opportunity_agents (next_run_at) "
+        "WHERE status = 'active'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_opportunity_agents_due")
+    op.execute("DROP INDEX IF EXISTS ix_opportunity_sources_due")
+    op.execute("DROP TABLE IF EXISTS opportunity_scheduler_runs")
+    op.execute("DROP TYPE IF EXISTS opportunity_scheduler_run_status")
+    op.execute("DROP TYPE IF EXISTS opportunity_scheduler_run_kind")
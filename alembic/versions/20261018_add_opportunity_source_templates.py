@@ -0,0 +1,44 @@
+"""add opportunity source templates
+
+Revision ID: opportunity_source_templates_20261018
+Revises: vendor_scorecards_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "opportunity_source_templates_20261018"
+down_revision: Union[str, None] = "vendor_scorecards_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE opportunity_source_templates (
+            source_id UUID PRIMARY KEY REFERENCES opportunity_sources(id) ON DELETE CASCADE,
+            org_id UUID NOT NULL REFERENCES organizations(id),
+            selectors JSONB NOT NULL,
+            induced_by VARCHAR(32) NOT NULL,
+            is_active BOOLEAN NOT NULL DEFAULT true,
+            version INTEGER NOT NULL DEFAULT 1,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            consecutive_misses INTEGER NOT NULL DEFAULT 0,
+            validated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            last_matched_at TIMESTAMPTZ,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_opportunity_source_templates_org_id ON opportunity_source_templates (org_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS opportunity_source_templates")
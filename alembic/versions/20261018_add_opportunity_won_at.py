@@ -0,0 +1,60 @@
+"""add opportunities.won_at, maintained by trigger
+
+Revision ID: opportunity_won_at_20261018
+Revises: id_counters_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "opportunity_won_at_20261018"
+down_revision: Union[str, None] = "id_counters_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS won_at timestamptz")
+    # Best available date for deals won before the column existed
+    op.execute("UPDATE opportunities SET won_at = updated_at WHERE stage = 'won' AND won_at IS NULL")
+
+    # Set when an opportunity enters `won`, cleared when it leaves; other edits leave it alone,
+    # so every write path (ORM, bulk updates, imports) keeps it right
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION opportunities_set_won_at() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.stage = 'won' THEN
+                IF TG_OP = 'INSERT' OR OLD.stage IS DISTINCT FROM 'won' THEN
+                    NEW.won_at := coalesce(NEW.won_at, now());
+                END IF;
+            ELSE
+                NEW.won_at := NULL;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS trg_opportunities_won_at ON opportunities")
+    op.execute(
+        """
+        CREATE TRIGGER trg_opportunities_won_at
+        BEFORE INSERT OR UPDATE OF stage ON opportunities
+        FOR EACH ROW EXECUTE FUNCTION opportunities_set_won_at()
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_opportunities_org_won_at ON opportunities (org_id, won_at) "
+        "WHERE won_at IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_opportunities_org_won_at")
+    op.execute("DROP TRIGGER IF EXISTS trg_opportunities_won_at ON opportunities")
+    op.execute("DROP FUNCTION IF EXISTS opportunities_set_won_at()")
+    op.execute("ALTER TABLE opportunities DROP COLUMN IF EXISTS won_at")
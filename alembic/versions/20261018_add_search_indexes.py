@@ -0,0 +1,109 @@
+"""add full-text and trigram search indexes
+
+Revision ID: search_indexes_20261018
+Revises: opportunity_source_templates_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "search_indexes_20261018"
+down_revision: Union[str, None] = "opportunity_source_templates_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Weighted document per searchable table: A = name/title, B = identifiers and
+# counterparties, C = classification, D = free text
+SEARCH_VECTORS = {
+    "opportunities": (
+        "setweight(to_tsvector('english', coalesce(project_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(client_name, '') || ' ' || coalesce(custom_id, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(market_sector, '') || ' ' || coalesce(state, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+    ),
+    "accounts": (
+        "setweight(to_tsvector('english', coalesce(client_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(custom_id, '') || ' ' || coalesce(company_website, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(market_sector, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'D')"
+    ),
+    "contacts": (
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(email, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(title, '')), 'C')"
+    ),
+    "vendors": (
+        "setweight(to_tsvector('english', coalesce(vendor_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(organisation, '') || ' ' || coalesce(email, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'D')"
+    ),
+    "purchase_requisitions": (
+        "setweight(to_tsvector('english', coalesce(custom_id, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+    ),
+    "purchase_orders": (
+        "setweight(to_tsvector('english', coalesce(vendor_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(custom_id, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+    ),
+    "rfqs": (
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(custom_id, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+    ),
+    "vendor_invoices": (
+        "setweight(to_tsvector('english', coalesce(invoice_number, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(vendor_name, '')), 'B')"
+    ),
+}
+
+# Columns filtered with ILIKE '%term%' by the list endpoints and matched by
+# similarity() in the search service
+TRIGRAM_COLUMNS = {
+    "opportunities": ("project_name", "client_name", "description", "market_sector", "state"),
+    "accounts": ("client_name",),
+    "contacts": ("name", "email"),
+    "vendors": ("vendor_name", "organisation"),
+    "purchase_requisitions": ("description", "custom_id"),
+    "purchase_orders": ("description", "custom_id", "vendor_name"),
+    "rfqs": ("title", "custom_id"),
+    "employee_expenses": ("description", "custom_id"),
+    "vendor_invoices": ("invoice_number", "vendor_name"),
+    "contracts": ("client_name", "project_name", "contract_id"),
+    "proposals": ("title", "proposal_number", "summary"),
+    "clause_library": ("title", "clause_text"),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, document in SEARCH_VECTORS.items():
+        op.execute(
+            f"""
+            ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS ({document}) STORED
+            """
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)")
+
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    for table, columns in TRIGRAM_COLUMNS.items():
+        for column in columns:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
+
+    for table in SEARCH_VECTORS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,85 @@
+"""add vendor scorecards
+
+Revision ID: vendor_scorecards_20261018
+Revises: finance_scenario_simulations_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "vendor_scorecards_20261018"
+down_revision: Union[str, None] = "finance_scenario_simulations_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE vendor_scorecards (
+            vendor_id UUID PRIMARY KEY REFERENCES vendors(id) ON DELETE CASCADE,
+            total_orders INTEGER NOT NULL DEFAULT 0,
+            orders_spend NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            avg_order_value NUMERIC(15, 2),
+            last_order_at TIMESTAMPTZ,
+            total_invoices INTEGER NOT NULL DEFAULT 0,
+            invoices_spend NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            avg_invoice_value NUMERIC(15, 2),
+            milestones_total INTEGER NOT NULL DEFAULT 0,
+            milestones_on_time INTEGER NOT NULL DEFAULT 0,
+            delivery_days_sum INTEGER NOT NULL DEFAULT 0,
+            delivery_days_count INTEGER NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    # Seed every vendor with one grouped pass over orders, invoices and milestones
+    op.execute(
+        """
+        INSERT INTO vendor_scorecards (
+            vendor_id, total_orders, orders_spend, avg_order_value, last_order_at,
+            total_invoices, invoices_spend, avg_invoice_value,
+            milestones_total, milestones_on_time, delivery_days_sum, delivery_days_count,
+            refreshed_at
+        )
+        SELECT
+            v.id,
+            COALESCE(po.total_orders, 0), COALESCE(po.spend, 0), po.avg_value, po.last_order_at,
+            COALESCE(inv.total_invoices, 0), COALESCE(inv.spend, 0), inv.avg_value,
+            COALESCE(ms.total, 0), COALESCE(ms.on_time, 0), COALESCE(ms.days_sum, 0), COALESCE(ms.days_count, 0),
+            now()
+        FROM vendors v
+        LEFT JOIN (
+            SELECT vendor_id, count(*) AS total_orders, sum(amount) AS spend,
+                   avg(amount) AS avg_value, max(created_at) AS last_order_at
+            FROM purchase_orders
+            WHERE vendor_id IS NOT NULL
+            GROUP BY vendor_id
+        ) po ON po.vendor_id = v.id
+        LEFT JOIN (
+            SELECT vendor_id, count(*) AS total_invoices, sum(amount) AS spend, avg(amount) AS avg_value
+            FROM vendor_invoices
+            WHERE vendor_id IS NOT NULL
+            GROUP BY vendor_id
+        ) inv ON inv.vendor_id = v.id
+        LEFT JOIN (
+            SELECT o.vendor_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE m.completed_date <= m.due_date) AS on_time,
+                   sum(floor(extract(epoch FROM m.completed_date - m.due_date) / 86400))
+                       FILTER (WHERE m.completed_date IS NOT NULL) AS days_sum,
+                   count(m.completed_date) AS days_count
+            FROM delivery_milestones m
+            JOIN purchase_orders o ON o.id = m.po_id
+            WHERE o.vendor_id IS NOT NULL
+            GROUP BY o.vendor_id
+        ) ms ON ms.vendor_id = v.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS vendor_scorecards")
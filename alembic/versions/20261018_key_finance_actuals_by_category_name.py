@@ -0,0 +1,102 @@
+"""key finance monthly actuals by normalized category name, split reimbursed expenses
+
+Revision ID: finance_actuals_category_key_20261018
+Revises: opportunity_won_at_20261018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "finance_actuals_category_key_20261018"
+down_revision: Union[str, None] = "opportunity_won_at_20261018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _category_key(column: str) -> str:
+    return f"lower(regexp_replace(trim(COALESCE({column}, '')), '\\s+', ' ', 'g'))"
+
+
+def upgrade() -> None:
+    # The table only holds derived data: recreate it with the new key and backfill
+    op.execute("DROP TABLE IF EXISTS finance_monthly_actuals")
+    op.execute(
+        """
+        CREATE TABLE finance_monthly_actuals (
+            org_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+            category_key VARCHAR(255) NOT NULL,
+            month DATE NOT NULL,
+            expense_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            expense_count INTEGER NOT NULL DEFAULT 0,
+            reimbursed_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            reimbursed_count INTEGER NOT NULL DEFAULT 0,
+            invoice_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            invoice_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT now(),
+            PRIMARY KEY (org_id, category_key, month)
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_finance_monthly_actuals_org_month ON finance_monthly_actuals (org_id, month)"
+    )
+    op.execute(
+        f"""
+        WITH contributions AS (
+            SELECT e.org_id,
+                   {_category_key("e.category")} AS category_key,
+                   date_trunc('month', e.expense_date AT TIME ZONE 'UTC')::date AS month,
+                   CASE WHEN e.status = 'APPROVED' THEN e.amount ELSE 0 END AS expense_amount,
+                   CASE WHEN e.status = 'APPROVED' THEN 1 ELSE 0 END AS expense_count,
+                   CASE WHEN e.status = 'REIMBURSED' THEN e.amount ELSE 0 END AS reimbursed_amount,
+                   CASE WHEN e.status = 'REIMBURSED' THEN 1 ELSE 0 END AS reimbursed_count,
+                   0::numeric AS invoice_amount, 0 AS invoice_count
+            FROM employee_expenses e
+            WHERE e.status IN ('APPROVED', 'REIMBURSED')
+            UNION ALL
+            SELECT i.org_id,
+                   {_category_key("r.category")},
+                   date_trunc('month', i.invoice_date AT TIME ZONE 'UTC')::date,
+                   0::numeric, 0, 0::numeric, 0,
+                   i.amount, 1
+            FROM vendor_invoices i
+            LEFT JOIN purchase_orders po ON po.id = i.po_id
+            LEFT JOIN purchase_requisitions r ON r.id = po.requisition_id
+            WHERE i.status IN ('APPROVED', 'PAID')
+        )
+        INSERT INTO finance_monthly_actuals
+            (org_id, category_key, month, expense_amount, expense_count, reimbursed_amount, reimbursed_count,
+             invoice_amount, invoice_count, updated_at)
+        SELECT org_id, category_key, month,
+               SUM(expense_amount), SUM(expense_count), SUM(reimbursed_amount), SUM(reimbursed_count),
+               SUM(invoice_amount), SUM(invoice_count), now()
+        FROM contributions
+        GROUP BY org_id, category_key, month
+        """
+    )
+
+
+def downgrade() -> None:
+    # Back to the id-keyed table; run `manage.py rebuild-finance-actuals` on the old code to refill it
+    op.execute("DROP TABLE IF EXISTS finance_monthly_actuals")
+    op.execute(
+        """
+        CREATE TABLE finance_monthly_actuals (
+            org_id UUID NOT NULL REFERENCES organizations(id) ON DELETE CASCADE,
+            category_id INTEGER NOT NULL,
+            month DATE NOT NULL,
+            expense_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            expense_count INTEGER NOT NULL DEFAULT 0,
+            invoice_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+            invoice_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT now(),
+            PRIMARY KEY (org_id, category_id, month)
+        );
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_finance_monthly_actuals_org_month ON finance_monthly_actuals (org_id, month)"
+    )
@@ -14,7 +14,13 @@ def get_database_url() -> str:
     from app.environment import normalize_psycopg
     return normalize_psycopg(environment.DATABASE_URL)
 
-engine: AsyncEngine = create_async_engine(get_database_url(), echo=False, future=True)
+engine: AsyncEngine = create_async_engine(
+    get_database_url(),
+    echo=False,
+    future=True,
+    pool_size=environment.DB_POOL_SIZE,
+    max_overflow=environment.DB_MAX_OVERFLOW,
+)
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
 )
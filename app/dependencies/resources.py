@@ -0,0 +1,20 @@
+from typing import Any, Optional
+
+from app.services.resources import get_http_client as _get_http_client
+from app.services.resources import get_s3_client as _get_s3_client
+from app.services.resources import resources
+from app.services.storage import StorageService
+
+
+def get_http_client() -> Any:
+    """Shared pooled httpx.AsyncClient (closed by the app lifespan, never by callers)."""
+    return _get_http_client()
+
+
+def get_s3_client() -> Optional[Any]:
+    """Shared boto3 S3 client, or None when S3 is not configured."""
+    return _get_s3_client()
+
+
+def get_storage_service() -> StorageService:
+    return resources.get("storage")
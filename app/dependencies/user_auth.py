@@ -1,7 +1,10 @@
 from fastapi import Request
 import jwt
 import os
-import asyncpg
+import uuid
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.session import engine
 from app.utils.error import MegapolisHTTPException
 from app.models.organization import Organization
 from app.models.user import User
@@ -41,14 +44,15 @@ async def get_current_user(
                 status_code=401, details="Invalid token: no user ID found"
             )
 
-        db_url = environment.DATABASE_URL.replace('postgresql+psycopg://', 'postgresql://')
-        conn = None
+        user_uuid = uuid.UUID(str(user_id))
         try:
-            conn = await asyncpg.connect(db_url)
-            user_row = await conn.fetchrow(
-                'SELECT id, short_id, email, org_id, role FROM users WHERE id = $1',
-                user_id
-            )
+            # Pooled connection from the app engine (warmed at startup) instead of a new one per request
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text('SELECT id, short_id, email, org_id, role FROM users WHERE id = :user_id'),
+                    {"user_id": user_uuid},
+                )
+                user_row = result.mappings().first()
             if not user_row:
                 logger.warning(f"Authentication failed: invalid user ID")
                 raise MegapolisHTTPException(
@@ -64,12 +68,9 @@ async def get_current_user(
                 org_id=str(user_row['org_id']) if user_row['org_id'] else None,
                 role=user_row['role']
             )
-        except asyncpg.PostgresError as e:
+        except SQLAlchemyError as e:
             logger.error(f"Database error during authentication: {e}")
             raise MegapolisHTTPException(status_code=500, details="Authentication service error")
-        finally:
-            if conn:
-                await conn.close()
             
         return user
 
@@ -80,6 +80,54 @@ class Environment(BaseModel):
     AWS_SECRET_ACCESS_KEY: Optional[str] = Field(default=None)
     AWS_S3_BUCKET_NAME: Optional[str] = Field(default="megapolis-resumes")
     AWS_S3_REGION: Optional[str] = Field(default="us-east-1")
+    # Custom endpoint for S3-compatible stand-ins (MinIO, LocalStack) in dev/tests
+    AWS_S3_ENDPOINT_URL: Optional[str] = Field(default=None)
+    
+    # Object storage: "auto" picks S3 when credentials are present, else local disk
+    STORAGE_BACKEND: Literal["auto", "s3", "local"] = Field(default="auto")
+    LOCAL_STORAGE_ROOT: str = Field(default="uploads")
+    
+    # Scheduler worker: when enabled, the API process also drains queued scheduler runs
+    # (for deployments without a separate `manage.py scheduler-worker` process)
+    SCHEDULER_INLINE_WORKER: bool = Field(default=False)
+    SCHEDULER_LEASE_SECONDS: int = Field(default=600)
+    
+    # Notification push: "memory" delivers events within this process only; "postgres" relays
+    # them through LISTEN/NOTIFY so every API worker sees them
+    NOTIFICATION_PUSH_BACKEND: Literal["memory", "postgres"] = Field(default="memory")
+    NOTIFICATION_STREAM_KEEPALIVE_SECONDS: int = Field(default=25)
+    
+    # Shared clients created at startup (app/services/resources.py)
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+    DB_POOL_WARM_CONNECTIONS: int = Field(default=2)
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = Field(default=30.0)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=100)
+    # How long introspected schema capabilities are trusted before the Alembic revision is re-checked
+    SCHEMA_CAPABILITIES_TTL_SECONDS: int = Field(default=300)
+    # Build the Gemini client at boot instead of on first AI request
+    WARM_AI_CLIENTS: bool = Field(default=False)
+    
+    # Request instrumentation: /metrics, slow request sampling and N+1 warnings
+    METRICS_ENABLED: bool = Field(default=True)
+    METRICS_TOKEN: Optional[str] = Field(default=None)
+    SLOW_REQUEST_MS: int = Field(default=1000)
+    SLOW_REQUEST_SAMPLE_RATE: float = Field(default=1.0)
+    N_PLUS_ONE_THRESHOLD: int = Field(default=10)
+    
+    # Password hashing: bcrypt cost for new hashes (older hashes are upgraded on login),
+    # hashing pool size (0 = based on CPU count) and how many jobs may wait for it
+    BCRYPT_ROUNDS: int = Field(default=12)
+    PASSWORD_HASH_WORKERS: int = Field(default=0)
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64)
+    
+    # Detail-page enrichment (app/services/enrichment_pipeline.py): concurrency per stage,
+    # and how much page text / how many pages are packed into one Gemini request
+    ENRICH_FETCH_CONCURRENCY: int = Field(default=8)
+    ENRICH_EXTRACT_CONCURRENCY: int = Field(default=4)
+    ENRICH_LLM_CONCURRENCY: int = Field(default=2)
+    ENRICH_LLM_BATCH_CHARS: int = Field(default=24000)
+    ENRICH_LLM_BATCH_SIZE: int = Field(default=5)
     
     # Security Configuration
     ALLOWED_ORIGINS: str = Field(default="http://localhost:5173,http://127.0.0.1:5173")
@@ -133,6 +181,47 @@ def load_environment() -> Environment:
         "AWS_SECRET_ACCESS_KEY": pick("AWS_SECRET_ACCESS_KEY", default=None),
         "AWS_S3_BUCKET_NAME": pick("AWS_S3_BUCKET_NAME", default="megapolis-resumes"),
         "AWS_S3_REGION": pick("AWS_S3_REGION", default="us-east-1"),
+        "AWS_S3_ENDPOINT_URL": pick("AWS_S3_ENDPOINT_URL", default=None),
+        
+        # Object storage
+        "STORAGE_BACKEND": pick("STORAGE_BACKEND", default="auto"),
+        "LOCAL_STORAGE_ROOT": pick("LOCAL_STORAGE_ROOT", default="uploads"),
+        
+        # Scheduler worker
+        "SCHEDULER_INLINE_WORKER": pick("SCHEDULER_INLINE_WORKER", "false").lower() == "true",
+        "SCHEDULER_LEASE_SECONDS": int(pick("SCHEDULER_LEASE_SECONDS", "600")),
+        
+        # Notification push
+        "NOTIFICATION_PUSH_BACKEND": pick("NOTIFICATION_PUSH_BACKEND", default="memory"),
+        "NOTIFICATION_STREAM_KEEPALIVE_SECONDS": int(pick("NOTIFICATION_STREAM_KEEPALIVE_SECONDS", "25")),
+        
+        # Shared clients
+        "DB_POOL_SIZE": int(pick("DB_POOL_SIZE", "10")),
+        "DB_MAX_OVERFLOW": int(pick("DB_MAX_OVERFLOW", "20")),
+        "DB_POOL_WARM_CONNECTIONS": int(pick("DB_POOL_WARM_CONNECTIONS", "2")),
+        "HTTP_CLIENT_TIMEOUT_SECONDS": float(pick("HTTP_CLIENT_TIMEOUT_SECONDS", "30")),
+        "HTTP_CLIENT_MAX_CONNECTIONS": int(pick("HTTP_CLIENT_MAX_CONNECTIONS", "100")),
+        "SCHEMA_CAPABILITIES_TTL_SECONDS": int(pick("SCHEMA_CAPABILITIES_TTL_SECONDS", "300")),
+        "WARM_AI_CLIENTS": pick("WARM_AI_CLIENTS", "false").lower() == "true",
+        
+        # Request instrumentation
+        "METRICS_ENABLED": pick("METRICS_ENABLED", "true").lower() == "true",
+        "METRICS_TOKEN": pick("METRICS_TOKEN", default=None),
+        "SLOW_REQUEST_MS": int(pick("SLOW_REQUEST_MS", "1000")),
+        "SLOW_REQUEST_SAMPLE_RATE": float(pick("SLOW_REQUEST_SAMPLE_RATE", "1.0")),
+        "N_PLUS_ONE_THRESHOLD": int(pick("N_PLUS_ONE_THRESHOLD", "10")),
+        
+        # Password hashing
+        "BCRYPT_ROUNDS": int(pick("BCRYPT_ROUNDS", "12")),
+        "PASSWORD_HASH_WORKERS": int(pick("PASSWORD_HASH_WORKERS", "0")),
+        "PASSWORD_HASH_MAX_PENDING": int(pick("PASSWORD_HASH_MAX_PENDING", "64")),
+        
+        # Detail-page enrichment
+        "ENRICH_FETCH_CONCURRENCY": int(pick("ENRICH_FETCH_CONCURRENCY", "8")),
+        "ENRICH_EXTRACT_CONCURRENCY": int(pick("ENRICH_EXTRACT_CONCURRENCY", "4")),
+        "ENRICH_LLM_CONCURRENCY": int(pick("ENRICH_LLM_CONCURRENCY", "2")),
+        "ENRICH_LLM_BATCH_CHARS": int(pick("ENRICH_LLM_BATCH_CHARS", "24000")),
+        "ENRICH_LLM_BATCH_SIZE": int(pick("ENRICH_LLM_BATCH_SIZE", "5")),
         
         # Security Configuration
         "ALLOWED_ORIGINS": pick("ALLOWED_ORIGINS", default="http://localhost:5173,http://127.0.0.1:5173"),
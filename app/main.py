@@ -15,6 +15,11 @@ from app.middlewares.brute_force_protection import BruteForceProtectionMiddlewar
 from app.middlewares.file_upload_security import FileUploadSecurityMiddleware
 from app.middlewares.audit_logging import AuditLoggingMiddleware
 from app.middlewares.input_validation import InputValidationMiddleware
+from app.middlewares.request_metrics import RequestMetricsMiddleware
+from app.routes.metrics import router as metrics_router
+from app.db.session import engine
+from app.services.request_profiler import install_sql_listeners
+from app.services.resources import resources
 from app.utils.error import MegapolisHTTPException
 from app.utils.logger import logger
 from app.utils.security import sanitize_log_data, mask_id
@@ -22,7 +27,7 @@ from app.environment import environment
 from pydantic import BaseModel
 import os
 
-app = FastAPI(title="Megapolis API", version="0.1.0")
+app = FastAPI(title="Megapolis API", version="0.1.0", lifespan=resources.lifespan)
 
 logger.info("Starting Megapolis API")
 
@@ -61,6 +66,10 @@ app.add_middleware(RateLimitMiddleware, requests_per_minute=environment.RATE_LIM
 app.add_middleware(AuditLoggingMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(RequestTransactionMiddleware)
+if environment.METRICS_ENABLED:
+    # Outermost, so its timings include the request transaction's commit
+    install_sql_listeners(engine)
+    app.add_middleware(RequestMetricsMiddleware)
 
 def add_cors_headers(response: JSONResponse, origin: str = None) -> JSONResponse:
     # Only add if CORSMiddleware hasn't already added them
@@ -146,6 +155,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     return add_cors_headers(response, origin)
 
 app.include_router(api_router, prefix="/api")
+if environment.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 # Mount static files for uploads - SECURE: Only in development, require auth in production
 if environment.ENVIRONMENT == "dev" and os.path.exists("uploads"):
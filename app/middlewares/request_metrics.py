@@ -0,0 +1,24 @@
+from typing import Callable
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.services.request_profiler import finish_profile, start_profile
+
+
+class RequestMetricsMiddleware(BaseHTTPMiddleware):
+    """Times each request and the SQL it runs; see app/services/request_profiler.py."""
+
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Response]) -> Response:
+        profile, token = start_profile(request.method, request.url.path)
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            # The router stores the matched route in the shared scope; label by its
+            # template (/api/accounts/{account_id}) to keep label cardinality bounded
+            route = request.scope.get("route")
+            profile.route = getattr(route, "path", None)
+            finish_profile(profile, token, status_code)
@@ -5,6 +5,7 @@ from .formbricks_projects import *
 from .invite import *
 from .survey import *  # Import before organization (circular dependency)
 from .organization import *
+from .id_counter import *
 from .user import *
 from .user_permission import *
 from .account_note import *
@@ -124,6 +124,26 @@ class Contract(Base):
     reviewer: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assigned_reviewer])
 
 
+class ContractClauseAnalysis(Base):
+    """AI verdicts for one clause segment of a contract, keyed by the segment's normalized text hash."""
+    __tablename__ = "contract_clause_analyses"
+
+    contract_id: Mapped[uuid.UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("contracts.id", ondelete="CASCADE"), primary_key=True
+    )
+    segment_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    # Hash of the contract/opportunity/proposal context the verdicts were produced under
+    context_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    items: Mapped[List[Dict[str, Any]]] = mapped_column(JSONB, nullable=False, default=list)
+
+    analyzed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 class ClauseRiskLevel(enum.Enum):
     preferred = "preferred"
     acceptable = "acceptable"
@@ -1,4 +1,4 @@
-from sqlalchemy import String, select, Boolean, Column, ForeignKey, DECIMAL, Enum as SQLEnum, Text, ARRAY, TIMESTAMP, Integer, func
+from sqlalchemy import String, select, delete, Boolean, Column, ForeignKey, DECIMAL, Enum as SQLEnum, Text, ARRAY, TIMESTAMP, Integer, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
@@ -8,6 +8,7 @@ import enum
 from datetime import datetime
 from app.db.base import Base
 from app.db.session import get_transaction
+from app.utils.skills import normalize_skill
 
 if TYPE_CHECKING:
     from app.models.organization import Organization
@@ -213,6 +214,12 @@ class Employee(Base):
     account_assignments: Mapped[List["AccountTeam"]] = relationship("AccountTeam", back_populates="employee", cascade="all, delete-orphan")
     attendance_records: Mapped[List["Attendance"]] = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan")
 
+    # GIN indexes back array containment/overlap lookups (skills && ARRAY[...])
+    __table_args__ = (
+        Index("ix_employees_skills_gin", "skills", postgresql_using="gin"),
+        Index("ix_employees_ai_suggested_skills_gin", "ai_suggested_skills", postgresql_using="gin"),
+    )
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "id": str(self.id),
@@ -298,6 +305,7 @@ class Employee(Base):
             db.add(employee)
             await db.flush()
             await db.refresh(employee)
+            await EmployeeSkill.sync_for_employee(db, employee)
             return employee
 
     @classmethod
@@ -344,6 +352,8 @@ class Employee(Base):
                         setattr(employee, key, value)
                 await db.flush()
                 await db.refresh(employee)
+                if EmployeeSkill.INDEXED_FIELDS.intersection(kwargs):
+                    await EmployeeSkill.sync_for_employee(db, employee)
             return employee
 
     @classmethod
@@ -352,12 +362,70 @@ class Employee(Base):
             result = await db.execute(select(cls).where(cls.id == employee_id))
             employee = result.scalar_one_or_none()
             if employee:
+                await db.execute(delete(EmployeeSkill).where(EmployeeSkill.employee_id == employee_id))
                 await db.delete(employee)
                 await db.flush()
                 return True
             return False
 
 
+class EmployeeSkill(Base):
+    """Inverted skill index: one row per (employee, normalized skill token)."""
+    __tablename__ = "employee_skills"
+
+    SOURCE_DECLARED = "declared"
+    SOURCE_AI = "ai"
+    INDEXED_FIELDS = frozenset({"skills", "ai_suggested_skills", "company_id"})
+
+    employee_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True
+    )
+    skill: Mapped[str] = mapped_column(String(100), primary_key=True)
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
+    )
+    # First spelling seen for this token, used when presenting org skills
+    label: Mapped[str] = mapped_column(String(255), nullable=False)
+    source: Mapped[str] = mapped_column(String(20), default=SOURCE_DECLARED, nullable=False)
+
+    __table_args__ = (
+        Index("ix_employee_skills_org_skill", "org_id", "skill"),
+    )
+
+    @classmethod
+    def build_rows(cls, employee: "Employee") -> List[Dict[str, Any]]:
+        """Index rows for an employee; declared skills win over AI-suggested ones."""
+        if not employee.company_id:
+            return []
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        sources = (
+            (cls.SOURCE_DECLARED, employee.skills or []),
+            (cls.SOURCE_AI, employee.ai_suggested_skills or []),
+        )
+        for source, skills in sources:
+            for raw in skills:
+                token = normalize_skill(raw)
+                if not token or len(token) > 100 or token in rows:
+                    continue
+                rows[token] = {
+                    "employee_id": employee.id,
+                    "skill": token,
+                    "org_id": employee.company_id,
+                    "label": raw.strip()[:255],
+                    "source": source,
+                }
+        return list(rows.values())
+
+    @classmethod
+    async def sync_for_employee(cls, db: AsyncSession, employee: "Employee") -> None:
+        """Replace the index rows of a single employee inside the caller's transaction."""
+        await db.execute(delete(cls).where(cls.employee_id == employee.id))
+        rows = cls.build_rows(employee)
+        if rows:
+            await db.execute(cls.__table__.insert(), rows)
+
+
 class ResumeStatus(str, enum.Enum):
     UPLOADED = "uploaded"
     PARSING = "parsing"
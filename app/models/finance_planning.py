@@ -3,11 +3,12 @@ Finance Planning Models
 Handles annual budgets, revenue/expense lines, scenarios, and forecasting data
 """
 import enum
-from sqlalchemy import Column, Integer, String, Float, Date, TIMESTAMP, Text, JSON, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, Date, TIMESTAMP, Text, JSON, Boolean, ForeignKey, Enum as SQLEnum, Numeric, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime, date
+from decimal import Decimal
 from typing import Optional, Dict, Any
 import uuid
 from app.db.base import Base
@@ -58,6 +59,7 @@ class FinanceRevenueLine(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     budget_id: Mapped[int] = mapped_column(Integer, ForeignKey("finance_annual_budgets.id", ondelete="CASCADE"), nullable=False)
+    line_key: Mapped[str] = mapped_column(String(255), nullable=False)  # stable key for diff-based saves
     
     label: Mapped[str] = mapped_column(String(255), nullable=False)
     target: Mapped[float] = mapped_column(Float, default=0.0)
@@ -77,6 +79,10 @@ class FinanceRevenueLine(Base):
     # Relationships
     budget: Mapped["FinanceAnnualBudget"] = relationship("FinanceAnnualBudget", back_populates="revenue_lines")
 
+    __table_args__ = (
+        UniqueConstraint("budget_id", "line_key", name="uq_finance_revenue_lines_budget_line_key"),
+    )
+
 
 class FinanceExpenseLine(Base):
     """
@@ -86,6 +92,7 @@ class FinanceExpenseLine(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     budget_id: Mapped[int] = mapped_column(Integer, ForeignKey("finance_annual_budgets.id", ondelete="CASCADE"), nullable=False)
+    line_key: Mapped[str] = mapped_column(String(255), nullable=False)  # stable key for diff-based saves
     
     label: Mapped[str] = mapped_column(String(255), nullable=False)
     target: Mapped[float] = mapped_column(Float, default=0.0)
@@ -105,6 +112,10 @@ class FinanceExpenseLine(Base):
     # Relationships
     budget: Mapped["FinanceAnnualBudget"] = relationship("FinanceAnnualBudget", back_populates="expense_lines")
 
+    __table_args__ = (
+        UniqueConstraint("budget_id", "line_key", name="uq_finance_expense_lines_budget_line_key"),
+    )
+
 
 class FinanceBusinessUnit(Base):
     """
@@ -114,6 +125,7 @@ class FinanceBusinessUnit(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     budget_id: Mapped[int] = mapped_column(Integer, ForeignKey("finance_annual_budgets.id", ondelete="CASCADE"), nullable=False)
+    line_key: Mapped[str] = mapped_column(String(255), nullable=False)  # stable key for diff-based saves
     
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     revenue: Mapped[float] = mapped_column(Float, default=0.0)
@@ -128,6 +140,10 @@ class FinanceBusinessUnit(Base):
     # Relationships
     budget: Mapped["FinanceAnnualBudget"] = relationship("FinanceAnnualBudget", back_populates="business_units")
 
+    __table_args__ = (
+        UniqueConstraint("budget_id", "line_key", name="uq_finance_business_units_budget_line_key"),
+    )
+
 
 class FinancePlanningScenario(Base):
     """
@@ -166,6 +182,7 @@ class FinancePlanningScenario(Base):
     # Relationships
     projections = relationship("FinanceProjection", back_populates="scenario", cascade="all, delete-orphan")
     kpi_targets = relationship("FinanceKpiTarget", back_populates="scenario", cascade="all, delete-orphan")
+    simulations = relationship("FinanceScenarioSimulation", back_populates="scenario", cascade="all, delete-orphan")
 
 
 class FinanceProjection(Base):
@@ -190,6 +207,33 @@ class FinanceProjection(Base):
     scenario: Mapped["FinancePlanningScenario"] = relationship("FinancePlanningScenario", back_populates="projections")
 
 
+class FinanceScenarioSimulation(Base):
+    """
+    Monte-Carlo run summary for a scenario: per-year mean/percentiles of revenue,
+    expenses, profit and margin plus loss/target probabilities. Individual draws
+    are not stored.
+    """
+    __tablename__ = "finance_scenario_simulations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    scenario_id: Mapped[int] = mapped_column(Integer, ForeignKey("finance_planning_scenarios.id", ondelete="CASCADE"), nullable=False)
+    
+    draws: Mapped[int] = mapped_column(Integer, nullable=False)
+    seed: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    parameters: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)  # volatilities, correlation, base values
+    summary: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    
+    created_by: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
+    
+    # Relationships
+    scenario: Mapped["FinancePlanningScenario"] = relationship("FinancePlanningScenario", back_populates="simulations")
+
+    __table_args__ = (
+        Index("ix_finance_scenario_simulations_scenario_created", "scenario_id", "created_at"),
+    )
+
+
 class FinanceKpiTarget(Base):
     """
     KPI targets for scenarios
@@ -305,3 +349,30 @@ class BudgetApproval(Base):
     
     # Relationships
     budget: Mapped["FinanceAnnualBudget"] = relationship("FinanceAnnualBudget", back_populates="approvals")
+
+
+class FinanceMonthlyActual(Base):
+    """
+    Monthly actuals fact table: approved spend per organization, expense category and month.
+    Maintained incrementally by FinanceActualsService when expenses and invoices change status,
+    so budget-vs-actual views read a handful of indexed rows instead of scanning source tables.
+    category_key is the normalized category name; "" collects spend without a category.
+    """
+    __tablename__ = "finance_monthly_actuals"
+
+    org_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    category_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)  # first day of the month
+
+    expense_amount: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=Decimal("0"))
+    expense_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reimbursed_amount: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=Decimal("0"))
+    reimbursed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    invoice_amount: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=Decimal("0"))
+    invoice_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_finance_monthly_actuals_org_month", "org_id", "month"),
+    )
@@ -101,6 +101,46 @@ class OpportunitySource(Base):
     creator: Mapped["User"] = relationship("User")
 
 
+class OpportunitySourceTemplate(Base):
+    """Learned CSS selectors for a source's listing page (see app/utils/extraction_templates.py)."""
+    __tablename__ = "opportunity_source_templates"
+
+    source_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("opportunity_sources.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False, index=True
+    )
+
+    selectors: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # "structure" (repeated-DOM detection) or "model" (selector-only Gemini call)
+    induced_by: Mapped[str] = mapped_column(String(32), nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    version: Mapped[int] = mapped_column(default=1, nullable=False)
+    hit_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    consecutive_misses: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    validated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    last_matched_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+    )
+
+    source: Mapped["OpportunitySource"] = relationship("OpportunitySource")
+
+
 class ScrapeJobStatus(enum.Enum):
     queued = "queued"
     running = "running"
@@ -363,3 +403,64 @@ class OpportunityAgentRun(Base):
     agent: Mapped["OpportunityAgent"] = relationship("OpportunityAgent", backref="runs")
 
 
+
+class SchedulerRunKind(enum.Enum):
+    sources = "sources"
+    agents = "agents"
+    all = "all"
+
+
+class SchedulerRunStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class OpportunitySchedulerRun(Base):
+    """A queued batch of scheduled scrapes / agent executions, processed by the scheduler worker."""
+    __tablename__ = "opportunity_scheduler_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    kind: Mapped[SchedulerRunKind] = mapped_column(
+        SQLEnum(
+            SchedulerRunKind,
+            name="opportunity_scheduler_run_kind",
+            create_type=False,
+        ),
+        nullable=False,
+    )
+    status: Mapped[SchedulerRunStatus] = mapped_column(
+        SQLEnum(
+            SchedulerRunStatus,
+            name="opportunity_scheduler_run_status",
+            create_type=False,
+        ),
+        default=SchedulerRunStatus.queued,
+        nullable=False,
+        index=True,
+    )
+    requested_by: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+
+    # Worker currently holding the run and until when; an expired lease lets another worker resume it
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    results: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -11,11 +11,12 @@ These are TWO COMPLETELY SEPARATE systems. Do NOT mix them.
 See: docs/VENDOR_SYSTEMS_DOCUMENTATION.md for full details.
 """
 
-from sqlalchemy import String, select, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import String, select, Boolean, DateTime, Text, JSON, ForeignKey, Integer, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from app.db.base import Base
 from app.db.session import get_transaction
@@ -389,3 +390,36 @@ class VendorQualification(Base):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+
+
+class VendorScorecard(Base):
+    """
+    Per-vendor rollup of purchase orders, invoices and delivery milestones.
+
+    One row per vendor, recomputed by VendorScorecardService with a single
+    grouped query when the vendor's orders, invoices or milestones change.
+    """
+    __tablename__ = "vendor_scorecards"
+
+    vendor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("vendors.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    total_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    orders_spend: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=0)
+    avg_order_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 2), nullable=True)
+    last_order_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    total_invoices: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    invoices_spend: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=0)
+    avg_invoice_value: Mapped[Optional[Decimal]] = mapped_column(Numeric(15, 2), nullable=True)
+
+    milestones_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    milestones_on_time: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Sum and count of (completed - due) in whole days over completed milestones
+    delivery_days_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delivery_days_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -43,6 +43,7 @@ from app.routes.notifications import router as notifications_router
 from app.routes.opportunity_filter_preset import router as opportunity_filter_preset_router
 from app.routes.departments import router as departments_router
 from app.routes.contract import router as contract_router
+from app.routes.search import router as search_router
 
 api_router = APIRouter()
 
@@ -89,4 +90,5 @@ api_router.include_router(procurement_router)
 api_router.include_router(notifications_router)
 api_router.include_router(opportunity_filter_preset_router)
 api_router.include_router(departments_router)
-api_router.include_router(contract_router)
\ No newline at end of file
+api_router.include_router(contract_router)
+api_router.include_router(search_router)
\ No newline at end of file
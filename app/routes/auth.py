@@ -3,18 +3,20 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import timedelta, datetime
 from pydantic import BaseModel, EmailStr
 from typing import Optional, Dict, Any
-import boto3
-from botocore.exceptions import ClientError
 import os
 from app.environment import environment
 from app.utils.logger import logger
 from app.utils.error import MegapolisHTTPException
+from app.services.resources import get_s3_client
+from app.utils.lazy import lazy_import
 
 from app.services.auth_service import AuthService
 from app.models.user import User
 from app.db.session import get_transaction
 from sqlalchemy import select
 
+botocore_exceptions = lazy_import("botocore.exceptions")
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
 
@@ -298,17 +300,12 @@ async def upload_profile_picture(
                 s3_key = f"profile-pictures/{current_user.id}/{timestamp}.{file_extension}"
                 
                 # Upload to S3
-                s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                    region_name=environment.AWS_S3_REGION or "us-east-1"
-                )
+                s3_client = get_s3_client()
                 
                 # Check if bucket exists
                 try:
                     s3_client.head_bucket(Bucket=environment.AWS_S3_BUCKET_NAME)
-                except ClientError as e:
+                except botocore_exceptions.ClientError as e:
                     error_code = e.response.get('Error', {}).get('Code', '')
                     if error_code == '404' or error_code == '403':
                         logger.warning(f"S3 bucket '{environment.AWS_S3_BUCKET_NAME}' does not exist or is not accessible. Falling back to local storage.")
@@ -327,7 +324,7 @@ async def upload_profile_picture(
                     region_segment = f".{environment.AWS_S3_REGION}" if environment.AWS_S3_REGION else ""
                     file_url = f"https://{environment.AWS_S3_BUCKET_NAME}.s3{region_segment}.amazonaws.com/{s3_key}"
                     logger.info(f"Profile picture uploaded to S3: {s3_key}")
-            except ClientError as e:
+            except botocore_exceptions.ClientError as e:
                 logger.error(f"S3 upload failed: {e}. Falling back to local storage.")
                 s3_enabled = False
         
@@ -389,7 +386,7 @@ async def change_password(
     current_user: User = Depends(get_current_user)
 ):
     # Verify current password
-    if not AuthService.verify_password(current_password, current_user.password_hash):
+    if not await AuthService.verify_password_async(current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -13,6 +13,7 @@ from app.dependencies.permissions import get_user_permission
 from app.models.user import User
 from app.schemas.auth import AuthUserResponse
 from app.schemas.user_permission import UserPermissionResponse
+from app.utils.pagination import CountMode
 from app.schemas.contract import (
     ContractCreate,
     ContractResponse,
@@ -98,6 +99,8 @@ async def list_contracts(
     status_filter: Optional[ContractStatus] = Query(None),
     risk_filter: Optional[RiskLevel] = Query(None),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: AuthUserResponse = Depends(get_current_user),
     _: UserPermissionResponse = Depends(get_user_permission({"contracts": ["view"]})),
@@ -131,6 +134,8 @@ async def list_contracts(
             status_filter=status_filter,
             risk_filter=risk_filter,
             search=search,
+            cursor=cursor,
+            count=count,
         )
     except HTTPException:
         raise
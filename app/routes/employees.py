@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from uuid import UUID
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.employee import (
@@ -22,15 +23,20 @@ from app.schemas.employee_activation import EmployeeActivationRequest, EmployeeA
 from app.services.employee_service import employee_service
 from app.services.resume_service import resume_service
 from app.services.gemini_service import gemini_service
+from app.services.skill_index import SkillIndexService, CANDIDATE_STATUSES
 from app.services.auth_service import AuthService
 from app.services.email import send_employee_activation_email
 from app.dependencies.user_auth import get_current_user
 from app.models.user import User
 from app.db.session import get_request_transaction, get_session, get_transaction
 from app.utils.logger import get_logger
+from app.utils.skills import normalize_skills
 
 import logging
 
+if TYPE_CHECKING:
+    from app.models.employee import Employee
+
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/resources", tags=["Employee Onboarding"])
@@ -387,7 +393,7 @@ async def activate_employee(
             if activation_data.temporary_password:
                 try:
                     from app.services.auth_service import AuthService
-                    user.password_hash = AuthService.get_password_hash(activation_data.temporary_password)
+                    user.password_hash = await AuthService.get_password_hash_async(activation_data.temporary_password)
                     await db.flush()
                     logger.info(f"Updated password for existing user {user.id}")
                 except Exception as pw_error:
@@ -422,7 +428,7 @@ async def activate_employee(
                         logger.info(f"Reusing existing user with email {user_email} and username {username}")
                         user = email_user
                         # Update password
-                        user.password_hash = AuthService.get_password_hash(activation_data.temporary_password)
+                        user.password_hash = await AuthService.get_password_hash_async(activation_data.temporary_password)
                         await db.flush()
                         await db.refresh(user)
                     else:
@@ -437,7 +443,7 @@ async def activate_employee(
                     user = User(
                         email=user_email,
                         username=username,
-                        password_hash=AuthService.get_password_hash(activation_data.temporary_password),
+                        password_hash=await AuthService.get_password_hash_async(activation_data.temporary_password),
                         role=activation_data.user_role,
                         name=employee.name,
                         org_id=current_user.org_id,
@@ -995,10 +1001,27 @@ async def send_welcome_email(
 
 # ==================== EMPLOYEE SEARCH ====================
 
+async def _load_candidates(db: AsyncSession, org_id: UUID, limit: int = 1000) -> List["Employee"]:
+    """Pending/review employees of the org, newest first."""
+    from app.models.employee import Employee
+    
+    result = await db.execute(
+        select(Employee)
+        .where(
+            Employee.company_id == org_id,
+            Employee.status.in_(CANDIDATE_STATUSES)
+        )
+        .order_by(Employee.created_at.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
 @router.post("/employees/search")
 async def search_employees(
     search_criteria: dict,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_request_transaction)
 ):
     """
     AI-powered employee search with smart matching
@@ -1007,22 +1030,20 @@ async def search_employees(
     Returns: Candidates with match percentage (sorted)
     """
     try:
-        from app.models.employee import Employee
-        
         position = search_criteria.get('position', '')
         skills = search_criteria.get('skills', [])
         sectors = search_criteria.get('sectors', [])
         services = search_criteria.get('services', [])
         project_types = search_criteria.get('projectTypes', [])
         
-        # Get all employees (in accepted/active status - team members)
-        all_employees = await Employee.get_all(
-            company_id=current_user.org_id,
-            limit=1000
-        )
+        # Load CANDIDATES only (pending + review) - NOT accepted/active
+        candidates = await _load_candidates(db, current_user.org_id)
         
-        # Filter for CANDIDATES only (pending + review) - NOT accepted/active
-        candidates = [e for e in all_employees if e.status in ['pending', 'review']]
+        # Skill overlap per candidate comes from the org skill index
+        skill_matches = await SkillIndexService(db).match_skills(
+            current_user.org_id, skills, statuses=CANDIDATE_STATUSES
+        ) if skills else {}
+        query_skill_count = len(normalize_skills(skills))
         
         # Calculate match score for each candidate
         results = []
@@ -1041,10 +1062,9 @@ async def search_employees(
             # Skills match
             if skills:
                 total_criteria += 40
-                emp_skills = emp.skills or []
-                matched_skills = len(set(skills) & set(emp_skills))
-                if matched_skills > 0:
-                    match_score += min((matched_skills / len(skills)) * 40, 40)
+                matched_skills = len(skill_matches.get(emp.id, []))
+                if matched_skills > 0 and query_skill_count:
+                    match_score += min((matched_skills / query_skill_count) * 40, 40)
             
             # Sectors match (mock - would check emp.sectors if available)
             if sectors:
@@ -1114,7 +1134,8 @@ async def search_employees(
 @router.post("/employees/ai-search")
 async def ai_semantic_search(
     search_query: dict,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_request_transaction)
 ):
     """
     AI-powered semantic employee search using Gemini
@@ -1123,8 +1144,6 @@ async def ai_semantic_search(
     Example: "Find civil engineers with 5+ years experience in high-rise construction"
     """
     try:
-        from app.models.employee import Employee
-        
         query_text = search_query.get('query', '')
         
         if not query_text:
@@ -1190,13 +1209,14 @@ Return ONLY the JSON object, no markdown or explanation.
             filters = {"role": query_text}
         
         # Step 2: Query database using extracted filters
-        all_employees = await Employee.get_all(
-            company_id=current_user.org_id,
-            limit=1000
-        )
+        # Load CANDIDATES only (pending + review) - NOT accepted/active
+        candidates = await _load_candidates(db, current_user.org_id)
         
-        # Filter for CANDIDATES only (pending + review) - NOT accepted/active
-        candidates = [e for e in all_employees if e.status in ['pending', 'review']]
+        filter_skills = filters.get('skills') or []
+        skill_matches = await SkillIndexService(db).match_skills(
+            current_user.org_id, filter_skills, statuses=CANDIDATE_STATUSES, fuzzy=True
+        ) if filter_skills else {}
+        filter_skill_count = len(normalize_skills(filter_skills))
         
         # Apply filters
         results = []
@@ -1214,13 +1234,11 @@ Return ONLY the JSON object, no markdown or explanation.
                     match_score += 25
             
             # Skills match
-            if filters.get('skills'):
+            if filter_skills:
                 total_criteria += 40
-                emp_skills = [s.lower() for s in (emp.skills or [])]
-                filter_skills = [s.lower() for s in filters['skills']]
-                matched = sum(1 for fs in filter_skills if any(fs in es or es in fs for es in emp_skills))
-                if matched > 0:
-                    match_score += min((matched / len(filter_skills)) * 40, 40)
+                matched = len(skill_matches.get(emp.id, []))
+                if matched > 0 and filter_skill_count:
+                    match_score += min((matched / filter_skill_count) * 40, 40)
             
             # Location match
             if filters.get('location'):
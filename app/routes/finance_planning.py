@@ -27,6 +27,11 @@ from app.schemas.finance import (
     FinanceAnnualBudgetUpdate,
     FinancePlanningConfigUpdate,
     FinanceScenarioUpdate,
+    ScenarioProjectionParams,
+    ScenarioSensitivityRequest,
+    ScenarioSensitivityResponse,
+    ScenarioSimulationRequest,
+    ScenarioSimulationResponse,
     ForecastCreate,
     ForecastResponse,
     ForecastListResponse,
@@ -286,6 +291,71 @@ async def update_planning_config(
         )
 
 
+@router.post("/scenarios/projections/recalculate", response_model=FinancePlanningScenarioResponse)
+async def recalculate_scenario_projections(
+    params: ScenarioProjectionParams,
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: AuthUserResponse = Depends(get_current_user),
+) -> FinancePlanningScenarioResponse:
+    """
+    Recompute every scenario's yearly projections from its growth rates and the planning configuration.
+    """
+    from app.services.finance_planning import get_scenarios_from_db
+    from app.services.scenario_projection import recalculate_projections
+    
+    await recalculate_projections(db, params)
+    await db.flush()
+    scenarios_data = await get_scenarios_from_db(db)
+    if scenarios_data:
+        return scenarios_data
+    return get_scenario_planning_snapshot()
+
+
+@router.post("/scenarios/sensitivity", response_model=ScenarioSensitivityResponse)
+async def scenario_sensitivity(
+    params: ScenarioSensitivityRequest,
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: AuthUserResponse = Depends(get_current_user),
+) -> ScenarioSensitivityResponse:
+    """
+    Final-year profit and margin of each scenario when revenue and expense growth are shifted.
+    """
+    from app.services.scenario_projection import run_sensitivity
+    
+    return await run_sensitivity(db, params)
+
+
+@router.post("/scenarios/simulations", response_model=ScenarioSimulationResponse)
+async def simulate_scenarios(
+    params: ScenarioSimulationRequest,
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: AuthUserResponse = Depends(get_current_user),
+) -> ScenarioSimulationResponse:
+    """
+    Run a Monte-Carlo simulation of growth and expense rates; stores and returns per-scenario summaries.
+    """
+    from app.services.scenario_projection import run_simulation
+    
+    try:
+        simulations = await run_simulation(db, params, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ScenarioSimulationResponse(simulations=simulations)
+
+
+@router.get("/scenarios/simulations", response_model=ScenarioSimulationResponse)
+async def read_scenario_simulations(
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: AuthUserResponse = Depends(get_current_user),
+) -> ScenarioSimulationResponse:
+    """
+    Latest simulation summary of each scenario.
+    """
+    from app.services.scenario_projection import latest_simulations
+    
+    return ScenarioSimulationResponse(simulations=await latest_simulations(db))
+
+
 @router.patch("/scenarios/{scenario_key}", response_model=FinancePlanningScenarioResponse)
 async def update_scenario_data(
     scenario_key: str,
@@ -318,7 +388,7 @@ async def generate_forecast(
     current_user: AuthUserResponse = Depends(get_current_user),
 ) -> ForecastResponse:
     """
-    Generate a financial forecast using AI.
+    Generate a statistical financial forecast from monthly actuals.
     """
     try:
         from app.services.forecast_service import forecast_service
@@ -326,12 +396,12 @@ async def generate_forecast(
         logger = logging.getLogger(__name__)
         
         # Get historical data
-        historical_data = await forecast_service._get_historical_data(db, months=12)
+        historical_data = await forecast_service._get_historical_data(
+            db, months=36, org_id=getattr(current_user, 'org_id', None)
+        )
         logger.info(f"Fetched {len(historical_data)} months of historical data")
         
-        # Generate forecast using AI (this may take time)
-        logger.info("Starting AI forecast generation...")
-        forecast_items, ai_confidence, ai_insights = await forecast_service.generate_ai_forecast(
+        forecast_items, ai_confidence, ai_insights = await forecast_service.generate_forecast(
             historical_data,
             forecast_params
         )
@@ -0,0 +1,40 @@
+"""
+Metrics routes (mounted at the app root, outside /api).
+
+`/metrics` is the Prometheus scrape target. Both endpoints need
+`Authorization: Bearer <METRICS_TOKEN>`; without a configured token they are
+only served in the dev environment.
+"""
+import hmac
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.environment import environment
+from app.services.request_profiler import slow_samples
+from app.utils.metrics import registry
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"], include_in_schema=False)
+
+
+def require_metrics_access(request: Request) -> None:
+    token = environment.METRICS_TOKEN
+    if not token:
+        if environment.ENVIRONMENT == "dev":
+            return
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied, token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+
+@router.get("", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/slow-requests", dependencies=[Depends(require_metrics_access)])
+async def get_slow_requests() -> List[Dict[str, Any]]:
+    """Recently sampled slow requests with their grouped SQL statements."""
+    return slow_samples()
@@ -1,7 +1,8 @@
 """
 Notification API routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List, Optional
@@ -10,7 +11,8 @@ from app.dependencies.user_auth import get_current_user
 from app.dependencies.permissions import get_user_permission
 from app.models.user import User
 from app.schemas.user_permission import UserPermissionResponse
-from app.db.session import get_request_transaction
+from app.db.session import get_request_transaction, get_session
+from app.services.notification_events import notification_bus
 from app.services.opportunity_notifications import OpportunityNotificationService
 from app.utils.logger import get_logger
 
@@ -63,6 +65,34 @@ async def get_unread_count(
     return {"unread_count": count}
 
 
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    user_permission: UserPermissionResponse = Depends(get_user_permission({"notifications": ["view"]}))
+) -> StreamingResponse:
+    """
+    Server-sent event stream of new notifications and unread-count changes.
+    Sends the current unread count first, then `notification` and `unread_count`
+    events as they are committed, with keep-alive comments in between.
+    """
+    if not current_user.org_id:
+        raise HTTPException(status_code=400, detail="User must belong to an organization")
+
+    user_id, org_id = current_user.id, current_user.org_id
+
+    async def initial_unread() -> int:
+        # Short-lived session: the stream must not hold a pooled connection open
+        async with get_session() as db:
+            return await OpportunityNotificationService(db).get_unread_count(user_id=user_id, org_id=org_id)
+
+    return StreamingResponse(
+        notification_bus.stream(user_id, initial_unread, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{notification_id}/read")
 async def mark_notification_read(
     notification_id: UUID,
@@ -26,6 +26,7 @@ from app.models.opportunity import Opportunity
 from app.schemas.user_permission import UserPermissionResponse
 from app.db.session import get_request_transaction
 from app.utils.logger import get_logger
+from app.utils.pagination import CountMode
 
 logger = get_logger("opportunity_routes")
 
@@ -57,6 +58,8 @@ async def list_opportunities(
     risk_level: Optional[str] = Query(None, description="Filter by risk level"),
     min_match_score: Optional[int] = Query(None, description="Minimum match score"),
     account_id: Optional[UUID] = Query(None, description="Filter by account ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["view"]}))
@@ -89,6 +92,8 @@ async def list_opportunities(
         risk_level=risk_level,
         min_match_score=min_match_score,
         account_id=account_id,
+        cursor=cursor,
+        count=count,
     )
 
 @router.get("/{opportunity_id}", response_model=OpportunityResponse)
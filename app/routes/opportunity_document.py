@@ -1,13 +1,18 @@
 import os
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, UploadFile, File, Form, Request
 from fastapi.responses import FileResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import List
 
 from app.schemas.opportunity_document import *
-from app.services.opportunity_document import OpportunityDocumentService
+from app.services.opportunity_document import (
+    MAX_DOCUMENT_BYTES,
+    DocumentLocationError,
+    OpportunityDocumentService,
+)
+from app.services.storage import FileTooLargeError
 from app.dependencies.user_auth import get_current_user
 from app.dependencies.permissions import get_user_permission
 from app.models.user import User
@@ -29,7 +34,7 @@ async def upload_opportunity_document(
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["update"]}))
 ):
-    from app.utils.security import validate_file_type, validate_file_size, sanitize_filename
+    from app.utils.security import validate_file_type, sanitize_filename
     
     try:
         if not file.filename:
@@ -44,40 +49,60 @@ async def upload_opportunity_document(
                 detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
             )
         
-        file_content = await file.read()
-        
-        if not validate_file_size(len(file_content), max_size_mb=10):
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="File size exceeds 10MB limit"
-            )
-        document_data = OpportunityDocumentCreate(
-            file_name=safe_name,
+        content_type = file.content_type or "application/octet-stream"
+        service = OpportunityDocumentService(db)
+        return await service.upload_document(
+            opportunity_id,
+            file,
             original_name=safe_name,
-            file_type=file.content_type or "application/octet-stream",
-            file_size=len(file_content),
+            content_type=content_type,
             category=category,
             purpose=purpose,
-            description=f"Uploaded file: {safe_name}",
-            tags=None,
-            status="uploaded",
-            is_available_for_proposal=True,
+            current_user=current_user,
+            max_bytes=MAX_DOCUMENT_BYTES,
         )
-        
-        service = OpportunityDocumentService(db)
-        return await service.create_document(
-            opportunity_id,
-            document_data,
-            current_user,
-            file_content=file_content,
-            content_type=file.content_type or "application/octet-stream",
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File size exceeds 10MB limit"
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading document for opportunity {opportunity_id}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to upload document")
 
+@router.post("/{opportunity_id}/documents/upload-url", response_model=OpportunityDocumentUploadUrlResponse)
+async def create_opportunity_document_upload_url(
+    opportunity_id: UUID,
+    payload: OpportunityDocumentUploadUrlRequest,
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: User = Depends(get_current_user),
+    user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["update"]}))
+):
+    """
+    Presigned URL for uploading straight to the bucket. After the upload, register
+    the file with POST /{opportunity_id}/documents using the returned key as file_path.
+    """
+    from app.utils.security import sanitize_filename
+    
+    try:
+        service = OpportunityDocumentService(db)
+        ticket = await service.create_upload_url(
+            opportunity_id, sanitize_filename(payload.file_name), payload.content_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Direct uploads are not available; use /documents/upload instead"
+        )
+    return OpportunityDocumentUploadUrlResponse(**ticket)
+
 @router.post("/{opportunity_id}/documents", response_model=OpportunityDocumentResponse, status_code=201)
 async def create_opportunity_document(
     opportunity_id: UUID,
@@ -89,6 +114,13 @@ async def create_opportunity_document(
     try:
         service = OpportunityDocumentService(db)
         return await service.create_document(opportunity_id, document_data, current_user)
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File size exceeds 10MB limit"
+        )
+    except DocumentLocationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -142,6 +174,8 @@ async def update_opportunity_document(
     try:
         service = OpportunityDocumentService(db)
         return await service.update_document(opportunity_id, document_id, update_data, current_user)
+    except DocumentLocationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -170,6 +204,7 @@ async def delete_opportunity_document(
 async def download_opportunity_document(
     opportunity_id: UUID,
     document_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["read"]}))
@@ -178,18 +213,33 @@ async def download_opportunity_document(
         service = OpportunityDocumentService(db)
         document = await service.get_document(opportunity_id, document_id, current_user)
 
+        filename = document.original_name or document.file_name or "document"
+        media_type = document.file_type or "application/octet-stream"
+        storage = service.storage
+
+        # Only objects stored under this opportunity's prefix are served from the bucket
+        key = service.owned_key(opportunity_id, document.file_path)
+        if key:
+            presigned_url = await storage.presign_download(key, filename=filename)
+            if presigned_url:
+                return RedirectResponse(url=presigned_url)
+            return await storage.range_response(
+                key,
+                range_header=request.headers.get("range"),
+                media_type=media_type,
+                filename=filename,
+            )
+
         if document.file_url:
             return RedirectResponse(url=document.file_url)
 
-        if not document.file_path or not os.path.exists(document.file_path):
+        # Legacy rows stored an absolute path outside the storage root
+        if not document.file_path or not os.path.isabs(document.file_path) or not os.path.exists(document.file_path):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Stored file not found on server"
             )
 
-        filename = document.original_name or document.file_name or "document"
-        media_type = document.file_type or "application/octet-stream"
-
         return FileResponse(
             path=document.file_path,
             media_type=media_type,
@@ -201,4 +251,4 @@ async def download_opportunity_document(
         raise
     except Exception as e:
         logger.error(f"Error downloading document {document_id} for opportunity {opportunity_id}: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to download document")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to download document")
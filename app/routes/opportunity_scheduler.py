@@ -1,15 +1,22 @@
 """
 Opportunity Scheduler Routes
 Provides endpoints to trigger and manage scheduled opportunity scrapes and AI agent executions.
+Triggers only queue a run; the work is done by `python manage.py scheduler-worker`.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Optional
 
+from app.environment import environment
+from app.models.opportunity_source import OpportunitySchedulerRun, SchedulerRunKind
 from app.services.opportunity_scheduler import OpportunitySchedulerService
+from app.services.scheduler_worker import SchedulerWorker, enqueue_scheduler_run
 from app.dependencies.user_auth import get_current_user
 from app.dependencies.permissions import get_user_permission
 from app.models.user import User
+from app.schemas.user import Roles
 from app.schemas.user_permission import UserPermissionResponse
 from app.db.session import get_request_transaction
 from app.utils.logger import get_logger
@@ -19,27 +26,48 @@ logger = get_logger("opportunity_scheduler_routes")
 router = APIRouter(prefix="/opportunity-scheduler", tags=["Opportunity Scheduler"])
 
 
+def _requested_by(current_user: User) -> Optional[uuid.UUID]:
+    user_id = getattr(current_user, "id", None)
+    if user_id is None:
+        return None
+    return user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+
+
+def _is_admin(current_user: User) -> bool:
+    # Same rule as require_role: the vendor (main owner) role has admin privileges
+    role = (getattr(current_user, "role", None) or "").lower()
+    return role in (Roles.ADMIN.value, Roles.SUPER_ADMIN.value, Roles.VENDOR.value)
+
+
+async def _enqueue(
+    kind: SchedulerRunKind, current_user: User, background_tasks: BackgroundTasks
+) -> Dict[str, Any]:
+    run = await enqueue_scheduler_run(kind, requested_by=_requested_by(current_user))
+    if environment.SCHEDULER_INLINE_WORKER:
+        background_tasks.add_task(SchedulerWorker(schedule=False).drain)
+    return {
+        "status": "queued",
+        "message": "Scheduler run queued; poll /opportunity-scheduler/runs/{run_id} for progress",
+        "run_id": str(run.id),
+        "kind": kind.value,
+    }
+
+
 @router.post("/run-sources", response_model=Dict[str, Any])
 async def run_scheduled_sources(
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["admin"]}))
 ) -> Dict[str, Any]:
     """
-    Manually trigger scheduled opportunity source scrapes.
-    This endpoint can be called by cron jobs or manually by admins.
+    Queue scheduled opportunity source scrapes.
+    This endpoint can be called by cron jobs or manually by admins; the scheduler
+    worker performs the scrapes and the returned run id can be polled.
     """
     try:
-        scheduler = OpportunitySchedulerService(db)
-        results = await scheduler.run_scheduled_scrapes()
-        return {
-            "status": "success",
-            "message": "Scheduled source scrapes completed",
-            **results
-        }
+        return await _enqueue(SchedulerRunKind.sources, current_user, background_tasks)
     except Exception as e:
-        logger.error(f"Error running scheduled sources: {e}")
+        logger.error(f"Error queueing scheduled sources: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to run scheduled sources: {str(e)}"
@@ -49,24 +77,17 @@ async def run_scheduled_sources(
 @router.post("/run-agents", response_model=Dict[str, Any])
 async def run_scheduled_agents(
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["admin"]}))
 ) -> Dict[str, Any]:
     """
-    Manually trigger scheduled AI agent executions.
+    Queue scheduled AI agent executions.
     This endpoint can be called by cron jobs or manually by admins.
     """
     try:
-        scheduler = OpportunitySchedulerService(db)
-        results = await scheduler.run_scheduled_agents()
-        return {
-            "status": "success",
-            "message": "Scheduled agent executions completed",
-            **results
-        }
+        return await _enqueue(SchedulerRunKind.agents, current_user, background_tasks)
     except Exception as e:
-        logger.error(f"Error running scheduled agents: {e}")
+        logger.error(f"Error queueing scheduled agents: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to run scheduled agents: {str(e)}"
@@ -76,45 +97,72 @@ async def run_scheduled_agents(
 @router.post("/run-all", response_model=Dict[str, Any])
 async def run_all_scheduled_tasks(
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["admin"]}))
 ) -> Dict[str, Any]:
     """
-    Run both scheduled source scrapes and AI agent executions.
+    Queue both scheduled source scrapes and AI agent executions.
     This is the main endpoint that should be called by cron jobs.
     """
     try:
-        scheduler = OpportunitySchedulerService(db)
-        
-        # Run sources
-        source_results = await scheduler.run_scheduled_scrapes()
-        
-        # Run agents
-        agent_results = await scheduler.run_scheduled_agents()
-        
-        return {
-            "status": "success",
-            "message": "All scheduled tasks completed",
-            "sources": source_results,
-            "agents": agent_results,
-            "summary": {
-                "total_sources_processed": source_results.get("sources_processed", 0),
-                "total_agents_processed": agent_results.get("agents_processed", 0),
-                "total_opportunities_created": (
-                    source_results.get("total_opportunities_created", 0) +
-                    agent_results.get("total_opportunities_created", 0)
-                )
-            }
-        }
+        return await _enqueue(SchedulerRunKind.all, current_user, background_tasks)
     except Exception as e:
-        logger.error(f"Error running all scheduled tasks: {e}")
+        logger.error(f"Error queueing scheduled tasks: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to run scheduled tasks: {str(e)}"
         )
 
 
+@router.get("/runs/{run_id}", response_model=Dict[str, Any])
+async def get_scheduler_run(
+    run_id: uuid.UUID,
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: User = Depends(get_current_user),
+    user_permission: UserPermissionResponse = Depends(get_user_permission({"opportunities": ["view"]}))
+) -> Dict[str, Any]:
+    """
+    Get progress and results of a queued scheduler run.
+    """
+    # Runs carry no org of their own; they belong to the org of the user who queued them.
+    # Runs the worker queues on its own schedule (no requester) span all orgs and are
+    # visible to admins only.
+    visible = User.org_id == current_user.org_id
+    if _is_admin(current_user):
+        visible = or_(visible, OpportunitySchedulerRun.requested_by.is_(None))
+    run = (
+        await db.execute(
+            select(OpportunitySchedulerRun)
+            .outerjoin(User, User.id == OpportunitySchedulerRun.requested_by)
+            .where(OpportunitySchedulerRun.id == run_id, visible)
+        )
+    ).scalar_one_or_none()
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scheduler run not found")
+
+    results = run.results or {}
+    sources = results.get("sources", {})
+    agents = results.get("agents", {})
+    return {
+        "run_id": str(run.id),
+        "kind": run.kind.value,
+        "status": run.status.value,
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+        "error_message": run.error_message,
+        **results,
+        "summary": {
+            "total_sources_processed": sources.get("sources_processed", 0),
+            "total_agents_processed": agents.get("agents_processed", 0),
+            "total_opportunities_created": (
+                sources.get("total_opportunities_created", 0) +
+                agents.get("total_opportunities_created", 0)
+            )
+        }
+    }
+
+
 @router.get("/status", response_model=Dict[str, Any])
 async def get_scheduler_status(
     db: AsyncSession = Depends(get_request_transaction),
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, Query, Body, UploadFile, File, Form
 from app.utils.error import MegapolisHTTPException
 from app.utils.logger import logger
+from app.services.resources import get_s3_client
+from app.utils.lazy import lazy_import
 from typing import List, Dict, Any, Optional
-import boto3
-from botocore.exceptions import ClientError
 from datetime import datetime
 import os
 from app.schemas.organization import (
@@ -41,6 +41,8 @@ from app.dependencies.permissions import require_role
 from app.services.email import send_organization_creation_email
 from app.environment import environment
 
+botocore_exceptions = lazy_import("botocore.exceptions")
+
 router = APIRouter(prefix="/orgs", tags=["orgs"])
 
 @router.post(
@@ -373,17 +375,12 @@ async def upload_org_logo(
             s3_key = f"organization-logos/{org_uuid}/{timestamp}.{file_extension}"
             
             # Upload to S3
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                region_name=environment.AWS_S3_REGION or "us-east-1"
-            )
+            s3_client = get_s3_client()
             
             # Check if bucket exists
             try:
                 s3_client.head_bucket(Bucket=environment.AWS_S3_BUCKET_NAME)
-            except ClientError as e:
+            except botocore_exceptions.ClientError as e:
                 error_code = e.response.get('Error', {}).get('Code', '')
                 if error_code == '404' or error_code == '403':
                     logger.warning(f"S3 bucket '{environment.AWS_S3_BUCKET_NAME}' does not exist or is not accessible. Falling back to local storage.")
@@ -402,7 +399,7 @@ async def upload_org_logo(
                 region_segment = f".{environment.AWS_S3_REGION}" if environment.AWS_S3_REGION else ""
                 file_url = f"https://{environment.AWS_S3_BUCKET_NAME}.s3{region_segment}.amazonaws.com/{s3_key}"
                 logger.info(f"Logo uploaded to S3: {s3_key}")
-        except ClientError as e:
+        except botocore_exceptions.ClientError as e:
             logger.error(f"S3 upload failed: {e}. Falling back to local storage.")
             s3_enabled = False
     
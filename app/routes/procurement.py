@@ -49,6 +49,7 @@ from app.schemas.procurement import (
     ProcurementBudgetListResponse,
 )
 from app.utils.logger import get_logger
+from app.utils.pagination import CountMode
 
 logger = get_logger("procurement_routes")
 
@@ -84,12 +85,14 @@ async def list_requisitions(
     size: int = Query(10, ge=1, le=100, description="Page size"),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search query"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"procurement": ["view"]}))
 ) -> PurchaseRequisitionListResponse:
     service = _service(db)
-    return await service.list_requisitions(current_user, page, size, status_filter, search)
+    return await service.list_requisitions(current_user, page, size, status_filter, search, cursor, count)
 
 @router.get(
     "/requisitions/{requisition_id}",
@@ -199,12 +202,14 @@ async def list_purchase_orders(
     size: int = Query(10, ge=1, le=100, description="Page size"),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search query"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"procurement": ["view"]}))
 ) -> PurchaseOrderListResponse:
     service = _service(db)
-    return await service.list_purchase_orders(current_user, page, size, status_filter, search)
+    return await service.list_purchase_orders(current_user, page, size, status_filter, search, cursor, count)
 
 @router.get(
     "/orders/{order_id}",
@@ -293,12 +298,14 @@ async def list_rfqs(
     size: int = Query(10, ge=1, le=100, description="Page size"),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search query"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"procurement": ["view"]}))
 ) -> RFQListResponse:
     service = _service(db)
-    return await service.list_rfqs(current_user, page, size, status_filter, search)
+    return await service.list_rfqs(current_user, page, size, status_filter, search, cursor, count)
 
 @router.get(
     "/rfqs/{rfq_id}",
@@ -419,12 +426,14 @@ async def list_expenses(
     size: int = Query(10, ge=1, le=100, description="Page size"),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search query"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"procurement": ["view"]}))
 ) -> EmployeeExpenseListResponse:
     service = _service(db)
-    return await service.list_expenses(current_user, page, size, status_filter, search)
+    return await service.list_expenses(current_user, page, size, status_filter, search, cursor, count)
 
 @router.get(
     "/expenses/{expense_id}",
@@ -560,12 +569,14 @@ async def list_invoices(
     size: int = Query(10, ge=1, le=100, description="Page size"),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     search: Optional[str] = Query(None, description="Search query"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"procurement": ["view"]}))
 ) -> VendorInvoiceListResponse:
     service = _service(db)
-    return await service.list_invoices(current_user, page, size, status_filter, search)
+    return await service.list_invoices(current_user, page, size, status_filter, search, cursor, count)
 
 @router.get(
     "/invoices/{invoice_id}",
@@ -698,12 +709,14 @@ async def list_grns(
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     po_id: Optional[UUID] = Query(None, description="Filter by purchase order ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     user_permission: UserPermissionResponse = Depends(get_user_permission({"procurement": ["view"]}))
 ) -> GRNListResponse:
     service = _service(db)
-    return await service.list_grns(current_user, page, size, po_id)
+    return await service.list_grns(current_user, page, size, po_id, cursor, count)
 
 @router.get(
     "/grns/{grn_id}",
@@ -13,6 +13,7 @@ from app.dependencies.permissions import get_user_permission
 from app.models.user import User
 from app.schemas.auth import AuthUserResponse
 from app.schemas.user_permission import UserPermissionResponse
+from app.utils.pagination import CountMode
 from app.schemas.proposal import (
     ProposalCreate,
     ProposalResponse,
@@ -98,6 +99,8 @@ async def list_proposals(
     status_filter: Optional[ProposalStatus] = Query(None),
     type_filter: Optional[ProposalType] = Query(None, description="Filter by proposal type (proposal, brochure, interview, campaign)"),
     search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    count: CountMode = Query("exact", description="Total on the first page: exact, capped or estimate (cursor pages reuse it)"),
     db: AsyncSession = Depends(get_request_transaction),
     current_user: User = Depends(get_current_user),
     _: UserPermissionResponse = Depends(get_user_permission({"proposals": ["view"]})),
@@ -111,6 +114,8 @@ async def list_proposals(
             status_filter=status_filter,
             type_filter=type_filter,
             search=search,
+            cursor=cursor,
+            count=count,
         )
     except HTTPException:
         raise
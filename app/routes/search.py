@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.db.session import get_request_transaction
+from app.dependencies.user_auth import get_current_user
+from app.models.user import User
+from app.schemas.search import SearchResponse, SearchResult
+from app.services.search import SEARCH_TARGETS, SearchService
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get(
+    "",
+    response_model=SearchResponse,
+    summary="Ranked search across opportunities, accounts, contacts, vendors and procurement documents"
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (supports quotes, OR and -term)"),
+    types: Optional[str] = Query(
+        None, description=f"Comma-separated entity types ({', '.join(SEARCH_TARGETS)}); default all"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    db: AsyncSession = Depends(get_request_transaction),
+    current_user: User = Depends(get_current_user),
+) -> SearchResponse:
+    if not current_user.org_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User is not part of an organization")
+
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()] if types else None
+    unknown = [kind for kind in kinds or [] if kind not in SEARCH_TARGETS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search type(s): {', '.join(unknown)}"
+        )
+
+    hits = await SearchService(db).search(current_user.org_id, q, kinds, limit)
+    return SearchResponse(query=q, results=[SearchResult(**hit) for hit in hits])
@@ -24,10 +24,9 @@ from app.schemas.staff_planning import (
     StaffPlanWithAllocations,
 )
 from app.dependencies.user_auth import get_current_user
-from app.services.gemini_service import GeminiService
+from app.services.gemini_service import gemini_service
 
 router = APIRouter(prefix="/staff-planning", tags=["Staff Planning"])
-gemini_service = GeminiService()
 
 
 def calculate_allocation_total_cost_with_escalation(
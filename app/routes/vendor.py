@@ -203,6 +203,37 @@ async def get_vendor_qualification_history(
         )
 
 
+# Risk Assessment Endpoints (MUST come before /{vendor_id} route)
+@router.get("/risk-assessment")
+async def get_all_vendor_risk_assessments(
+    current_user: AuthUserResponse = Depends(get_current_user)
+):
+    """Get AI-powered risk assessments for all vendors"""
+    from app.services.vendor_risk_assessment import VendorRiskAssessmentService
+    
+    risk_service = VendorRiskAssessmentService()
+    try:
+        assessments = await risk_service.assess_all_vendors()
+        return assessments
+    except Exception as e:
+        logger.error(f"Error assessing all vendors: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to assess vendors: {str(e)}"
+        )
+
+
+@router.get("/performance")
+async def list_vendor_performance(
+    current_user: AuthUserResponse = Depends(get_current_user)
+):
+    """Performance metrics of every vendor, from the vendor scorecard rollup"""
+    from app.schemas.procurement import VendorPerformanceResponse
+    
+    performance = await vendor_service.list_vendor_performance()
+    return [VendorPerformanceResponse(**item) for item in performance]
+
+
 @router.get("/{vendor_id}", response_model=VendorResponse)
 async def get_vendor(vendor_id: str):
     vendor = await vendor_service.get_vendor_by_id(vendor_id)
@@ -298,26 +329,6 @@ async def delete_vendor(vendor_id: str):
     return None
 
 
-# Risk Assessment Endpoints (MUST come before /{vendor_id} route)
-@router.get("/risk-assessment")
-async def get_all_vendor_risk_assessments(
-    current_user: AuthUserResponse = Depends(get_current_user)
-):
-    """Get AI-powered risk assessments for all vendors"""
-    from app.services.vendor_risk_assessment import VendorRiskAssessmentService
-    
-    risk_service = VendorRiskAssessmentService()
-    try:
-        assessments = await risk_service.assess_all_vendors()
-        return assessments
-    except Exception as e:
-        logger.error(f"Error assessing all vendors: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to assess vendors: {str(e)}"
-        )
-
-
 @router.get("/risk-assessment/{vendor_id}")
 async def get_vendor_risk_assessment(
     vendor_id: str,
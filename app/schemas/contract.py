@@ -119,6 +119,8 @@ class ContractListResponse(BaseModel):
     total: int
     page: int
     size: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 
 class ContractFromProposalRequest(BaseModel):
@@ -207,6 +207,7 @@ class FinancePlanningMetric(BaseModel):
 
 
 class FinancePlanningLineItem(BaseModel):
+    line_key: Optional[str] = None  # Stable key; derived from the label when omitted
     label: str
     target: float
     variance: float
@@ -217,6 +218,7 @@ class FinancePlanningLineItem(BaseModel):
 
 
 class FinancePlanningBusinessUnit(BaseModel):
+    line_key: Optional[str] = None  # Stable key; derived from the name when omitted
     name: str
     revenue: float
     expense: float
@@ -383,6 +385,59 @@ class FinanceScenarioUpdate(BaseModel):
     opportunities: Optional[List[str]] = None
 
 
+class ScenarioProjectionParams(BaseModel):
+    expense_growth_ratio: float = Field(0.75, ge=0, le=3)  # expense growth as a multiple of revenue growth
+    expense_growth_rates: Optional[Dict[str, List[float]]] = None  # scenario key -> explicit expense growth rates
+    use_business_units: bool = True  # split the base year by the latest budget's business units
+
+
+class ScenarioSensitivityRequest(ScenarioProjectionParams):
+    revenue_shifts: List[float] = Field(default_factory=lambda: [-4.0, -2.0, 0.0, 2.0, 4.0], max_length=25)
+    expense_shifts: List[float] = Field(default_factory=lambda: [-2.0, -1.0, 0.0, 1.0, 2.0], max_length=25)
+
+
+class ScenarioSensitivityCell(BaseModel):
+    revenue_shift: float
+    expense_shift: float
+    revenue: float
+    expenses: float
+    profit: float
+    margin_percent: float
+
+
+class ScenarioSensitivityResult(BaseModel):
+    scenario_key: str
+    year: int
+    cells: List[ScenarioSensitivityCell]
+
+
+class ScenarioSensitivityResponse(BaseModel):
+    results: List[ScenarioSensitivityResult]
+
+
+class ScenarioSimulationRequest(ScenarioProjectionParams):
+    scenario_keys: Optional[List[str]] = None  # default: all scenarios
+    draws: int = Field(5000, ge=100, le=20000)
+    revenue_volatility: float = Field(3.0, ge=0, le=50)  # std. dev. of annual revenue growth, percentage points
+    expense_volatility: float = Field(1.5, ge=0, le=50)
+    correlation: float = Field(0.5, ge=-1, le=1)
+    seed: Optional[int] = Field(None, ge=0, le=2**31 - 1)  # stored in an INTEGER column
+
+
+class ScenarioSimulationSummary(BaseModel):
+    id: int
+    scenario_key: str
+    draws: int
+    seed: Optional[int] = None
+    parameters: Dict[str, Any]
+    summary: Dict[str, Any]
+    created_at: Optional[datetime] = None
+
+
+class ScenarioSimulationResponse(BaseModel):
+    simulations: List[ScenarioSimulationSummary]
+
+
 # ---------------------------------------------------------------------------
 # Expense Category Schemas
 # ---------------------------------------------------------------------------
@@ -437,6 +492,11 @@ class ForecastPeriodItem(BaseModel):
     expenses: float
     profit: float
     margin: float  # Percentage
+    # Prediction band (statistical forecasts only)
+    revenue_lower: Optional[float] = None
+    revenue_upper: Optional[float] = None
+    expenses_lower: Optional[float] = None
+    expenses_upper: Optional[float] = None
 
 
 class ForecastCreate(BaseModel):
@@ -446,6 +506,7 @@ class ForecastCreate(BaseModel):
     market_growth_rate: float = Field(0.0, ge=0, le=100)
     inflation_rate: float = Field(0.0, ge=0, le=100)
     seasonal_adjustment: bool = False
+    ai_narrative: bool = False  # Ask the AI model to write the insights text for the computed forecast
 
 
 class ForecastResponse(BaseModel):
@@ -89,6 +89,8 @@ class OpportunityListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 class OpportunityStageUpdate(BaseModel):
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import uuid
 
@@ -53,4 +53,15 @@ class OpportunityDocumentListResponse(BaseModel):
 
 class OpportunityDocumentDeleteResponse(BaseModel):
     message: str
-    document_id: uuid.UUID
\ No newline at end of file
+    document_id: uuid.UUID
+
+class OpportunityDocumentUploadUrlRequest(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255)
+    content_type: Optional[str] = Field(default=None, max_length=100)
+
+class OpportunityDocumentUploadUrlResponse(BaseModel):
+    key: str
+    method: str
+    url: str
+    headers: Dict[str, str] = Field(default_factory=dict)
+    expires_in: int
@@ -81,6 +81,8 @@ class PurchaseRequisitionListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 # Purchase Order Schemas
 class PurchaseOrderCreate(BaseModel):
@@ -142,6 +144,8 @@ class PurchaseOrderListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 # RFQ Schemas
 class RFQCreate(BaseModel):
@@ -191,6 +195,8 @@ class RFQListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 # RFQ Response Schemas
 class RFQResponseCreate(BaseModel):
@@ -275,6 +281,8 @@ class EmployeeExpenseListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 # Vendor Invoice Schemas
 class VendorInvoiceCreate(BaseModel):
@@ -336,6 +344,8 @@ class VendorInvoiceListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 # Invoice Extraction Schemas
 class InvoiceExtractionResponse(BaseModel):
@@ -399,6 +409,8 @@ class GRNListResponse(BaseModel):
     page: int
     size: int
     total_pages: int
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+    total_is_estimate: bool = False
 
 # Delivery Milestone Schemas
 class DeliveryMilestoneCreate(BaseModel):
@@ -0,0 +1,18 @@
+"""
+Schemas for global search.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class SearchResult(BaseModel):
+    type: str = Field(..., description="Entity type, e.g. opportunity, account, contact, vendor, rfq")
+    id: str
+    title: Optional[str] = None
+    subtitle: Optional[str] = None
+    rank: float = Field(..., description="Relevance; higher is better")
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
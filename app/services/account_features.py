@@ -0,0 +1,150 @@
+"""
+Account Features
+Loads everything the health-score and tiering engines need for a set of
+accounts in one grouped statement, instead of one query per account per
+signal.
+
+- Accounts are joined to their primary contact and address, and to a
+  per-account rollup of notes (total, last 30 days, and last 30 days counted
+  from midnight as the tiering engine does)
+- Scorers take an `AccountFeatures` and do no I/O, so a whole organization is
+  scored in one pass over the loaded rows
+- Large sets are read in chunks of FEATURE_CHUNK_SIZE accounts
+
+    for features in await load_account_features(db, org_id, account_ids):
+        features.account, features.recent_notes
+"""
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.account import Account
+from app.models.account_note import AccountNote
+from app.models.address import Address
+from app.models.contact import Contact
+
+FEATURE_CHUNK_SIZE = 500
+RECENT_NOTES_DAYS = 30
+
+
+@dataclass
+class AccountFeatures:
+    account: Account
+    # Primary contact fields that are non-empty; all False without a primary contact
+    has_primary_contact: bool
+    contact_name: bool
+    contact_email: bool
+    contact_phone: bool
+    # Of name, email, phone: how many are not NULL (an empty string counts)
+    contact_fields_not_null: int
+    # Filled fields out of line1, city, state, pincode; None without an address
+    address_fields: Optional[int]
+    notes_count: int
+    recent_notes: int
+    # Notes since midnight RECENT_NOTES_DAYS ago (AITieringService's window)
+    recent_notes_since_midnight: int
+
+    @property
+    def contact_fields(self) -> int:
+        return int(self.contact_name) + int(self.contact_email) + int(self.contact_phone)
+
+
+def _features_query(account_ids: Sequence[uuid.UUID], now: datetime):
+    recent = now - timedelta(days=RECENT_NOTES_DAYS)
+    recent_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=RECENT_NOTES_DAYS)
+    # Filtered inside the subquery too: Postgres does not push the IN list through GROUP BY
+    notes = (
+        select(
+            AccountNote.account_id.label("account_id"),
+            func.count().label("total"),
+            func.count().filter(AccountNote.created_at >= recent).label("recent"),
+            func.count().filter(AccountNote.created_at >= recent_midnight).label("recent_midnight"),
+        )
+        .where(AccountNote.account_id.in_(account_ids))
+        .group_by(AccountNote.account_id)
+        .subquery()
+    )
+    address_fields = sum(
+        case((column.isnot(None), 1), else_=0)
+        for column in (Address.line1, Address.city, Address.state, Address.pincode)
+    )
+    contact_fields_not_null = sum(
+        case((column.isnot(None), 1), else_=0) for column in (Contact.name, Contact.email, Contact.phone)
+    )
+    return (
+        select(
+            Account,
+            Contact.id.label("contact_id"),
+            # Non-empty, matching the scorers' `if contact.email` checks
+            (func.coalesce(Contact.name, "") != "").label("contact_name"),
+            (func.coalesce(Contact.email, "") != "").label("contact_email"),
+            (func.coalesce(Contact.phone, "") != "").label("contact_phone"),
+            contact_fields_not_null.label("contact_fields_not_null"),
+            Address.id.label("address_id"),
+            address_fields.label("address_fields"),
+            func.coalesce(notes.c.total, 0).label("notes_count"),
+            func.coalesce(notes.c.recent, 0).label("recent_notes"),
+            func.coalesce(notes.c.recent_midnight, 0).label("recent_notes_since_midnight"),
+        )
+        .outerjoin(Contact, Contact.id == Account.primary_contact_id)
+        .outerjoin(Address, Address.id == Account.client_address_id)
+        .outerjoin(notes, notes.c.account_id == Account.account_id)
+        .where(Account.account_id.in_(account_ids))
+    )
+
+
+async def _load_chunk(
+    db: AsyncSession, org_id: Optional[uuid.UUID], account_ids: Sequence[uuid.UUID], now: datetime
+) -> List[AccountFeatures]:
+    query = _features_query(account_ids, now)
+    if org_id is not None:
+        query = query.where(Account.org_id == org_id)
+    rows = (await db.execute(query)).all()
+    return [
+        AccountFeatures(
+            account=row.Account,
+            has_primary_contact=row.contact_id is not None,
+            contact_name=bool(row.contact_name),
+            contact_email=bool(row.contact_email),
+            contact_phone=bool(row.contact_phone),
+            contact_fields_not_null=int(row.contact_fields_not_null or 0) if row.contact_id is not None else 0,
+            address_fields=int(row.address_fields) if row.address_id is not None else None,
+            notes_count=int(row.notes_count),
+            recent_notes=int(row.recent_notes),
+            recent_notes_since_midnight=int(row.recent_notes_since_midnight),
+        )
+        for row in rows
+    ]
+
+
+async def load_account_features(
+    db: AsyncSession,
+    org_id: Optional[uuid.UUID],
+    account_ids: Sequence[uuid.UUID],
+    now: Optional[datetime] = None,
+) -> List[AccountFeatures]:
+    """Features for `account_ids` (restricted to `org_id` when given); unknown ids are left out."""
+    now = now or datetime.utcnow()
+    ids = list(dict.fromkeys(account_ids))
+    features: List[AccountFeatures] = []
+    for start in range(0, len(ids), FEATURE_CHUNK_SIZE):
+        features.extend(await _load_chunk(db, org_id, ids[start:start + FEATURE_CHUNK_SIZE], now))
+    return features
+
+
+async def iter_org_account_features(
+    db: AsyncSession, org_id: uuid.UUID, now: Optional[datetime] = None
+) -> AsyncIterator[List[AccountFeatures]]:
+    """Every account of an organization, FEATURE_CHUNK_SIZE accounts at a time."""
+    now = now or datetime.utcnow()
+    ids = (
+        await db.execute(select(Account.account_id).where(Account.org_id == org_id).order_by(Account.account_id))
+    ).scalars().all()
+    for start in range(0, len(ids), FEATURE_CHUNK_SIZE):
+        yield await _load_chunk(db, org_id, ids[start:start + FEATURE_CHUNK_SIZE], now)
@@ -1,7 +1,6 @@
 from typing import Optional, Tuple, List, Dict
 
 from sqlalchemy import select, func
-import supabase
 from app.db.session import get_session, get_transaction
 from app.models.user import User
 from app.models.organization import Organization
@@ -80,7 +79,7 @@ async def admin_create_user(
                 role=role,
                 name=name,  # Add vendor name
                 org_id=None,  # No organization yet - vendor will create on first login
-                password_hash=AuthService.get_password_hash(password),  # Hash the password
+                password_hash=await AuthService.get_password_hash_async(password),  # Hash the password
                 short_id=short_id  # Add short ID
             )
             # Note: Contact number is not stored in User model currently
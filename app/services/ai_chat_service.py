@@ -1,8 +1,8 @@
-import google.generativeai as genai
 from typing import List, Optional, Dict, Any
 from app.environment import environment
 from app.utils.logger import logger
 from app.utils.error import MegapolisHTTPException
+from app.utils.lazy import deferred, genai
 import asyncio
 
 
@@ -262,5 +262,5 @@ Guidelines:
 
 
 # Singleton instance
-ai_chat_service = AIChatService()
+ai_chat_service = deferred(AIChatService)
 
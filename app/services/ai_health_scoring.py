@@ -11,8 +11,6 @@ from fastapi import HTTPException
 
 from app.models.account import Account
 from app.models.user import User
-from app.models.contact import Contact
-from app.models.account_note import AccountNote
 from app.schemas.ai_health_scoring import (
     HealthScoreResponse, 
     BatchHealthScoreResponse,
@@ -21,6 +19,7 @@ from app.schemas.ai_health_scoring import (
 )
 from app.utils.logger import logger
 from app.services.ai_suggestions import AISuggestionService
+from app.services.account_features import AccountFeatures, iter_org_account_features, load_account_features
 from app.db.session import get_session, get_request_transaction
 
 class AccountHealthScoringService:
@@ -63,49 +62,15 @@ class AccountHealthScoringService:
         try:
             logger.info(f"Calculating health score for account {account.account_id}")
             
-            if not force_recalculation and account.last_ai_analysis:
-                time_since_analysis = datetime.utcnow() - account.last_ai_analysis
-                if time_since_analysis < timedelta(hours=24):
-                    logger.info(f"Recent analysis exists for account {account.account_id}, skipping calculation")
-                    return self._create_health_response_from_account(account)
+            if not force_recalculation and self._has_recent_analysis(account):
+                logger.info(f"Recent analysis exists for account {account.account_id}, skipping calculation")
+                return self._create_health_response_from_account(account)
             
-            data_quality_score = await self._calculate_data_quality_score(account, db)
-            communication_frequency = await self._calculate_communication_frequency(account, db)
-            win_rate = await self._calculate_win_rate(account, db)
-            revenue_growth = await self._calculate_revenue_growth(account, db)
+            features = await load_account_features(db, None, [account.account_id])
+            if not features:
+                raise HTTPException(status_code=404, detail="Account not found")
             
-            health_score = self._calculate_overall_health_score(
-                data_quality_score,
-                communication_frequency,
-                win_rate,
-                revenue_growth
-            )
-            
-            health_trend = await self._determine_health_trend(account, health_score, db)
-            
-            risk_level = self._determine_risk_level(health_score, health_trend)
-            
-            recommendations = await self._generate_ai_recommendations(account, health_score)
-            
-            response = HealthScoreResponse(
-                account_id=account.account_id,
-                ai_health_score=health_score,
-                health_trend=health_trend,
-                risk_level=risk_level,
-                last_ai_analysis=datetime.utcnow(),
-                data_quality_score=data_quality_score,
-                revenue_growth=revenue_growth,
-                communication_frequency=communication_frequency,
-                win_rate=win_rate,
-                score_breakdown={
-                    "data_quality": float(data_quality_score),
-                    "communication": float(communication_frequency),
-                    "win_rate": float(win_rate),
-                    "revenue_growth": float(revenue_growth)
-                },
-                recommendations=recommendations,
-                warnings=self._generate_warnings(health_score, risk_level)
-            )
+            response = await self._score_account(features[0])
             
             await self._update_account_health_data(account, response, db)
             
@@ -118,8 +83,57 @@ class AccountHealthScoringService:
             logger.error(f"Error calculating health score for account {account.account_id}: {e}")
             raise
     
-    async def _calculate_data_quality_score(self, account: Account, db: AsyncSession) -> Decimal:
+    def _has_recent_analysis(self, account: Account) -> bool:
 
+        if not account.last_ai_analysis:
+            return False
+        return datetime.utcnow() - account.last_ai_analysis < timedelta(hours=24)
+    
+    async def _score_account(self, features: AccountFeatures) -> HealthScoreResponse:
+
+        account = features.account
+        
+        data_quality_score = self._calculate_data_quality_score(features)
+        communication_frequency = self._calculate_communication_frequency(features)
+        win_rate = self._calculate_win_rate(account)
+        revenue_growth = self._calculate_revenue_growth(account)
+        
+        health_score = self._calculate_overall_health_score(
+            data_quality_score,
+            communication_frequency,
+            win_rate,
+            revenue_growth
+        )
+        
+        health_trend = await self._determine_health_trend(account, health_score)
+        
+        risk_level = self._determine_risk_level(health_score, health_trend)
+        
+        recommendations = await self._generate_ai_recommendations(account, health_score)
+        
+        return HealthScoreResponse(
+            account_id=account.account_id,
+            ai_health_score=health_score,
+            health_trend=health_trend,
+            risk_level=risk_level,
+            last_ai_analysis=datetime.utcnow(),
+            data_quality_score=data_quality_score,
+            revenue_growth=revenue_growth,
+            communication_frequency=communication_frequency,
+            win_rate=win_rate,
+            score_breakdown={
+                "data_quality": float(data_quality_score),
+                "communication": float(communication_frequency),
+                "win_rate": float(win_rate),
+                "revenue_growth": float(revenue_growth)
+            },
+            recommendations=recommendations,
+            warnings=self._generate_warnings(health_score, risk_level)
+        )
+    
+    def _calculate_data_quality_score(self, features: AccountFeatures) -> Decimal:
+
+        account = features.account
         score = Decimal('0')
         total_weight = Decimal('0')
         
@@ -136,72 +150,46 @@ class AccountHealthScoringService:
             if getattr(account, field) is not None:
                 score += Decimal(str(weight))
         
-        contact_score = await self._calculate_contact_completeness(account, db)
+        contact_score = self._calculate_contact_completeness(features)
         score += contact_score * Decimal('30')
         total_weight += Decimal('30')
         
-        address_score = await self._calculate_address_completeness(account, db)
+        address_score = self._calculate_address_completeness(features)
         score += address_score * Decimal('20')
         total_weight += Decimal('20')
         
-        notes_score = await self._calculate_notes_completeness(account, db)
+        notes_score = self._calculate_notes_completeness(features)
         score += notes_score * Decimal('10')
         total_weight += Decimal('10')
         
         return (score / total_weight) * Decimal('100') if total_weight > 0 else Decimal('0')
     
-    async def _calculate_contact_completeness(self, account: Account, db: AsyncSession) -> Decimal:
+    def _calculate_contact_completeness(self, features: AccountFeatures) -> Decimal:
 
-        if not account.primary_contact_id:
-            return Decimal('0')
-        
-        stmt = select(Contact).where(Contact.id == account.primary_contact_id)
-        result = await db.execute(stmt)
-        contact = result.scalar_one_or_none()
-        
-        if not contact:
+        if not features.has_primary_contact:
             return Decimal('0')
         
-        fields = ['name', 'email', 'phone']
-        completed_fields = sum(1 for field in fields if getattr(contact, field) is not None)
-        
-        return Decimal(str((completed_fields / len(fields)) * 100))
+        return Decimal(str((features.contact_fields_not_null / 3) * 100))
     
-    async def _calculate_address_completeness(self, account: Account, db: AsyncSession) -> Decimal:
+    def _calculate_address_completeness(self, features: AccountFeatures) -> Decimal:
 
-        if not account.client_address:
+        if features.address_fields is None:
             return Decimal('0')
         
-        address = account.client_address
-        required_fields = ['line1', 'city', 'state', 'pincode']
-        completed_fields = sum(1 for field in required_fields if getattr(address, field) is not None)
-        
-        return Decimal(str((completed_fields / len(required_fields)) * 100))
+        return Decimal(str((features.address_fields / 4) * 100))
     
-    async def _calculate_notes_completeness(self, account: Account, db: AsyncSession) -> Decimal:
+    def _calculate_notes_completeness(self, features: AccountFeatures) -> Decimal:
 
-        notes_score = Decimal('50') if account.notes else Decimal('0')
-        
-        stmt = select(func.count(AccountNote.id)).where(AccountNote.account_id == account.account_id)
-        result = await db.execute(stmt)
-        notes_count = result.scalar() or 0
+        notes_score = Decimal('50') if features.account.notes else Decimal('0')
         
-        if notes_count > 0:
+        if features.notes_count > 0:
             notes_score += Decimal('50')
         
         return notes_score
     
-    async def _calculate_communication_frequency(self, account: Account, db: AsyncSession) -> Decimal:
+    def _calculate_communication_frequency(self, features: AccountFeatures) -> Decimal:
 
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        stmt = select(func.count(AccountNote.id)).where(
-            and_(
-                AccountNote.account_id == account.account_id,
-                AccountNote.created_at >= thirty_days_ago
-            )
-        )
-        result = await db.execute(stmt)
-        recent_notes = result.scalar() or 0
+        recent_notes = features.recent_notes
         
         if recent_notes >= 5:
             return Decimal('10')  # Excellent communication
@@ -212,7 +200,7 @@ class AccountHealthScoringService:
         else:
             return Decimal('2.5')  # Poor communication
     
-    async def _calculate_win_rate(self, account: Account, db: AsyncSession) -> Decimal:
+    def _calculate_win_rate(self, account: Account) -> Decimal:
 
         base_win_rate = Decimal('70')  # Base win rate
         
@@ -226,7 +214,7 @@ class AccountHealthScoringService:
         
         return min(base_win_rate, Decimal('95'))  # Cap at 95%
     
-    async def _calculate_revenue_growth(self, account: Account, db: AsyncSession) -> Decimal:
+    def _calculate_revenue_growth(self, account: Account) -> Decimal:
 
         base_growth = Decimal('8')  # Base growth rate
         
@@ -268,7 +256,7 @@ class AccountHealthScoringService:
         
         return round(overall_score, 2)
     
-    async def _determine_health_trend(self, account: Account, current_score: Decimal, db: AsyncSession) -> str:
+    async def _determine_health_trend(self, account: Account, current_score: Decimal) -> str:
 
         if current_score >= Decimal('80'):
             return 'up'
@@ -340,6 +328,12 @@ class AccountHealthScoringService:
     
     async def _update_account_health_data(self, account: Account, response: HealthScoreResponse, db: AsyncSession):
 
+        self._apply_health_data(account, response)
+        
+        await db.commit()
+    
+    def _apply_health_data(self, account: Account, response: HealthScoreResponse) -> None:
+
         account.ai_health_score = response.ai_health_score
         account.health_trend = response.health_trend
         account.risk_level = response.risk_level
@@ -348,8 +342,6 @@ class AccountHealthScoringService:
         account.revenue_growth = response.revenue_growth
         account.communication_frequency = response.communication_frequency
         account.win_rate = response.win_rate
-        
-        await db.commit()
     
     async def calculate_batch_health_scores(
         self, 
@@ -361,16 +353,20 @@ class AccountHealthScoringService:
         start_time = time.time()
         
         try:
-            stmt = select(Account).where(Account.account_id.in_(account_ids))
-            result = await db.execute(stmt)
-            accounts = result.scalars().all()
+            # One grouped feature query per chunk instead of several queries per account
+            features = await load_account_features(db, None, account_ids)
             
             results = []
             errors = []
             
-            for account in accounts:
+            for item in features:
+                account = item.account
+                if not force_recalculation and self._has_recent_analysis(account):
+                    results.append(self._create_health_response_from_account(account))
+                    continue
                 try:
-                    health_response = await self.calculate_health_score(account, db, force_recalculation)
+                    health_response = await self._score_account(item)
+                    self._apply_health_data(account, health_response)
                     results.append(health_response)
                 except Exception as e:
                     errors.append({
@@ -378,11 +374,13 @@ class AccountHealthScoringService:
                         "error": str(e)
                     })
             
+            await db.commit()
+            
             processing_time = int((time.time() - start_time) * 1000)
             
             return BatchHealthScoreResponse(
                 total_accounts=len(account_ids),
-                processed_accounts=len(accounts),
+                processed_accounts=len(features),
                 successful_calculations=len(results),
                 failed_calculations=len(errors),
                 processing_time_ms=processing_time,
@@ -392,4 +390,26 @@ class AccountHealthScoringService:
             
         except Exception as e:
             logger.error(f"Error in batch health score calculation: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    async def recompute_org_health_scores(self, org_id: UUID, db: AsyncSession) -> Dict[str, int]:
+        """Rescore every account of an organization (nightly job); flushes after each chunk."""
+
+        start_time = time.time()
+        scored = 0
+        failed = 0
+        
+        async for chunk in iter_org_account_features(db, org_id):
+            for item in chunk:
+                try:
+                    self._apply_health_data(item.account, await self._score_account(item))
+                    scored += 1
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Error recomputing health score for account {item.account.account_id}: {e}")
+            await db.flush()
+        
+        processing_time = int((time.time() - start_time) * 1000)
+        logger.info(f"Recomputed {scored} account health scores for org {org_id} ({failed} failed) in {processing_time}ms")
+        
+        return {"scored": scored, "failed": failed}
\ No newline at end of file
@@ -11,12 +11,15 @@ from app.schemas.ai_suggestions import (
     CompanySizeSuggestionRequest, CompanySizeSuggestionResponse,
     SuggestionValue, AISuggestionRequest, AISuggestionResponse
 )
+from app.utils.html_page import page_of
 from app.utils.scraper import scrape_text_with_bs4
 from app.utils.logger import logger
 from app.utils.error import MegapolisHTTPException
 from app.environment import environment
-import google.generativeai as genai
-from google.generativeai import types
+from app.utils.lazy import deferred, lazy_import
+
+genai = lazy_import("google.generativeai")
+types = lazy_import("google.generativeai.types")
 
 
 class DataEnrichmentService:
@@ -35,8 +38,7 @@ class DataEnrichmentService:
         3. Extracts detailed data from each project
         4. Returns multiple opportunities
         """
-        import re
-        from urllib.parse import urljoin, urlparse
+        from urllib.parse import urlparse
         
         logger.info(f"Starting opportunity discovery for: {base_url}")
         
@@ -51,13 +53,10 @@ class DataEnrichmentService:
             'contracts', 'freeway', 'construction', 'in-progress', 'ongoing'
         ]
         
-        # Extract all links from main page
-        all_links = re.findall(r'href=["\'](https?://[^"\']+|/[^"\']+)["\']', main_page_data.get('html', ''))
-        
-        # Filter for project-related URLs
+        # Links of the already-parsed main page, resolved to absolute URLs
         project_urls = []
-        for link in all_links:
-            full_url = urljoin(base_url, link)
+        for link in page_of(main_page_data, base_url).links:
+            full_url = link.url
             # Check if URL contains project keywords
             if any(keyword in full_url.lower() for keyword in project_keywords):
                 # Avoid duplicate URLs
@@ -93,21 +92,17 @@ class DataEnrichmentService:
         import re
         
         content = page_data.get('text', '')
-        html = page_data.get('html', '')
+        page = page_of(page_data, page_url)
         
         # === OPPORTUNITY NAME ===
         # Extract from H1, H2, or title tag
         opportunity_name = ""
-        h1_match = re.search(r'<h1[^>]*>([^<]+)</h1>', html, re.IGNORECASE)
-        h2_match = re.search(r'<h2[^>]*>([^<]+)</h2>', html, re.IGNORECASE)
-        title_match = re.search(r'<title>([^<]+)</title>', html, re.IGNORECASE)
-        
-        if h1_match:
-            opportunity_name = h1_match.group(1).strip()
-        elif h2_match:
-            opportunity_name = h2_match.group(1).strip()
-        elif title_match:
-            opportunity_name = title_match.group(1).split('|')[0].strip()
+        if page.headings["h1"]:
+            opportunity_name = page.headings["h1"][0]
+        elif page.headings["h2"]:
+            opportunity_name = page.headings["h2"][0]
+        elif page.title:
+            opportunity_name = page.title.split('|')[0].strip()
         
         # === PROJECT DESCRIPTION (Project Overview) ===
         # Look for "Project Overview" section
@@ -170,18 +165,13 @@ class DataEnrichmentService:
                 break
         
         # === DOCUMENTS (PDFs, DOCs, etc.) ===
-        documents = []
-        doc_patterns = [
-            r'href=["\'](https?://[^"\']*\.(?:pdf|doc|docx|xls|xlsx|ppt|pptx))["\']',
-            r'href=["\'](https?://[^"\']*(?:document|download|report|attachment)[^"\']*)["\']'
-        ]
-        for pattern in doc_patterns:
-            matches = re.findall(pattern, html, re.IGNORECASE)
-            documents.extend(matches)
+        doc_pattern = re.compile(
+            r'\.(?:pdf|doc|docx|xls|xlsx|ppt|pptx)$|document|download|report|attachment', re.IGNORECASE
+        )
+        documents = [link.url for link in page.links if link.url.startswith("http") and doc_pattern.search(link.url)]
         
         # === IMAGES ===
-        image_pattern = r'src=["\'](https?://[^"\']*\.(?:jpg|jpeg|png|gif|svg|webp))["\']'
-        images = re.findall(image_pattern, html, re.IGNORECASE)
+        images = page.images
         
         # === PROJECT STATUS ===
         status = "Lead"  # Default
@@ -1294,5 +1284,5 @@ class AISuggestionService:
             )
 
 
-data_enrichment_service = DataEnrichmentService()
-ai_suggestion_service = AISuggestionService()
\ No newline at end of file
+data_enrichment_service = deferred(DataEnrichmentService)
+ai_suggestion_service = deferred(AISuggestionService)
\ No newline at end of file
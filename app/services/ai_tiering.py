@@ -1,14 +1,12 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from enum import Enum
+import uuid
 
 from app.db.session import get_session
 from app.models.account import Account, ClientType
-from app.models.contact import Contact
-from app.models.account_note import AccountNote
+from app.services.account_features import AccountFeatures, load_account_features
 from app.utils.logger import logger
-from sqlalchemy import select, func, and_
-from sqlalchemy.ext.asyncio import AsyncSession
 
 class TierLevel(str, Enum):
     TIER_1 = "tier_1"
@@ -20,38 +18,40 @@ class AITieringService:
     async def suggest_account_tier(self, account_id: str, org_id: str) -> Dict[str, Any]:
 
         async with get_session() as db:
-            stmt = select(Account).where(
-                Account.account_id == account_id,
-                Account.org_id == org_id
-            )
-            result = await db.execute(stmt)
-            account = result.scalar_one_or_none()
+            features = await load_account_features(db, uuid.UUID(str(org_id)), [uuid.UUID(str(account_id))])
             
-            if not account:
+            if not features:
                 raise ValueError(f"Account {account_id} not found")
             
-            tier_analysis = await self._analyze_account_for_tiering(account, db)
-            
-            suggested_tier = self._calculate_optimal_tier(tier_analysis)
-            
-            reasoning = self._generate_tier_reasoning(tier_analysis, suggested_tier)
-            
-            result = {
-                "account_id": account_id,
-                "current_tier": account.client_type.value if account.client_type else None,
-                "suggested_tier": suggested_tier.value,
-                "confidence_score": tier_analysis["confidence_score"],
-                "reasoning": reasoning,
-                "analysis": tier_analysis,
-                "suggested_at": datetime.utcnow().isoformat(),
-                "recommendation": self._generate_recommendation(suggested_tier, account.client_type)
-            }
+            result = self._suggest_from_features(features[0])
             
-            logger.info(f"Tier suggestion generated for account {account_id}: {suggested_tier.value}")
+            logger.info(f"Tier suggestion generated for account {account_id}: {result['suggested_tier']}")
             return result
     
-    async def _analyze_account_for_tiering(self, account: Account, db: AsyncSession) -> Dict[str, Any]:
+    def _suggest_from_features(self, features: AccountFeatures) -> Dict[str, Any]:
 
+        account = features.account
+        
+        tier_analysis = self._analyze_account_for_tiering(features)
+        
+        suggested_tier = self._calculate_optimal_tier(tier_analysis)
+        
+        reasoning = self._generate_tier_reasoning(tier_analysis, suggested_tier)
+        
+        return {
+            "account_id": str(account.account_id),
+            "current_tier": account.client_type.value if account.client_type else None,
+            "suggested_tier": suggested_tier.value,
+            "confidence_score": tier_analysis["confidence_score"],
+            "reasoning": reasoning,
+            "analysis": tier_analysis,
+            "suggested_at": datetime.utcnow().isoformat(),
+            "recommendation": self._generate_recommendation(suggested_tier, account.client_type)
+        }
+    
+    def _analyze_account_for_tiering(self, features: AccountFeatures) -> Dict[str, Any]:
+
+        account = features.account
         analysis = {
             "revenue_potential": 0,
             "strategic_value": 0,
@@ -62,23 +62,23 @@ class AITieringService:
             "factors": {}
         }
         
-        revenue_score = await self._analyze_revenue_potential(account, db)
+        revenue_score = self._analyze_revenue_potential(account)
         analysis["revenue_potential"] = revenue_score["score"]
         analysis["factors"]["revenue"] = revenue_score
         
-        strategic_score = await self._analyze_strategic_value(account, db)
+        strategic_score = self._analyze_strategic_value(account)
         analysis["strategic_value"] = strategic_score["score"]
         analysis["factors"]["strategic"] = strategic_score
         
-        relationship_score = await self._analyze_relationship_strength(account, db)
+        relationship_score = self._analyze_relationship_strength(features)
         analysis["relationship_strength"] = relationship_score["score"]
         analysis["factors"]["relationship"] = relationship_score
         
-        growth_score = await self._analyze_growth_potential(account, db)
+        growth_score = self._analyze_growth_potential(account)
         analysis["growth_potential"] = growth_score["score"]
         analysis["factors"]["growth"] = growth_score
         
-        risk_score = await self._analyze_risk_level(account, db)
+        risk_score = self._analyze_risk_level(features)
         analysis["risk_level"] = risk_score["score"]
         analysis["factors"]["risk"] = risk_score
         
@@ -86,7 +86,7 @@ class AITieringService:
         
         return analysis
     
-    async def _analyze_revenue_potential(self, account: Account, db: AsyncSession) -> Dict[str, Any]:
+    def _analyze_revenue_potential(self, account: Account) -> Dict[str, Any]:
 
         score = 50  # Base score
         factors = []
@@ -122,7 +122,7 @@ class AITieringService:
             "weight": 0.3
         }
     
-    async def _analyze_strategic_value(self, account: Account, db: AsyncSession) -> Dict[str, Any]:
+    def _analyze_strategic_value(self, account: Account) -> Dict[str, Any]:
 
         score = 50  # Base score
         factors = []
@@ -149,36 +149,20 @@ class AITieringService:
             "weight": 0.25
         }
     
-    async def _analyze_relationship_strength(self, account: Account, db: AsyncSession) -> Dict[str, Any]:
+    def _analyze_relationship_strength(self, features: AccountFeatures) -> Dict[str, Any]:
 
         score = 50  # Base score
         factors = []
         
-        if account.primary_contact_id:
-            stmt = select(Contact).where(Contact.id == account.primary_contact_id)
-            result = await db.execute(stmt)
-            contact = result.scalar_one_or_none()
-            
-            if contact:
-                if contact.email and contact.phone:
-                    score += 20
-                    factors.append("Complete primary contact information")
-                elif contact.email or contact.phone:
-                    score += 10
-                    factors.append("Partial primary contact information")
-        
-        thirty_days_ago = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        from datetime import timedelta
-        thirty_days_ago = thirty_days_ago - timedelta(days=30)
-        
-        stmt = select(func.count(AccountNote.id)).where(
-            and_(
-                AccountNote.account_id == account.account_id,
-                AccountNote.created_at >= thirty_days_ago
-            )
-        )
-        result = await db.execute(stmt)
-        recent_notes = result.scalar() or 0
+        if features.has_primary_contact:
+            if features.contact_email and features.contact_phone:
+                score += 20
+                factors.append("Complete primary contact information")
+            elif features.contact_email or features.contact_phone:
+                score += 10
+                factors.append("Partial primary contact information")
+        
+        recent_notes = features.recent_notes_since_midnight
         
         if recent_notes >= 5:
             score += 20
@@ -198,7 +182,7 @@ class AITieringService:
             "weight": 0.25
         }
     
-    async def _analyze_growth_potential(self, account: Account, db: AsyncSession) -> Dict[str, Any]:
+    def _analyze_growth_potential(self, account: Account) -> Dict[str, Any]:
 
         score = 50  # Base score
         factors = []
@@ -241,8 +225,9 @@ class AITieringService:
             "weight": 0.15
         }
     
-    async def _analyze_risk_level(self, account: Account, db: AsyncSession) -> Dict[str, Any]:
+    def _analyze_risk_level(self, features: AccountFeatures) -> Dict[str, Any]:
 
+        account = features.account
         score = 50  # Base score
         factors = []
         
@@ -258,18 +243,7 @@ class AITieringService:
             score -= 10
             factors.append("No website - low risk")
         
-        thirty_days_ago = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        from datetime import timedelta
-        thirty_days_ago = thirty_days_ago - timedelta(days=30)
-        
-        stmt = select(func.count(AccountNote.id)).where(
-            and_(
-                AccountNote.account_id == account.account_id,
-                AccountNote.created_at >= thirty_days_ago
-            )
-        )
-        result = await db.execute(stmt)
-        recent_notes = result.scalar() or 0
+        recent_notes = features.recent_notes_since_midnight
         
         if recent_notes == 0:
             score -= 15
@@ -374,9 +348,26 @@ class AITieringService:
             }
         }
         
+        parsed_ids = {}
+        for account_id in account_ids:
+            try:
+                parsed_ids[account_id] = uuid.UUID(str(account_id))
+            except ValueError:
+                parsed_ids[account_id] = None
+        
+        # Features for the whole batch in one grouped query, then scored in memory
+        async with get_session() as db:
+            features = await load_account_features(
+                db, uuid.UUID(str(org_id)), [parsed for parsed in parsed_ids.values() if parsed]
+            )
+        by_id = {item.account.account_id: item for item in features}
+        
         for account_id in account_ids:
             try:
-                suggestion = await self.suggest_account_tier(account_id, org_id)
+                item = by_id.get(parsed_ids[account_id])
+                if item is None:
+                    raise ValueError(f"Account {account_id} not found")
+                suggestion = self._suggest_from_features(item)
                 results["suggestions"].append(suggestion)
                 results["summary"][f"{suggestion['suggested_tier']}_suggestions"] += 1
             except Exception as e:
@@ -1,18 +1,26 @@
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from sqlalchemy import select, text, or_
+from sqlalchemy import select, text, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.environment import environment
-from app.db.session import get_session
+from app.db.session import get_session, get_transaction
+from app.services.password_hashing import password_hashing
+from app.services.schema_capabilities import schema_capabilities
 from app.utils.logger import logger
 
 # Password hashing configuration | check the reference @amar.softication don't change it
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below BCRYPT_ROUNDS count as outdated and are upgraded on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=environment.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=environment.BCRYPT_ROUNDS,
+)
 
 # JWT configuration
 SECRET_KEY = environment.JWT_SECRET_KEY
@@ -78,6 +86,38 @@ class AuthService:
             password_hash = hash_obj.hexdigest()
             return f"sha256:{salt}:{password_hash}"
     
+    @staticmethod
+    def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        verify_password plus, on success, a replacement hash when the stored one
+        is SHA-256 or bcrypt below the configured cost. Blocking; run it in the
+        password hashing pool.
+        """
+        if not AuthService.verify_password(plain_password, hashed_password):
+            return False, None
+        if hashed_password in ("admin_hash", "user_hash"):
+            return True, None
+        try:
+            outdated = hashed_password.startswith("sha256:") or pwd_context.needs_update(hashed_password)
+        except Exception:
+            outdated = False
+        if not outdated:
+            return True, None
+        try:
+            new_hash = AuthService.get_password_hash(plain_password)
+        except ValueError:
+            # Legacy passwords shorter than the current minimum keep their hash
+            return True, None
+        return True, (new_hash if not new_hash.startswith("sha256:") else None)
+    
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        return await password_hashing.run(AuthService.verify_password, plain_password, hashed_password)
+    
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        return await password_hashing.run(AuthService.get_password_hash, password)
+    
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         to_encode = data.copy()
@@ -105,91 +145,83 @@ class AuthService:
         - Vendors/Admins login with email
         """
         from sqlalchemy import or_
-        async with get_session() as db:
+        try:
+            username_column_exists = await schema_capabilities.has_column("users", "username")
+        except Exception as exc:
+            logger.warning("Failed to verify users.username column presence: %s", exc)
             username_column_exists = False
 
-            try:
-                column_check = await db.execute(
-                    text(
-                        """
-                        SELECT 1
-                        FROM information_schema.columns
-                        WHERE table_name = 'users'
-                          AND column_name = 'username'
-                        LIMIT 1
-                        """
-                    )
-                )
-                username_column_exists = column_check.scalar_one_or_none() is not None
-            except Exception as exc:
-                from app.utils.logger import logger
-                logger.warning("Failed to verify users.username column presence: %s", exc)
-                username_column_exists = False
+        selectable_columns = [
+            User.id,
+            User.short_id,
+            User.email,
+            User.name,
+            User.phone,
+            User.bio,
+            User.address,
+            User.city,
+            User.state,
+            User.zip_code,
+            User.country,
+            User.timezone,
+            User.language,
+            User.org_id,
+            User.role,
+            User.formbricks_user_id,
+            User.password_hash,
+            User.created_at,
+            User.updated_at,
+            User.last_login,
+        ]
 
-            selectable_columns = [
-                User.id,
-                User.short_id,
-                User.email,
-                User.name,
-                User.phone,
-                User.bio,
-                User.address,
-                User.city,
-                User.state,
-                User.zip_code,
-                User.country,
-                User.timezone,
-                User.language,
-                User.org_id,
-                User.role,
-                User.formbricks_user_id,
-                User.password_hash,
-                User.created_at,
-                User.updated_at,
-                User.last_login,
-            ]
+        if username_column_exists:
+            selectable_columns.append(User.username)
 
-            if username_column_exists:
-                selectable_columns.append(User.username)
+        query = select(*selectable_columns)
 
-            query = select(*selectable_columns)
-
-            if username_column_exists:
-                query = query.where(
-                    or_(
-                        User.email == email_or_username,
-                        User.username == email_or_username,
-                    )
+        if username_column_exists:
+            query = query.where(
+                or_(
+                    User.email == email_or_username,
+                    User.username == email_or_username,
                 )
-            else:
-                query = query.where(User.email == email_or_username)
+            )
+        else:
+            query = query.where(User.email == email_or_username)
 
+        # The session is closed before hashing so a login waiting on the hashing
+        # pool does not hold a pooled DB connection
+        async with get_session() as db:
             result = await db.execute(query)
             row = result.mappings().first()
 
-            if not row:
-                return None
+        if not row:
+            return None
+
+        user = User()
+        for key, value in row.items():
+            setattr(user, key, value)
+
+        if not user.password_hash:
+            logger.warning(f"User {email_or_username} has no password hash")
+            return None
+
+        password_valid, new_hash = await password_hashing.run(
+            AuthService.verify_and_update_password, password, user.password_hash
+        )
+        if not password_valid:
+            logger.warning(f"Password verification failed for user {email_or_username}")
+            return None
+
+        if new_hash:
+            # Cost parameters changed since this hash was made; store an up-to-date one
+            async with get_transaction() as db:
+                await db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+            user.password_hash = new_hash
+            logger.info(f"Upgraded password hash for user {user.id}")
+
+        return user
 
-            user = User()
-            for key, value in row.items():
-                setattr(user, key, value)
-            
-            if not user:
-                return None
-            
-            if not user.password_hash:
-                from app.utils.logger import logger
-                logger.warning(f"User {email_or_username} has no password hash")
-                return None
-                
-            password_valid = AuthService.verify_password(password, user.password_hash)
-            if not password_valid:
-                from app.utils.logger import logger
-                logger.warning(f"Password verification failed for user {email_or_username}")
-                return None
-            
-            return user
-    
     @staticmethod
     async def get_user_by_email(email: str) -> Optional[User]:
         async with get_session() as db:
@@ -228,7 +260,7 @@ class AuthService:
             user = User(
                 email=email,
                 username=username,  # Will be employee_number for employees, None for vendors
-                password_hash=AuthService.get_password_hash(password),
+                password_hash=await AuthService.get_password_hash_async(password),
                 role=role,
                 name=name,
                 org_id=org_id,
@@ -248,7 +280,7 @@ class AuthService:
             if not user:
                 return False
             
-            user.password_hash = AuthService.get_password_hash(new_password)
+            user.password_hash = await AuthService.get_password_hash_async(new_password)
             await db.commit()
             return True
     
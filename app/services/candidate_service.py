@@ -18,6 +18,7 @@ from app.schemas.candidate import (
 from app.services.gemini_service import gemini_service
 from app.services.linkedin_scraper import linkedin_scraper
 from app.services.file_extractor import file_extractor
+from app.services.text_extraction import text_extraction
 
 logger = logging.getLogger(__name__)
 
@@ -151,7 +152,7 @@ IMPORTANT NOTES:
             logger.info(f"Parsing CV: {file_name}")
 
             # Extract REAL text from PDF/DOCX using pdfminer/docx2txt
-            file_text = file_extractor.extract_text_from_file(file_content, file_name)
+            file_text = await text_extraction.extract(file_content, file_name)
             
             if not file_text or len(file_text) < 50:
                 logger.warning(f"No text extracted from {file_name}, using fallback")
@@ -0,0 +1,248 @@
+"""
+Clause Index Service
+In-memory TF-IDF similarity index over an organization's clause library.
+
+Contract segments whose normalized text is identical to a library clause (or
+one of its accepted alternatives / fallback positions) are classified locally.
+Close but not identical segments still go to the model, with the library
+clause they resemble as a reference: a negation or a changed amount or cap
+barely moves the similarity score but changes the verdict. Built indexes are kept per process and
+persisted to object storage keyed by a fingerprint of the library, so a
+restart or another worker can load them instead of rebuilding.
+"""
+from __future__ import annotations
+
+import io
+import json
+import math
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.contract import ClauseLibraryItem, ClauseRiskLevel
+from app.services.storage import get_storage
+from app.utils import contract_segments
+from app.utils.logger import get_logger
+
+logger = get_logger("clause_index")
+
+# Cosine similarity at which a library clause is offered to the model as a reference
+MATCH_THRESHOLD = 0.8
+INDEX_FORMAT_VERSION = 2
+STORAGE_PREFIX = "clause-index"
+
+_STOPWORDS = frozenset(
+    "a an and any are as at be by for from has have in into is it its of on or such that the "
+    "this to under upon was were which will with shall may".split()
+)
+
+
+@dataclass
+class ClauseEntry:
+    clause_id: str
+    title: str
+    category: str
+    risk_level: str  # "green" | "amber"
+    position: str  # "library language" | "fallback position"
+    text: str
+
+
+@dataclass
+class ClauseMatch:
+    entry: ClauseEntry
+    score: float
+    exact: bool = False  # same normalized text as the library clause
+
+
+def _features(text: str) -> Counter:
+    words = contract_segments.normalize_clause_text(text).split()
+    content = [w for w in words if w not in _STOPWORDS]
+    features = Counter(content)
+    features.update(f"{a} {b}" for a, b in zip(content, content[1:]))
+    return features
+
+
+class ClauseIndex:
+    """Sparse TF-IDF vectors with an inverted index for cosine lookups."""
+
+    def __init__(
+        self,
+        fingerprint: str,
+        entries: List[ClauseEntry],
+        idf: Dict[str, float],
+        vectors: List[Dict[str, float]],
+    ):
+        self.fingerprint = fingerprint
+        self.entries = entries
+        self.idf = idf
+        self.vectors = vectors
+        self._default_idf = math.log(1 + len(entries)) + 1
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for index, vector in enumerate(vectors):
+            for feature, weight in vector.items():
+                self._postings[feature].append((index, weight))
+
+    @classmethod
+    def build(cls, fingerprint: str, documents: Sequence[Tuple[ClauseEntry, str]]) -> "ClauseIndex":
+        counts = [_features(text) for _, text in documents]
+        df: Counter = Counter()
+        for features in counts:
+            df.update(features.keys())
+
+        total = len(documents)
+        idf = {feature: math.log((1 + total) / (1 + n)) + 1 for feature, n in df.items()}
+        vectors = [cls._weigh(features, idf, math.log(1 + total) + 1) for features in counts]
+        return cls(fingerprint, [entry for entry, _ in documents], idf, vectors)
+
+    @staticmethod
+    def _weigh(features: Counter, idf: Dict[str, float], default_idf: float) -> Dict[str, float]:
+        vector = {
+            feature: (1 + math.log(count)) * idf.get(feature, default_idf)
+            for feature, count in features.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {feature: w / norm for feature, w in vector.items()} if norm else {}
+
+    def best_match(self, text: str) -> Optional[ClauseMatch]:
+        query = self._weigh(_features(text), self.idf, self._default_idf)
+        if not query:
+            return None
+
+        scores: Dict[int, float] = defaultdict(float)
+        for feature, weight in query.items():
+            for index, entry_weight in self._postings.get(feature, ()):
+                scores[index] += weight * entry_weight
+        if not scores:
+            return None
+
+        index, score = max(scores.items(), key=lambda item: item[1])
+        entry = self.entries[index]
+        exact = contract_segments.normalize_clause_text(text) == contract_segments.normalize_clause_text(entry.text)
+        return ClauseMatch(entry=entry, score=score, exact=exact)
+
+    def to_json(self) -> bytes:
+        return json.dumps({
+            "version": INDEX_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "entries": [asdict(entry) for entry in self.entries],
+            "idf": self.idf,
+            "vectors": self.vectors,
+        }).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, payload: bytes) -> Optional["ClauseIndex"]:
+        data = json.loads(payload)
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            return None
+        return cls(
+            data["fingerprint"],
+            [ClauseEntry(**entry) for entry in data["entries"]],
+            data["idf"],
+            data["vectors"],
+        )
+
+
+# Built indexes by org, shared by every request in this process
+_indexes: Dict[uuid.UUID, ClauseIndex] = {}
+
+
+class ClauseIndexService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _fingerprint(self, org_id: uuid.UUID) -> str:
+        result = await self.db.execute(
+            select(ClauseLibraryItem.id, ClauseLibraryItem.version, ClauseLibraryItem.updated_at)
+            .where(ClauseLibraryItem.org_id == org_id)
+            .order_by(ClauseLibraryItem.id)
+        )
+        state = ";".join(f"{row[0]}:{row[1]}:{row[2].isoformat() if row[2] else ''}" for row in result.all())
+        return contract_segments.text_hash(f"{INDEX_FORMAT_VERSION}|{state}")
+
+    @staticmethod
+    def _storage_key(org_id: uuid.UUID, fingerprint: str) -> str:
+        return f"{STORAGE_PREFIX}/{org_id}/{fingerprint}.json"
+
+    async def _build(self, org_id: uuid.UUID, fingerprint: str) -> ClauseIndex:
+        result = await self.db.execute(
+            select(ClauseLibraryItem).where(ClauseLibraryItem.org_id == org_id)
+        )
+        documents: List[Tuple[ClauseEntry, str]] = []
+        for clause in result.scalars().all():
+            base_risk = "amber" if clause.risk_level == ClauseRiskLevel.fallback else "green"
+            for text in [clause.clause_text, *(clause.acceptable_alternatives or [])]:
+                if text and text.strip():
+                    documents.append((
+                        ClauseEntry(
+                            str(clause.id), clause.title, clause.category, base_risk, "library language", text
+                        ),
+                        text,
+                    ))
+            for text in clause.fallback_positions or []:
+                if text and text.strip():
+                    documents.append((
+                        ClauseEntry(
+                            str(clause.id), clause.title, clause.category, "amber", "fallback position", text
+                        ),
+                        text,
+                    ))
+        return ClauseIndex.build(fingerprint, documents)
+
+    async def get_index(self, org_id: uuid.UUID) -> ClauseIndex:
+        """Current index for the org: from memory, then storage, else rebuilt and persisted."""
+        fingerprint = await self._fingerprint(org_id)
+        index = _indexes.get(org_id)
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+
+        storage = get_storage()
+        key = self._storage_key(org_id, fingerprint)
+        try:
+            if await storage.backend.stat(key):
+                index = ClauseIndex.from_json(await storage.backend.read(key))
+        except Exception as e:
+            logger.warning(f"Failed to load clause index {key}: {e}")
+            index = None
+
+        if index is None or index.fingerprint != fingerprint:
+            index = await self._build(org_id, fingerprint)
+            payload = index.to_json()
+            try:
+                await storage.backend.put_file(key, io.BytesIO(payload), len(payload), "application/json")
+            except Exception as e:
+                logger.warning(f"Failed to persist clause index {key}: {e}")
+            logger.info(f"Built clause index for org {org_id}: {len(index.entries)} entries")
+
+        previous = _indexes.get(org_id)
+        _indexes[org_id] = index
+        if previous is not None and previous.fingerprint != fingerprint:
+            await storage.delete(self._storage_key(org_id, previous.fingerprint))
+        return index
+
+    async def match_segments(
+        self,
+        org_id: uuid.UUID,
+        segments: Dict[str, str],
+        threshold: float = MATCH_THRESHOLD,
+    ) -> Dict[str, ClauseMatch]:
+        """
+        Best library match per segment key, for segments at or above the threshold.
+        Only matches with `exact` set may be classified without the model.
+        """
+        if not segments:
+            return {}
+
+        index = await self.get_index(org_id)
+        if not index.entries:
+            return {}
+
+        matches: Dict[str, ClauseMatch] = {}
+        for key, segment in segments.items():
+            match = index.best_match(segment)
+            if match is not None and match.score >= threshold:
+                matches[key] = match
+        return matches
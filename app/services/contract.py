@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+import time
 import uuid
 from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict, Any
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, desc, or_
+from sqlalchemy import select, func, desc, or_, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.contract import (
     Contract,
+    ContractClauseAnalysis,
     ContractStatus,
     RiskLevel as ContractRiskLevel,
     ClauseLibraryItem,
@@ -42,12 +45,15 @@ from app.schemas.contract import (
     WorkflowStats,
     ContractWorkflowResponse,
 )
+from app.services.id_generator import IDGenerator
 from app.utils.logger import get_logger
+from app.utils.pagination import CountMode, paginate
 from app.services.pdf_extractor import PDFExtractor
+from app.services.text_extraction import text_extraction
+from app.utils import contract_segments
 import os
-import boto3
-from botocore.exceptions import ClientError
 from app.environment import environment
+from app.services.storage import get_storage
 import re
 import asyncio
 
@@ -62,44 +68,18 @@ class ContractService:
     async def _generate_contract_id(self, org_id: uuid.UUID) -> str:
         year = datetime.utcnow().year
         prefix = f"CNT-{year}"
-        
-        try:
-            result = await self.db.execute(
-                select(Contract.contract_id)
-                .where(
-                    Contract.org_id == org_id,
-                    Contract.contract_id.like(f"{prefix}-%")
-                )
-                .order_by(desc(Contract.contract_id))
-                .limit(100)
-            )
-            existing_ids = [row[0] for row in result.fetchall() if row[0]]
-            
-            max_number = 0
-            for cnt_id in existing_ids:
-                try:
-                    parts = cnt_id.split('-')
-                    if len(parts) >= 3:
-                        num_str = parts[2]
-                        num = int(num_str)
-                        if num > max_number:
-                            max_number = num
-                except (ValueError, IndexError):
-                    continue
-            
-            next_number = max_number + 1
-            unique_suffix = str(uuid.uuid4())[:8].upper()
-            contract_id = f"{prefix}-{next_number:04d}-{unique_suffix}"
-            
-            logger.info(f"Generated contract ID: {contract_id} for org {org_id}")
-            return contract_id
-        except Exception as e:
-            logger.warning(f"Error generating contract ID: {e}, using timestamp fallback")
-            import time
+        # Contract IDs are unique across organizations, so the per-org number keeps a random suffix
+        unique_suffix = str(uuid.uuid4())[:8].upper()
+
+        number = await IDGenerator.try_next_value(self.db, org_id, "contract", f"{prefix}-", scope=str(year))
+        if number is None:
             timestamp = str(int(time.time()))[-6:]
-            unique_suffix = str(uuid.uuid4())[:8].upper()
             return f"{prefix}-{timestamp}-{unique_suffix}"
 
+        contract_id = f"{prefix}-{number:04d}-{unique_suffix}"
+        logger.info(f"Generated contract ID: {contract_id} for org {org_id}")
+        return contract_id
+
     async def _get_contract_for_org(self, contract_id: uuid.UUID, org_id: uuid.UUID) -> Contract:
         contract = await self.db.get(Contract, contract_id)
         if not contract or contract.org_id != org_id:
@@ -274,6 +254,8 @@ class ContractService:
         status_filter: Optional[ContractStatus] = None,
         risk_filter: Optional[ContractRiskLevel] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact",
     ) -> ContractListResponse:
         try:
             query = select(Contract).where(Contract.org_id == org_id)
@@ -292,23 +274,29 @@ class ContractService:
                     )
                 )
 
-            total_result = await self.db.execute(
-                select(func.count()).select_from(query.subquery())
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=Contract.created_at,
+                id_column=Contract.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
             )
-            total = total_result.scalar() or 0
 
-            query = query.order_by(desc(Contract.created_at)).offset((page - 1) * size).limit(size)
-            result = await self.db.execute(query)
-            contracts = result.scalars().all()
-
-            items = [await self._contract_to_list_item(c) for c in contracts]
+            items = [await self._contract_to_list_item(c) for c in page_result.items]
 
             return ContractListResponse(
                 items=items,
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.exception(f"Error listing contracts: {e}")
             raise HTTPException(
@@ -369,7 +357,10 @@ class ContractService:
         Args:
             contract_id: The contract ID to analyze
             user: The user performing the analysis
-            force_reanalyze: If True, always re-analyze even if analysis exists. If False, return cached analysis.
+            force_reanalyze: If True, re-check the current document even if analysis exists. If False, return cached analysis.
+
+        Re-analysis is incremental: the document text is split into clause segments and
+        only segments whose normalized text changed since the last run are sent to the model.
         """
         try:
             user_org_id = user.org_id if hasattr(user, 'org_id') else None
@@ -403,6 +394,7 @@ class ContractService:
             opportunity_data = None
             proposal_data = None
             executive_summary = None
+            incremental_metadata: Dict[str, Any] = {}
             
             if contract.opportunity_id:
                 try:
@@ -463,7 +455,9 @@ class ContractService:
                     # Download file from S3 or local storage
                     file_content = await self._download_contract_file(contract.file_url, contract.file_name)
                     if file_content:
-                        contract_text = PDFExtractor.extract_text_from_file(file_content, contract.file_name or "contract.pdf")
+                        contract_text = await text_extraction.extract(
+                            file_content, contract.file_name or "contract.pdf", max_chars=200000
+                        )
                         contract_text = PDFExtractor.clean_text(contract_text, max_length=50000)
                         logger.info(f"Extracted {len(contract_text)} characters from contract document")
                 except Exception as e:
@@ -524,16 +518,12 @@ class ContractService:
                     risk_level = ContractRiskLevel.medium
                     executive_summary = "Basic analysis performed. Please upload contract document for comprehensive AI analysis."
             else:
-                # Use Gemini AI for comprehensive analysis with opportunity and proposal context
-                analysis_items, red_count, amber_count, green_count, risk_level, executive_summary = await self._analyze_with_ai(
-                    contract_text, 
-                    contract.client_name, 
-                    contract.project_name, 
-                    contract.document_type,
-                    opportunity_data,
-                    proposal_data,
-                    contract
-                )
+                # Use Gemini AI for comprehensive analysis with opportunity and proposal context,
+                # re-sending only clauses that changed since the last run
+                (
+                    analysis_items, red_count, amber_count, green_count, risk_level, executive_summary,
+                    incremental_metadata,
+                ) = await self._analyze_incrementally(contract, contract_text, opportunity_data, proposal_data)
                 total_clauses = len(analysis_items)
 
             # Store analysis in extra_metadata
@@ -551,6 +541,7 @@ class ContractService:
                 'proposal_context': proposal_data is not None,
                 'executive_summary': executive_summary if executive_summary else '',
             }
+            analysis_metadata.update(incremental_metadata)
             contract.extra_metadata['ai_analysis'] = analysis_metadata
 
             # Update contract with analysis results
@@ -592,38 +583,235 @@ class ContractService:
                 detail=f"Failed to analyze contract: {str(e)}"
             )
 
+    @staticmethod
+    def _analysis_context_hash(
+        contract: Contract,
+        opportunity_data: Optional[Dict[str, Any]],
+        proposal_data: Optional[Dict[str, Any]],
+    ) -> str:
+        """Fingerprint of everything besides the document text that feeds the analysis prompt."""
+        import json
+
+        context = {
+            'client_name': contract.client_name,
+            'project_name': contract.project_name,
+            'document_type': contract.document_type,
+            'contract_value': str(contract.contract_value) if contract.contract_value is not None else None,
+            'currency': contract.currency,
+            'start_date': str(contract.start_date) if contract.start_date else None,
+            'end_date': str(contract.end_date) if contract.end_date else None,
+            'opportunity': opportunity_data,
+            'proposal': proposal_data,
+        }
+        return contract_segments.text_hash(json.dumps(context, sort_keys=True, default=str))
+
+    @staticmethod
+    def _summarize_items(
+        analysis_items: List[ContractAnalysisItem],
+    ) -> tuple[int, int, int, ContractRiskLevel]:
+        red_count = sum(1 for item in analysis_items if item.riskLevel == 'red')
+        amber_count = sum(1 for item in analysis_items if item.riskLevel == 'amber')
+        green_count = sum(1 for item in analysis_items if item.riskLevel == 'green')
+        if red_count > amber_count + green_count:
+            risk_level = ContractRiskLevel.high
+        elif green_count > red_count + amber_count:
+            risk_level = ContractRiskLevel.low
+        else:
+            risk_level = ContractRiskLevel.medium
+        return red_count, amber_count, green_count, risk_level
+
+    async def _match_clause_library(
+        self, org_id: uuid.UUID, segments: Dict[str, str]
+    ) -> tuple[Dict[str, List[ContractAnalysisItem]], List[str]]:
+        """
+        Verdicts for segments whose wording is identical to a clause library entry,
+        plus reference notes for segments that only resemble one.
+
+        Uses the org's TF-IDF clause index; preferred and acceptable language is
+        green, fallback positions are amber. Near matches are left for the model,
+        which gets the library clause as a reference, since a negation or a changed
+        amount or cap scores as similar but changes the verdict.
+        """
+        from app.services.clause_index import ClauseIndexService
+
+        matches = await ClauseIndexService(self.db).match_segments(org_id, segments)
+        verdicts = {
+            segment_hash: [
+                ContractAnalysisItem(
+                    clauseTitle=match.entry.title,
+                    detectedText=segments[segment_hash][:500],
+                    riskLevel=match.entry.risk_level,
+                    reasoning=(
+                        f"Matches the clause library entry '{match.entry.title}' "
+                        f"({match.entry.position}, identical wording)."
+                    ),
+                    location=contract_segments.segment_title(segments[segment_hash]) or 'Unknown',
+                    category=match.entry.category,
+                )
+            ]
+            for segment_hash, match in matches.items()
+            if match.exact
+        }
+        references = [
+            f"{contract_segments.segment_title(segments[segment_hash]) or 'Clause'} resembles "
+            f"'{match.entry.title}' ({match.entry.position}, {match.entry.risk_level}): "
+            f"{match.entry.text[:500]}"
+            for segment_hash, match in matches.items()
+            if not match.exact
+        ]
+        return verdicts, references
+
+    async def _analyze_incrementally(
+        self,
+        contract: Contract,
+        contract_text: str,
+        opportunity_data: Optional[Dict[str, Any]],
+        proposal_data: Optional[Dict[str, Any]],
+    ) -> tuple[List[ContractAnalysisItem], int, int, int, ContractRiskLevel, str, Dict[str, Any]]:
+        """
+        Analyze contract text clause by clause, reusing verdicts from earlier runs.
+
+        Segments are keyed by the hash of their normalized text. Segments analyzed before
+        under the same context, or matching the clause library, are reused; only the rest
+        are sent to the model. Returns the usual analysis tuple plus metadata to store
+        alongside the analysis.
+        """
+        document_hash = contract_segments.text_hash(contract_text)
+        context_hash = self._analysis_context_hash(contract, opportunity_data, proposal_data)
+        metadata = {'document_hash': document_hash, 'context_hash': context_hash}
+
+        stored = (contract.extra_metadata or {}).get('ai_analysis') or {}
+        if (
+            stored.get('document_hash') == document_hash
+            and stored.get('context_hash') == context_hash
+            and stored.get('items') is not None
+        ):
+            logger.info(f"Contract {contract.id} document unchanged since last analysis, reusing stored result")
+            analysis_items = [ContractAnalysisItem(**item) for item in stored['items']]
+            red_count, amber_count, green_count, risk_level = self._summarize_items(analysis_items)
+            return (
+                analysis_items, red_count, amber_count, green_count, risk_level,
+                stored.get('executive_summary') or '', {**metadata, 'segments_reanalyzed': 0},
+            )
+
+        # Ordered, de-duplicated segments of the current document
+        segments: Dict[str, str] = {}
+        for segment in contract_segments.split_clauses(contract_text):
+            segments.setdefault(contract_segments.segment_hash(segment), segment)
+
+        result = await self.db.execute(
+            select(ContractClauseAnalysis).where(
+                ContractClauseAnalysis.contract_id == contract.id,
+                ContractClauseAnalysis.context_hash == context_hash,
+                ContractClauseAnalysis.segment_hash.in_(list(segments)),
+            )
+        )
+        verdicts: Dict[str, List[ContractAnalysisItem]] = {
+            row.segment_hash: [ContractAnalysisItem(**item) for item in row.items]
+            for row in result.scalars().all()
+        }
+        reused_count = len(verdicts)
+        library_verdicts, library_references = await self._match_clause_library(
+            contract.org_id, {h: s for h, s in segments.items() if h not in verdicts}
+        )
+        verdicts.update(library_verdicts)
+        library_count = len(verdicts) - reused_count
+
+        pending = {h: s for h, s in segments.items() if h not in verdicts}
+        executive_summary = stored.get('executive_summary') or ''
+        ai_risk_level: Optional[ContractRiskLevel] = None
+
+        if pending:
+            prior_findings = [item for items in verdicts.values() for item in items]
+            try:
+                new_items, _, _, _, ai_risk_level, executive_summary = await self._analyze_with_ai(
+                    "\n\n".join(pending.values()),
+                    contract.client_name,
+                    contract.project_name,
+                    contract.document_type,
+                    opportunity_data,
+                    proposal_data,
+                    contract,
+                    prior_findings=prior_findings or None,
+                    library_references=library_references or None,
+                    raise_errors=True,
+                )
+            except Exception as e:
+                logger.warning(f"AI analysis failed for contract {contract.id}, using basic analysis: {e}")
+                # Not recorded as the analysis of this document, so the next run retries the AI
+                return (*self._get_basic_analysis(contract_text), {})
+
+            # Attribute each new verdict to the segment it quotes
+            pending_hashes = list(pending)
+            pending_segments = list(pending.values())
+            normalized = {
+                i: contract_segments.normalize_clause_text(segment) for i, segment in enumerate(pending_segments)
+            }
+            for segment_hash in pending_hashes:
+                verdicts[segment_hash] = []
+            for item in new_items:
+                index = contract_segments.best_segment(item.detectedText, pending_segments, normalized)
+                verdicts[pending_hashes[index if index is not None else 0]].append(item)
+
+            rows = [
+                {
+                    'contract_id': contract.id,
+                    'segment_hash': segment_hash,
+                    'org_id': contract.org_id,
+                    'context_hash': context_hash,
+                    'items': [item.model_dump() for item in verdicts[segment_hash]],
+                }
+                for segment_hash in pending_hashes
+            ]
+            stmt = pg_insert(ContractClauseAnalysis).values(rows)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[ContractClauseAnalysis.contract_id, ContractClauseAnalysis.segment_hash],
+                    set_={
+                        'context_hash': stmt.excluded.context_hash,
+                        'items': stmt.excluded.items,
+                        'analyzed_at': func.now(),
+                    },
+                )
+            )
+
+        # Drop verdicts for clauses no longer in the document or produced under an old context
+        await self.db.execute(
+            delete(ContractClauseAnalysis).where(
+                ContractClauseAnalysis.contract_id == contract.id,
+                or_(
+                    ContractClauseAnalysis.context_hash != context_hash,
+                    ContractClauseAnalysis.segment_hash.not_in(list(segments)),
+                ),
+            )
+        )
+
+        analysis_items = [item for segment_hash in segments for item in verdicts.get(segment_hash, [])]
+        red_count, amber_count, green_count, risk_level = self._summarize_items(analysis_items)
+        if ai_risk_level is not None and len(pending) == len(segments):
+            # Whole document went to the model: keep its overall judgement
+            risk_level = ai_risk_level
+        elif ai_risk_level == ContractRiskLevel.high:
+            risk_level = ContractRiskLevel.high
+
+        logger.info(
+            f"Incremental analysis for contract {contract.id}: {len(segments)} segments, "
+            f"{reused_count} reused, {library_count} matched clause library, {len(pending)} sent to AI"
+        )
+        metadata.update({
+            'segments_total': len(segments),
+            'segments_reanalyzed': len(pending),
+            'segments_from_library': library_count,
+        })
+        return analysis_items, red_count, amber_count, green_count, risk_level, executive_summary, metadata
+
     async def _download_contract_file(self, file_url: str, file_name: Optional[str] = None) -> Optional[bytes]:
         """Download contract file from S3 or local storage"""
         try:
-            # Check if it's an S3 URL
-            if file_url.startswith('https://') and 's3' in file_url and 'amazonaws.com' in file_url:
-                # Extract S3 key from URL
-                # Format: https://bucket.s3.region.amazonaws.com/key
-                try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(file_url)
-                    path_parts = parsed.path.lstrip('/').split('/', 1)
-                    if len(path_parts) == 2:
-                        bucket = path_parts[0] if not parsed.netloc.startswith(path_parts[0]) else parsed.netloc.split('.')[0]
-                        s3_key = path_parts[1]
-                    else:
-                        # Try to extract from netloc
-                        bucket = parsed.netloc.split('.')[0]
-                        s3_key = parsed.path.lstrip('/')
-                    
-                    s3_client = boto3.client(
-                        's3',
-                        aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                        aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                        region_name=environment.AWS_S3_REGION or "us-east-1"
-                    )
-                    
-                    response = s3_client.get_object(Bucket=bucket, Key=s3_key)
-                    file_content = response['Body'].read()
-                    logger.info(f"Downloaded contract file from S3: {s3_key}")
-                    return file_content
-                except Exception as e:
-                    logger.warning(f"Failed to download from S3: {e}")
+            file_content = await get_storage().read(file_url)
+            if file_content is not None:
+                logger.info(f"Downloaded contract file from storage: {file_url}")
+                return file_content
             
             # Try local file path
             if os.path.exists(file_url):
@@ -633,8 +821,8 @@ class ContractService:
             # Try HTTP download
             if file_url.startswith('http'):
                 try:
-                    import httpx
-                    async with httpx.AsyncClient() as client:
+                    from app.services.resources import http_session
+                    async with http_session() as client:
                         response = await client.get(file_url, timeout=30.0)
                         if response.status_code == 200:
                             return response.content
@@ -659,11 +847,20 @@ class ContractService:
         document_type: str,
         opportunity_data: Optional[Dict[str, Any]] = None,
         proposal_data: Optional[Dict[str, Any]] = None,
-        contract: Optional[Contract] = None
+        contract: Optional[Contract] = None,
+        prior_findings: Optional[List[ContractAnalysisItem]] = None,
+        library_references: Optional[List[str]] = None,
+        raise_errors: bool = False,
     ) -> tuple[List[ContractAnalysisItem], int, int, int, ContractRiskLevel, str]:
         """
         Use Gemini AI to analyze contract text and identify clauses, risks, and provide recommendations.
         Includes context from related opportunity and proposal for comprehensive analysis.
+
+        prior_findings: verdicts for unchanged clauses that are not part of contract_text; they are
+            listed for the executive summary but not re-analyzed.
+        library_references: clause library language that sections of contract_text resemble
+            but do not match word for word.
+        raise_errors: raise instead of falling back to the keyword-based analysis.
         Returns: (analysis_items, red_count, amber_count, green_count, risk_level)
         """
         try:
@@ -672,6 +869,8 @@ class ContractService:
             import re
             
             if not gemini_service.enabled:
+                if raise_errors:
+                    raise RuntimeError("Gemini AI not enabled")
                 logger.warning("Gemini AI not enabled, returning basic analysis")
                 return self._get_basic_analysis(contract_text)
 
@@ -740,7 +939,29 @@ class ContractService:
                 if proposal_data.get('due_date'):
                     prop_context += f"\n- Due Date: {proposal_data.get('due_date')}"
                 context_parts.append(prop_context)
-            
+
+            # Verdicts carried over from a previous run of this contract
+            if prior_findings:
+                prior_context = (
+                    "\n\nPreviously Reviewed Clauses (unchanged, already analyzed - do not list them again, "
+                    "but take them into account in the summary and counts). The document text below contains "
+                    "only the new or revised sections:"
+                )
+                for item in prior_findings[:60]:
+                    prior_context += f"\n- {item.clauseTitle} [{item.riskLevel}] ({item.category or 'General'})"
+                context_parts.append(prior_context)
+
+            # Library clauses that sections of the text resemble without matching exactly
+            if library_references:
+                library_context = (
+                    "\n\nClause Library References (approved language that some sections resemble but do not "
+                    "match word for word - compare negations, amounts, caps and parties, and classify each "
+                    "section on its own wording):"
+                )
+                for reference in library_references[:30]:
+                    library_context += f"\n- {reference}"
+                context_parts.append(library_context)
+
             context = "\n".join(context_parts)
 
             prompt = f"""You are an expert contract analysis AI assistant. Perform a comprehensive analysis of the contract document, considering all related business context including the opportunity and proposal information.
@@ -914,8 +1135,12 @@ Rules:
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse AI analysis JSON: {e}")
             logger.error(f"Response text: {response_text[:500] if 'response_text' in locals() else 'N/A'}")
+            if raise_errors:
+                raise
             return self._get_basic_analysis(contract_text)
         except Exception as e:
+            if raise_errors:
+                raise
             logger.exception(f"Error in AI analysis: {e}")
             return self._get_basic_analysis(contract_text)
 
@@ -972,10 +1197,8 @@ Rules:
             file_extension = filename.lower().split('.')[-1]
             text_content = ""
             
-            if file_extension == 'pdf':
-                text_content = PDFExtractor.extract_text_from_file(file_content, filename)
-            elif file_extension in ['doc', 'docx']:
-                text_content = PDFExtractor.extract_text_from_file(file_content, filename)
+            if file_extension in ['pdf', 'doc', 'docx']:
+                text_content = await text_extraction.extract(file_content, filename)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -1091,58 +1314,21 @@ Rules:
         try:
             # Sanitize filename
             safe_filename = re.sub(r'[^a-zA-Z0-9._-]', '_', filename)[:255]
-            timestamp = int(datetime.utcnow().timestamp())
-            storage_filename = f"{timestamp}_{safe_filename}"
             
-            # Try S3 first
-            s3_configured = all([
-                environment.AWS_ACCESS_KEY_ID,
-                environment.AWS_SECRET_ACCESS_KEY,
-                environment.AWS_S3_BUCKET_NAME,
-            ])
-            
-            file_path = None
-            file_url = None
+            storage = get_storage()
+            stored = await storage.save(
+                f"contracts/{contract_id}", safe_filename, file_content, content_type
+            )
+            file_path = stored.key
+            file_url = stored.url
             
-            if s3_configured:
-                try:
-                    s3_key = f"contracts/{contract_id}/{storage_filename}"
-                    s3_client = boto3.client(
-                        's3',
-                        aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                        aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                        region_name=environment.AWS_S3_REGION or "us-east-1"
-                    )
-                    s3_client.put_object(
-                        Bucket=environment.AWS_S3_BUCKET_NAME,
-                        Key=s3_key,
-                        Body=file_content,
-                        ContentType=content_type
-                    )
-                    region_segment = f".{environment.AWS_S3_REGION}" if environment.AWS_S3_REGION else ""
-                    file_url = f"https://{environment.AWS_S3_BUCKET_NAME}.s3{region_segment}.amazonaws.com/{s3_key}"
-                    file_path = s3_key
-                    logger.info(f"Contract document uploaded to S3: {s3_key}")
-                except ClientError as e:
-                    logger.warning(f"S3 upload failed: {e}, falling back to local storage")
-            
-            # Fallback to local storage
-            if not file_path:
-                upload_root = os.path.join("uploads", "contract_documents")
-                os.makedirs(upload_root, exist_ok=True)
-                contract_dir = os.path.join(upload_root, str(contract_id))
-                os.makedirs(contract_dir, exist_ok=True)
-                local_path = os.path.join(contract_dir, storage_filename)
-                
-                with open(local_path, "wb") as f:
-                    f.write(file_content)
-                
-                file_path = local_path
+            if not file_url:
+                # Local disk is served by the dev static mount under /uploads
                 api_base = getattr(environment, 'FRONTEND_URL', None) or "http://127.0.0.1:8000"
                 if ":5173" in api_base:
                     api_base = api_base.replace(":5173", ":8000")
-                file_url = f"{api_base}/uploads/contract_documents/{contract_id}/{storage_filename}"
-                logger.info(f"Contract document saved locally: {local_path}")
+                file_url = f"{api_base}/uploads/{stored.key}"
+            logger.info(f"Contract document stored ({stored.backend}): {stored.key}")
             
             return file_path, file_url
             
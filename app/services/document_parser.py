@@ -6,16 +6,15 @@ import io
 import mimetypes
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse
-import httpx
-import google.generativeai as genai
-from app.environment import environment
+from app.services.resources import http_session
 from app.utils.logger import get_logger
+from app.services.text_extraction import text_extraction
+from app.utils.lazy import deferred, genai
 
 logger = get_logger("document_parser")
 
-# Configure Gemini
-genai.configure(api_key=environment.GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-pro')
+# Gemini model, created on first use
+model = deferred(lambda: genai.GenerativeModel('gemini-pro'))
 
 
 async def download_document(url: str) -> Optional[bytes]:
@@ -24,8 +23,8 @@ async def download_document(url: str) -> Optional[bytes]:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        async with httpx.AsyncClient(timeout=60.0, headers=headers) as client:
-            response = await client.get(url)
+        async with http_session() as client:
+            response = await client.get(url, headers=headers, timeout=60.0)
             response.raise_for_status()
             return response.content
     except Exception as e:
@@ -131,12 +130,15 @@ async def parse_document(url: str) -> Dict[str, Any]:
         
         if file_path.endswith('.pdf'):
             result["file_type"] = "PDF"
-            text = extract_text_from_pdf(content)
+            text = await text_extraction.extract(content, file_path, max_chars=50000)
         elif file_path.endswith('.docx'):
             result["file_type"] = "DOCX"
-            text = extract_text_from_docx(content)
-        elif file_path.endswith(('.xls', '.xlsx')):
-            result["file_type"] = "XLS" if file_path.endswith('.xls') else "XLSX"
+            text = await text_extraction.extract(content, file_path)
+        elif file_path.endswith('.xlsx'):
+            result["file_type"] = "XLSX"
+            text = await text_extraction.extract(content, file_path)
+        elif file_path.endswith('.xls'):
+            result["file_type"] = "XLS"
             text = extract_text_from_xls(content, file_path[-4:])
         else:
             result["error"] = f"Unsupported file type: {file_path}"
@@ -0,0 +1,111 @@
+"""
+Email Queue
+Sends notification emails in the background instead of inside request handlers.
+
+Jobs are pushed onto an in-process asyncio queue and drained by a small pool of
+worker tasks that run the blocking SMTP call in a thread. When a job carries
+notification ids, their `email_sent` flags are set once the message is out.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import update
+
+from app.services.email import _send_email_via_smtp
+from app.utils.logger import get_logger
+
+logger = get_logger("email_queue")
+
+
+@dataclass
+class EmailJob:
+    to_email: str
+    subject: str
+    text_body: str
+    html_body: str
+    notification_ids: List[UUID] = field(default_factory=list)
+
+
+class EmailQueue:
+    def __init__(self, workers: int = 2, maxsize: int = 1000):
+        self.workers = workers
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    def enqueue(self, job: EmailJob) -> bool:
+        """Queue an email; returns False (and logs) if the queue is full."""
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Email queue full, dropping email to {job.to_email}: {job.subject}")
+            return False
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                sent = await asyncio.to_thread(
+                    _send_email_via_smtp, job.to_email, job.subject, job.text_body, job.html_body
+                )
+                if sent:
+                    self.sent += 1
+                    if job.notification_ids:
+                        await self._mark_sent(job.notification_ids)
+                else:
+                    self.failed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error sending queued email to {job.to_email}: {e}")
+            finally:
+                queue.task_done()
+
+    @staticmethod
+    async def _mark_sent(notification_ids: List[UUID]) -> None:
+        from app.db.session import get_transaction
+        from app.models.notification import Notification
+
+        async with get_transaction() as db:
+            await db.execute(
+                update(Notification)
+                .where(Notification.id.in_(notification_ids))
+                .values(email_sent=True, email_sent_at=datetime.utcnow())
+            )
+
+    async def join(self) -> None:
+        """Wait until every queued email has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+# Global instance
+email_queue = EmailQueue()
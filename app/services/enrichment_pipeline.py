@@ -0,0 +1,335 @@
+"""
+Enrichment Pipeline
+Enriches opportunity detail pages in three stages, each with its own
+concurrency limit, instead of one fetch + model call after another:
+
+1. fetch   - download detail pages over the shared HTTP client
+2. extract - parse the HTML (worker threads), collect text and document links
+3. llm     - pack several small pages into one structured Gemini request
+
+Each item is handed to `on_result` as soon as its batch completes, so callers
+can write results back (e.g. `enrich_temp_opportunities` updates
+OpportunityTemp rows) without waiting for the whole listing.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.db.session import get_transaction
+from app.environment import environment
+from app.models.opportunity_source import OpportunityTemp, TempOpportunityStatus
+from app.utils.html_page import page_of
+from app.utils.logger import get_logger
+from app.utils.scraper import (
+    PROJECT_DETAILS_PROMPT,
+    _safe_json_loads,
+    _truncate_text,
+    fetch_html,
+    finalize_details,
+    model,
+    parse_fetched,
+)
+
+logger = get_logger("enrichment_pipeline")
+
+_DONE = object()
+# How long the batcher waits for more extracted pages before sending a partial batch
+BATCH_LINGER_SECONDS = 0.25
+
+BATCH_DETAILS_PROMPT = """You are an infrastructure opportunity analyst. Below are {count} project pages,
+each wrapped in <page id="..."> tags. For EVERY page return one object with its id and these fields:
+"overview", "project_value_text", "project_value_numeric", "expected_rfp_date", "start_date",
+"completion_date", "scope_summary", "scope_items" (list), "location" (line1, line2, city, state,
+country_code, pincode), "contacts" (list of name, role, organization, email list, phone list),
+"documents" (list of title, url, type).
+
+Return ONLY valid JSON: {{"pages": [{{"id": "...", ...fields}}, ...]}}
+Use null for unknown fields. Never include markdown or commentary.
+
+{pages}"""
+
+
+@dataclass
+class EnrichmentJob:
+    key: Hashable
+    detail_url: str
+    # An already-fetched scrape_text_with_bs4 result for this URL, if any
+    prefetched: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _Extracted:
+    job: EnrichmentJob
+    text: str
+    documents: List[Dict[str, Any]]
+
+
+ResultCallback = Callable[[EnrichmentJob, Dict[str, Any]], Awaitable[None]]
+
+
+class EnrichmentPipeline:
+    def __init__(
+        self,
+        on_result: ResultCallback,
+        fetch_concurrency: Optional[int] = None,
+        extract_concurrency: Optional[int] = None,
+        llm_concurrency: Optional[int] = None,
+        batch_chars: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.on_result = on_result
+        self.fetch_concurrency = max(1, fetch_concurrency or environment.ENRICH_FETCH_CONCURRENCY)
+        self.extract_concurrency = max(1, extract_concurrency or environment.ENRICH_EXTRACT_CONCURRENCY)
+        self.llm_slots = asyncio.Semaphore(max(1, llm_concurrency or environment.ENRICH_LLM_CONCURRENCY))
+        self.batch_chars = batch_chars or environment.ENRICH_LLM_BATCH_CHARS
+        self.batch_size = max(1, batch_size or environment.ENRICH_LLM_BATCH_SIZE)
+        self.llm_calls = 0
+
+    async def run(self, jobs: Iterable[EnrichmentJob]) -> None:
+        fetched: asyncio.Queue = asyncio.Queue()
+        extracted: asyncio.Queue = asyncio.Queue()
+        pending: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            pending.put_nowait(job)
+        if pending.empty():
+            return
+
+        fetchers = [asyncio.create_task(self._fetch_stage(pending, fetched)) for _ in range(self.fetch_concurrency)]
+        extractors = [
+            asyncio.create_task(self._extract_stage(fetched, extracted)) for _ in range(self.extract_concurrency)
+        ]
+        batcher = asyncio.create_task(self._llm_stage(extracted))
+        try:
+            await asyncio.gather(*fetchers)
+            for _ in extractors:
+                fetched.put_nowait(_DONE)
+            await asyncio.gather(*extractors)
+            extracted.put_nowait(_DONE)
+            await batcher
+        finally:
+            for task in (*fetchers, *extractors, batcher):
+                task.cancel()
+
+    async def _emit(self, job: EnrichmentJob, details: Dict[str, Any]) -> None:
+        try:
+            await self.on_result(job, details)
+        except Exception as e:
+            logger.error(f"Storing enrichment for {job.detail_url} failed: {e}")
+
+    # ---- stages ----------------------------------------------------------
+
+    async def _fetch_stage(self, pending: asyncio.Queue, fetched: asyncio.Queue) -> None:
+        while not pending.empty():
+            job = pending.get_nowait()
+            page = job.prefetched or await fetch_html(job.detail_url)
+            fetched.put_nowait((job, page))
+
+    async def _extract_stage(self, fetched: asyncio.Queue, extracted: asyncio.Queue) -> None:
+        while True:
+            item = await fetched.get()
+            if item is _DONE:
+                return
+            job, page = item
+            if "text" not in page:
+                # Parsing is CPU-bound; keep it off the event loop
+                page = await asyncio.to_thread(parse_fetched, page)
+            if "text" not in page:
+                await self._emit(job, {"detail_error": page.get("error")})
+                continue
+            documents = await asyncio.to_thread(lambda: page_of(page, job.detail_url).documents())
+            extracted.put_nowait(_Extracted(job, _truncate_text(page["text"]), documents))
+
+    async def _llm_stage(self, extracted: asyncio.Queue) -> None:
+        batches: List[asyncio.Task] = []
+        batch: List[_Extracted] = []
+        size = 0
+        finished = False
+        while not finished:
+            try:
+                item = await (extracted.get() if not batch else asyncio.wait_for(extracted.get(), BATCH_LINGER_SECONDS))
+            except asyncio.TimeoutError:
+                item = None
+            if item is _DONE:
+                finished = True
+            elif item is not None:
+                if batch and size + len(item.text) > self.batch_chars:
+                    batches.append(asyncio.create_task(self._complete(batch)))
+                    batch, size = [], 0
+                batch.append(item)
+                size += len(item.text)
+                if len(batch) < self.batch_size and size < self.batch_chars:
+                    continue
+            if batch:
+                batches.append(asyncio.create_task(self._complete(batch)))
+                batch, size = [], 0
+        # A failing batch must not take the other batches' results with it
+        for outcome in await asyncio.gather(*batches, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                logger.error(f"Enrichment batch failed: {outcome}")
+
+    async def _complete(self, batch: List[_Extracted]) -> None:
+        try:
+            async with self.llm_slots:
+                structured = await asyncio.to_thread(self._ask_model, batch)
+        except Exception as e:
+            logger.warning(f"Enrichment batch of {len(batch)} page(s) failed: {e}")
+            for item in batch:
+                await self._emit(item.job, {"detail_error": f"Enrichment failed: {e}"})
+            return
+        for item, output in zip(batch, structured):
+            try:
+                details = finalize_details(
+                    output,
+                    item.text,
+                    item.documents,
+                    item.job.detail_url,
+                    contact_fallback=False,
+                )
+            except Exception as e:
+                logger.warning(f"Finalizing enrichment for {item.job.detail_url} failed: {e}")
+                details = {"detail_error": f"Enrichment failed: {e}"}
+            await self._emit(item.job, details)
+
+    def _ask_model(self, batch: List[_Extracted]) -> List[Dict[str, Any]]:
+        """
+        Blocking Gemini call for one batch; returns the structured output for each page, in order.
+        Model errors propagate so `_complete` records them as `detail_error`.
+        """
+        self.llm_calls += 1
+        if len(batch) == 1:
+            response = model.generate_content(PROJECT_DETAILS_PROMPT.format(content=batch[0].text))
+            return parse_batch_response(_safe_json_loads(response.text if response else ""), 1)
+
+        pages = "\n\n".join(
+            f'<page id="p{index}">\n{item.text}\n</page>' for index, item in enumerate(batch)
+        )
+        response = model.generate_content(BATCH_DETAILS_PROMPT.format(count=len(batch), pages=pages))
+        return parse_batch_response(_safe_json_loads(response.text if response else ""), len(batch))
+
+
+def parse_batch_response(payload: Any, count: int) -> List[Dict[str, Any]]:
+    """
+    Per-page outputs, in order, from a parsed model response. Accepts the
+    requested {"pages": [...]} object, a bare list of page objects, or (for a
+    single page) the page object itself; anything unusable becomes {}.
+    """
+    if count == 1 and isinstance(payload, dict) and "pages" not in payload:
+        return [payload]
+    if isinstance(payload, dict):
+        entries = payload.get("pages")
+    else:
+        entries = payload
+    if not isinstance(entries, list):
+        return [{} for _ in range(count)]
+
+    entries = [entry for entry in entries if isinstance(entry, dict)]
+    by_id = {str(entry["id"]): entry for entry in entries if entry.get("id") is not None}
+    if not by_id and len(entries) == count:
+        # Ids dropped by the model; fall back to position
+        return entries
+    return [by_id.get(f"p{index}", {}) for index in range(count)]
+
+
+async def enrich_listing(
+    opportunities: List[Dict[str, Any]],
+    listing_url: str,
+    listing_page: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Merge detail-page enrichment into listing opportunities, as process_urls
+    did one at a time. A single opportunity without its own detail URL is
+    enriched from the listing page itself.
+    """
+    jobs: List[EnrichmentJob] = []
+    for index, opportunity in enumerate(opportunities):
+        if opportunity.get("detail_url"):
+            jobs.append(EnrichmentJob(index, opportunity["detail_url"]))
+        elif len(opportunities) == 1:
+            jobs.append(EnrichmentJob(index, listing_url, prefetched=listing_page))
+
+    details: Dict[Hashable, Dict[str, Any]] = {}
+
+    async def _collect(job: EnrichmentJob, payload: Dict[str, Any]) -> None:
+        details[job.key] = payload
+
+    await EnrichmentPipeline(_collect).run(jobs)
+
+    enriched: List[Dict[str, Any]] = []
+    for index, opportunity in enumerate(opportunities):
+        merged = {**opportunity}
+        merged.update({k: v for k, v in details.get(index, {}).items() if v is not None})
+        enriched.append(merged)
+    return enriched
+
+
+def apply_details_to_temp(record: OpportunityTemp, details: Dict[str, Any]) -> None:
+    """Fold enrichment into a temp opportunity without overwriting fields it already has."""
+    now = datetime.utcnow().isoformat()
+    metadata = dict(record.ai_metadata or {})
+    if details.get("detail_error"):
+        metadata["enrichment"] = {"status": "error", "error": details["detail_error"], "at": now}
+        record.ai_metadata = metadata
+        return
+
+    payload = {**(record.raw_payload or {}), **{k: v for k, v in details.items() if v is not None}}
+    record.raw_payload = payload
+    metadata["opportunity"] = payload
+    metadata["enrichment"] = {"status": "done", "at": now}
+    record.ai_metadata = metadata
+
+    location = (payload.get("location_details") or {}).get("city")
+    if not record.location and location:
+        record.location = str(location)[:255]
+    if not record.budget_text and payload.get("project_value_text"):
+        record.budget_text = str(payload["project_value_text"])[:255]
+    if not record.documents and payload.get("documents"):
+        record.documents = payload["documents"]
+    if payload.get("overview"):
+        record.ai_summary = payload["overview"]
+    record.updated_at = datetime.utcnow()
+
+
+async def enrich_temp_opportunities(temp_ids: Iterable[uuid.UUID]) -> Dict[str, int]:
+    """
+    Enrich freshly created temp opportunities from their detail pages. No
+    transaction is held while pages are fetched or the model runs; each result
+    is written back in its own short transaction as soon as it is ready.
+    """
+    ids = list(temp_ids)
+    if not ids:
+        return {"enriched": 0, "failed": 0, "llm_calls": 0}
+
+    async with get_transaction() as db:
+        rows = (
+            await db.execute(select(OpportunityTemp.id, OpportunityTemp.raw_payload).where(OpportunityTemp.id.in_(ids)))
+        ).all()
+    jobs = [
+        EnrichmentJob(temp_id, detail_url)
+        for temp_id, payload in rows
+        if (detail_url := (payload or {}).get("detail_url") or (payload or {}).get("source_url"))
+    ]
+
+    stats = {"enriched": 0, "failed": 0}
+
+    async def _store(job: EnrichmentJob, details: Dict[str, Any]) -> None:
+        async with get_transaction() as db:
+            record = await db.get(OpportunityTemp, job.key)
+            # Leave drafts alone once a reviewer has acted on them
+            if record is None or record.status != TempOpportunityStatus.pending_review:
+                return
+            apply_details_to_temp(record, details)
+        stats["failed" if details.get("detail_error") else "enriched"] += 1
+
+    pipeline = EnrichmentPipeline(_store)
+    await pipeline.run(jobs)
+    logger.info(
+        f"Enriched {stats['enriched']} temp opportunities ({stats['failed']} failed) "
+        f"with {pipeline.llm_calls} model calls"
+    )
+    return {**stats, "llm_calls": pipeline.llm_calls}
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -182,6 +182,7 @@ class ExpenseCategoryService:
     async def delete(db: AsyncSession, category_id: int) -> bool:
         from sqlalchemy import select
         from app.models.finance_planning import FinanceRevenueLine, FinanceExpenseLine, FinanceAnnualBudget
+        from app.services.finance_planning import budget_line_key
         
         category = await ExpenseCategoryService.get_by_id(db, category_id, include_subcategories=False)
         if not category:
@@ -252,6 +253,7 @@ class ExpenseCategoryService:
             # If no budgets table exists or error, just skip value transfer
             all_budgets = []
         
+        other_line_key = budget_line_key(other_category_name)
         for budget in all_budgets:
             if category_type == "revenue":
                 # Find revenue lines with this category name
@@ -268,7 +270,10 @@ class ExpenseCategoryService:
                     other_line_result = await db.execute(
                         select(FinanceRevenueLine).where(
                             FinanceRevenueLine.budget_id == budget.id,
-                            FinanceRevenueLine.label == other_category_name
+                            or_(
+                                FinanceRevenueLine.label == other_category_name,
+                                FinanceRevenueLine.line_key == other_line_key
+                            )
                         ).order_by(FinanceRevenueLine.id).limit(1)
                     )
                     other_line = other_line_result.scalar_one_or_none()
@@ -281,6 +286,7 @@ class ExpenseCategoryService:
                         # Create new "Other Revenue" line
                         other_line = FinanceRevenueLine(
                             budget_id=budget.id,
+                            line_key=other_line_key,
                             label=other_category_name,
                             target=line.target,
                             variance=line.variance,
@@ -305,7 +311,10 @@ class ExpenseCategoryService:
                     other_line_result = await db.execute(
                         select(FinanceExpenseLine).where(
                             FinanceExpenseLine.budget_id == budget.id,
-                            FinanceExpenseLine.label == other_category_name
+                            or_(
+                                FinanceExpenseLine.label == other_category_name,
+                                FinanceExpenseLine.line_key == other_line_key
+                            )
                         ).order_by(FinanceExpenseLine.id).limit(1)
                     )
                     other_line = other_line_result.scalar_one_or_none()
@@ -318,6 +327,7 @@ class ExpenseCategoryService:
                         # Create new "Other Expense" line
                         other_line = FinanceExpenseLine(
                             budget_id=budget.id,
+                            line_key=other_line_key,
                             label=other_category_name,
                             target=line.target,
                             variance=line.variance,
@@ -1,9 +1,6 @@
 import logging
 from typing import Optional
-from pdfminer.high_level import extract_text as pdf_extract_text
-import docx2txt
-import tempfile
-import os
+from app.utils import text_extractors
 
 logger = logging.getLogger(__name__)
 
@@ -20,40 +17,29 @@ class FileExtractor:
         Extract text from uploaded file
         Supports: PDF, DOCX
         Returns: Clean text content
+
+        Synchronous; async callers should use `text_extraction.extract`, which
+        runs off the event loop and caches by content hash.
         """
         try:
-            file_extension = filename.lower().split('.')[-1]
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}') as temp_file:
-                temp_file.write(file_content)
-                temp_path = temp_file.name
-            
-            try:
-                if file_extension == 'pdf':
-                    text = FileExtractor.extract_text_from_pdf(temp_path)
-                elif file_extension in ['doc', 'docx']:
-                    text = FileExtractor.extract_text_from_docx(temp_path)
-                else:
-                    logger.warning(f"Unsupported file type: {file_extension}")
-                    text = ""
-                
-                return text
-                
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+            file_extension = text_extractors.file_extension(filename)
+            if file_extension == 'pdf':
+                return FileExtractor.extract_text_from_pdf(file_content)
+            if file_extension in ['doc', 'docx']:
+                return FileExtractor.extract_text_from_docx(file_content)
+
+            logger.warning(f"Unsupported file type: {file_extension}")
+            return ""
 
         except Exception as e:
             logger.error(f"File extraction error: {e}")
             return ""
 
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> str:
-        """Extract text from PDF using pdfminer.six"""
+    def extract_text_from_pdf(file_content: bytes) -> str:
+        """Extract text from PDF bytes using pdfminer.six"""
         try:
-            text = pdf_extract_text(file_path)
+            text = text_extractors.extract_pdf(file_content)
             logger.info(f"✅ Extracted {len(text)} characters from PDF")
             return text
         except Exception as e:
@@ -61,10 +47,10 @@ class FileExtractor:
             return ""
 
     @staticmethod
-    def extract_text_from_docx(file_path: str) -> str:
-        """Extract text from DOCX using docx2txt"""
+    def extract_text_from_docx(file_content: bytes) -> str:
+        """Extract text from DOCX bytes using docx2txt"""
         try:
-            text = docx2txt.process(file_path)
+            text = text_extractors.extract_docx(file_content)
             logger.info(f"✅ Extracted {len(text)} characters from DOCX")
             return text
         except Exception as e:
@@ -0,0 +1,285 @@
+"""
+Finance Actuals
+Maintains the `finance_monthly_actuals` fact table: approved spend per
+(org, expense category, month), split into approved employee expenses,
+reimbursed employee expenses and approved/paid vendor invoices.
+
+Rows are keyed by the normalized category name (`category_key`: lower-cased,
+trimmed, inner whitespace collapsed), because expenses and requisitions carry
+the category as free text. Readers pick the sources they report on, so
+budget-vs-actual keeps counting approved expenses only and the procurement
+history keeps counting approved and reimbursed expenses, as before.
+
+Expense and invoice writes call `apply(before, after)` with the row's
+contribution before and after the change; the difference is added to the
+affected month buckets with one `INSERT ... ON CONFLICT DO UPDATE`. Reads are
+range scans on the primary key instead of `extract(year)` / `ilike` scans of
+the source tables. `rebuild()` recomputes an organization from scratch.
+"""
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import delete, func, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.expense_category import ExpenseCategory
+from app.models.finance_planning import FinanceMonthlyActual
+from app.models.procurement import (
+    EmployeeExpense,
+    ExpenseStatus,
+    InvoiceStatus,
+    PurchaseOrder,
+    PurchaseRequisition,
+    VendorInvoice,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger("finance_actuals")
+
+UNCATEGORIZED = ""
+COUNTED_EXPENSE_STATUSES = (ExpenseStatus.APPROVED, ExpenseStatus.REIMBURSED)
+COUNTED_INVOICE_STATUSES = (InvoiceStatus.APPROVED, InvoiceStatus.PAID)
+SOURCES = ("expense", "reimbursed", "invoice")
+
+
+@dataclass(frozen=True)
+class ActualContribution:
+    """What one expense or invoice adds to the fact table."""
+    org_id: uuid.UUID
+    category_name: Optional[str]
+    month: date
+    source: str  # "expense" | "reimbursed" | "invoice"
+    amount: Decimal
+
+
+def category_key(name: Optional[str]) -> str:
+    """Normalized category name the fact table is keyed by; matches `_category_key_sql`."""
+    return " ".join((name or "").split()).lower()
+
+
+def _category_key_sql(column: str) -> str:
+    return f"lower(regexp_replace(trim(COALESCE({column}, '')), '\\s+', ' ', 'g'))"
+
+
+def month_start(value: Union[datetime, date]) -> date:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        value = value.date()
+    return value.replace(day=1)
+
+
+def year_range(year: int) -> Tuple[date, date]:
+    """Half-open [start, end) month range covering a calendar year."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def expense_contribution(expense: EmployeeExpense) -> Optional[ActualContribution]:
+    if expense is None or expense.status not in COUNTED_EXPENSE_STATUSES or not expense.expense_date:
+        return None
+    return ActualContribution(
+        org_id=expense.org_id,
+        category_name=expense.category,
+        month=month_start(expense.expense_date),
+        source="reimbursed" if expense.status == ExpenseStatus.REIMBURSED else "expense",
+        amount=Decimal(str(expense.amount or 0)),
+    )
+
+
+def _amount_column(sources: Sequence[str]):
+    columns = [getattr(FinanceMonthlyActual, f"{source}_amount") for source in sources]
+    amount = columns[0]
+    for column in columns[1:]:
+        amount = amount + column
+    return amount
+
+
+class FinanceActualsService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # ---- maintenance -----------------------------------------------------
+
+    async def invoice_contribution(self, invoice: VendorInvoice) -> Optional[ActualContribution]:
+        """Invoices take the category of the requisition behind their purchase order."""
+        if invoice is None or invoice.status not in COUNTED_INVOICE_STATUSES or not invoice.invoice_date:
+            return None
+        category_name = None
+        if invoice.po_id:
+            result = await self.db.execute(
+                select(PurchaseRequisition.category)
+                .join(PurchaseOrder, PurchaseOrder.requisition_id == PurchaseRequisition.id)
+                .where(PurchaseOrder.id == invoice.po_id)
+            )
+            category_name = result.scalar_one_or_none()
+        return ActualContribution(
+            org_id=invoice.org_id,
+            category_name=category_name,
+            month=month_start(invoice.invoice_date),
+            source="invoice",
+            amount=Decimal(str(invoice.amount or 0)),
+        )
+
+    async def apply(
+        self,
+        before: Optional[ActualContribution],
+        after: Optional[ActualContribution],
+    ) -> None:
+        """Move a row's contribution from `before` to `after` (either may be None)."""
+        if before == after:
+            return
+        buckets: Dict[Tuple[uuid.UUID, str, date], Dict[str, object]] = {}
+        for contribution, sign in ((before, -1), (after, 1)):
+            if contribution is None:
+                continue
+            key = (contribution.org_id, category_key(contribution.category_name), contribution.month)
+            row = buckets.setdefault(key, {
+                "org_id": key[0],
+                "category_key": key[1],
+                "month": key[2],
+                **{f"{source}_amount": Decimal("0") for source in SOURCES},
+                **{f"{source}_count": 0 for source in SOURCES},
+            })
+            row[f"{contribution.source}_amount"] += contribution.amount * sign
+            row[f"{contribution.source}_count"] += sign
+
+        rows = [
+            row for row in buckets.values()
+            if any(row[f"{source}_amount"] or row[f"{source}_count"] for source in SOURCES)
+        ]
+        if not rows:
+            return
+
+        stmt = pg_insert(FinanceMonthlyActual).values(rows)
+        table = FinanceMonthlyActual.__table__
+        totals = {
+            column: table.c[column] + stmt.excluded[column]
+            for source in SOURCES
+            for column in (f"{source}_amount", f"{source}_count")
+        }
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.org_id, table.c.category_key, table.c.month],
+                set_={**totals, "updated_at": func.now()},
+            )
+        )
+
+    async def rebuild(self, org_id: Optional[uuid.UUID] = None) -> int:
+        """Recompute the fact table from expenses and invoices (one org, or all); returns rows written."""
+        if org_id is not None:
+            await self.db.execute(delete(FinanceMonthlyActual).where(FinanceMonthlyActual.org_id == org_id))
+        else:
+            await self.db.execute(delete(FinanceMonthlyActual))
+        result = await self.db.execute(text(REBUILD_SQL), {"org_id": org_id})
+        logger.info(f"Rebuilt finance monthly actuals (org={org_id or 'all'}): {result.rowcount} rows")
+        return result.rowcount or 0
+
+    # ---- queries ---------------------------------------------------------
+
+    async def monthly(
+        self,
+        org_id: uuid.UUID,
+        start: date,
+        end: date,
+        category_keys: Optional[Sequence[str]] = None,
+    ) -> List[FinanceMonthlyActual]:
+        """Fact rows for months in [start, end), optionally limited to some categories."""
+        query = select(FinanceMonthlyActual).where(
+            FinanceMonthlyActual.org_id == org_id,
+            FinanceMonthlyActual.month >= start,
+            FinanceMonthlyActual.month < end,
+        )
+        if category_keys is not None:
+            query = query.where(FinanceMonthlyActual.category_key.in_(list(category_keys)))
+        result = await self.db.execute(query.order_by(FinanceMonthlyActual.month))
+        return list(result.scalars().all())
+
+    async def totals_by_category(
+        self,
+        org_id: uuid.UUID,
+        start: date,
+        end: date,
+        sources: Sequence[str] = ("expense",),
+    ) -> Dict[str, Decimal]:
+        """Spend from `sources` per category key over [start, end) in a single grouped range query."""
+        result = await self.db.execute(
+            select(FinanceMonthlyActual.category_key, func.sum(_amount_column(sources)))
+            .where(
+                FinanceMonthlyActual.org_id == org_id,
+                FinanceMonthlyActual.month >= start,
+                FinanceMonthlyActual.month < end,
+            )
+            .group_by(FinanceMonthlyActual.category_key)
+        )
+        return {key: Decimal(str(total or 0)) for key, total in result.all()}
+
+    async def category_tree_keys(self, category_id: int) -> List[str]:
+        """Keys of an expense category and its direct subcategories."""
+        result = await self.db.execute(
+            select(ExpenseCategory.name).where(
+                or_(ExpenseCategory.id == category_id, ExpenseCategory.parent_id == category_id)
+            )
+        )
+        return sorted({category_key(name) for name in result.scalars().all() if category_key(name)})
+
+    async def yearly_totals(
+        self,
+        org_id: uuid.UUID,
+        category_keys: Sequence[str],
+        years: Sequence[int],
+        sources: Sequence[str] = ("expense",),
+    ) -> Dict[int, Decimal]:
+        """Spend from `sources` per calendar year for a set of categories."""
+        totals: Dict[int, Decimal] = defaultdict(lambda: Decimal("0"))
+        if not category_keys or not years:
+            return {year: totals[year] for year in years}
+        start, end = year_range(min(years))[0], year_range(max(years))[1]
+        for row in await self.monthly(org_id, start, end, category_keys):
+            totals[row.month.year] += sum(
+                (Decimal(str(getattr(row, f"{source}_amount") or 0)) for source in sources), Decimal("0")
+            )
+        return {year: totals[year] for year in years}
+
+
+# Aggregates all sources into month buckets, keyed like category_key()
+REBUILD_SQL = f"""
+WITH contributions AS (
+    SELECT e.org_id,
+           {_category_key_sql("e.category")} AS category_key,
+           date_trunc('month', e.expense_date AT TIME ZONE 'UTC')::date AS month,
+           CASE WHEN e.status = 'APPROVED' THEN e.amount ELSE 0 END AS expense_amount,
+           CASE WHEN e.status = 'APPROVED' THEN 1 ELSE 0 END AS expense_count,
+           CASE WHEN e.status = 'REIMBURSED' THEN e.amount ELSE 0 END AS reimbursed_amount,
+           CASE WHEN e.status = 'REIMBURSED' THEN 1 ELSE 0 END AS reimbursed_count,
+           0::numeric AS invoice_amount, 0 AS invoice_count
+    FROM employee_expenses e
+    WHERE e.status IN ('APPROVED', 'REIMBURSED')
+      AND (CAST(:org_id AS uuid) IS NULL OR e.org_id = CAST(:org_id AS uuid))
+    UNION ALL
+    SELECT i.org_id,
+           {_category_key_sql("r.category")},
+           date_trunc('month', i.invoice_date AT TIME ZONE 'UTC')::date,
+           0::numeric, 0, 0::numeric, 0,
+           i.amount, 1
+    FROM vendor_invoices i
+    LEFT JOIN purchase_orders po ON po.id = i.po_id
+    LEFT JOIN purchase_requisitions r ON r.id = po.requisition_id
+    WHERE i.status IN ('APPROVED', 'PAID')
+      AND (CAST(:org_id AS uuid) IS NULL OR i.org_id = CAST(:org_id AS uuid))
+)
+INSERT INTO finance_monthly_actuals
+    (org_id, category_key, month, expense_amount, expense_count, reimbursed_amount, reimbursed_count,
+     invoice_amount, invoice_count, updated_at)
+SELECT org_id, category_key, month,
+       SUM(expense_amount), SUM(expense_count), SUM(reimbursed_amount), SUM(reimbursed_count),
+       SUM(invoice_amount), SUM(invoice_count), now()
+FROM contributions
+GROUP BY org_id, category_key, month
+"""
@@ -8,7 +8,8 @@ until real budgeting and forecasting data is available.
 from __future__ import annotations
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, delete, func, extract
+from sqlalchemy import select, and_, or_, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 from typing import Optional, Union, List, Dict, Any
 import uuid
@@ -54,7 +55,6 @@ from app.schemas.finance import (
     BudgetApprovalListResponse,
     BudgetApprovalActionRequest,
 )
-from fastapi import HTTPException, status
 from app.utils.logger import get_logger
 
 logger = get_logger("finance_planning")
@@ -303,32 +303,23 @@ async def get_annual_budget_from_db(
         expense_lines_sorted = sorted(expense_lines_list, key=lambda x: x.display_order)
         business_units_sorted = sorted(business_units_list, key=lambda x: x.name)
         
-        # Calculate actual spending from procurement/expenses for expense lines
-        from app.models.procurement import EmployeeExpense, ExpenseStatus
+        # Actual spending per expense line (approved employee expenses whose category
+        # matches the line label) from the monthly actuals fact table
+        from app.services.finance_actuals import FinanceActualsService, category_key, year_range
         from datetime import datetime
         
         budget_year_int = int(budget.budget_year) if budget.budget_year else datetime.now().year
         
-        # Calculate actual expense spending by category
         expense_actuals = {}
-        if expense_lines_sorted:
-            # Get all approved expenses for the budget year
-            expense_query = select(
-                EmployeeExpense.category,
-                func.sum(EmployeeExpense.amount).label('total_amount')
-            ).where(
-                and_(
-                    extract('year', EmployeeExpense.expense_date) == budget_year_int,
-                    EmployeeExpense.status == ExpenseStatus.APPROVED
-                )
+        actuals_org_id = org_id or budget.org_id
+        if expense_lines_sorted and actuals_org_id:
+            totals = await FinanceActualsService(db).totals_by_category(
+                actuals_org_id, *year_range(budget_year_int), sources=("expense",)
             )
-            if org_id:
-                expense_query = expense_query.where(EmployeeExpense.org_id == org_id)
-            
-            expense_result = await db.execute(expense_query.group_by(EmployeeExpense.category))
-            for row in expense_result:
-                category_name = row.category or 'Other'
-                expense_actuals[category_name] = float(row.total_amount or 0)
+            for line in expense_lines_sorted:
+                key = category_key(line.label)
+                if key in totals:
+                    expense_actuals[line.label] = float(totals[key])
         
         # Calculate actual revenue (from opportunities won in the budget year)
         revenue_actuals = {}
@@ -341,7 +332,8 @@ async def get_annual_budget_from_db(
             ).where(
                 and_(
                     Opportunity.stage == OpportunityStage.won,
-                    extract('year', Opportunity.updated_at) == budget_year_int
+                    Opportunity.updated_at >= datetime(budget_year_int, 1, 1),
+                    Opportunity.updated_at < datetime(budget_year_int + 1, 1, 1)
                 )
             )
             if org_id:
@@ -392,6 +384,7 @@ async def get_annual_budget_from_db(
             ],
             revenue_lines=[
                 FinancePlanningLineItem(
+                    line_key=line.line_key,
                     label=line.label,
                     target=line.target,
                     variance=revenue_actuals.get(line.label, 0) - line.target,  # Calculate variance: actual - target
@@ -404,6 +397,7 @@ async def get_annual_budget_from_db(
             ],
             expense_lines=[
                 FinancePlanningLineItem(
+                    line_key=line.line_key,
                     label=line.label,
                     target=line.target,
                     variance=expense_actuals.get(line.label, 0) - line.target,  # Calculate variance: actual - target
@@ -416,6 +410,7 @@ async def get_annual_budget_from_db(
             ],
             business_units=[
                 FinancePlanningBusinessUnit(
+                    line_key=unit.line_key,
                     name=unit.name,
                     revenue=unit.revenue,
                     expense=unit.expense,
@@ -751,6 +746,110 @@ def get_scenario_planning_snapshot() -> FinancePlanningScenarioResponse:
 
 # Database save functions
 
+def budget_line_key(label: Optional[str]) -> str:
+    """Default stable key of a budget line: its normalized label."""
+    return " ".join(str(label or "").split()).lower()[:200]
+
+
+def assign_line_keys(keys: List[Optional[str]], labels: List[Optional[str]]) -> List[str]:
+    """
+    Resolve the key of every line in a save: the client's line_key when given,
+    else the normalized label; repeats get "#2", "#3"... in order of appearance.
+    """
+    used = set()
+    resolved = []
+    for key, label in zip(keys, labels):
+        base = (key or "").strip()[:200] or budget_line_key(label)
+        candidate, n = base, 1
+        while candidate in used:
+            n += 1
+            candidate = f"{base}#{n}"
+        used.add(candidate)
+        resolved.append(candidate)
+    return resolved
+
+
+async def _sync_budget_rows(
+    db: AsyncSession,
+    model,
+    budget_id: int,
+    rows: List[Dict[str, Any]],
+    update_columns: List[str],
+) -> None:
+    """
+    Make the budget's rows of `model` match `rows` (keyed by line_key):
+    one bulk INSERT ... ON CONFLICT that only rewrites rows whose values changed,
+    then one DELETE for lines no longer present. Row ids and columns not in
+    `update_columns` (variance explanations etc.) survive the save.
+    """
+    table = model.__table__
+    if rows:
+        stmt = pg_insert(model).values(rows)
+        changed = or_(*[table.c[column].is_distinct_from(stmt.excluded[column]) for column in update_columns])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.budget_id, table.c.line_key],
+                set_={**{column: stmt.excluded[column] for column in update_columns}, "updated_at": func.now()},
+                where=changed,
+            )
+        )
+
+    stale = delete(model).where(model.budget_id == budget_id)
+    if rows:
+        stale = stale.where(model.line_key.not_in([row["line_key"] for row in rows]))
+    await db.execute(stale)
+
+
+_LINE_COLUMNS = ["label", "target", "variance", "display_order"]
+_UNIT_COLUMNS = ["name", "revenue", "expense", "profit", "headcount", "margin_percent"]
+
+
+async def _sync_budget_lines(
+    db: AsyncSession,
+    model,
+    budget_id: int,
+    lines: List[FinancePlanningLineItem],
+    default_label: str,
+) -> None:
+    labels = [str(line.label) if line.label else f"{default_label} {idx + 1}" for idx, line in enumerate(lines)]
+    keys = assign_line_keys([line.line_key for line in lines], labels)
+    rows = [
+        {
+            "budget_id": budget_id,
+            "line_key": key,
+            "label": label,
+            "target": float(line.target) if line.target is not None else 0.0,
+            "variance": float(line.variance) if line.variance is not None else 0.0,
+            "display_order": idx,
+        }
+        for idx, (line, key, label) in enumerate(zip(lines, keys, labels))
+    ]
+    await _sync_budget_rows(db, model, budget_id, rows, _LINE_COLUMNS)
+
+
+async def _sync_business_units(
+    db: AsyncSession,
+    budget_id: int,
+    units: List[FinancePlanningBusinessUnit],
+) -> None:
+    keys = assign_line_keys([unit.line_key for unit in units], [unit.name for unit in units])
+    rows = []
+    for unit, key in zip(units, keys):
+        # Pydantic model has marginPercent (camelCase) with alias margin_percent (snake_case)
+        margin_value = getattr(unit, 'marginPercent', 0.0)
+        rows.append({
+            "budget_id": budget_id,
+            "line_key": key,
+            "name": unit.name,
+            "revenue": float(unit.revenue) if unit.revenue is not None else 0.0,
+            "expense": float(unit.expense) if unit.expense is not None else 0.0,
+            "profit": float(unit.profit) if unit.profit is not None else 0.0,
+            "headcount": int(unit.headcount) if unit.headcount is not None else 0,
+            "margin_percent": float(margin_value) if margin_value is not None else 0.0,
+        })
+    await _sync_budget_rows(db, FinanceBusinessUnit, budget_id, rows, _UNIT_COLUMNS)
+
+
 async def save_annual_budget(
     db: AsyncSession,
     budget_data: FinanceAnnualBudgetCreate,
@@ -811,22 +910,6 @@ async def save_annual_budget(
             if org_id:
                 existing_budget.org_id = org_id
             
-            # Delete existing lines - flush after each delete to ensure they're executed
-            await db.execute(
-                delete(FinanceRevenueLine).where(FinanceRevenueLine.budget_id == existing_budget.id)
-            )
-            await db.flush()
-            
-            await db.execute(
-                delete(FinanceExpenseLine).where(FinanceExpenseLine.budget_id == existing_budget.id)
-            )
-            await db.flush()
-            
-            await db.execute(
-                delete(FinanceBusinessUnit).where(FinanceBusinessUnit.budget_id == existing_budget.id)
-            )
-            await db.flush()
-            
             budget = existing_budget
         else:
             # Create new budget
@@ -846,55 +929,10 @@ async def save_annual_budget(
             db.add(budget)
             await db.flush()
         
-        # Add revenue lines
-        if budget_data.revenue_lines:
-            for idx, line in enumerate(budget_data.revenue_lines):
-                try:
-                    revenue_line = FinanceRevenueLine(
-                        budget_id=budget.id,
-                        label=str(line.label) if line.label else f"Revenue Line {idx + 1}",
-                        target=float(line.target) if line.target is not None else 0.0,
-                        variance=float(line.variance) if line.variance is not None else 0.0,
-                        display_order=idx,
-                    )
-                    db.add(revenue_line)
-                except Exception as e:
-                    logger.error(f"Error creating revenue line {idx}: {str(e)}")
-                    raise
-        
-        # Add expense lines
-        if budget_data.expense_lines:
-            for idx, line in enumerate(budget_data.expense_lines):
-                try:
-                    expense_line = FinanceExpenseLine(
-                        budget_id=budget.id,
-                        label=str(line.label) if line.label else f"Expense Line {idx + 1}",
-                        target=float(line.target) if line.target is not None else 0.0,
-                        variance=float(line.variance) if line.variance is not None else 0.0,
-                        display_order=idx,
-                    )
-                    db.add(expense_line)
-                except Exception as e:
-                    logger.error(f"Error creating expense line {idx}: {str(e)}")
-                    raise
-        
-        # Add business units (if provided)
-        if budget_data.business_units and len(budget_data.business_units) > 0:
-            for unit in budget_data.business_units:
-                # Pydantic model has marginPercent (camelCase) with alias margin_percent (snake_case)
-                # With populate_by_name=True, both JSON field names work and map to marginPercent attribute
-                margin_value = getattr(unit, 'marginPercent', 0.0)
-                
-                business_unit = FinanceBusinessUnit(
-                    budget_id=budget.id,
-                    name=unit.name,
-                    revenue=float(unit.revenue) if unit.revenue is not None else 0.0,
-                    expense=float(unit.expense) if unit.expense is not None else 0.0,
-                    profit=float(unit.profit) if unit.profit is not None else 0.0,
-                    headcount=int(unit.headcount) if unit.headcount is not None else 0,
-                    margin_percent=float(margin_value) if margin_value is not None else 0.0,
-                )
-                db.add(business_unit)
+        # Upsert lines by line_key and drop only the ones that were removed
+        await _sync_budget_lines(db, FinanceRevenueLine, budget.id, budget_data.revenue_lines or [], "Revenue Line")
+        await _sync_budget_lines(db, FinanceExpenseLine, budget.id, budget_data.expense_lines or [], "Expense Line")
+        await _sync_business_units(db, budget.id, budget_data.business_units or [])
         
         await db.commit()
         # Note: Don't refresh here - can cause "closed transaction" errors
@@ -983,38 +1021,15 @@ async def update_annual_budget(
     if budget.total_revenue_target > 0:
         budget.profit_margin = (budget.target_profit / budget.total_revenue_target) * 100
     
-    # Update lines if provided
+    # Update lines if provided (diffed against the stored lines by line_key)
     if budget_data.revenue_lines is not None:
-        # Delete existing revenue lines
-        await db.execute(
-            delete(FinanceRevenueLine).where(FinanceRevenueLine.budget_id == budget.id)
-        )
-        # Add new ones
-        for idx, line in enumerate(budget_data.revenue_lines):
-            revenue_line = FinanceRevenueLine(
-                budget_id=budget.id,
-                label=line.label,
-                target=line.target,
-                variance=line.variance,
-                display_order=idx,
-            )
-            db.add(revenue_line)
+        await _sync_budget_lines(db, FinanceRevenueLine, budget.id, budget_data.revenue_lines, "Revenue Line")
     
     if budget_data.expense_lines is not None:
-        # Delete existing expense lines
-        await db.execute(
-            delete(FinanceExpenseLine).where(FinanceExpenseLine.budget_id == budget.id)
-        )
-        # Add new ones
-        for idx, line in enumerate(budget_data.expense_lines):
-            expense_line = FinanceExpenseLine(
-                budget_id=budget.id,
-                label=line.label,
-                target=line.target,
-                variance=line.variance,
-                display_order=idx,
-            )
-            db.add(expense_line)
+        await _sync_budget_lines(db, FinanceExpenseLine, budget.id, budget_data.expense_lines, "Expense Line")
+    
+    if budget_data.business_units is not None:
+        await _sync_business_units(db, budget.id, budget_data.business_units)
     
     await db.commit()
     # Note: Don't refresh here - can cause "closed transaction" errors
@@ -1166,6 +1181,11 @@ async def update_scenario(
             scenario.risks = scenario_data.risks
         if scenario_data.opportunities is not None:
             scenario.opportunities = scenario_data.opportunities
+        if scenario_data.growth_rates is not None:
+            # Keep the stored projections in line with the new rates
+            from app.services.scenario_projection import recalculate_projections
+            await db.flush()
+            await recalculate_projections(db, scenario_keys=[scenario_key])
         
         await db.commit()
         # Note: Don't refresh here - can cause "closed transaction" errors
@@ -0,0 +1,218 @@
+"""
+Forecast Engine
+Deterministic statistical forecasts for monthly finance series, with
+prediction bands:
+
+- holt_winters: additive Holt-Winters with a damped trend; smoothing
+  parameters are picked by a grid search that runs every parameter
+  combination side by side as NumPy arrays
+- linear: least-squares trend, plus month-of-year offsets when seasonal
+- seasonal_naive: same month last season (or last value when not seasonal)
+- auto: whichever of the above has the lowest error on a holdout of the
+  most recent months
+
+The same input always gives the same output, and a forecast takes
+milliseconds, so no external service is involved.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+METHODS = ("holt_winters", "linear", "seasonal_naive")
+
+_ALPHAS = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+_BETAS = np.array([0.01, 0.05, 0.1, 0.2])
+_GAMMAS = np.array([0.05, 0.1, 0.3])
+_PHIS = np.array([0.9, 0.98, 1.0])
+
+
+@dataclass
+class SeriesForecast:
+    method: str
+    point: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    sigma: float
+    backtest_error: Optional[float] = None  # weighted absolute percentage error on the holdout
+    params: Optional[Dict[str, float]] = None
+
+
+def resolve_method(name: Optional[str]) -> str:
+    """Map the user-facing model name ("Exponential Smoothing", "Linear Regression"...) to a method."""
+    key = (name or "").strip().lower()
+    if "naive" in key:
+        return "seasonal_naive"
+    if "linear" in key or "regression" in key or "trend" in key:
+        return "linear"
+    if any(word in key for word in ("holt", "winters", "exponential", "smoothing")):
+        return "holt_winters"
+    return "auto"
+
+
+def _z(level: float) -> float:
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+
+def _season_length(n: int, seasonal: bool, season_length: int) -> int:
+    return season_length if seasonal and n >= 2 * season_length else 1
+
+
+# ---- models ---------------------------------------------------------------
+
+def _holt_winters(y: np.ndarray, horizon: int, m: int) -> Tuple[np.ndarray, np.ndarray, Dict[str, float]]:
+    """Returns (point forecast, per-step standard deviations, chosen parameters)."""
+    n = len(y)
+    seasonal = m > 1
+    gammas = _GAMMAS if seasonal else np.array([0.0])
+    grid = np.array(np.meshgrid(_ALPHAS, _BETAS, gammas, _PHIS, indexing="ij")).reshape(4, -1)
+    alpha, beta, gamma, phi = grid
+    p = grid.shape[1]
+
+    if seasonal:
+        # Start from a line through the first two seasons and their average offsets from it
+        x = np.arange(2 * m, dtype=float)
+        slope, intercept = np.polyfit(x, y[:2 * m], 1)
+        residuals = y[:2 * m] - (intercept + slope * x)
+        level0, trend0 = intercept - slope, slope
+        season0 = (residuals[:m] + residuals[m:]) / 2
+    else:
+        level0 = y[0]
+        trend0 = y[1] - y[0] if n > 1 else 0.0
+        season0 = np.zeros(1)
+
+    level = np.full(p, level0, dtype=float)
+    trend = np.full(p, trend0, dtype=float)
+    season = np.tile(season0.astype(float), (p, 1))
+    errors = np.empty((p, n))
+
+    for t in range(n):
+        idx = t % m
+        s = season[:, idx]
+        errors[:, t] = y[t] - (level + phi * trend + s)
+        new_level = alpha * (y[t] - s) + (1 - alpha) * (level + phi * trend)
+        trend = beta * (new_level - level) + (1 - beta) * phi * trend
+        season[:, idx] = gamma * (y[t] - new_level) + (1 - gamma) * s
+        level = new_level
+
+    sse = (errors ** 2).sum(axis=1)
+    best = int(np.argmin(sse))
+    a, b, g, f = alpha[best], beta[best], gamma[best], phi[best]
+
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(f ** steps)  # phi + phi^2 + ... + phi^h
+    point = level[best] + damped * trend[best] + season[best, (n + steps - 1) % m]
+
+    dof = max(n - (4 if seasonal else 3), 1)
+    sigma = float(np.sqrt(sse[best] / dof))
+    # Variance of the h-step error: sigma^2 * (1 + sum_{j<h} c_j^2)
+    c = a * (1 + b * np.cumsum(f ** steps)) + g * ((steps % m) == 0)
+    var_multiplier = 1 + np.concatenate(([0.0], np.cumsum(c ** 2)[:-1]))
+    params = {"alpha": float(a), "beta": float(b), "gamma": float(g), "phi": float(f)}
+    return point, sigma * np.sqrt(var_multiplier), params
+
+
+def _linear(y: np.ndarray, horizon: int, m: int) -> Tuple[np.ndarray, np.ndarray, Dict[str, float]]:
+    n = len(y)
+    x = np.arange(n, dtype=float)
+    slope, intercept = np.polyfit(x, y, 1)
+    fitted = intercept + slope * x
+
+    offsets = np.zeros(m)
+    if m > 1:
+        residuals = y - fitted
+        offsets = np.array([residuals[i::m].mean() for i in range(m)])
+        fitted = fitted + offsets[np.arange(n) % m]
+
+    future = np.arange(n, n + horizon, dtype=float)
+    point = intercept + slope * future + offsets[(np.arange(n, n + horizon)) % m]
+
+    dof = max(n - 2 - (m - 1 if m > 1 else 0), 1)
+    sigma = float(np.sqrt(((y - fitted) ** 2).sum() / dof))
+    sxx = ((x - x.mean()) ** 2).sum() or 1.0
+    std = sigma * np.sqrt(1 + 1 / n + (future - x.mean()) ** 2 / sxx)
+    return point, std, {"slope": float(slope), "intercept": float(intercept)}
+
+
+def _seasonal_naive(y: np.ndarray, horizon: int, m: int) -> Tuple[np.ndarray, np.ndarray, Dict[str, float]]:
+    n = len(y)
+    steps = np.arange(horizon)
+    point = y[n - m + steps % m]
+    diffs = y[m:] - y[:-m]
+    sigma = float(np.sqrt((diffs ** 2).mean())) if len(diffs) else 0.0
+    std = sigma * np.sqrt(steps // m + 1)
+    return point, std, {"season_length": float(m)}
+
+
+_MODELS: Dict[str, Callable[[np.ndarray, int, int], Tuple[np.ndarray, np.ndarray, Dict[str, float]]]] = {
+    "holt_winters": _holt_winters,
+    "linear": _linear,
+    "seasonal_naive": _seasonal_naive,
+}
+
+
+# ---- public API -----------------------------------------------------------
+
+def _backtest_error(y: np.ndarray, method: str, seasonal: bool, season_length: int) -> Optional[float]:
+    holdout = max(1, min(6, len(y) // 4))
+    train, actual = y[:-holdout], y[-holdout:]
+    if len(train) < 3:
+        return None
+    m = _season_length(len(train), seasonal, season_length)
+    point, _, _ = _MODELS[method](train, holdout, m)
+    scale = np.abs(actual).sum()
+    if scale == 0:
+        return None
+    return float(np.abs(actual - point).sum() / scale)
+
+
+def forecast_series(
+    values,
+    horizon: int,
+    method: str = "auto",
+    seasonal: bool = True,
+    season_length: int = 12,
+    level: float = 0.9,
+    non_negative: bool = True,
+) -> SeriesForecast:
+    """
+    Forecast `horizon` steps of a regularly spaced series (at least 3 points).
+    Bands are central `level` prediction intervals.
+    """
+    y = np.asarray(values, dtype=float)
+    if len(y) < 3:
+        raise ValueError("At least 3 observations are needed to forecast")
+
+    if method == "auto":
+        scored = {name: _backtest_error(y, name, seasonal, season_length) for name in METHODS}
+        candidates = {name: err for name, err in scored.items() if err is not None}
+        method = min(candidates, key=candidates.get) if candidates else "holt_winters"
+        error = candidates.get(method)
+    else:
+        if method not in _MODELS:
+            raise ValueError(f"Unknown forecasting method: {method}")
+        error = _backtest_error(y, method, seasonal, season_length)
+
+    m = _season_length(len(y), seasonal, season_length)
+    point, std, params = _MODELS[method](y, horizon, m)
+    half_width = _z(level) * std
+    lower, upper = point - half_width, point + half_width
+    if non_negative:
+        point, lower, upper = np.maximum(point, 0), np.maximum(lower, 0), np.maximum(upper, 0)
+    return SeriesForecast(
+        method=method,
+        point=point,
+        lower=lower,
+        upper=upper,
+        sigma=float(std[0]) if len(std) else 0.0,
+        backtest_error=error,
+        params=params,
+    )
+
+
+def growth_factors(horizon: int, annual_rate_percent: float) -> np.ndarray:
+    """Compounded monthly multipliers for an annual rate, for steps 1..horizon."""
+    return (1 + annual_rate_percent / 100 / 12) ** np.arange(1, horizon + 1)
@@ -2,11 +2,10 @@ import os
 import json
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, literal_column
 from sqlalchemy.orm import selectinload
-import google.generativeai as genai
 import uuid
 
 from app.models.finance_planning import FinanceForecast
@@ -14,6 +13,11 @@ from app.schemas.finance import ForecastPeriodItem, ForecastCreate, ForecastResp
 from app.models.finance_planning import FinanceAnnualBudget
 from app.services.finance_dashboard import get_overhead, get_revenue
 from app.services.finance_planning import get_annual_budget_from_db
+from app.services.forecast_engine import forecast_series, growth_factors, resolve_method
+from app.services.schema_capabilities import schema_capabilities
+from app.utils.lazy import deferred, lazy_import
+
+genai = lazy_import("google.generativeai")
 
 logger = logging.getLogger(__name__)
 
@@ -38,187 +42,255 @@ class ForecastService:
     async def _get_historical_data(
         self,
         db: AsyncSession,
-        months: int = 12
+        months: int = 36,
+        org_id: Optional[uuid.UUID] = None
     ) -> List[Dict[str, Any]]:
-        """Fetch historical financial data for forecasting"""
+        """
+        Monthly actuals for the last `months` complete months: revenue from won
+        opportunities and spend from the monthly actuals table. Falls back to a
+        budget-derived baseline when there are fewer than 3 months of actuals.
+        """
         try:
-            # Get recent budget data
-            budget_result = await db.execute(
-                select(FinanceAnnualBudget).order_by(desc(FinanceAnnualBudget.budget_year)).limit(1)
-            )
-            budget = budget_result.scalar_one_or_none()
-            
-            historical = []
-            if budget:
-                # Get revenue and expense lines
-                from app.models.finance_planning import FinanceRevenueLine, FinanceExpenseLine
-                
-                revenue_result = await db.execute(
-                    select(FinanceRevenueLine).where(FinanceRevenueLine.budget_id == budget.id)
-                )
-                expense_result = await db.execute(
-                    select(FinanceExpenseLine).where(FinanceExpenseLine.budget_id == budget.id)
-                )
-                
-                revenue_lines = revenue_result.scalars().all()
-                expense_lines = expense_result.scalars().all()
-                
-                total_revenue = sum(line.target for line in revenue_lines)
-                total_expenses = sum(line.target for line in expense_lines)
-                
-                # Generate monthly historical data (simplified - in production, use actual monthly data)
-                monthly_revenue = total_revenue / 12
-                monthly_expenses = total_expenses / 12
-                
-                current_date = datetime.now()
-                for i in range(months, 0, -1):
-                    month_date = current_date - timedelta(days=30 * i)
-                    revenue = monthly_revenue * (1 + (i * 0.01))
-                    expenses = monthly_expenses * (1 + (i * 0.005))
-                    profit = revenue - expenses
-                    margin = (profit / revenue) * 100 if revenue > 0 else 0.0
-                    historical.append({
-                        "period": month_date.strftime("%b %Y"),
-                        "revenue": revenue,
-                        "expenses": expenses,
-                        "profit": profit,
-                        "margin": margin
-                    })
-            
-            return historical
+            if org_id:
+                historical = await self._get_monthly_actuals(db, months, org_id)
+                if len(historical) >= 3:
+                    return historical
+            return await self._get_budget_baseline(db, min(months, 12), org_id)
         except Exception as e:
             logger.error(f"Error fetching historical data: {e}")
             return []
     
-    async def generate_ai_forecast(
+    async def _get_monthly_actuals(
+        self,
+        db: AsyncSession,
+        months: int,
+        org_id: uuid.UUID
+    ) -> List[Dict[str, Any]]:
+        from app.models.finance_planning import FinanceMonthlyActual
+        from app.models.opportunity import Opportunity, OpportunityStage
+        
+        today = date.today()
+        end = date(today.year, today.month, 1)  # current month is incomplete
+        start_index = end.year * 12 + end.month - 1 - months
+        start = date(start_index // 12, start_index % 12 + 1, 1)
+        month_keys = [
+            date((start_index + i) // 12, (start_index + i) % 12 + 1, 1) for i in range(months)
+        ]
+        
+        # won_at is set by a trigger when a deal enters `won` (alembic: opportunity_won_at_20261018);
+        # updated_at moves with any later edit, so it is only the fallback for older schemas
+        if await schema_capabilities.has_column("opportunities", "won_at"):
+            won_date = literal_column("opportunities.won_at")
+        else:
+            won_date = Opportunity.updated_at
+        won_month = func.date_trunc('month', won_date)
+        revenue_result = await db.execute(
+            select(won_month, func.sum(Opportunity.project_value))
+            .where(
+                Opportunity.org_id == org_id,
+                Opportunity.stage == OpportunityStage.won,
+                won_date >= datetime(start.year, start.month, 1),
+                won_date < datetime(end.year, end.month, 1),
+            )
+            .group_by(won_month)
+        )
+        revenue = {month.date() if isinstance(month, datetime) else month: float(total or 0)
+                   for month, total in revenue_result.all()}
+        
+        expense_result = await db.execute(
+            select(
+                FinanceMonthlyActual.month,
+                func.sum(FinanceMonthlyActual.expense_amount + FinanceMonthlyActual.invoice_amount)
+            )
+            .where(
+                FinanceMonthlyActual.org_id == org_id,
+                FinanceMonthlyActual.month >= start,
+                FinanceMonthlyActual.month < end,
+            )
+            .group_by(FinanceMonthlyActual.month)
+        )
+        expenses = {month: float(total or 0) for month, total in expense_result.all()}
+        
+        historical = []
+        for month in month_keys:
+            month_revenue = revenue.get(month, 0.0)
+            month_expenses = expenses.get(month, 0.0)
+            if not historical and not month_revenue and not month_expenses:
+                continue  # skip months before the organization has any data
+            profit = month_revenue - month_expenses
+            historical.append({
+                "period": month.strftime("%b %Y"),
+                "revenue": month_revenue,
+                "expenses": month_expenses,
+                "profit": profit,
+                "margin": (profit / month_revenue) * 100 if month_revenue > 0 else 0.0
+            })
+        return historical
+    
+    async def _get_budget_baseline(
+        self,
+        db: AsyncSession,
+        months: int = 12,
+        org_id: Optional[uuid.UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """Synthetic monthly history spread from the latest budget's targets."""
+        budget_query = select(FinanceAnnualBudget).order_by(desc(FinanceAnnualBudget.budget_year))
+        if org_id:
+            budget_query = budget_query.where(FinanceAnnualBudget.org_id == org_id)
+        budget_result = await db.execute(budget_query.limit(1))
+        budget = budget_result.scalar_one_or_none()
+        
+        historical = []
+        if budget:
+            # Get revenue and expense lines
+            from app.models.finance_planning import FinanceRevenueLine, FinanceExpenseLine
+            
+            revenue_result = await db.execute(
+                select(FinanceRevenueLine).where(FinanceRevenueLine.budget_id == budget.id)
+            )
+            expense_result = await db.execute(
+                select(FinanceExpenseLine).where(FinanceExpenseLine.budget_id == budget.id)
+            )
+            
+            revenue_lines = revenue_result.scalars().all()
+            expense_lines = expense_result.scalars().all()
+            
+            total_revenue = sum(line.target for line in revenue_lines)
+            total_expenses = sum(line.target for line in expense_lines)
+            
+            monthly_revenue = total_revenue / 12
+            monthly_expenses = total_expenses / 12
+            
+            current_date = datetime.now()
+            for i in range(months, 0, -1):
+                month_date = current_date - timedelta(days=30 * i)
+                revenue = monthly_revenue * (1 + (i * 0.01))
+                expenses = monthly_expenses * (1 + (i * 0.005))
+                profit = revenue - expenses
+                margin = (profit / revenue) * 100 if revenue > 0 else 0.0
+                historical.append({
+                    "period": month_date.strftime("%b %Y"),
+                    "revenue": revenue,
+                    "expenses": expenses,
+                    "profit": profit,
+                    "margin": margin
+                })
+        
+        return historical
+    
+    async def generate_forecast(
         self,
         historical_data: List[Dict[str, Any]],
         forecast_params: ForecastCreate
     ) -> tuple[List[ForecastPeriodItem], Optional[float], Optional[str]]:
-        """Generate forecast using AI (Gemini) with timeout handling"""
-        if not self.ai_enabled:
+        """
+        Statistical forecast of revenue and expenses with 90% prediction bands.
+        Market growth and inflation are applied on top of the fitted baseline.
+        The AI model is only asked for the insights text, and only when requested.
+        """
+        if len(historical_data) < 3:
             return self._generate_fallback_forecast(historical_data, forecast_params)
         
-        try:
-            import asyncio
-            
-            # Prepare historical data summary for AI
-            historical_summary = json.dumps(historical_data[-12:], indent=2)  # Last 12 months
-            
-            prompt = f"""
-You are a financial forecasting AI expert. Analyze the historical financial data and generate accurate forecasts.
-
-Historical Data (Last 12 months):
-{historical_summary}
-
-Forecasting Parameters:
-- Model: {forecast_params.forecasting_model}
-- Forecast Period: {forecast_params.forecast_period_months} months
-- Market Growth Rate: {forecast_params.market_growth_rate}% annually
-- Inflation Rate: {forecast_params.inflation_rate}% annually
-- Seasonal Adjustment: {"Enabled" if forecast_params.seasonal_adjustment else "Disabled"}
-
-Instructions:
-1. Analyze the historical revenue, expenses, and profit trends
-2. Apply the {forecast_params.forecasting_model} model appropriately
-3. Consider market growth rate ({forecast_params.market_growth_rate}%) and inflation ({forecast_params.inflation_rate}%)
-4. Apply seasonal adjustments if enabled
-5. Generate realistic forecasts for the next {forecast_params.forecast_period_months} months
-6. Ensure forecasts are conservative and realistic based on historical patterns
-7. Calculate profit margins accurately
+        horizon = forecast_params.forecast_period_months
+        method = resolve_method(forecast_params.forecasting_model)
+        seasonal = forecast_params.seasonal_adjustment
+        
+        revenue = forecast_series(
+            [d.get("revenue", 0.0) for d in historical_data], horizon, method, seasonal=seasonal
+        )
+        expenses = forecast_series(
+            [d.get("expenses", 0.0) for d in historical_data], horizon, method, seasonal=seasonal
+        )
+        revenue_factor = growth_factors(horizon, forecast_params.market_growth_rate)
+        expense_factor = growth_factors(horizon, forecast_params.inflation_rate)
+        
+        last_period = datetime.strptime(historical_data[-1]["period"], "%b %Y")
+        forecast_items = []
+        for i in range(horizon):
+            month_index = last_period.month + i  # 0-based month of step i + 1
+            period = date(last_period.year + month_index // 12, month_index % 12 + 1, 1)
+            rev = float(revenue.point[i] * revenue_factor[i])
+            exp = float(expenses.point[i] * expense_factor[i])
+            profit = rev - exp
+            forecast_items.append(ForecastPeriodItem(
+                period=period.strftime("%b %Y"),
+                revenue=round(rev, 2),
+                expenses=round(exp, 2),
+                profit=round(profit, 2),
+                margin=round((profit / rev) * 100 if rev > 0 else 0.0, 2),
+                revenue_lower=round(float(revenue.lower[i] * revenue_factor[i]), 2),
+                revenue_upper=round(float(revenue.upper[i] * revenue_factor[i]), 2),
+                expenses_lower=round(float(expenses.lower[i] * expense_factor[i]), 2),
+                expenses_upper=round(float(expenses.upper[i] * expense_factor[i]), 2),
+            ))
+        
+        errors = [e for e in (revenue.backtest_error, expenses.backtest_error) if e is not None]
+        confidence = round(min(99.0, max(50.0, 100.0 * (1 - sum(errors) / len(errors)))), 1) if errors else 70.0
+        insights = self._summarize(historical_data, forecast_items, revenue.method, expenses.method)
+        
+        if forecast_params.ai_narrative and self.ai_enabled:
+            insights = await self._ai_narrative(historical_data, forecast_items) or insights
+        
+        return forecast_items, confidence, insights
+    
+    @staticmethod
+    def _summarize(
+        historical_data: List[Dict[str, Any]],
+        forecast_items: List[ForecastPeriodItem],
+        revenue_method: str,
+        expense_method: str
+    ) -> str:
+        window = min(12, len(historical_data), len(forecast_items))
+        past_revenue = sum(d.get("revenue", 0.0) for d in historical_data[-window:])
+        next_revenue = sum(item.revenue for item in forecast_items[:window])
+        next_profit = sum(item.profit for item in forecast_items[:window])
+        change = ((next_revenue - past_revenue) / past_revenue * 100) if past_revenue > 0 else 0.0
+        margin = (next_profit / next_revenue * 100) if next_revenue > 0 else 0.0
+        methods = revenue_method if revenue_method == expense_method else f"{revenue_method} (revenue) / {expense_method} (expenses)"
+        return (
+            f"Revenue over the next {window} months is projected at {next_revenue:,.0f} "
+            f"({change:+.1f}% vs. the previous {window} months) with a {margin:.1f}% margin. "
+            f"Model: {methods.replace('_', ' ')} fitted on {len(historical_data)} months of actuals."
+        )
+    
+    async def _ai_narrative(
+        self,
+        historical_data: List[Dict[str, Any]],
+        forecast_items: List[ForecastPeriodItem]
+    ) -> Optional[str]:
+        """Optional AI-written commentary on an already computed forecast."""
+        import asyncio
+        
+        prompt = f"""
+You are a financial analyst. Given monthly actuals and a statistical forecast (with 90% bands),
+write 2-3 concise sentences on the revenue trajectory, expense pressure, margin trend, and key risks.
 
-Return ONLY a valid JSON array with this exact structure:
-[
-  {{
-    "period": "Jan 2026",
-    "revenue": 450000.0,
-    "expenses": 350000.0,
-    "profit": 100000.0,
-    "margin": 22.2
-  }},
-  ...
-]
+Actuals (last 12 months):
+{json.dumps(historical_data[-12:], default=str)}
 
-Rules:
-- Period format: "MMM YYYY" (e.g., "Jan 2026", "Feb 2026")
-- Revenue and expenses should show realistic growth/trends
-- Profit = Revenue - Expenses
-- Margin = (Profit / Revenue) * 100
-- Ensure margins are realistic (typically 15-30% for consulting)
-- Apply gradual growth, not sudden jumps
-- Consider seasonality if seasonal adjustment is enabled
+Forecast:
+{json.dumps([item.model_dump() for item in forecast_items[:12]], default=str)}
 
-Respond ONLY with the JSON array, no explanation or markdown.
+Respond with plain text only.
 """
-            
-            logger.info("Calling Gemini API for financial forecast generation")
-            # Use asyncio.wait_for with timeout (25 seconds for forecast generation)
+        try:
             response = await asyncio.wait_for(
                 asyncio.to_thread(self.model.generate_content, prompt),
-                timeout=25.0
+                timeout=10.0
             )
-            response_text = response.text.strip()
-            
-            # Clean response
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            forecast_data = json.loads(response_text)
-            
-            # Convert to ForecastPeriodItem format
-            forecast_items = [
-                ForecastPeriodItem(
-                    period=item["period"],
-                    revenue=float(item["revenue"]),
-                    expenses=float(item["expenses"]),
-                    profit=float(item["profit"]),
-                    margin=float(item["margin"])
-                )
-                for item in forecast_data
-            ]
-            
-            # Generate AI insights with timeout (10 seconds)
-            insights_prompt = f"""
-Based on the forecast generated, provide 2-3 key insights about:
-1. Revenue growth trajectory
-2. Expense management considerations
-3. Profit margin trends
-4. Any risks or opportunities
-
-Keep insights concise (2-3 sentences total).
-"""
-            try:
-                insights_response = await asyncio.wait_for(
-                    asyncio.to_thread(self.model.generate_content, insights_prompt),
-                    timeout=10.0
-                )
-                ai_insights = insights_response.text.strip()
-            except asyncio.TimeoutError:
-                logger.warning("AI insights generation timed out, using default insights")
-                ai_insights = "Forecast generated successfully. Review the data for trends and opportunities."
-            
-            # Calculate confidence score based on data quality
-            confidence = min(95.0, 70.0 + (len(historical_data) * 2.0))
-            
-            logger.info(f"✅ AI forecast generated successfully: {len(forecast_items)} periods")
-            return forecast_items, confidence, ai_insights
-            
+            return response.text.strip() or None
         except asyncio.TimeoutError:
-            logger.error("❌ Gemini API timeout after 25s, falling back to statistical forecast")
-            return self._generate_fallback_forecast(historical_data, forecast_params)
+            logger.warning("AI forecast narrative timed out, using statistical summary")
         except Exception as e:
-            logger.error(f"Error generating AI forecast: {e}")
-            logger.info("Falling back to statistical forecast")
-            return self._generate_fallback_forecast(historical_data, forecast_params)
+            logger.warning(f"AI forecast narrative failed: {e}")
+        return None
     
     def _generate_fallback_forecast(
         self,
         historical_data: List[Dict[str, Any]],
         forecast_params: ForecastCreate
     ) -> tuple[List[ForecastPeriodItem], Optional[float], Optional[str]]:
-        """Fallback forecast using statistical methods when AI is unavailable"""
+        """Growth-rate projection used when there is too little history to fit a model"""
         if not historical_data:
             # Default values if no historical data
             base_revenue = 400000.0
@@ -261,8 +333,8 @@ Keep insights concise (2-3 sentences total).
                 margin=round(margin, 2)
             ))
         
-        insights = "Forecast generated using statistical methods. Consider reviewing with AI for enhanced accuracy."
-        confidence = 75.0
+        insights = "Not enough monthly actuals to fit a model yet; projected from averages and the growth and inflation rates."
+        confidence = 60.0
         
         return forecast_items, confidence, insights
     
@@ -349,5 +421,5 @@ Keep insights concise (2-3 sentences total).
 
 
 # Singleton instance
-forecast_service = ForecastService()
+forecast_service = deferred(ForecastService)
 
@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from sqlalchemy import UUID
 from app.environment import environment
 from app.models.organization import Organization
-import httpx
+from app.services.resources import http_session
 
 from app.models.user import User
 from app.schemas.auth import AuthUserResponse
@@ -27,7 +27,7 @@ from loguru import logger
 async def create_formbricks_organization(
     organization: Organization,
 ) -> CreateOrganizationFormBricksResponse:
-    async with httpx.AsyncClient() as client:
+    async with http_session() as client:
         response = await client.post(
             f"{environment.FORMBRICKS_SERVER_URL}/api/v2/admin/organizations",
             json={"name": organization.name},
@@ -48,7 +48,7 @@ async def create_formbricks_organization(
 async def signup_user_in_formbricks(
     organization: Organization, user: User
 ) -> CreateUserInFormBricksResponse:
-    async with httpx.AsyncClient() as client:
+    async with http_session() as client:
         payload = {
             "name": user.email.split("@")[0],
             "email": user.email,
@@ -74,7 +74,7 @@ async def signup_user_in_formbricks(
 async def create_formbricks_project(
     organization: Organization
 ) -> CreateFormBricksProjectResponse:
-    async with httpx.AsyncClient() as client:
+    async with http_session() as client:
         payload = {
             "name": organization.name,
             "styling": {
@@ -133,7 +133,7 @@ async def get_all_surveys(org_id: UUID, current_user: User) -> SurveyListRespons
         "x-admin-secret": environment.FORMBRICKS_ADMIN_SECRET,
     }
 
-    async with httpx.AsyncClient() as client:
+    async with http_session() as client:
         response = await client.get(url, headers=headers)
 
     if response.status_code != 200:
@@ -190,7 +190,7 @@ async def create_survey(current_user: User, payload: SurveyCreateRequest) -> Sur
         "type": "link"
     }
 
-    async with httpx.AsyncClient() as client:
+    async with http_session() as client:
         response = await client.post(url, headers=headers, json=body)
 
     if response.status_code not in (200, 201):
@@ -225,7 +225,7 @@ async def create_survey_link(
             "Content-Type": "application/json",
             "x-admin-secret": environment.FORMBRICKS_ADMIN_SECRET,
         }
-        async with httpx.AsyncClient() as client:
+        async with http_session() as client:
             list_resp = await client.get(list_url, headers=headers)
         if list_resp.status_code == 200:
             surveys = (list_resp.json() or {}).get("data", [])
@@ -248,7 +248,7 @@ async def create_survey_link(
     }
     body = {"email": payload.email}
 
-    async with httpx.AsyncClient() as client:
+    async with http_session() as client:
         response = await client.post(link_url, headers=link_headers, json=body)
 
     if response.status_code != 200:
@@ -1,4 +1,5 @@
 import httpx
+from app.services.resources import http_session
 import os
 from typing import Dict, Any, List, Optional
 from app.utils.logger import logger
@@ -48,7 +49,7 @@ class FormBricksClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_session() as client:
                 response = await client.post(
                     url,
                     headers=self.headers,
@@ -67,7 +68,7 @@ class FormBricksClient:
         url = f"{self.base_url}/api/v1/management/surveys/{survey_id}"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_session() as client:
                 response = await client.get(
                     url,
                     headers=self.headers,
@@ -87,7 +88,7 @@ class FormBricksClient:
         url = f"{self.base_url}/api/v1/management/surveys/{survey_id}"
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_session() as client:
                 response = await client.put(
                     url,
                     headers=self.headers,
@@ -119,7 +120,7 @@ class FormBricksClient:
             params["expirationDays"] = expiration_days
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_session() as client:
                 response = await client.post(
                     url,
                     headers=self.headers,
@@ -157,7 +158,7 @@ class FormBricksClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_session() as client:
                 response = await client.post(
                     webhook_url,
                     headers=self.headers,
@@ -187,7 +188,7 @@ class FormBricksClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with http_session() as client:
                 response = await client.get(
                     url,
                     headers=self.headers,
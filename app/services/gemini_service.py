@@ -2,8 +2,10 @@ import os
 import json
 import logging
 from typing import Dict, Any, List, Optional
-import google.generativeai as genai
 from app.schemas.employee import AIRoleSuggestionResponse, ResumeAnalysisResponse
+from app.utils.lazy import deferred, lazy_import
+
+genai = lazy_import("google.generativeai")
 
 logger = logging.getLogger(__name__)
 
@@ -380,5 +382,5 @@ The {company_name} Team"""
 
 
 # Global instance
-gemini_service = GeminiService()
+gemini_service = deferred(GeminiService)
 
@@ -2,28 +2,22 @@ from typing import Optional
 from decimal import Decimal
 from datetime import datetime
 import asyncio
+import uuid
 
 from app.db.session import get_session
 from app.models.account import Account
-from app.models.contact import Contact
-from app.models.account_note import AccountNote
+from app.services.account_features import AccountFeatures, load_account_features
 from app.utils.logger import logger
-from sqlalchemy import select, func, and_
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
 class HealthScoreService:
 
     async def calculate_health_score_for_account(self, account_id: str, org_id: str) -> dict:
 
         async with get_session() as db:
-            stmt = select(Account).where(
-                Account.account_id == account_id,
-                Account.org_id == org_id
-            )
-            result = await db.execute(stmt)
-            account = result.scalar_one_or_none()
+            features = await load_account_features(db, uuid.UUID(str(org_id)), [uuid.UUID(str(account_id))])
             
-            if not account:
+            if not features:
                 return {
                     "health_score": 0,
                     "risk_level": "unknown",
@@ -31,39 +25,46 @@ class HealthScoreService:
                     "last_analysis": datetime.utcnow().isoformat()
                 }
             
-            data_quality = await self._calculate_data_quality(account, db)
-            communication = await self._calculate_communication_frequency(account, db)
-            business_value = await self._calculate_business_value(account)
-            completeness = await self._calculate_completeness(account, db)
-            
-            health_score = (
-                data_quality * 0.3 +
-                communication * 0.25 +
-                business_value * 0.25 +
-                completeness * 0.2
-            )
-            
-            risk_level = self._determine_risk_level(health_score)
-            
-            health_trend = "stable"  # Could be enhanced with historical data
-            
-            logger.info(f"Calculated health score for account {account_id}: {health_score}%")
-            
-            return {
-                "health_score": round(health_score, 1),
-                "risk_level": risk_level,
-                "health_trend": health_trend,
-                "last_analysis": datetime.utcnow().isoformat(),
-                "components": {
-                    "data_quality": data_quality,
-                    "communication": communication,
-                    "business_value": business_value,
-                    "completeness": completeness
-                }
+            health_data = self._score_features(features[0])
+            logger.info(f"Calculated health score for account {account_id}: {health_data['health_score']}%")
+            return health_data
+    
+    def _score_features(self, features: AccountFeatures) -> dict:
+
+        account = features.account
+        
+        data_quality = self._calculate_data_quality(features)
+        communication = self._calculate_communication_frequency(features)
+        business_value = self._calculate_business_value(account)
+        completeness = self._calculate_completeness(account)
+        
+        health_score = (
+            data_quality * 0.3 +
+            communication * 0.25 +
+            business_value * 0.25 +
+            completeness * 0.2
+        )
+        
+        risk_level = self._determine_risk_level(health_score)
+        
+        health_trend = "stable"  # Could be enhanced with historical data
+        
+        return {
+            "health_score": round(health_score, 1),
+            "risk_level": risk_level,
+            "health_trend": health_trend,
+            "last_analysis": datetime.utcnow().isoformat(),
+            "components": {
+                "data_quality": data_quality,
+                "communication": communication,
+                "business_value": business_value,
+                "completeness": completeness
             }
+        }
     
-    async def _calculate_data_quality(self, account: Account, db: AsyncSession) -> float:
+    def _calculate_data_quality(self, features: AccountFeatures) -> float:
 
+        account = features.account
         score = 0
         max_score = 100
         
@@ -78,34 +79,13 @@ class HealthScoreService:
         if account.total_value:
             score += 15
         
-        if account.primary_contact_id:
-            stmt = select(Contact).where(Contact.id == account.primary_contact_id)
-            result = await db.execute(stmt)
-            contact = result.scalar_one_or_none()
-            
-            if contact:
-                if contact.name:
-                    score += 10
-                if contact.email:
-                    score += 10
-                if contact.phone:
-                    score += 10
+        score += 10 * features.contact_fields
         
         return min(score, max_score)
     
-    async def _calculate_communication_frequency(self, account: Account, db: AsyncSession) -> float:
+    def _calculate_communication_frequency(self, features: AccountFeatures) -> float:
 
-        from datetime import timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        stmt = select(func.count(AccountNote.id)).where(
-            and_(
-                AccountNote.account_id == account.account_id,
-                AccountNote.created_at >= thirty_days_ago
-            )
-        )
-        result = await db.execute(stmt)
-        recent_notes = result.scalar() or 0
+        recent_notes = features.recent_notes
         
         if recent_notes >= 5:
             return 100  # Excellent communication
@@ -116,7 +96,7 @@ class HealthScoreService:
         else:
             return 25   # Poor communication
     
-    async def _calculate_business_value(self, account: Account) -> float:
+    def _calculate_business_value(self, account: Account) -> float:
 
         score = 50  # Base score
         
@@ -139,7 +119,7 @@ class HealthScoreService:
         
         return min(score, 100)
     
-    async def _calculate_completeness(self, account: Account, db: AsyncSession) -> float:
+    def _calculate_completeness(self, account: Account) -> float:
 
         score = 0
         max_score = 100
@@ -1,76 +1,125 @@
 
 import asyncio
-from typing import Optional
-from sqlalchemy import select, func
+import time
+import uuid
+from typing import Optional, Union
+from sqlalchemy import select, func, update, cast, BigInteger
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_session
+from app.models.id_counter import IdCounter
+from app.utils.logger import get_logger
+
+logger = get_logger("id_generator")
+
+# entity -> (table, custom ID column) its counter is seeded from
+ID_SEQUENCES = {
+    "opportunity": ("opportunities", "custom_id"),
+    "account": ("accounts", "custom_id"),
+    "requisition": ("purchase_requisitions", "custom_id"),
+    "purchase_order": ("purchase_orders", "custom_id"),
+    "rfq": ("rfqs", "custom_id"),
+    "expense": ("employee_expenses", "custom_id"),
+    "contract": ("contracts", "contract_id"),
+    "proposal": ("proposals", "proposal_number"),
+}
+
+# Number right after the prefix; longer runs are timestamp fallbacks, not sequence numbers
+SEQUENCE_NUMBER_PATTERN = r"^(\d{1,5})(?:-|$)"
+
 
 class IDGenerator:
 
     @staticmethod
-    async def generate_opportunity_id(org_id: str, db: AsyncSession) -> str:
-        import time
-        
-        try:
-            from app.models.opportunity import Opportunity
-            from app.models.organization import Organization
-            
-            # Get organization to extract identifier
-            org_stmt = select(Organization).where(Organization.id == org_id)
-            org_result = await db.execute(org_stmt)
-            organization = org_result.scalar_one_or_none()
-            
-            if not organization:
-                # Fallback if organization not found
-                org_prefix = "ORG"
-            else:
-                # Extract first 2 characters of organization name for prefix
-                org_name = organization.name or "ORG"
-                org_prefix = org_name[:2].upper() if len(org_name) >= 2 else "OR"
-            
-            stmt = select(Opportunity.custom_id).where(
-                Opportunity.org_id == org_id,
-                Opportunity.custom_id.isnot(None),
-                Opportunity.custom_id.like(f'OPP-NY{org_prefix}%')
+    async def next_value(
+        db: AsyncSession,
+        org_id: Union[str, uuid.UUID],
+        entity: str,
+        prefix: str,
+        scope: str = "",
+    ) -> int:
+        """
+        Next number for an organization's `entity` IDs, taken with one
+        UPDATE ... RETURNING on its id_counters row. The row lock is held until
+        the caller's transaction ends, so concurrent creates queue instead of
+        colliding, and a rollback returns the number (no gaps).
+
+        A missing counter is seeded once from the highest existing ID that
+        starts with `prefix`.
+        """
+        org_uuid = org_id if isinstance(org_id, uuid.UUID) else uuid.UUID(str(org_id))
+        result = await db.execute(
+            update(IdCounter)
+            .where(IdCounter.org_id == org_uuid, IdCounter.entity == entity, IdCounter.scope == scope)
+            .values(last_value=IdCounter.last_value + 1)
+            .returning(IdCounter.last_value)
+        )
+        value = result.scalar_one_or_none()
+        if value is not None:
+            return value
+
+        seed = await IDGenerator._highest_existing(db, org_uuid, entity, prefix)
+        stmt = insert(IdCounter).values(org_id=org_uuid, entity=entity, scope=scope, last_value=seed + 1)
+        # Another transaction may have created the row since the UPDATE above
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdCounter.org_id, IdCounter.entity, IdCounter.scope],
+            set_={"last_value": IdCounter.last_value + 1, "updated_at": func.now()},
+        ).returning(IdCounter.last_value)
+        return (await db.execute(stmt)).scalar_one()
+
+    @staticmethod
+    async def _highest_existing(db: AsyncSession, org_id: uuid.UUID, entity: str, prefix: str) -> int:
+        from app.db.base import Base
+
+        table_name, column_name = ID_SEQUENCES[entity]
+        table = Base.metadata.tables[table_name]
+        column = table.c[column_name]
+        number = func.substring(func.substring(column, len(prefix) + 1), SEQUENCE_NUMBER_PATTERN)
+        result = await db.execute(
+            select(func.coalesce(func.max(cast(number, BigInteger)), 0)).where(
+                table.c.org_id == org_id,
+                func.left(column, len(prefix)) == prefix,
             )
-            result = await db.execute(stmt)
-            existing_ids = [row[0] for row in result.fetchall()]
-            
-            if existing_ids:
-                numbers = []
-                for custom_id in existing_ids:
-                    try:
-                        # Extract number from format OPP-NY{ORG_PREFIX}0001
-                        number_part = custom_id.split(org_prefix)[-1]
-                        # Remove spaces if any
-                        number_part = number_part.strip().replace(' ', '')
-                        numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-                
-                if numbers:
-                    next_number = max(numbers) + 1
-                else:
-                    next_number = 1
-            else:
-                next_number = 1
-            
-            custom_id = f"OPP-NY{org_prefix}{next_number:04d}"
-            
-            # Check if this ID already exists (race condition protection)
-            existing = await IDGenerator.get_opportunity_by_custom_id(custom_id, db)
-            if existing:
-                # If it exists, use timestamp-based ID
-                import time
-                timestamp = int(time.time())
-                custom_id = f"OPP-NY{org_prefix}{timestamp}"
-            
-            return custom_id
-            
+        )
+        return int(result.scalar() or 0)
+
+    @staticmethod
+    async def try_next_value(
+        db: AsyncSession, org_id: Union[str, uuid.UUID], entity: str, prefix: str, scope: str = ""
+    ) -> Optional[int]:
+        """next_value inside a savepoint; None if the counter is unavailable."""
+        try:
+            async with db.begin_nested():
+                return await IDGenerator.next_value(db, org_id, entity, prefix, scope)
         except Exception as e:
-            # Generate a unique ID with timestamp to avoid conflicts
-            timestamp = int(time.time())
-            return f"OPP-NY{org_prefix}{timestamp}"
+            logger.warning(f"ID counter for {entity} in org {org_id} unavailable: {e}")
+            return None
+
+    @staticmethod
+    async def get_org_prefix(org_id: Union[str, uuid.UUID], db: AsyncSession) -> str:
+        """First two letters of the organization name, upper-cased (ORG if the org is missing)."""
+        from app.models.organization import Organization
+
+        result = await db.execute(select(Organization.name).where(Organization.id == org_id))
+        row = result.first()
+        if row is None:
+            return "ORG"
+        org_name = row[0] or "ORG"
+        return org_name[:2].upper() if len(org_name) >= 2 else "OR"
+
+    @staticmethod
+    async def generate_opportunity_id(org_id: str, db: AsyncSession) -> str:
+        org_prefix = await IDGenerator.get_org_prefix(org_id, db)
+        prefix = f"OPP-NY{org_prefix}"
+        number = await IDGenerator.try_next_value(db, org_id, "opportunity", prefix)
+        if number is None:
+            return f"{prefix}{int(time.time())}"
+        custom_id = f"{prefix}{number:04d}"
+
+        # Custom IDs are unique across organizations that share a name prefix
+        if await IDGenerator.get_opportunity_by_custom_id(custom_id, db):
+            custom_id = f"{prefix}{int(time.time())}"
+        return custom_id
     
     @staticmethod
     async def generate_organization_id(db: AsyncSession) -> str:
@@ -118,66 +167,17 @@ class IDGenerator:
     
     @staticmethod
     async def generate_account_id(org_id: str, db: AsyncSession) -> str:
-        import time
-        
-        try:
-            from app.models.account import Account
-            from app.models.organization import Organization
-            
-            # Get organization to extract identifier
-            org_stmt = select(Organization).where(Organization.id == org_id)
-            org_result = await db.execute(org_stmt)
-            organization = org_result.scalar_one_or_none()
-            
-            if not organization:
-                # Fallback if organization not found
-                org_prefix = "ORG"
-            else:
-                # Extract first 2 characters of organization name for prefix
-                org_name = organization.name or "ORG"
-                org_prefix = org_name[:2].upper() if len(org_name) >= 2 else "OR"
-            
-            # Try to generate a sequential ID first
-            stmt = select(Account.custom_id).where(
-                Account.custom_id.isnot(None),
-                Account.custom_id.like(f'AC-NY{org_prefix}%'),
-                Account.org_id == org_id
-            )
-            result = await db.execute(stmt)
-            existing_ids = [row[0] for row in result.fetchall()]
-            
-            if existing_ids:
-                numbers = []
-                for custom_id in existing_ids:
-                    try:
-                        # Extract number from format AC-NY{ORG_PREFIX}001
-                        number_part = custom_id.split(org_prefix)[-1]
-                        numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-                
-                if numbers:
-                    next_number = max(numbers) + 1
-                else:
-                    next_number = 1
-            else:
-                next_number = 1
-            
-            custom_id = f"AC-NY{org_prefix}{next_number:03d}"
-            
-            # Check if this ID already exists (race condition protection)
-            existing = await IDGenerator.get_account_by_custom_id(custom_id, db)
-            if existing:
-                # If it exists, use timestamp-based ID
-                timestamp = int(time.time())
-                custom_id = f"AC-NY{org_prefix}{timestamp}"
-            
-            return custom_id
-            
-        except Exception as e:
-            # Generate a unique ID with timestamp to avoid conflicts
-            timestamp = int(time.time())
-            return f"AC-NY{org_prefix}{timestamp}"
+        org_prefix = await IDGenerator.get_org_prefix(org_id, db)
+        prefix = f"AC-NY{org_prefix}"
+        number = await IDGenerator.try_next_value(db, org_id, "account", prefix)
+        if number is None:
+            return f"{prefix}{int(time.time())}"
+        custom_id = f"{prefix}{number:03d}"
+
+        # Custom IDs are unique across organizations that share a name prefix
+        if await IDGenerator.get_account_by_custom_id(custom_id, db):
+            custom_id = f"{prefix}{int(time.time())}"
+        return custom_id
     
     @staticmethod
     async def get_organization_by_custom_id(custom_id: str, db: AsyncSession):
@@ -197,177 +197,46 @@ class IDGenerator:
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
     
+    @staticmethod
+    async def custom_id_taken(entity: str, custom_id: str, db: AsyncSession) -> bool:
+        """Whether `custom_id` is already used by any organization's `entity` rows."""
+        from app.db.base import Base
+
+        table_name, column_name = ID_SEQUENCES[entity]
+        column = Base.metadata.tables[table_name].c[column_name]
+        result = await db.execute(select(column).where(column == custom_id).limit(1))
+        return result.first() is not None
+
+    @staticmethod
+    async def _prefixed_id(org_id: str, db: AsyncSession, entity: str, kind: str) -> str:
+        org_prefix = await IDGenerator.get_org_prefix(org_id, db)
+        prefix = f"{kind}-{org_prefix}"
+        number = await IDGenerator.try_next_value(db, org_id, entity, prefix)
+        if number is None:
+            return f"{prefix}{int(time.time())}"
+        custom_id = f"{prefix}{number:04d}"
+
+        # Custom IDs are unique across organizations that share a name prefix
+        if await IDGenerator.custom_id_taken(entity, custom_id, db):
+            custom_id = f"{prefix}{int(time.time())}"
+        return custom_id
+
     @staticmethod
     async def generate_requisition_id(org_id: str, db: AsyncSession) -> str:
         """Generate purchase requisition ID"""
-        import time
-        try:
-            from app.models.procurement import PurchaseRequisition
-            from app.models.organization import Organization
-            
-            org_stmt = select(Organization).where(Organization.id == org_id)
-            org_result = await db.execute(org_stmt)
-            organization = org_result.scalar_one_or_none()
-            
-            org_prefix = "ORG"
-            if organization:
-                org_name = organization.name or "ORG"
-                org_prefix = org_name[:2].upper() if len(org_name) >= 2 else "OR"
-            
-            stmt = select(PurchaseRequisition.custom_id).where(
-                PurchaseRequisition.org_id == org_id,
-                PurchaseRequisition.custom_id.isnot(None),
-                PurchaseRequisition.custom_id.like(f'REQ-{org_prefix}%')
-            )
-            result = await db.execute(stmt)
-            existing_ids = [row[0] for row in result.fetchall()]
-            
-            if existing_ids:
-                numbers = []
-                for custom_id in existing_ids:
-                    try:
-                        number_part = custom_id.split('-')[-1]
-                        numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-                next_number = max(numbers) + 1 if numbers else 1
-            else:
-                next_number = 1
-            
-            custom_id = f"REQ-{org_prefix}{next_number:04d}"
-            return custom_id
-        except Exception as e:
-            timestamp = int(time.time())
-            return f"REQ-{org_prefix}{timestamp}"
+        return await IDGenerator._prefixed_id(org_id, db, "requisition", "REQ")
     
     @staticmethod
     async def generate_po_id(org_id: str, db: AsyncSession) -> str:
         """Generate purchase order ID"""
-        import time
-        try:
-            from app.models.procurement import PurchaseOrder
-            from app.models.organization import Organization
-            
-            org_stmt = select(Organization).where(Organization.id == org_id)
-            org_result = await db.execute(org_stmt)
-            organization = org_result.scalar_one_or_none()
-            
-            org_prefix = "ORG"
-            if organization:
-                org_name = organization.name or "ORG"
-                org_prefix = org_name[:2].upper() if len(org_name) >= 2 else "OR"
-            
-            stmt = select(PurchaseOrder.custom_id).where(
-                PurchaseOrder.org_id == org_id,
-                PurchaseOrder.custom_id.isnot(None),
-                PurchaseOrder.custom_id.like(f'PO-{org_prefix}%')
-            )
-            result = await db.execute(stmt)
-            existing_ids = [row[0] for row in result.fetchall()]
-            
-            if existing_ids:
-                numbers = []
-                for custom_id in existing_ids:
-                    try:
-                        number_part = custom_id.split('-')[-1]
-                        numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-                next_number = max(numbers) + 1 if numbers else 1
-            else:
-                next_number = 1
-            
-            custom_id = f"PO-{org_prefix}{next_number:04d}"
-            return custom_id
-        except Exception as e:
-            timestamp = int(time.time())
-            return f"PO-{org_prefix}{timestamp}"
+        return await IDGenerator._prefixed_id(org_id, db, "purchase_order", "PO")
     
     @staticmethod
     async def generate_rfq_id(org_id: str, db: AsyncSession) -> str:
         """Generate RFQ ID"""
-        import time
-        try:
-            from app.models.procurement import RFQ
-            from app.models.organization import Organization
-            
-            org_stmt = select(Organization).where(Organization.id == org_id)
-            org_result = await db.execute(org_stmt)
-            organization = org_result.scalar_one_or_none()
-            
-            org_prefix = "ORG"
-            if organization:
-                org_name = organization.name or "ORG"
-                org_prefix = org_name[:2].upper() if len(org_name) >= 2 else "OR"
-            
-            stmt = select(RFQ.custom_id).where(
-                RFQ.org_id == org_id,
-                RFQ.custom_id.isnot(None),
-                RFQ.custom_id.like(f'RFQ-{org_prefix}%')
-            )
-            result = await db.execute(stmt)
-            existing_ids = [row[0] for row in result.fetchall()]
-            
-            if existing_ids:
-                numbers = []
-                for custom_id in existing_ids:
-                    try:
-                        # Format is RFQ-{org_prefix}{number}, e.g., RFQ-AM0001
-                        # Extract the numeric part after the org_prefix
-                        if custom_id.startswith(f'RFQ-{org_prefix}'):
-                            number_part = custom_id[len(f'RFQ-{org_prefix}'):]
-                            numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-                next_number = max(numbers) + 1 if numbers else 1
-            else:
-                next_number = 1
-            
-            custom_id = f"RFQ-{org_prefix}{next_number:04d}"
-            return custom_id
-        except Exception as e:
-            timestamp = int(time.time())
-            return f"RFQ-{org_prefix}{timestamp}"
+        return await IDGenerator._prefixed_id(org_id, db, "rfq", "RFQ")
     
     @staticmethod
     async def generate_expense_id(org_id: str, db: AsyncSession) -> str:
         """Generate employee expense ID"""
-        import time
-        try:
-            from app.models.procurement import EmployeeExpense
-            from app.models.organization import Organization
-            
-            org_stmt = select(Organization).where(Organization.id == org_id)
-            org_result = await db.execute(org_stmt)
-            organization = org_result.scalar_one_or_none()
-            
-            org_prefix = "ORG"
-            if organization:
-                org_name = organization.name or "ORG"
-                org_prefix = org_name[:2].upper() if len(org_name) >= 2 else "OR"
-            
-            stmt = select(EmployeeExpense.custom_id).where(
-                EmployeeExpense.org_id == org_id,
-                EmployeeExpense.custom_id.isnot(None),
-                EmployeeExpense.custom_id.like(f'EXP-{org_prefix}%')
-            )
-            result = await db.execute(stmt)
-            existing_ids = [row[0] for row in result.fetchall()]
-            
-            if existing_ids:
-                numbers = []
-                for custom_id in existing_ids:
-                    try:
-                        number_part = custom_id.split('-')[-1]
-                        numbers.append(int(number_part))
-                    except (ValueError, IndexError):
-                        continue
-                next_number = max(numbers) + 1 if numbers else 1
-            else:
-                next_number = 1
-            
-            custom_id = f"EXP-{org_prefix}{next_number:04d}"
-            return custom_id
-        except Exception as e:
-            timestamp = int(time.time())
-            return f"EXP-{org_prefix}{timestamp}"
\ No newline at end of file
+        return await IDGenerator._prefixed_id(org_id, db, "expense", "EXP")
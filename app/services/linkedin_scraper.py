@@ -1,12 +1,14 @@
 import logging
-import requests
 from typing import Dict, Any, Optional
 import re
 import json
-from bs4 import BeautifulSoup
+from app.utils.lazy import lazy_import
 
 logger = logging.getLogger(__name__)
 
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
+
 
 class LinkedInScraper:
     """
@@ -79,7 +81,7 @@ class LinkedInScraper:
             response = requests.get(linkedin_url, headers=headers, timeout=10, allow_redirects=True)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = bs4.BeautifulSoup(response.text, 'html.parser')
                 
                 # Extract data from public profile HTML
                 profile_data = LinkedInScraper._extract_from_public_profile(soup, linkedin_url)
@@ -105,8 +107,7 @@ class LinkedInScraper:
                     timeout=15
                 )
                 if response.status_code == 200:
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = bs4.BeautifulSoup(response.text, 'html.parser')
                     return LinkedInScraper._extract_from_html(soup)
         except Exception as e:
             logger.debug(f"ScraperAPI failed: {e}")
@@ -121,8 +122,7 @@ class LinkedInScraper:
             }
             response = requests.get(linkedin_url, headers=headers, timeout=10)
             if response.status_code == 200:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = bs4.BeautifulSoup(response.text, 'html.parser')
                 return LinkedInScraper._extract_from_html(soup)
         except Exception as e:
             logger.debug(f"Direct request failed: {e}")
@@ -0,0 +1,247 @@
+"""
+Notification Events
+Pushes new notifications and unread counts to connected clients instead of
+having every open tab poll `/notifications/unread-count`.
+
+Events are published from inside the writing transaction and only delivered
+once it commits:
+
+- "memory" backend: queued on the session and dispatched to this process's
+  subscribers from an after_commit hook
+- "postgres" backend: sent with `pg_notify`, which Postgres holds back until
+  commit; every API worker LISTENs on the channel and dispatches to its own
+  subscribers, so a client sees events no matter which worker it is connected to
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.environment import environment
+from app.utils.logger import get_logger
+
+logger = get_logger("notification_events")
+
+NOTIFICATION_CHANNEL = "notification_events"
+_PENDING_EVENTS_KEY = "pending_notification_events"
+
+# pg_notify payloads are limited to 8000 bytes; long texts are cut for the push
+_MAX_TITLE_CHARS = 200
+_MAX_MESSAGE_CHARS = 500
+
+
+@dataclass
+class NotificationEvent:
+    user_id: str
+    event: str  # "notification" | "unread_count"
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps({"user_id": self.user_id, "event": self.event, "data": self.data}, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "NotificationEvent":
+        payload = json.loads(raw)
+        return cls(user_id=payload["user_id"], event=payload["event"], data=payload.get("data") or {})
+
+    def to_sse(self) -> str:
+        return f"event: {self.event}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+def notification_payload(row: Dict[str, Any], unread_count: Optional[int] = None) -> Dict[str, Any]:
+    """Compact client-facing view of a notification row as written by the fan-out."""
+    message = row.get("message") or ""
+    payload = {
+        "id": str(row["id"]),
+        "type": getattr(row.get("type"), "value", row.get("type")),
+        "priority": getattr(row.get("priority"), "value", row.get("priority")),
+        "title": (row.get("title") or "")[:_MAX_TITLE_CHARS],
+        "message": message[:_MAX_MESSAGE_CHARS],
+        "truncated": len(message) > _MAX_MESSAGE_CHARS,
+        "related_entity_type": row.get("related_entity_type"),
+        "related_entity_id": str(row["related_entity_id"]) if row.get("related_entity_id") else None,
+        "created_at": row.get("created_at"),
+    }
+    if unread_count is not None:
+        payload["unread_count"] = unread_count
+    return payload
+
+
+async def count_unread(db: AsyncSession, org_id: UUID, user_ids: Iterable[UUID]) -> Dict[str, int]:
+    """Unread counts for several users of one organization in a single grouped query."""
+    from app.models.notification import Notification
+
+    ids = list(user_ids)
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(Notification.user_id, func.count(Notification.id))
+        .where(
+            Notification.user_id.in_(ids),
+            Notification.org_id == org_id,
+            Notification.is_read == False,
+        )
+        .group_by(Notification.user_id)
+    )
+    counts = {str(user_id): 0 for user_id in ids}
+    counts.update({str(user_id): count for user_id, count in result.all()})
+    return counts
+
+
+def _on_commit(session) -> None:
+    events = session.info.pop(_PENDING_EVENTS_KEY, [])
+    for item in events:
+        notification_bus.dispatch(item)
+
+
+def _on_rollback(session) -> None:
+    session.info.pop(_PENDING_EVENTS_KEY, None)
+
+
+class NotificationBus:
+    def __init__(self, backend: str = "memory", queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def distributed(self) -> bool:
+        return self.backend == "postgres"
+
+    def interested(self, user_ids: Iterable[Any]) -> List[str]:
+        """Users that may have an open stream; with a shared backend that is anyone."""
+        keys = [str(user_id) for user_id in user_ids]
+        if self.distributed:
+            return keys
+        return [key for key in keys if self._subscribers.get(key)]
+
+    # ---- publishing ------------------------------------------------------
+
+    async def publish(self, db: AsyncSession, events: List[NotificationEvent]) -> None:
+        """Deliver `events` once `db`'s transaction commits; dropped on rollback."""
+        if not events:
+            return
+        if self.distributed:
+            await db.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": NOTIFICATION_CHANNEL, "payloads": [item.to_json() for item in events]},
+            )
+            return
+
+        sync_session = db.sync_session
+        if not event.contains(sync_session, "after_commit", _on_commit):
+            event.listen(sync_session, "after_commit", _on_commit)
+            event.listen(sync_session, "after_rollback", _on_rollback)
+        sync_session.info.setdefault(_PENDING_EVENTS_KEY, []).extend(events)
+
+    def dispatch(self, item: NotificationEvent) -> None:
+        """Hand an event to this process's subscribers of its user."""
+        for queue in list(self._subscribers.get(item.user_id, ())):
+            if queue.full():
+                # A stalled client loses its oldest events rather than blocking publishers
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(item)
+            self.delivered += 1
+
+    # ---- subscribing -----------------------------------------------------
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: Any) -> AsyncIterator[asyncio.Queue]:
+        key = str(user_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        if self.distributed:
+            self._ensure_listener()
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        from app.db.session import get_database_url
+
+        dsn = get_database_url().replace("postgresql+psycopg://", "postgresql://", 1)
+        delay = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {NOTIFICATION_CHANNEL}")
+                    logger.info(f"Listening for notification events on '{NOTIFICATION_CHANNEL}'")
+                    delay = 1.0
+                    async for notify in conn.notifies():
+                        try:
+                            self.dispatch(NotificationEvent.from_json(notify.payload))
+                        except (ValueError, KeyError) as e:
+                            logger.warning(f"Ignoring malformed notification event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener error, reconnecting in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def stream(
+        self,
+        user_id: Any,
+        initial_unread: Callable[[], Awaitable[int]],
+        is_disconnected: Callable[[], Awaitable[bool]],
+        keepalive: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Server-sent event stream for one user: current unread count, then live events."""
+        keepalive = keepalive or environment.NOTIFICATION_STREAM_KEEPALIVE_SECONDS
+        async with self.subscribe(user_id) as queue:
+            # Subscribed before counting, so nothing committed in between is missed
+            yield "retry: 5000\n\n"
+            yield NotificationEvent(str(user_id), "unread_count", {"unread_count": await initial_unread()}).to_sse()
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield item.to_sse()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "users": len(self._subscribers),
+            "connections": sum(len(queues) for queues in self._subscribers.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+
+# Global instance
+notification_bus = NotificationBus(environment.NOTIFICATION_PUSH_BACKEND)
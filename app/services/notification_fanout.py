@@ -0,0 +1,181 @@
+"""
+Notification Fan-out
+Delivers one notification to many users with a fixed number of statements:
+
+- one query loads every recipient's preferences
+- one bulk INSERT creates all in-app notifications
+- emails go to the background email queue once the transaction commits,
+  so a rolled-back request never sends mail
+- connected clients get a push event with the new unread count (one grouped
+  count query, only for users with an open stream)
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notification import (
+    Notification,
+    NotificationPreference,
+    NotificationPriority,
+    NotificationType,
+)
+from app.models.user import User
+from app.services.email_queue import EmailJob, email_queue
+from app.services.notification_events import (
+    NotificationEvent,
+    count_unread,
+    notification_bus,
+    notification_payload,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger("notification_fanout")
+
+_PENDING_EMAILS_KEY = "pending_notification_emails"
+
+
+@dataclass
+class RenderedEmail:
+    subject: str
+    text_body: str
+    html_body: str
+
+
+@dataclass
+class FanoutResult:
+    recipients: int
+    in_app: int
+    emails_queued: int
+    notification_ids: Dict[uuid.UUID, uuid.UUID]  # user id -> notification id
+
+
+def channel_enabled(
+    preference: Optional[NotificationPreference], notification_type: NotificationType, channel: str
+) -> bool:
+    """Whether a user wants `channel` ("email" | "in_app") for this type; defaults to yes."""
+    if preference is None:
+        return True
+    if channel == "email" and not preference.email_enabled:
+        return False
+    if channel == "in_app" and not preference.in_app_enabled:
+        return False
+    type_prefs = (preference.preferences or {}).get(notification_type.value)
+    if isinstance(type_prefs, dict):
+        return bool(type_prefs.get(channel, True))
+    return True
+
+
+def _on_commit(session) -> None:
+    jobs = session.info.pop(_PENDING_EMAILS_KEY, [])
+    for job in jobs:
+        email_queue.enqueue(job)
+
+
+def _on_rollback(session) -> None:
+    jobs = session.info.pop(_PENDING_EMAILS_KEY, [])
+    if jobs:
+        logger.info(f"Discarded {len(jobs)} notification emails after rollback")
+
+
+def queue_email_after_commit(db: AsyncSession, job: EmailJob) -> None:
+    """Hand an email to the queue once `db`'s transaction commits."""
+    sync_session = db.sync_session
+    if not event.contains(sync_session, "after_commit", _on_commit):
+        event.listen(sync_session, "after_commit", _on_commit)
+        event.listen(sync_session, "after_rollback", _on_rollback)
+    sync_session.info.setdefault(_PENDING_EMAILS_KEY, []).append(job)
+
+
+class NotificationFanout:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_preferences(self, user_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, NotificationPreference]:
+        if not user_ids:
+            return {}
+        result = await self.db.execute(
+            select(NotificationPreference).where(NotificationPreference.user_id.in_(list(user_ids)))
+        )
+        return {pref.user_id: pref for pref in result.scalars().all()}
+
+    async def send(
+        self,
+        org_id: uuid.UUID,
+        recipients: Sequence[User],
+        notification_type: NotificationType,
+        title: str,
+        message: str,
+        priority: NotificationPriority = NotificationPriority.medium,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[uuid.UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        email: Optional[RenderedEmail] = None,
+    ) -> FanoutResult:
+        """Create in-app notifications and queue emails for every recipient that wants them."""
+        unique: Dict[uuid.UUID, User] = {}
+        for user in recipients:
+            unique.setdefault(user.id, user)
+        if not unique:
+            return FanoutResult(0, 0, 0, {})
+
+        preferences = await self.load_preferences(list(unique))
+
+        rows: List[Dict[str, Any]] = []
+        notification_ids: Dict[uuid.UUID, uuid.UUID] = {}
+        created_at = datetime.utcnow()
+        for user_id in unique:
+            if channel_enabled(preferences.get(user_id), notification_type, "in_app"):
+                notification_id = uuid.uuid4()
+                notification_ids[user_id] = notification_id
+                rows.append({
+                    "id": notification_id,
+                    "org_id": org_id,
+                    "user_id": user_id,
+                    "type": notification_type,
+                    "priority": priority,
+                    "title": title,
+                    "message": message,
+                    "related_entity_type": related_entity_type,
+                    "related_entity_id": related_entity_id,
+                    "notification_metadata": metadata or {},
+                    "is_read": False,
+                    "email_sent": False,
+                    "created_at": created_at,
+                })
+        if rows:
+            await self.db.execute(insert(Notification), rows)
+            await self._push(org_id, rows)
+
+        emails_queued = 0
+        if email is not None:
+            for user_id, user in unique.items():
+                if not user.email or not channel_enabled(preferences.get(user_id), notification_type, "email"):
+                    continue
+                notification_id = notification_ids.get(user_id)
+                queue_email_after_commit(self.db, EmailJob(
+                    to_email=user.email,
+                    subject=email.subject,
+                    text_body=email.text_body,
+                    html_body=email.html_body,
+                    notification_ids=[notification_id] if notification_id else [],
+                ))
+                emails_queued += 1
+
+        return FanoutResult(len(unique), len(rows), emails_queued, notification_ids)
+
+    async def _push(self, org_id: uuid.UUID, rows: List[Dict[str, Any]]) -> None:
+        by_user = {str(row["user_id"]): row for row in rows}
+        listening = notification_bus.interested(by_user)
+        if not listening:
+            return
+        counts = await count_unread(self.db, org_id, [by_user[key]["user_id"] for key in listening])
+        await notification_bus.publish(self.db, [
+            NotificationEvent(key, "notification", notification_payload(by_user[key], counts.get(key)))
+            for key in listening
+        ])
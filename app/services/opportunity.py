@@ -2,7 +2,7 @@ from uuid import UUID
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, func, and_, or_, desc, asc, false, literal_column
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
@@ -24,7 +24,17 @@ from app.schemas.opportunity import (
     OpportunityForecast,
     OpportunityForecastResponse
 )
+from app.services.search import (
+    SEARCH_TARGETS,
+    SIMILARITY_WEIGHT,
+    column_match,
+    is_indexed,
+    search_condition,
+    search_rank,
+    text_match,
+)
 from app.utils.logger import get_logger
+from app.utils.pagination import CountMode, paginate
 
 logger = get_logger("opportunity_service")
 
@@ -174,19 +184,18 @@ class OpportunityService:
         risk_level: Optional[str] = None,
         min_match_score: Optional[int] = None,
         account_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact",
     ) -> OpportunityListResponse:
 
         try:
             logger.info(f"Listing opportunities for user {user.id}, page {page}, size {size}")
             
-            offset = (page - 1) * size
-            
             from sqlalchemy import and_, or_
             from app.models.opportunity import RiskLevel
             
             # Build query with filters
             query = select(Opportunity).where(Opportunity.org_id == user.org_id)
-            count_query = select(func.count(Opportunity.id)).where(Opportunity.org_id == user.org_id)
             
             filters = []
             
@@ -228,41 +237,44 @@ class OpportunityService:
             
             if filters:
                 query = query.where(and_(*filters))
-                count_query = count_query.where(and_(*filters))
             
-            # Apply sorting
-            if sort_by == "created_at":
-                order_col = Opportunity.created_at
-            elif sort_by == "project_value":
-                order_col = Opportunity.project_value
+            # Apply sorting; nullable sort columns are coalesced so keyset cursors can compare
+            # them (literal 0 so the expression matches the keyset indexes)
+            if sort_by == "project_value":
+                order_col = func.coalesce(Opportunity.project_value, literal_column("0"))
             elif sort_by == "match_score":
-                order_col = Opportunity.match_score
+                order_col = func.coalesce(Opportunity.match_score, literal_column("0"))
             else:
+                sort_by = "created_at"
                 order_col = Opportunity.created_at
             
-            if sort_order == "desc":
-                query = query.order_by(order_col.desc())
-            else:
-                query = query.order_by(order_col.asc())
-            
-            query = query.limit(size).offset(offset)
-            
-            result = await self.db.execute(query)
-            opportunities = result.scalars().all()
-            
-            total_result = await self.db.execute(count_query)
-            total = total_result.scalar()
+            result = await paginate(
+                self.db,
+                query,
+                sort=order_col,
+                id_column=Opportunity.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
+                descending=sort_order == "desc",
+                key=f"{sort_by}:{sort_order}",
+            )
             
-            opportunity_responses = [OpportunityResponse.model_validate(opp) for opp in opportunities]
+            opportunity_responses = [OpportunityResponse.model_validate(opp) for opp in result.items]
             
             return OpportunityListResponse(
                 opportunities=opportunity_responses,
-                total=total,
+                total=result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size
+                total_pages=result.total_pages(size),
+                next_cursor=result.next_cursor,
+                total_is_estimate=result.total_is_estimate,
             )
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing opportunities: {e}")
             raise HTTPException(
@@ -536,56 +548,66 @@ class OpportunityService:
         try:
             logger.info(f"AI search for opportunities with query: {search_request.query}")
 
-            search_filter = or_(
-                Opportunity.project_name.ilike(f"%{search_request.query}%"),
-                Opportunity.client_name.ilike(f"%{search_request.query}%"),
-                Opportunity.description.ilike(f"%{search_request.query}%"),
-                Opportunity.market_sector.ilike(f"%{search_request.query}%")
+            # Ranked in SQL over the weighted search_vector and trigram indexes
+            # instead of loading ILIKE matches and scoring them here
+            target = SEARCH_TARGETS["opportunity"]
+            indexed = await is_indexed(Opportunity)
+            term = search_request.query
+            rank = search_rank(Opportunity, target.name_columns, term, indexed)
+            # Match reasons come from the same per-column predicates as the WHERE clause
+            reason_columns = (
+                ("Project name match", "project_name", 30),
+                ("Client name match", "client_name", 25),
+                ("Description match", "description", 20),
+                ("Market sector match", "market_sector", 15),
             )
-            
-            stmt = select(Opportunity).where(
-                Opportunity.org_id == user.org_id,
-                search_filter
-            ).limit(search_request.limit)
-            
+            matched = [
+                column_match(Opportunity, name, term, indexed).label(f"match_{name}")
+                for _, name, _ in reason_columns
+            ]
+            keyword_match = (text_match(Opportunity, term) if indexed else false()).label("match_keywords")
+            stmt = (
+                select(Opportunity, rank.label("rank"), *matched, keyword_match)
+                .where(
+                    Opportunity.org_id == user.org_id,
+                    search_condition(
+                        Opportunity,
+                        tuple(name for _, name, _ in reason_columns),
+                        term,
+                        indexed,
+                    ),
+                )
+                .order_by(rank.desc(), Opportunity.created_at.desc())
+                .limit(search_request.limit)
+            )
+
             result = await self.db.execute(stmt)
-            opportunities = result.scalars().all()
-            
+
             search_results = []
-            for opp in opportunities:
-                relevance_score = 0
+            for row in result.all():
+                opp = row.Opportunity
                 match_reasons = []
-                
-                query_lower = search_request.query.lower()
-                
-                if query_lower in (opp.project_name or "").lower():
-                    relevance_score += 30
-                    match_reasons.append("Project name match")
-                
-                if query_lower in (opp.client_name or "").lower():
-                    relevance_score += 25
-                    match_reasons.append("Client name match")
-                
-                if query_lower in (opp.description or "").lower():
-                    relevance_score += 20
-                    match_reasons.append("Description match")
-                
-                if query_lower in (opp.market_sector or "").lower():
-                    relevance_score += 15
-                    match_reasons.append("Market sector match")
-                
+                reason_score = 0
+                for label, name, weight in reason_columns:
+                    if getattr(row, f"match_{name}"):
+                        reason_score += weight
+                        match_reasons.append(label)
+                if row.match_keywords and not match_reasons:
+                    # Matched on the full-text document only (e.g. custom ID, state or word forms)
+                    match_reasons.append("Keyword match")
                 if opp.project_value and opp.project_value > 100000:
-                    relevance_score += 10
                     match_reasons.append("High value opportunity")
-                
+
+                # rank is at most 1 + SIMILARITY_WEIGHT; without the indexes fall back to field matches
+                relevance_score = (
+                    float(row.rank or 0.0) * 100 / (1 + SIMILARITY_WEIGHT) if indexed else reason_score
+                )
                 search_results.append(OpportunitySearchResult(
                     opportunity=OpportunityResponse.model_validate(opp),
-                    relevance_score=min(relevance_score, 100),
+                    relevance_score=round(min(relevance_score, 100), 1),
                     match_reasons=match_reasons
                 ))
-            
-            search_results.sort(key=lambda x: x.relevance_score, reverse=True)
-            
+
             return search_results
             
         except Exception as e:
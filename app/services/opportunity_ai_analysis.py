@@ -8,10 +8,10 @@ Provides comprehensive AI analysis for opportunities including:
 """
 from typing import Dict, Any, List, Optional
 from uuid import UUID
-import google.generativeai as genai
-from app.environment import environment
+from app.utils.lazy import deferred, genai
 from app.utils.logger import get_logger
 from app.models.opportunity import Opportunity
+from app.services.skill_index import SkillIndexService, TEAM_STATUSES, skill_coverage
 from app.models.opportunity_tabs import (
     OpportunityOverview,
     OpportunityCompetitor,
@@ -26,9 +26,6 @@ from functools import lru_cache
 
 logger = get_logger("opportunity_ai_analysis")
 
-# Configure Gemini with fallback models
-genai.configure(api_key=environment.GEMINI_API_KEY)
-
 # Try to use newer models, fallback to gemini-pro
 def get_model():
     """Get the best available Gemini model."""
@@ -43,7 +40,7 @@ def get_model():
             # Final fallback to gemini-pro
             return genai.GenerativeModel('gemini-pro')
 
-model = get_model()
+model = deferred(get_model)
 
 
 class OpportunityAIAnalysisService:
@@ -51,7 +48,7 @@ class OpportunityAIAnalysisService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.model = get_model()
+        self.model = deferred(get_model)
         self._cache = {}  # Simple in-memory cache for analysis results
     
     async def _call_ai_with_retry(
@@ -323,24 +320,7 @@ Return ONLY valid JSON."""
     async def _get_organization_skills(self, org_id: UUID) -> List[str]:
         """Get all skills from employees in the organization."""
         try:
-            from app.models.employee import Employee
-            from sqlalchemy import select
-            
-            stmt = select(Employee).where(
-                Employee.company_id == org_id,
-                Employee.status.in_(["accepted", "active"])
-            )
-            result = await self.db.execute(stmt)
-            employees = result.scalars().all()
-            
-            all_skills = set()
-            for emp in employees:
-                if emp.skills:
-                    all_skills.update(emp.skills)
-                if emp.ai_suggested_skills:
-                    all_skills.update(emp.ai_suggested_skills)
-            
-            return list(all_skills)
+            return await SkillIndexService(self.db).get_org_skills(org_id, statuses=TEAM_STATUSES)
         except Exception as e:
             logger.error(f"Error getting organization skills: {e}")
             return []
@@ -352,52 +332,19 @@ Return ONLY valid JSON."""
     ) -> List[Dict[str, Any]]:
         """Find employees matching required skills."""
         try:
-            from app.models.employee import Employee
-            from sqlalchemy import select
-            
-            stmt = select(Employee).where(
-                Employee.company_id == org_id,
-                Employee.status.in_(["accepted", "active"])
+            return await SkillIndexService(self.db).find_matching_employees(
+                org_id,
+                required_skills,
+                statuses=TEAM_STATUSES,
+                limit=10,  # Top 10 matches
             )
-            result = await self.db.execute(stmt)
-            employees = result.scalars().all()
-            
-            matches = []
-            for emp in employees:
-                emp_skills = set((emp.skills or []) + (emp.ai_suggested_skills or []))
-                required_skills_set = set([s.lower() for s in required_skills])
-                emp_skills_lower = set([s.lower() for s in emp_skills])
-                
-                matched_skills = required_skills_set.intersection(emp_skills_lower)
-                match_percentage = (len(matched_skills) / len(required_skills_set) * 100) if required_skills_set else 0
-                
-                if match_percentage > 0:
-                    matches.append({
-                        "id": str(emp.id),
-                        "name": emp.name,
-                        "job_title": emp.job_title,
-                        "matched_skills": list(matched_skills),
-                        "match_percentage": round(match_percentage, 1),
-                        "all_skills": list(emp_skills)
-                    })
-            
-            # Sort by match percentage
-            matches.sort(key=lambda x: x["match_percentage"], reverse=True)
-            return matches[:10]  # Top 10 matches
         except Exception as e:
             logger.error(f"Error finding matching employees: {e}")
             return []
     
     def _calculate_skill_match(self, required_skills: List[str], available_skills: List[str]) -> float:
         """Calculate percentage of required skills that are available."""
-        if not required_skills:
-            return 100.0
-        
-        required_lower = set([s.lower() for s in required_skills])
-        available_lower = set([s.lower() for s in available_skills])
-        
-        matched = required_lower.intersection(available_lower)
-        return (len(matched) / len(required_lower) * 100) if required_lower else 0.0
+        return skill_coverage(required_skills, available_skills)
     
     async def analyze_financial_viability(
         self,
@@ -4,12 +4,9 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-import boto3
-from botocore.exceptions import ClientError
 from sqlalchemy import and_, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.environment import environment
 from app.models.opportunity import Opportunity
 from app.models.opportunity_document import OpportunityDocument
 from app.models.user import User
@@ -21,60 +18,44 @@ from app.schemas.opportunity_document import (
     OpportunityDocumentUpdate,
 )
 from app.db.session import engine
+from app.services.schema_capabilities import schema_capabilities
+from app.services.storage import FileTooLargeError, StoredObject, UploadSource, get_storage
 from app.utils.logger import get_logger
 
 logger = get_logger("opportunity_document_service")
 
+MAX_DOCUMENT_BYTES = 10 * 1024 * 1024
+
+
+class DocumentLocationError(ValueError):
+    """Raised when a client-supplied file_path is not an object uploaded for this opportunity."""
+
 
 class OpportunityDocumentService:
     """Business logic for managing opportunity documents."""
 
     _schema_ensured: bool = False
+    _REQUIRED_COLUMNS = frozenset({
+        "file_name", "original_name", "file_type", "file_path", "file_url", "category", "purpose",
+        "description", "status", "is_available_for_proposal", "tags", "upload_date", "uploaded_at",
+        "updated_at",
+    })
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.upload_root = os.path.join("uploads", "opportunity_documents")
-
-        self.s3_bucket = environment.AWS_S3_BUCKET_NAME
-        self.s3_region = environment.AWS_S3_REGION
-        self._s3_enabled = all(
-            [
-                environment.AWS_ACCESS_KEY_ID,
-                environment.AWS_SECRET_ACCESS_KEY,
-                self.s3_bucket,
-            ]
-        )
-
-        if self._s3_enabled:
-            self.s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                region_name=self.s3_region,
-            )
-            logger.info("OpportunityDocumentService initialised with S3 storage")
-        else:
-            self.s3_client = None
-            logger.warning(
-                "S3 credentials missing. Falling back to local storage for opportunity documents"
-            )
+        self.storage = get_storage()
 
     async def _ensure_schema(self) -> None:
         if OpportunityDocumentService._schema_ensured:
             return
 
-        async with engine.begin() as conn:
-            result = await conn.execute(
-                text(
-                    """
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'opportunity_documents'
-                    """
-                )
-            )
-            columns = {row[0] for row in result}
+        columns = await schema_capabilities.columns("opportunity_documents")
+        if self._REQUIRED_COLUMNS <= columns and "document_name" not in columns:
+            # Current schema and no legacy columns to backfill or relax: nothing to do
+            OpportunityDocumentService._schema_ensured = True
+            return
 
+        async with engine.begin() as conn:
             statements = []
             if "file_name" not in columns:
                 statements.append(
@@ -188,6 +169,8 @@ class OpportunityDocumentService:
             except Exception as exc:  # pragma: no cover
                 logger.debug("Legacy column alteration skipped: %s", exc)
 
+        if statements:
+            await schema_capabilities.refresh()
         OpportunityDocumentService._schema_ensured = True
 
     async def create_document(
@@ -204,15 +187,15 @@ class OpportunityDocumentService:
 
         file_path = document_data.dict().get("file_path")
         file_url = document_data.dict().get("file_url")
+        file_size = document_data.file_size
         upload_timestamp = datetime.utcnow()
 
         if file_content is not None:
-            storage_name = self._build_storage_filename(document_data.original_name)
             try:
-                file_path, file_url = self._upload_file(
+                stored = await self._store_file(
                     opportunity_id=opportunity.id,
-                    storage_name=storage_name,
-                    file_content=file_content,
+                    original_name=document_data.original_name,
+                    source=file_content,
                     content_type=content_type or document_data.file_type,
                 )
             except Exception as exc:  # pragma: no cover - defensive logging
@@ -224,6 +207,21 @@ class OpportunityDocumentService:
                     exc_info=True,
                 )
                 raise
+            file_path, file_url, file_size = stored.key, stored.url, stored.size
+        elif file_path:
+            # Object uploaded directly to the bucket through a presigned URL
+            file_path = self.owned_key(opportunity.id, file_path)
+            if file_path is None:
+                raise DocumentLocationError("file_path must be a key returned by the upload-url endpoint")
+            info = await self.storage.stat(file_path)
+            if not info:
+                raise ValueError("Uploaded file not found in storage")
+            if info.size > MAX_DOCUMENT_BYTES:
+                # The presigned PUT cannot cap the size, so oversized uploads are dropped here
+                await self.storage.delete(file_path)
+                raise FileTooLargeError(f"Uploaded file exceeds {MAX_DOCUMENT_BYTES} bytes")
+            file_url = file_url or self.storage.public_url(file_path)
+            file_size = info.size
         else:
             if not file_url:
                 logger.warning(
@@ -236,7 +234,7 @@ class OpportunityDocumentService:
             file_name=document_data.file_name,
             original_name=document_data.original_name,
             file_type=document_data.file_type,
-            file_size=document_data.file_size,
+            file_size=file_size,
             category=document_data.category,
             purpose=document_data.purpose,
             description=document_data.description,
@@ -315,7 +313,10 @@ class OpportunityDocumentService:
         await self._ensure_opportunity_exists(opportunity_id)
         document = await self._get_document(opportunity_id, document_id)
 
-        for field, value in update_data.model_dump(exclude_unset=True).items():
+        changes = update_data.model_dump(exclude_unset=True)
+        if changes.get("file_path") and self.owned_key(opportunity_id, changes["file_path"]) is None:
+            raise DocumentLocationError("file_path must be a key returned by the upload-url endpoint")
+        for field, value in changes.items():
             setattr(document, field, value)
 
         document.updated_at = datetime.utcnow()
@@ -338,7 +339,7 @@ class OpportunityDocumentService:
         document = await self._get_document(opportunity_id, document_id)
 
         if document.file_path:
-            self._delete_file(document.file_path)
+            await self._delete_file(document)
 
         await self.db.delete(document)
         await self.db.flush()
@@ -375,60 +376,112 @@ class OpportunityDocumentService:
             raise ValueError("Document not found")
         return document
 
-    def _build_storage_filename(self, original_name: str) -> str:
-        base_name = os.path.basename(original_name)
-        sanitized = re.sub(r"[^A-Za-z0-9_.-]", "_", base_name)
-        unique_prefix = uuid.uuid4().hex
-        return f"{unique_prefix}_{sanitized}"[:255]
+    def _storage_prefix(self, opportunity_id: uuid.UUID) -> str:
+        return f"opportunities/{opportunity_id}"
+
+    def owned_key(self, opportunity_id: uuid.UUID, location: Optional[str]) -> Optional[str]:
+        """Storage key for `location` if it lies under this opportunity's prefix, else None."""
+        key = self.storage.backend.resolve_key(location) if location else None
+        if not key or not key.startswith(f"{self._storage_prefix(opportunity_id)}/"):
+            return None
+        if ".." in key.split("/"):
+            return None
+        return key
 
-    def _upload_file(
+    async def _store_file(
         self,
         *,
         opportunity_id: uuid.UUID,
-        storage_name: str,
-        file_content: bytes,
+        original_name: str,
+        source: UploadSource,
         content_type: Optional[str],
-    ) -> tuple[str, Optional[str]]:
-        if self._s3_enabled and self.s3_client:
-            key = f"opportunities/{opportunity_id}/{storage_name}"
-            extra_args = {"ContentType": content_type} if content_type else None
-            try:
-                self.s3_client.put_object(
-                    Bucket=self.s3_bucket,
-                    Key=key,
-                    Body=file_content,
-                    **(extra_args or {}),
-                )
-            except ClientError as exc:
-                logger.error("S3 upload failed for key %s: %s", key, exc)
-            else:
-                region_segment = f".{self.s3_region}" if self.s3_region else ""
-                url = f"https://{self.s3_bucket}.s3{region_segment}.amazonaws.com/{key}"
-                return key, url
-
-        # Local storage fallback
-        opportunity_dir = os.path.join(self.upload_root, str(opportunity_id))
-        os.makedirs(opportunity_dir, exist_ok=True)
-        local_path = os.path.abspath(os.path.join(opportunity_dir, storage_name))
-
-        with open(local_path, "wb") as destination:
-            destination.write(file_content)
-
-        logger.info("Stored opportunity document locally at %s", local_path)
-        return local_path, None
-
-    def _delete_file(self, file_path: str) -> None:
-        if self._s3_enabled and self.s3_client and not os.path.isabs(file_path):
-            try:
-                self.s3_client.delete_object(Bucket=self.s3_bucket, Key=file_path)
-                logger.info("Deleted opportunity document from S3: %s", file_path)
-                return
-            except ClientError as exc:  # pragma: no cover - defensive
-                logger.warning("Failed to delete S3 object %s: %s", file_path, exc)
+        max_bytes: Optional[int] = None,
+    ) -> StoredObject:
+        return await self.storage.save(
+            self._storage_prefix(opportunity_id),
+            original_name,
+            source,
+            content_type,
+            max_bytes=max_bytes,
+        )
+
+    async def upload_document(
+        self,
+        opportunity_id: uuid.UUID,
+        upload: UploadSource,
+        *,
+        original_name: str,
+        content_type: str,
+        category: str,
+        purpose: str,
+        current_user: User,
+        max_bytes: Optional[int] = None,
+    ) -> OpportunityDocumentResponse:
+        """Stream an uploaded file into storage and register it as a document."""
+        await self._ensure_schema()
+        opportunity = await self._ensure_opportunity_exists(opportunity_id)
+
+        stored = await self._store_file(
+            opportunity_id=opportunity.id,
+            original_name=original_name,
+            source=upload,
+            content_type=content_type,
+            max_bytes=max_bytes,
+        )
+        if stored.size == 0:
+            raise ValueError("Uploaded file is empty")
+
+        document_data = OpportunityDocumentCreate(
+            file_name=original_name,
+            original_name=original_name,
+            file_type=content_type,
+            file_size=stored.size,
+            category=category,
+            purpose=purpose,
+            description=f"Uploaded file: {original_name}",
+            tags=None,
+            status="uploaded",
+            is_available_for_proposal=True,
+            file_path=stored.key,
+            file_url=stored.url,
+        )
+        return await self.create_document(opportunity_id, document_data, current_user)
+
+    async def create_upload_url(
+        self,
+        opportunity_id: uuid.UUID,
+        file_name: str,
+        content_type: Optional[str] = None,
+    ) -> Optional[dict]:
+        """Presigned direct-to-bucket upload ticket; None when storage is local."""
+        await self._ensure_opportunity_exists(opportunity_id)
+        return await self.storage.presign_upload(
+            self._storage_prefix(opportunity_id), file_name, content_type
+        )
+
+    async def _delete_file(self, document: OpportunityDocument) -> None:
+        file_path = document.file_path
+
+        # Content-addressed objects can be shared by several documents
+        shared_stmt = select(func.count(OpportunityDocument.id)).where(
+            and_(
+                OpportunityDocument.file_path == file_path,
+                OpportunityDocument.id != document.id,
+            )
+        )
+        if (await self.db.execute(shared_stmt)).scalar():
+            logger.info("Stored file %s still referenced; keeping it", file_path)
+            return
+
+        key = self.owned_key(document.opportunity_id, file_path)
+        if key:
+            await self.storage.delete(key)
+            logger.info("Deleted opportunity document from storage: %s", file_path)
+            return
 
-        if os.path.exists(file_path):
+        if os.path.isabs(file_path) and os.path.exists(file_path):
             try:
                 os.remove(file_path)
                 logger.info("Deleted local opportunity document: %s", file_path)
             except OSError as exc:  # pragma: no cover - defensive
-                logger.warning("Failed to delete local file %s: %s", file_path, exc)
\ No newline at end of file
+                logger.warning("Failed to delete local file %s: %s", file_path, exc)
@@ -513,7 +513,7 @@ class OpportunityIngestionService:
             # Try to find existing account by client name (fuzzy match)
             stmt = select(Account).where(
                 Account.org_id == org_id,
-                func.lower(Account.client_name).like(f"%{client_name.lower()}%")
+                Account.client_name.ilike(f"%{client_name}%")
             )
             result = await self.db.execute(stmt)
             existing_account = result.scalar_one_or_none()
@@ -9,8 +9,9 @@ from sqlalchemy import select, and_, or_, func
 
 from app.models.user import User
 from app.models.opportunity import Opportunity
-from app.models.notification import Notification, NotificationType, NotificationPriority, NotificationPreference
-from app.services.email import _send_email_via_smtp
+from app.models.notification import Notification, NotificationType, NotificationPriority
+from app.services.notification_events import NotificationEvent, count_unread, notification_bus
+from app.services.notification_fanout import NotificationFanout, RenderedEmail
 from app.utils.logger import get_logger
 
 logger = get_logger("opportunity_notifications")
@@ -21,102 +22,71 @@ class OpportunityNotificationService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.fanout = NotificationFanout(db)
     
-    async def _get_user_preferences(self, user_id: UUID) -> Dict[str, Any]:
-        """Get user notification preferences."""
-        stmt = select(NotificationPreference).where(NotificationPreference.user_id == user_id)
-        result = await self.db.execute(stmt)
-        pref = result.scalar_one_or_none()
-        if pref:
-            return pref.preferences
-        return {}
-    
-    async def _should_send_email(self, user_id: UUID, notification_type: NotificationType) -> bool:
-        """Check if email should be sent based on user preferences."""
-        prefs = await self._get_user_preferences(user_id)
-        type_str = notification_type.value
-        if type_str in prefs:
-            return prefs[type_str].get("email", True)
-        return True  # Default to sending emails
-    
-    async def _should_send_in_app(self, user_id: UUID, notification_type: NotificationType) -> bool:
-        """Check if in-app notification should be sent."""
-        prefs = await self._get_user_preferences(user_id)
-        type_str = notification_type.value
-        if type_str in prefs:
-            return prefs[type_str].get("in_app", True)
-        return True  # Default to sending in-app
+    @staticmethod
+    def _render_email(
+        title: str,
+        message: str,
+        opportunity_id: Optional[UUID] = None
+    ) -> RenderedEmail:
+        """Render the email body shared by all recipients of a notification."""
+        subject = f"Opportunity Notification: {title}"
+        html_body = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                .header {{ background-color: #161950; color: white; padding: 20px; text-align: center; }}
+                .content {{ padding: 20px; background-color: #f9f9f9; }}
+                .button {{ display: inline-block; padding: 12px 30px; background-color: #161950; color: white; text-decoration: none; border-radius: 5px; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>{title}</h1>
+                </div>
+                <div class="content">
+                    <p>{message}</p>
+                    {f'<p><a href="#" class="button">View Opportunity</a></p>' if opportunity_id else ''}
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+        text_body = f"{title}\n\n{message}"
+        return RenderedEmail(subject=subject, text_body=text_body, html_body=html_body)
     
-    async def _create_notification(
+    async def _notify(
         self,
         org_id: UUID,
-        user_id: Optional[UUID],
+        recipients: List[User],
         notification_type: NotificationType,
         title: str,
         message: str,
-        priority: NotificationPriority = NotificationPriority.medium,
-        related_entity_type: Optional[str] = None,
-        related_entity_id: Optional[UUID] = None,
+        priority: NotificationPriority,
+        opportunity_id: UUID,
         metadata: Optional[Dict[str, Any]] = None
-    ) -> Notification:
-        """Create a notification record."""
-        notification = Notification(
+    ) -> None:
+        result = await self.fanout.send(
             org_id=org_id,
-            user_id=user_id,
-            type=notification_type,
-            priority=priority,
+            recipients=recipients,
+            notification_type=notification_type,
             title=title,
             message=message,
-            related_entity_type=related_entity_type,
-            related_entity_id=related_entity_id,
-            notification_metadata=metadata or {}
+            priority=priority,
+            related_entity_type="opportunity",
+            related_entity_id=opportunity_id,
+            metadata=metadata,
+            email=self._render_email(title, message, opportunity_id),
+        )
+        logger.info(
+            f"{notification_type.value} for opportunity {opportunity_id}: "
+            f"{result.in_app} in-app, {result.emails_queued} emails queued ({result.recipients} recipients)"
         )
-        self.db.add(notification)
-        await self.db.flush()
-        return notification
-    
-    async def _send_email_notification(
-        self,
-        user_email: str,
-        user_name: Optional[str],
-        title: str,
-        message: str,
-        opportunity_id: Optional[UUID] = None
-    ) -> bool:
-        """Send email notification."""
-        try:
-            subject = f"Opportunity Notification: {title}"
-            html_body = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                    .header {{ background-color: #161950; color: white; padding: 20px; text-align: center; }}
-                    .content {{ padding: 20px; background-color: #f9f9f9; }}
-                    .button {{ display: inline-block; padding: 12px 30px; background-color: #161950; color: white; text-decoration: none; border-radius: 5px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>{title}</h1>
-                    </div>
-                    <div class="content">
-                        <p>{message}</p>
-                        {f'<p><a href="#" class="button">View Opportunity</a></p>' if opportunity_id else ''}
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            text_body = f"{title}\n\n{message}"
-            
-            return _send_email_via_smtp(user_email, subject, text_body, html_body)
-        except Exception as e:
-            logger.error(f"Error sending email notification: {e}")
-            return False
     
     async def notify_opportunity_created(
         self,
@@ -141,31 +111,11 @@ class OpportunityNotificationService:
             title = f"New Opportunity: {opportunity.project_name}"
             message = f"A new opportunity '{opportunity.project_name}' has been created."
             
-            # Create in-app notification
-            if await self._should_send_in_app(created_by, NotificationType.opportunity_created):
-                await self._create_notification(
-                    org_id=org_id,
-                    user_id=created_by,
-                    notification_type=NotificationType.opportunity_created,
-                    title=title,
-                    message=message,
-                    priority=NotificationPriority.medium,
-                    related_entity_type="opportunity",
-                    related_entity_id=opportunity_id,
-                    notification_metadata={"opportunity_name": opportunity.project_name}
-                )
-            
-            # Send email notification
-            if await self._should_send_email(created_by, NotificationType.opportunity_created):
-                await self._send_email_notification(
-                    creator.email,
-                    creator.name,
-                    title,
-                    message,
-                    opportunity_id
-                )
-            
-            logger.info(f"Notification sent for opportunity {opportunity_id} creation")
+            await self._notify(
+                org_id, [creator], NotificationType.opportunity_created, title, message,
+                NotificationPriority.medium, opportunity_id,
+                metadata={"opportunity_name": opportunity.project_name}
+            )
             
         except Exception as e:
             logger.error(f"Error sending opportunity creation notification: {e}")
@@ -187,33 +137,16 @@ class OpportunityNotificationService:
             # Get all users in org who should be notified
             stmt = select(User).where(User.org_id == org_id)
             result = await self.db.execute(stmt)
-            users = result.scalars().all()
+            users = list(result.scalars().all())
             
             title = f"Opportunity Stage Changed: {opportunity.project_name}"
             message = f"Opportunity '{opportunity.project_name}' stage changed from {old_stage} to {new_stage}."
             
-            for user in users:
-                # Create in-app notification
-                if await self._should_send_in_app(user.id, NotificationType.opportunity_stage_changed):
-                    await self._create_notification(
-                        org_id=org_id,
-                        user_id=user.id,
-                        notification_type=NotificationType.opportunity_stage_changed,
-                        title=title,
-                        message=message,
-                        priority=NotificationPriority.medium,
-                        related_entity_type="opportunity",
-                        related_entity_id=opportunity_id,
-                        notification_metadata={"old_stage": old_stage, "new_stage": new_stage}
-                    )
-                
-                # Send email
-                if await self._should_send_email(user.id, NotificationType.opportunity_stage_changed):
-                    await self._send_email_notification(
-                        user.email, user.name, title, message, opportunity_id
-                    )
-            
-            logger.info(f"Stage change notifications sent for opportunity {opportunity_id}")
+            await self._notify(
+                org_id, users, NotificationType.opportunity_stage_changed, title, message,
+                NotificationPriority.medium, opportunity_id,
+                metadata={"old_stage": old_stage, "new_stage": new_stage}
+            )
             
         except Exception as e:
             logger.error(f"Error sending stage change notification: {e}")
@@ -233,30 +166,15 @@ class OpportunityNotificationService:
             # Get all users in org
             stmt = select(User).where(User.org_id == org_id)
             result = await self.db.execute(stmt)
-            users = result.scalars().all()
+            users = list(result.scalars().all())
             
             title = f"New Opportunity Promoted: {opportunity.project_name}"
             message = f"Temp opportunity '{opportunity.project_name}' has been promoted to active pipeline."
             
-            for user in users:
-                if await self._should_send_in_app(user.id, NotificationType.opportunity_promoted):
-                    await self._create_notification(
-                        org_id=org_id,
-                        user_id=user.id,
-                        notification_type=NotificationType.opportunity_promoted,
-                        title=title,
-                        message=message,
-                        priority=NotificationPriority.high,
-                        related_entity_type="opportunity",
-                        related_entity_id=opportunity_id
-                    )
-                
-                if await self._should_send_email(user.id, NotificationType.opportunity_promoted):
-                    await self._send_email_notification(
-                        user.email, user.name, title, message, opportunity_id
-                    )
-            
-            logger.info(f"Promotion notifications sent for opportunity {opportunity_id}")
+            await self._notify(
+                org_id, users, NotificationType.opportunity_promoted, title, message,
+                NotificationPriority.high, opportunity_id
+            )
             
         except Exception as e:
             logger.error(f"Error sending promotion notification: {e}")
@@ -284,31 +202,16 @@ class OpportunityNotificationService:
                 User.role.in_(["admin", "Admin"])
             )
             result = await self.db.execute(stmt)
-            admins = result.scalars().all()
+            admins = list(result.scalars().all())
             
             title = f"High-Value Opportunity: {opportunity.project_name}"
             message = f"High-value opportunity detected: '{opportunity.project_name}' (${project_value:,.0f})"
             
-            for admin in admins:
-                if await self._should_send_in_app(admin.id, NotificationType.opportunity_high_value):
-                    await self._create_notification(
-                        org_id=org_id,
-                        user_id=admin.id,
-                        notification_type=NotificationType.opportunity_high_value,
-                        title=title,
-                        message=message,
-                        priority=NotificationPriority.urgent,
-                        related_entity_type="opportunity",
-                        related_entity_id=opportunity_id,
-                        notification_metadata={"project_value": project_value}
-                    )
-                
-                if await self._should_send_email(admin.id, NotificationType.opportunity_high_value):
-                    await self._send_email_notification(
-                        admin.email, admin.name, title, message, opportunity_id
-                    )
-            
-            logger.info(f"High-value notifications sent for opportunity {opportunity_id}")
+            await self._notify(
+                org_id, admins, NotificationType.opportunity_high_value, title, message,
+                NotificationPriority.urgent, opportunity_id,
+                metadata={"project_value": project_value}
+            )
             
         except Exception as e:
             logger.error(f"Error sending high-value notification: {e}")
@@ -371,9 +274,12 @@ class OpportunityNotificationService:
             notification = result.scalar_one_or_none()
             
             if notification:
+                was_unread = not notification.is_read
                 notification.is_read = True
                 notification.read_at = datetime.utcnow()
                 await self.db.flush()
+                if was_unread:
+                    await self._push_unread_count(user_id, notification.org_id, [notification_id])
                 return True
             return False
         except Exception as e:
@@ -402,11 +308,23 @@ class OpportunityNotificationService:
                 count += 1
             
             await self.db.flush()
+            if count:
+                await self._push_unread_count(user_id, org_id, [n.id for n in notifications])
             return count
         except Exception as e:
             logger.error(f"Error marking all notifications as read: {e}")
             return 0
     
+    async def _push_unread_count(self, user_id: UUID, org_id: UUID, read_ids: List[UUID]) -> None:
+        """Tell the user's open streams about notifications read from another tab or device."""
+        if not notification_bus.interested([user_id]):
+            return
+        counts = await count_unread(self.db, org_id, [user_id])
+        await notification_bus.publish(self.db, [NotificationEvent(str(user_id), "unread_count", {
+            "unread_count": counts.get(str(user_id), 0),
+            "read_ids": [str(notification_id) for notification_id in read_ids],
+        })])
+    
     async def get_unread_count(
         self,
         user_id: UUID,
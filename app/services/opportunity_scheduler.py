@@ -23,7 +23,9 @@ from app.models.opportunity_source import (
     AgentStatus,
     AgentRunStatus,
 )
+from app.schemas.opportunity_ingestion import OpportunityTempCreate
 from app.services.opportunity_ingestion import OpportunityIngestionService
+from app.services.source_templates import SourceTemplateService
 from app.utils.scraper import process_urls, scrape_text_with_bs4
 from app.utils.logger import get_logger
 
@@ -92,6 +94,62 @@ class OpportunitySchedulerService:
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
     
+    async def claim_due_source(
+        self, lease: timedelta, exclude: Optional[List[uuid.UUID]] = None
+    ) -> Optional[OpportunitySource]:
+        """
+        Lock the next due source (skipping rows other workers hold) and push its
+        next_run_at out by `lease` so it is not picked again while being scraped.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            select(OpportunitySource)
+            .where(
+                OpportunitySource.status == OpportunitySourceStatus.active,
+                OpportunitySource.is_auto_discovery_enabled == True,
+                or_(
+                    OpportunitySource.next_run_at.is_(None),
+                    OpportunitySource.next_run_at <= now
+                ),
+            )
+            .order_by(OpportunitySource.next_run_at.asc().nulls_first())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if exclude:
+            stmt = stmt.where(OpportunitySource.id.not_in(exclude))
+        source = (await self.db.execute(stmt)).scalar_one_or_none()
+        if source is not None:
+            source.next_run_at = now + lease
+            await self.db.flush()
+        return source
+
+    async def claim_due_agent(
+        self, lease: timedelta, exclude: Optional[List[uuid.UUID]] = None
+    ) -> Optional[OpportunityAgent]:
+        """Agent counterpart of `claim_due_source`."""
+        now = datetime.utcnow()
+        stmt = (
+            select(OpportunityAgent)
+            .where(
+                OpportunityAgent.status == AgentStatus.active,
+                or_(
+                    OpportunityAgent.next_run_at.is_(None),
+                    OpportunityAgent.next_run_at <= now
+                ),
+            )
+            .order_by(OpportunityAgent.next_run_at.asc().nulls_first())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if exclude:
+            stmt = stmt.where(OpportunityAgent.id.not_in(exclude))
+        agent = (await self.db.execute(stmt)).scalar_one_or_none()
+        if agent is not None:
+            agent.next_run_at = now + lease
+            await self.db.flush()
+        return agent
+
     async def get_agents_due_for_execution(self) -> List[OpportunityAgent]:
         """Get all active agents that are due for execution."""
         now = datetime.utcnow()
@@ -142,8 +200,15 @@ class OpportunitySchedulerService:
         await self.db.flush()
         return history
     
-    async def scrape_source(self, source: OpportunitySource) -> Dict[str, Any]:
-        """Scrape a single opportunity source and create temp opportunities."""
+    async def scrape_source(
+        self, source: OpportunitySource, scrape_results: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Scrape a single opportunity source and create temp opportunities.
+
+        `scrape_results` lets the caller fetch the page outside the DB transaction
+        (see SchedulerWorker); when omitted the source URL is scraped here.
+        """
         logger.info(f"Starting scrape for source: {source.name} ({source.url})")
         
         results = {
@@ -152,6 +217,7 @@ class OpportunitySchedulerService:
             "urls_scraped": 0,
             "opportunities_found": 0,
             "opportunities_created": 0,
+            "temp_opportunity_ids": [],
             "errors": []
         }
         
@@ -160,6 +226,9 @@ class OpportunitySchedulerService:
             if await self.is_url_already_scraped(source.url, source.org_id):
                 logger.info(f"Source {source.name} already scraped, skipping")
                 results["errors"].append("URL already scraped (deduplication)")
+                source.last_run_at = datetime.utcnow()
+                source.next_run_at = calculate_next_run_time(source.frequency, source.last_run_at)
+                await self.db.flush()
                 return results
             
             # Create scrape history record
@@ -169,8 +238,14 @@ class OpportunitySchedulerService:
                 ScrapeJobStatus.running
             )
             
-            # Scrape the source URL
-            scrape_results = await process_urls([source.url])
+            # Scrape the source URL, extracting with the source's learned template when it has one
+            templates = SourceTemplateService(self.db)
+            if scrape_results is None:
+                scrape_results = await process_urls(
+                    [source.url],
+                    extraction_template=await templates.get_active(source.id),
+                    learn_templates=True,
+                )
             
             if not scrape_results or "error" in scrape_results[0]:
                 error_msg = scrape_results[0].get("error", "Unknown error") if scrape_results else "No results"
@@ -182,6 +257,7 @@ class OpportunitySchedulerService:
                 return results
             
             result = scrape_results[0]
+            await templates.record(source, result.get("extraction"))
             opportunities = result.get("opportunities", [])
             results["urls_scraped"] = 1
             results["opportunities_found"] = len(opportunities)
@@ -219,6 +295,7 @@ class OpportunitySchedulerService:
                         OpportunityTempCreate(**temp_opp_data)
                     )
                     results["opportunities_created"] += 1
+                    results["temp_opportunity_ids"].append(str(temp_opp.id))
                     
                     # Create scrape history for detail URL if exists
                     if detail_url:
@@ -254,8 +331,10 @@ class OpportunitySchedulerService:
         
         return results
     
-    async def execute_agent(self, agent: OpportunityAgent) -> Dict[str, Any]:
-        """Execute an AI agent to discover opportunities."""
+    async def execute_agent(
+        self, agent: OpportunityAgent, scrape_results: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Execute an AI agent to discover opportunities. `scrape_results` works as in `scrape_source`."""
         logger.info(f"Executing agent: {agent.name} ({agent.base_url})")
         
         results = {
@@ -280,7 +359,8 @@ class OpportunitySchedulerService:
         
         try:
             # Scrape the base URL
-            scrape_results = await process_urls([agent.base_url])
+            if scrape_results is None:
+                scrape_results = await process_urls([agent.base_url])
             
             if not scrape_results or "error" in scrape_results[0]:
                 error_msg = scrape_results[0].get("error", "Unknown error") if scrape_results else "No results"
@@ -326,7 +406,6 @@ class OpportunitySchedulerService:
                         "strategic_fit_score": None,
                     }
                     
-                    from app.schemas.opportunity_ingestion import OpportunityTempCreate
                     temp_opp = await self.ingestion_service.create_temp_opportunity(
                         agent.org_id,
                         OpportunityTempCreate(**temp_opp_data)
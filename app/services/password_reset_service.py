@@ -1,16 +1,14 @@
 import secrets
-from passlib.context import CryptContext
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
 from app.models.user import User
 from app.models.password_reset import PasswordResetToken
+from app.services.auth_service import pwd_context
+from app.services.password_hashing import password_hashing
 from app.utils.logger import logger
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def hash_password(password: str) -> str:
     # Bcrypt has a 72-byte limit, truncate if necessary
     password_bytes = password.encode('utf-8')[:72]
@@ -25,7 +23,7 @@ async def update_user_password(user_id: UUID, new_password: str) -> bool:
             return False
         
         # Hash the new password
-        hashed_password = hash_password(new_password)
+        hashed_password = await password_hashing.run(hash_password, new_password)
         
         # Update user password using AuthService
         from app.services.auth_service import AuthService
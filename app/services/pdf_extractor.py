@@ -1,11 +1,14 @@
 import logging
 from typing import Optional
-import PyPDF2
 import io
-from docx import Document
+
+from app.utils.lazy import lazy_import
 
 logger = logging.getLogger(__name__)
 
+PyPDF2 = lazy_import("PyPDF2")
+docx = lazy_import("docx")
+
 
 class PDFExtractor:
     """
@@ -61,7 +64,7 @@ class PDFExtractor:
         """Extract text from DOCX file"""
         try:
             docx_file = io.BytesIO(file_content)
-            doc = Document(docx_file)
+            doc = docx.Document(docx_file)
             
             text_content = []
             for paragraph in doc.paragraphs:
@@ -3,13 +3,14 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from decimal import Decimal
 import os
-import boto3
-from botocore.exceptions import ClientError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, desc, asc
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from app.environment import environment
+from app.services.storage import get_storage
+from app.services.finance_actuals import FinanceActualsService, expense_contribution
+from app.services.vendor_scorecards import VendorScorecardService
 
 from app.models.procurement import (
     PurchaseRequisition,
@@ -66,7 +67,9 @@ from app.schemas.procurement import (
     ProcurementDashboardStats,
 )
 from app.utils.logger import get_logger
+from app.utils.pagination import CountMode, paginate
 from app.services.file_extractor import FileExtractor
+from app.services.text_extraction import text_extraction
 from app.services.gemini_service import gemini_service
 import json
 import re
@@ -183,11 +186,12 @@ class ProcurementService:
         page: int = 1,
         size: int = 10,
         status_filter: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact"
     ) -> PurchaseRequisitionListResponse:
         """List requisitions with pagination and filters"""
         try:
-            offset = (page - 1) * size
             query = select(PurchaseRequisition).where(
                 PurchaseRequisition.org_id == user.org_id
             )
@@ -203,27 +207,17 @@ class ProcurementService:
                     )
                 )
 
-            query = query.order_by(desc(PurchaseRequisition.created_at))
-            query = query.offset(offset).limit(size)
-
-            result = await self.db.execute(query)
-            requisitions = result.scalars().all()
-
-            total_query = select(func.count(PurchaseRequisition.id)).where(
-                PurchaseRequisition.org_id == user.org_id
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=PurchaseRequisition.created_at,
+                id_column=PurchaseRequisition.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
             )
-            if status_filter:
-                total_query = total_query.where(PurchaseRequisition.status == status_filter)
-            if search:
-                total_query = total_query.where(
-                    or_(
-                        PurchaseRequisition.description.ilike(f"%{search}%"),
-                        PurchaseRequisition.custom_id.ilike(f"%{search}%")
-                    )
-                )
-
-            total_result = await self.db.execute(total_query)
-            total = total_result.scalar() or 0
+            requisitions = page_result.items
 
             # Get user names for all requisitions
             requisition_responses = []
@@ -235,11 +229,15 @@ class ProcurementService:
 
             return PurchaseRequisitionListResponse(
                 requisitions=requisition_responses,
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size if total > 0 else 0
+                total_pages=page_result.total_pages(size),
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing requisitions: {e}")
             raise HTTPException(
@@ -393,6 +391,7 @@ class ProcurementService:
 
             self.db.add(order)
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh([order.vendor_id])
             await self.db.refresh(order)
 
             logger.info(f"Created purchase order {order.id}")
@@ -446,11 +445,12 @@ class ProcurementService:
         page: int = 1,
         size: int = 10,
         status_filter: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact"
     ) -> PurchaseOrderListResponse:
         """List purchase orders with pagination and filters"""
         try:
-            offset = (page - 1) * size
             query = select(PurchaseOrder).where(
                 PurchaseOrder.org_id == user.org_id
             )
@@ -467,28 +467,17 @@ class ProcurementService:
                     )
                 )
 
-            query = query.order_by(desc(PurchaseOrder.created_at))
-            query = query.offset(offset).limit(size)
-
-            result = await self.db.execute(query)
-            orders = result.scalars().all()
-
-            total_query = select(func.count(PurchaseOrder.id)).where(
-                PurchaseOrder.org_id == user.org_id
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=PurchaseOrder.created_at,
+                id_column=PurchaseOrder.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
             )
-            if status_filter:
-                total_query = total_query.where(PurchaseOrder.status == status_filter)
-            if search:
-                total_query = total_query.where(
-                    or_(
-                        PurchaseOrder.description.ilike(f"%{search}%"),
-                        PurchaseOrder.custom_id.ilike(f"%{search}%"),
-                        PurchaseOrder.vendor_name.ilike(f"%{search}%")
-                    )
-                )
-
-            total_result = await self.db.execute(total_query)
-            total = total_result.scalar() or 0
+            orders = page_result.items
 
             # Get user names for all orders
             order_responses = []
@@ -500,11 +489,15 @@ class ProcurementService:
 
             return PurchaseOrderListResponse(
                 orders=order_responses,
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size if total > 0 else 0
+                total_pages=page_result.total_pages(size),
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing purchase orders: {e}")
             raise HTTPException(
@@ -533,6 +526,7 @@ class ProcurementService:
             if not order:
                 return None
 
+            previous_vendor_id = order.vendor_id
             update_data = order_data.dict(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(order, key, value)
@@ -545,6 +539,7 @@ class ProcurementService:
 
             order.updated_at = datetime.utcnow()
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh([previous_vendor_id, order.vendor_id])
             await self.db.refresh(order)
 
             return PurchaseOrderResponse.model_validate(order)
@@ -575,8 +570,10 @@ class ProcurementService:
             if not order:
                 return False
 
+            vendor_id = order.vendor_id
             await self.db.delete(order)
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh([vendor_id])
             return True
         except Exception as e:
             logger.error(f"Error deleting purchase order {order_id}: {e}")
@@ -730,11 +727,12 @@ class ProcurementService:
         page: int = 1,
         size: int = 10,
         status_filter: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact"
     ) -> RFQListResponse:
         """List RFQs with pagination and filters"""
         try:
-            offset = (page - 1) * size
             query = select(RFQ).where(RFQ.org_id == user.org_id)
 
             if status_filter:
@@ -748,25 +746,17 @@ class ProcurementService:
                     )
                 )
 
-            query = query.order_by(desc(RFQ.created_at))
-            query = query.offset(offset).limit(size)
-
-            result = await self.db.execute(query)
-            rfqs = result.scalars().all()
-
-            total_query = select(func.count(RFQ.id)).where(RFQ.org_id == user.org_id)
-            if status_filter:
-                total_query = total_query.where(RFQ.status == status_filter)
-            if search:
-                total_query = total_query.where(
-                    or_(
-                        RFQ.title.ilike(f"%{search}%"),
-                        RFQ.custom_id.ilike(f"%{search}%")
-                    )
-                )
-
-            total_result = await self.db.execute(total_query)
-            total = total_result.scalar() or 0
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=RFQ.created_at,
+                id_column=RFQ.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
+            )
+            rfqs = page_result.items
 
             # Get user names for all RFQs
             rfq_responses = []
@@ -778,11 +768,15 @@ class ProcurementService:
 
             return RFQListResponse(
                 rfqs=rfq_responses,
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size if total > 0 else 0
+                total_pages=page_result.total_pages(size),
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing RFQs: {e}")
             raise HTTPException(
@@ -1063,58 +1057,14 @@ class ProcurementService:
     ) -> str:
         """Upload expense receipt file to S3 or local storage and return URL"""
         try:
-            # Initialize S3 client if credentials are available
-            s3_enabled = all([
-                environment.AWS_ACCESS_KEY_ID,
-                environment.AWS_SECRET_ACCESS_KEY,
-                environment.AWS_S3_BUCKET_NAME
-            ])
-            
-            file_extension = file_name.split('.')[-1] if '.' in file_name else 'jpg'
-            timestamp = int(datetime.utcnow().timestamp())
-            s3_key = f"expense-receipts/{org_id}/{user_id}/{timestamp}.{file_extension}"
-            
-            if s3_enabled:
-                try:
-                    s3_client = boto3.client(
-                        's3',
-                        aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                        aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                        region_name=environment.AWS_S3_REGION or "us-east-1"
-                    )
-                    s3_client.put_object(
-                        Bucket=environment.AWS_S3_BUCKET_NAME,
-                        Key=s3_key,
-                        Body=file_content,
-                        ContentType=file_type
-                    )
-                    region_segment = f".{environment.AWS_S3_REGION}" if environment.AWS_S3_REGION else ""
-                    file_url = f"https://{environment.AWS_S3_BUCKET_NAME}.s3{region_segment}.amazonaws.com/{s3_key}"
-                    logger.info(f"Receipt uploaded to S3: {s3_key}")
-                    return file_url
-                except ClientError as e:
-                    logger.error(f"S3 upload failed: {e}")
-                    # Fallback to local storage
-                    pass
+            prefix = f"expense-receipts/{org_id}/{user_id}" if org_id else "expense-receipts"
+            stored = await get_storage().save(prefix, file_name, file_content, file_type)
+            if stored.url:
+                logger.info(f"Receipt uploaded to storage: {stored.key}")
+                return stored.url
             
-            # Local storage fallback
-            upload_root = os.path.join("uploads", "expense_receipts")
-            os.makedirs(upload_root, exist_ok=True)
-            if org_id:
-                org_dir = os.path.join(upload_root, str(org_id))
-                os.makedirs(org_dir, exist_ok=True)
-                user_dir = os.path.join(org_dir, str(user_id))
-                os.makedirs(user_dir, exist_ok=True)
-                local_path = os.path.join(user_dir, f"{timestamp}.{file_extension}")
-            else:
-                local_path = os.path.join(upload_root, f"{timestamp}.{file_extension}")
-            
-            with open(local_path, "wb") as f:
-                f.write(file_content)
-            
-            file_url = f"/local/expense-receipts/{org_id}/{user_id}/{timestamp}.{file_extension}" if org_id else f"/local/expense-receipts/{timestamp}.{file_extension}"
-            logger.info(f"Receipt stored locally at: {local_path}")
-            return file_url
+            logger.info(f"Receipt stored locally at: {stored.key}")
+            return f"/local/{stored.key}"
             
         except Exception as e:
             logger.error(f"Error uploading expense receipt: {e}")
@@ -1162,11 +1112,12 @@ class ProcurementService:
         page: int = 1,
         size: int = 10,
         status_filter: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact"
     ) -> EmployeeExpenseListResponse:
         """List expenses with pagination and filters"""
         try:
-            offset = (page - 1) * size
             query = select(EmployeeExpense).where(
                 EmployeeExpense.org_id == user.org_id
             )
@@ -1182,27 +1133,17 @@ class ProcurementService:
                     )
                 )
 
-            query = query.order_by(desc(EmployeeExpense.created_at))
-            query = query.offset(offset).limit(size)
-
-            result = await self.db.execute(query)
-            expenses = result.scalars().all()
-
-            total_query = select(func.count(EmployeeExpense.id)).where(
-                EmployeeExpense.org_id == user.org_id
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=EmployeeExpense.created_at,
+                id_column=EmployeeExpense.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
             )
-            if status_filter:
-                total_query = total_query.where(EmployeeExpense.status == status_filter)
-            if search:
-                total_query = total_query.where(
-                    or_(
-                        EmployeeExpense.description.ilike(f"%{search}%"),
-                        EmployeeExpense.custom_id.ilike(f"%{search}%")
-                    )
-                )
-
-            total_result = await self.db.execute(total_query)
-            total = total_result.scalar() or 0
+            expenses = page_result.items
 
             # Get user names for all expenses
             expense_responses = []
@@ -1214,11 +1155,15 @@ class ProcurementService:
 
             return EmployeeExpenseListResponse(
                 expenses=expense_responses,
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size if total > 0 else 0
+                total_pages=page_result.total_pages(size),
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing expenses: {e}")
             raise HTTPException(
@@ -1247,11 +1192,13 @@ class ProcurementService:
             if not expense:
                 return None
 
+            before = expense_contribution(expense)
             update_data = expense_data.dict(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(expense, key, value)
 
             expense.updated_at = datetime.utcnow()
+            await FinanceActualsService(self.db).apply(before, expense_contribution(expense))
             await self.db.flush()
             await self.db.refresh(expense)
 
@@ -1284,6 +1231,7 @@ class ProcurementService:
             if not expense:
                 return None
 
+            before = expense_contribution(expense)
             expense.status = approval_data.status
             expense.updated_at = datetime.utcnow()
 
@@ -1293,6 +1241,7 @@ class ProcurementService:
             elif approval_data.status == ExpenseStatus.REJECTED:
                 expense.rejected_reason = approval_data.rejection_reason
 
+            await FinanceActualsService(self.db).apply(before, expense_contribution(expense))
             await self.db.flush()
             await self.db.refresh(expense)
 
@@ -1324,6 +1273,7 @@ class ProcurementService:
             if not expense:
                 return False
 
+            await FinanceActualsService(self.db).apply(expense_contribution(expense), None)
             await self.db.delete(expense)
             await self.db.flush()
             return True
@@ -1379,6 +1329,7 @@ class ProcurementService:
 
             self.db.add(invoice)
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh([invoice.vendor_id])
             await self.db.refresh(invoice)
 
             logger.info(f"Created invoice {invoice.id}")
@@ -1426,11 +1377,12 @@ class ProcurementService:
         page: int = 1,
         size: int = 10,
         status_filter: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact"
     ) -> VendorInvoiceListResponse:
         """List invoices with pagination and filters"""
         try:
-            offset = (page - 1) * size
             query = select(VendorInvoice).where(
                 VendorInvoice.org_id == user.org_id
             )
@@ -1446,35 +1398,29 @@ class ProcurementService:
                     )
                 )
 
-            query = query.order_by(desc(VendorInvoice.created_at))
-            query = query.offset(offset).limit(size)
-
-            result = await self.db.execute(query)
-            invoices = result.scalars().all()
-
-            total_query = select(func.count(VendorInvoice.id)).where(
-                VendorInvoice.org_id == user.org_id
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=VendorInvoice.created_at,
+                id_column=VendorInvoice.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
             )
-            if status_filter:
-                total_query = total_query.where(VendorInvoice.status == status_filter)
-            if search:
-                total_query = total_query.where(
-                    or_(
-                        VendorInvoice.invoice_number.ilike(f"%{search}%"),
-                        VendorInvoice.vendor_name.ilike(f"%{search}%")
-                    )
-                )
-
-            total_result = await self.db.execute(total_query)
-            total = total_result.scalar() or 0
+            invoices = page_result.items
 
             return VendorInvoiceListResponse(
                 invoices=[VendorInvoiceResponse.model_validate(i) for i in invoices],
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size if total > 0 else 0
+                total_pages=page_result.total_pages(size),
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing invoices: {e}")
             raise HTTPException(
@@ -1503,12 +1449,17 @@ class ProcurementService:
             if not invoice:
                 return None
 
+            actuals = FinanceActualsService(self.db)
+            before = await actuals.invoice_contribution(invoice)
+            previous_vendor_id = invoice.vendor_id
             update_data = invoice_data.dict(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(invoice, key, value)
 
             invoice.updated_at = datetime.utcnow()
+            await actuals.apply(before, await actuals.invoice_contribution(invoice))
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh([previous_vendor_id, invoice.vendor_id])
             await self.db.refresh(invoice)
 
             return VendorInvoiceResponse.model_validate(invoice)
@@ -1539,8 +1490,12 @@ class ProcurementService:
             if not invoice:
                 return False
 
+            actuals = FinanceActualsService(self.db)
+            await actuals.apply(await actuals.invoice_contribution(invoice), None)
+            vendor_id = invoice.vendor_id
             await self.db.delete(invoice)
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh([vendor_id])
             return True
         except Exception as e:
             logger.error(f"Error deleting invoice {invoice_id}: {e}")
@@ -1557,7 +1512,7 @@ class ProcurementService:
         """Extract invoice data from uploaded file using AI"""
         try:
             # Extract text from file
-            text = FileExtractor.extract_text_from_file(file_content, filename)
+            text = await text_extraction.extract(file_content, filename)
             if not text or len(text.strip()) < 10:
                 logger.warning(f"Could not extract text from {filename} or text too short")
                 return {
@@ -1791,7 +1746,7 @@ Rules:
         """Extract receipt data from uploaded file using AI OCR"""
         try:
             # Extract text from file
-            text = FileExtractor.extract_text_from_file(file_content, filename)
+            text = await text_extraction.extract(file_content, filename)
             if not text or len(text.strip()) < 10:
                 logger.warning(f"Could not extract text from {filename} or text too short")
                 return {
@@ -2058,36 +2013,40 @@ Rules:
         user: User,
         page: int = 1,
         size: int = 10,
-        po_id: Optional[UUID] = None
+        po_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact"
     ) -> GRNListResponse:
         """List GRNs with pagination"""
         try:
-            offset = (page - 1) * size
             query = select(GRN).where(GRN.org_id == user.org_id)
 
             if po_id:
                 query = query.where(GRN.po_id == po_id)
 
-            query = query.order_by(desc(GRN.created_at))
-            query = query.offset(offset).limit(size)
-
-            result = await self.db.execute(query)
-            grns = result.scalars().all()
-
-            total_query = select(func.count(GRN.id)).where(GRN.org_id == user.org_id)
-            if po_id:
-                total_query = total_query.where(GRN.po_id == po_id)
-
-            total_result = await self.db.execute(total_query)
-            total = total_result.scalar() or 0
+            page_result = await paginate(
+                self.db,
+                query,
+                sort=GRN.created_at,
+                id_column=GRN.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
+            )
+            grns = page_result.items
 
             return GRNListResponse(
                 grns=[GRNResponse.model_validate(g) for g in grns],
-                total=total,
+                total=page_result.total,
                 page=page,
                 size=size,
-                total_pages=(total + size - 1) // size if total > 0 else 0
+                total_pages=page_result.total_pages(size),
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error listing GRNs: {e}")
             raise HTTPException(
@@ -2189,6 +2148,7 @@ Rules:
 
             self.db.add(milestone)
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh_for_orders([milestone.po_id])
             await self.db.refresh(milestone)
 
             logger.info(f"Created milestone {milestone.id}")
@@ -2242,12 +2202,14 @@ Rules:
             if not milestone:
                 return None
 
+            previous_po_id = milestone.po_id
             update_data = milestone_data.dict(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(milestone, key, value)
 
             milestone.updated_at = datetime.utcnow()
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh_for_orders([previous_po_id, milestone.po_id])
             await self.db.refresh(milestone)
 
             return DeliveryMilestoneResponse.model_validate(milestone)
@@ -2272,8 +2234,10 @@ Rules:
             if not milestone:
                 return False
 
+            po_id = milestone.po_id
             await self.db.delete(milestone)
             await self.db.flush()
+            await VendorScorecardService(self.db).refresh_for_orders([po_id])
             return True
         except Exception as e:
             logger.error(f"Error deleting milestone {milestone_id}: {e}")
@@ -2359,11 +2323,9 @@ Rules:
         org_id: UUID,
         budget_year: str
     ) -> Dict[str, Decimal]:
-        """Get historical spending for a category from finance module and employee expenses"""
+        """Get historical spending for a category from finance module and the monthly actuals table"""
         from app.models.finance_planning import FinanceAnnualBudget, FinanceExpenseLine
-        from app.models.procurement import EmployeeExpense, ExpenseStatus
         from app.models.expense_category import ExpenseCategory
-        from datetime import date
         from decimal import Decimal
         
         current_year = int(budget_year)
@@ -2383,96 +2345,32 @@ Rules:
             return result
         
         category_name = category.name
+        year_keys = {str(last_year): 'actual_last_year', str(current_year): 'actual_current_year'}
         
-        # Get spending from FinanceExpenseLine (finance module) - match by label
-        # Get budget for last year
-        last_year_budget_result = await self.db.execute(
-            select(FinanceAnnualBudget)
+        # Get spending from FinanceExpenseLine (finance module) - match by label, both years in one query
+        finance_lines_result = await self.db.execute(
+            select(FinanceAnnualBudget.budget_year, func.sum(FinanceExpenseLine.target))
+            .join(FinanceExpenseLine, FinanceExpenseLine.budget_id == FinanceAnnualBudget.id)
             .where(
                 and_(
-                    FinanceAnnualBudget.budget_year == str(last_year),
-                    FinanceAnnualBudget.org_id == org_id
+                    FinanceAnnualBudget.org_id == org_id,
+                    FinanceAnnualBudget.budget_year.in_(list(year_keys)),
+                    FinanceExpenseLine.label.ilike(f'%{category_name}%')
                 )
             )
+            .group_by(FinanceAnnualBudget.budget_year)
         )
-        last_budget = last_year_budget_result.scalar_one_or_none()
-        
-        if last_budget:
-            # Get expense lines matching category name
-            expense_lines_result = await self.db.execute(
-                select(func.sum(FinanceExpenseLine.target))
-                .where(
-                    and_(
-                        FinanceExpenseLine.budget_id == last_budget.id,
-                        FinanceExpenseLine.label.ilike(f'%{category_name}%')
-                    )
-                )
-            )
-            last_year_finance_total = expense_lines_result.scalar() or Decimal('0.00')
-            result['actual_last_year'] += Decimal(str(last_year_finance_total))
+        for year, total in finance_lines_result.all():
+            result[year_keys[year]] += Decimal(str(total or 0))
         
-        # Get budget for current year
-        current_year_budget_result = await self.db.execute(
-            select(FinanceAnnualBudget)
-            .where(
-                and_(
-                    FinanceAnnualBudget.budget_year == str(current_year),
-                    FinanceAnnualBudget.org_id == org_id
-                )
-            )
-        )
-        current_budget = current_year_budget_result.scalar_one_or_none()
-        
-        if current_budget:
-            expense_lines_result = await self.db.execute(
-                select(func.sum(FinanceExpenseLine.target))
-                .where(
-                    and_(
-                        FinanceExpenseLine.budget_id == current_budget.id,
-                        FinanceExpenseLine.label.ilike(f'%{category_name}%')
-                    )
-                )
-            )
-            current_year_finance_total = expense_lines_result.scalar() or Decimal('0.00')
-            result['actual_current_year'] += Decimal(str(current_year_finance_total))
-        
-        # Also get from EmployeeExpense table - match by category name
-        last_year_start = date(last_year, 1, 1)
-        last_year_end = date(last_year, 12, 31)
-        current_year_start = date(current_year, 1, 1)
-        current_year_end = date(current_year, 12, 31)
-        
-        # Get expenses for last year matching category
-        last_year_expenses_result = await self.db.execute(
-            select(func.sum(EmployeeExpense.amount))
-            .where(
-                and_(
-                    EmployeeExpense.org_id == org_id,
-                    EmployeeExpense.expense_date >= last_year_start,
-                    EmployeeExpense.expense_date <= last_year_end,
-                    EmployeeExpense.status.in_([ExpenseStatus.APPROVED, ExpenseStatus.REIMBURSED]),
-                    EmployeeExpense.category.ilike(f'%{category_name}%')
-                )
-            )
-        )
-        last_year_expense_total = last_year_expenses_result.scalar() or Decimal('0.00')
-        result['actual_last_year'] += Decimal(str(last_year_expense_total))
-        
-        # Get expenses for current year matching category
-        current_year_expenses_result = await self.db.execute(
-            select(func.sum(EmployeeExpense.amount))
-            .where(
-                and_(
-                    EmployeeExpense.org_id == org_id,
-                    EmployeeExpense.expense_date >= current_year_start,
-                    EmployeeExpense.expense_date <= current_year_end,
-                    EmployeeExpense.status.in_([ExpenseStatus.APPROVED, ExpenseStatus.REIMBURSED]),
-                    EmployeeExpense.category.ilike(f'%{category_name}%')
-                )
-            )
+        # Approved and reimbursed expenses for the category and its subcategories, from the fact table
+        actuals = FinanceActualsService(self.db)
+        category_keys = await actuals.category_tree_keys(category_id)
+        yearly = await actuals.yearly_totals(
+            org_id, category_keys, [last_year, current_year], sources=("expense", "reimbursed")
         )
-        current_year_expense_total = current_year_expenses_result.scalar() or Decimal('0.00')
-        result['actual_current_year'] += Decimal(str(current_year_expense_total))
+        result['actual_last_year'] += yearly[last_year]
+        result['actual_current_year'] += yearly[current_year]
         
         return result
 
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
+import time
 import uuid
 import os
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-import boto3
-from botocore.exceptions import ClientError
 from fastapi import HTTPException, status
 from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -42,11 +41,17 @@ from app.schemas.proposal import (
     ProposalDocumentCreate,
     ProposalApprovalCreate,
 )
+from app.services.resources import get_s3_client
+from app.utils.lazy import lazy_import
+from app.services.id_generator import IDGenerator
 from app.utils.logger import get_logger
+from app.utils.pagination import CountMode, paginate
 
 
 logger = get_logger("proposal_service")
 
+botocore_exceptions = lazy_import("botocore.exceptions")
+
 DEFAULT_APPROVAL_FLOW: List[ProposalApprovalCreate] = [
     ProposalApprovalCreate(stage_name="Business Development Review", required_role="business_development", sequence=0),
     ProposalApprovalCreate(stage_name="Technical Manager Review", required_role="technical_manager", sequence=1),
@@ -60,67 +65,21 @@ class ProposalService:
         self.db = db
 
     async def _generate_proposal_number(self, org_id: uuid.UUID) -> str:
-        from sqlalchemy.exc import OperationalError, InvalidRequestError
-        
         year = datetime.utcnow().year
         prefix = f"PROP-{year}"
-        
-        try:
-            # Query all existing proposal numbers for this org and year, ordered by number
-            # This gives us the highest number currently in use
-            result = await self.db.execute(
-                select(Proposal.proposal_number)
-                .where(
-                    Proposal.org_id == org_id,
-                    Proposal.proposal_number.like(f"{prefix}-%")
-                )
-                .order_by(desc(Proposal.proposal_number))
-                .limit(100)  # Limit to recent proposals for performance
-            )
-            existing_numbers = [row[0] for row in result.fetchall()]
-            
-            # Find the highest sequential number
-            max_number = 0
-            for prop_num in existing_numbers:
-                try:
-                    # Extract number from "PROP-2025-0001" or "PROP-2025-0001-ABC12345" format
-                    parts = prop_num.split('-')
-                    if len(parts) >= 3:
-                        num_str = parts[2]  # Third part is the number (e.g., "0001")
-                        # Parse the 4-digit number
-                        num = int(num_str)
-                        if num > max_number:
-                            max_number = num
-                except (ValueError, IndexError):
-                    continue
-            
-            # Generate next sequential number
-            next_number = max_number + 1
-            
-            # Always add a UUID suffix to ensure uniqueness even with concurrent requests
-            # This prevents race conditions where two requests generate the same sequential number
-            # Format: PROP-2025-0001-ABC12345
-            unique_suffix = str(uuid.uuid4())[:8].upper()
-            proposal_number = f"{prefix}-{next_number:04d}-{unique_suffix}"
-            
-            logger.info(f"Generated proposal number: {proposal_number} for org {org_id}")
-            return proposal_number
-            
-        except (OperationalError, InvalidRequestError) as e:
-            # Transaction/session error - use timestamp + UUID for guaranteed uniqueness
-            logger.warning(f"Database session error generating proposal number: {e}, using timestamp fallback")
-            import time
-            timestamp = str(int(time.time()))[-6:]  # Last 6 digits of timestamp
-            unique_suffix = str(uuid.uuid4())[:8].upper()
-            return f"{prefix}-{timestamp}-{unique_suffix}"
-        except Exception as e:
-            # Any other error - use timestamp + UUID for guaranteed uniqueness
-            logger.warning(f"Unexpected error generating proposal number: {e}, using timestamp fallback")
-            import time
+        # Proposal numbers are unique across organizations, so the per-org number keeps a random suffix
+        # Format: PROP-2025-0001-ABC12345
+        unique_suffix = str(uuid.uuid4())[:8].upper()
+
+        number = await IDGenerator.try_next_value(self.db, org_id, "proposal", f"{prefix}-", scope=str(year))
+        if number is None:
             timestamp = str(int(time.time()))[-6:]  # Last 6 digits of timestamp
-            unique_suffix = str(uuid.uuid4())[:8].upper()
             return f"{prefix}-{timestamp}-{unique_suffix}"
 
+        proposal_number = f"{prefix}-{number:04d}-{unique_suffix}"
+        logger.info(f"Generated proposal number: {proposal_number} for org {org_id}")
+        return proposal_number
+
     async def _get_proposal_for_org(self, proposal_id: uuid.UUID, org_id: uuid.UUID) -> Proposal:
         proposal = await self.db.get(
             Proposal,
@@ -429,6 +388,8 @@ class ProposalService:
         status_filter: Optional[ProposalStatus] = None,
         type_filter: Optional[ProposalType] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = "exact",
     ) -> ProposalListResponse:
         try:
             if not user.org_id:
@@ -442,23 +403,25 @@ class ProposalService:
             if search:
                 # Sanitize search input - limit length and escape special characters
                 search_clean = search.strip()[:100]  # Limit to 100 characters
-                search_like = f"%{search_clean.lower()}%"
+                search_like = f"%{search_clean}%"
+                # ILIKE (not lower() LIKE) so the pg_trgm indexes on these columns apply
                 filters.append(
-                    func.lower(Proposal.title).like(search_like)
-                    | func.lower(Proposal.proposal_number).like(search_like)
-                    | func.lower(Proposal.summary).like(search_like)
+                    Proposal.title.ilike(search_like)
+                    | Proposal.proposal_number.ilike(search_like)
+                    | Proposal.summary.ilike(search_like)
                 )
 
-            query = select(Proposal).where(*filters)
-            count_query = select(func.count(Proposal.id)).where(*filters)
-
-            total_result = await self.db.execute(count_query)
-            total = total_result.scalar() or 0
-
-            result = await self.db.execute(
-                query.order_by(desc(Proposal.created_at)).offset((page - 1) * size).limit(size)
+            page_result = await paginate(
+                self.db,
+                select(Proposal).where(*filters),
+                sort=Proposal.created_at,
+                id_column=Proposal.id,
+                size=size,
+                page=page,
+                cursor=cursor,
+                count=count,
             )
-            proposals = result.scalars().all()
+            proposals = page_result.items
             
             # Validate each proposal and handle validation errors gracefully
             items = []
@@ -501,7 +464,14 @@ class ProposalService:
                     # Skip invalid proposals instead of failing the entire request
                     continue
             
-            return ProposalListResponse(items=items, total=total, page=page, size=size)
+            return ProposalListResponse(
+                items=items,
+                total=page_result.total,
+                page=page,
+                size=size,
+                next_cursor=page_result.next_cursor,
+                total_is_estimate=page_result.total_is_estimate,
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -658,12 +628,7 @@ class ProposalService:
                 s3_key = f"proposals/{proposal_id}/{timestamp}_{safe_s3_name}"
                 
                 # Initialize S3 client
-                s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
-                    region_name=environment.AWS_S3_REGION or "us-east-1"
-                )
+                s3_client = get_s3_client()
                 
                 # Upload to S3
                 s3_client.put_object(
@@ -680,7 +645,7 @@ class ProposalService:
                 storage_type = "s3"
                 
                 logger.info(f"File uploaded to S3: {s3_key}")
-            except ClientError as e:
+            except botocore_exceptions.ClientError as e:
                 logger.warning(f"S3 upload failed ({e}), falling back to local storage")
             except Exception as e:
                 logger.warning(f"S3 upload error ({type(e).__name__}: {e}), falling back to local storage")
@@ -0,0 +1,219 @@
+"""
+Request Profiler
+Per-request latency and SQL accounting:
+
+- every statement is timed through SQLAlchemy cursor events and attributed
+  to the request that ran it (via a context variable)
+- statements are grouped by shape (literals and bind values stripped); a
+  request that runs the same shape more than N_PLUS_ONE_THRESHOLD times is
+  logged as a likely N+1 query
+- requests slower than SLOW_REQUEST_MS are sampled with their query list,
+  logged and kept in a small ring buffer for `/metrics/slow-requests`
+
+Latencies and query counts feed the Prometheus histograms in app.utils.metrics.
+"""
+from __future__ import annotations
+
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.environment import environment
+from app.utils import metrics
+from app.utils.logger import get_logger
+
+logger = get_logger("request_profiler")
+
+SLOW_SAMPLE_BUFFER = 50
+SLOW_SAMPLE_QUERIES = 20
+_MAX_SHAPE_LENGTH = 400
+
+request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Request latency", ["method", "route", "status"]
+)
+request_db_queries = metrics.histogram(
+    "http_request_db_queries",
+    "SQL statements run per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500),
+)
+request_db_seconds = metrics.histogram(
+    "http_request_db_seconds", "Total SQL time per request", ["method", "route"]
+)
+db_query_duration = metrics.histogram("db_query_duration_seconds", "SQL statement latency")
+n_plus_one_total = metrics.counter(
+    "http_request_n_plus_one_total", "Requests that repeated one statement shape too often", ["route"]
+)
+slow_requests_total = metrics.counter(
+    "http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS", ["method", "route"]
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_BIND_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """Statement with literals and bind values replaced by `?` and IN lists collapsed."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _BIND.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _BIND_LIST.sub("?", shape)
+    return shape[:_MAX_SHAPE_LENGTH]
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    route: Optional[str] = None
+    query_count: int = 0
+    query_seconds: float = 0.0
+    # shape -> [count, total seconds]
+    shapes: Dict[str, List[float]] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.query_seconds += seconds
+        entry = self.shapes.get(statement)
+        if entry is None:
+            self.shapes[statement] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def grouped(self) -> List[Tuple[str, int, float]]:
+        """(shape, count, seconds), most expensive first. Raw statements are grouped here, once."""
+        grouped: Dict[str, List[float]] = {}
+        for statement, (count, seconds) in self.shapes.items():
+            entry = grouped.setdefault(statement_shape(statement), [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        return sorted(
+            ((shape, int(count), seconds) for shape, (count, seconds) in grouped.items()),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+_slow_samples: Deque[Dict[str, Any]] = deque(maxlen=SLOW_SAMPLE_BUFFER)
+
+
+def start_profile(method: str, path: str) -> Tuple[RequestProfile, Token]:
+    profile = RequestProfile(method=method, path=path)
+    return profile, _current_profile.set(profile)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+def finish_profile(profile: RequestProfile, token: Token, status_code: int) -> float:
+    """Record the request's metrics, N+1 warnings and slow sample; returns its duration in seconds."""
+    _current_profile.reset(token)
+    duration = time.perf_counter() - profile.started
+    route = profile.route or "unmatched"
+
+    request_duration.observe(duration, method=profile.method, route=route, status=str(status_code))
+    request_db_queries.observe(profile.query_count, method=profile.method, route=route)
+    request_db_seconds.observe(profile.query_seconds, method=profile.method, route=route)
+
+    threshold = environment.N_PLUS_ONE_THRESHOLD
+    grouped: Optional[List[Tuple[str, int, float]]] = None
+    if threshold > 0 and profile.query_count > threshold:
+        grouped = profile.grouped()
+        repeated = [(shape, count) for shape, count, _ in grouped if count > threshold]
+        if repeated:
+            n_plus_one_total.inc(route=route)
+            for shape, count in repeated:
+                logger.warning(
+                    f"Possible N+1 on {profile.method} {route}: statement ran {count} times: {shape}"
+                )
+
+    if duration * 1000 >= environment.SLOW_REQUEST_MS:
+        slow_requests_total.inc(method=profile.method, route=route)
+        if random.random() < environment.SLOW_REQUEST_SAMPLE_RATE:
+            _sample_slow(profile, route, status_code, duration, grouped or profile.grouped())
+    return duration
+
+
+def _sample_slow(
+    profile: RequestProfile,
+    route: str,
+    status_code: int,
+    duration: float,
+    grouped: List[Tuple[str, int, float]],
+) -> None:
+    sample = {
+        "at": datetime.utcnow().isoformat(),
+        "method": profile.method,
+        "path": profile.path,
+        "route": route,
+        "status": status_code,
+        "duration_ms": round(duration * 1000, 1),
+        "query_count": profile.query_count,
+        "query_ms": round(profile.query_seconds * 1000, 1),
+        "queries": [
+            {"statement": shape, "count": count, "total_ms": round(seconds * 1000, 2)}
+            for shape, count, seconds in grouped[:SLOW_SAMPLE_QUERIES]
+        ],
+    }
+    _slow_samples.append(sample)
+    top = "; ".join(f"{q['count']}x {q['total_ms']}ms {q['statement'][:120]}" for q in sample["queries"][:5])
+    logger.warning(
+        f"Slow request {profile.method} {profile.path} ({route}) {sample['duration_ms']}ms, "
+        f"{profile.query_count} queries / {sample['query_ms']}ms SQL. Top: {top}"
+    )
+
+
+def slow_samples() -> List[Dict[str, Any]]:
+    """Most recent slow request samples, newest first."""
+    return list(reversed(_slow_samples))
+
+
+# ---- SQLAlchemy hooks -----------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    db_query_duration.observe(seconds)
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+
+
+def _handle_error(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def install_sql_listeners(engine: AsyncEngine) -> None:
+    """Time every statement the engine runs; safe to call more than once."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,307 @@
+"""
+Resources
+Process-wide clients that are created once when the app starts and closed
+when it stops, instead of per request or per call:
+
+- db: the SQLAlchemy engine; a few pool connections are opened at boot
+- schema: which optional tables/columns exist, introspected once
+- http: one pooled httpx.AsyncClient for outbound calls (Formbricks,
+  scraping, document downloads)
+- storage: the object storage service (its S3 client, when configured)
+- s3: a boto3 S3 client for code that talks to the bucket directly
+- gemini: the Gemini service, built at boot only when WARM_AI_CLIENTS is set
+
+Background services (notification listener, email queue, text extraction
+pool) register shutdown hooks so the process exits cleanly.
+
+Outside the API process (CLI commands, the scheduler worker) nothing calls
+`startup()`; resources are then built on first `get()`.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.environment import environment
+from app.utils import metrics
+from app.utils.lazy import lazy_import
+from app.utils.logger import get_logger
+
+logger = get_logger("resources")
+
+httpx = lazy_import("httpx")
+
+
+async def _maybe_await(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+@dataclass
+class _Resource:
+    name: str
+    factory: Callable[[], Any]
+    close: Optional[Callable[[Any], Any]] = None
+    warm: Optional[Callable[[Any], Awaitable[None]]] = None
+    eager: bool = True
+
+
+class ResourceRegistry:
+    def __init__(self):
+        self._definitions: Dict[str, _Resource] = {}
+        self._instances: Dict[str, Any] = {}
+        self._shutdown_hooks: List[Callable[[], Any]] = []
+        self.startup_ms: Dict[str, float] = {}
+        self.started = False
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], Any]] = None,
+        warm: Optional[Callable[[Any], Awaitable[None]]] = None,
+        eager: bool = True,
+    ) -> None:
+        """Declare a resource; `eager` ones are built (and warmed) in startup()."""
+        self._definitions[name] = _Resource(name, factory, close, warm, eager)
+
+    def on_shutdown(self, hook: Callable[[], Any]) -> None:
+        self._shutdown_hooks.append(hook)
+
+    def get(self, name: str) -> Any:
+        """The resource instance, built now if startup() has not built it."""
+        if name in self._instances:
+            return self._instances[name]
+        definition = self._definitions[name]
+        instance = definition.factory()
+        self._instances[name] = instance
+        return instance
+
+    async def startup(self) -> None:
+        for definition in self._definitions.values():
+            if not definition.eager or definition.name in self._instances:
+                continue
+            started = time.perf_counter()
+            try:
+                instance = definition.factory()
+                self._instances[definition.name] = instance
+                if definition.warm is not None and instance is not None:
+                    await definition.warm(instance)
+            except Exception as e:
+                # A broken optional integration must not keep the API from starting
+                logger.error(f"Failed to start resource '{definition.name}': {e}")
+                continue
+            self.startup_ms[definition.name] = round((time.perf_counter() - started) * 1000, 1)
+        self.started = True
+        logger.info(f"Resources ready: {self.startup_ms}")
+
+    async def shutdown(self) -> None:
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                await _maybe_await(hook())
+            except Exception as e:
+                logger.warning(f"Shutdown hook {getattr(hook, '__qualname__', hook)} failed: {e}")
+        for name in reversed(list(self._instances)):
+            definition = self._definitions[name]
+            instance = self._instances.pop(name)
+            if definition.close is None or instance is None:
+                continue
+            try:
+                await _maybe_await(definition.close(instance))
+            except Exception as e:
+                logger.warning(f"Failed to close resource '{name}': {e}")
+        self.started = False
+        logger.info("Resources closed")
+
+    @asynccontextmanager
+    async def lifespan(self, app: Any) -> AsyncIterator[None]:
+        await self.startup()
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"ready": name in self._instances, "startup_ms": self.startup_ms.get(name)}
+            for name in self._definitions
+        }
+
+
+# ---- resource definitions -------------------------------------------------
+
+def _db_engine():
+    from app.db.session import engine
+
+    return engine
+
+
+async def _warm_db(engine) -> None:
+    """Open a few pool connections now so the first requests don't pay for connecting."""
+    from sqlalchemy import text
+
+    async def _ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(max(environment.DB_POOL_WARM_CONNECTIONS, 0))))
+
+
+async def _dispose_engine(engine) -> None:
+    await engine.dispose()
+
+
+def _build_http_client():
+    return httpx.AsyncClient(
+        timeout=environment.HTTP_CLIENT_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=environment.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=max(environment.HTTP_CLIENT_MAX_CONNECTIONS // 5, 1),
+        ),
+    )
+
+
+async def _close_http_client(client) -> None:
+    await client.aclose()
+
+
+def _s3_configured() -> bool:
+    return all([
+        environment.AWS_ACCESS_KEY_ID,
+        environment.AWS_SECRET_ACCESS_KEY,
+        environment.AWS_S3_BUCKET_NAME,
+    ])
+
+
+def _schema_capabilities():
+    from app.services.schema_capabilities import schema_capabilities
+
+    return schema_capabilities
+
+
+async def _load_schema_capabilities(capabilities) -> None:
+    await capabilities.load()
+
+
+def _build_s3_client():
+    if not _s3_configured():
+        return None
+    import boto3
+
+    # boto3 clients are thread-safe and keep their own connection pool
+    return boto3.client(
+        "s3",
+        aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
+        region_name=environment.AWS_S3_REGION or "us-east-1",
+    )
+
+
+def _build_storage():
+    from app.services.storage import get_storage
+
+    return get_storage()
+
+
+def _build_gemini():
+    from app.services.gemini_service import gemini_service
+
+    return gemini_service.get()
+
+
+async def _stop_notification_bus() -> None:
+    from app.services.notification_events import notification_bus
+
+    await notification_bus.close()
+
+
+async def _drain_email_queue() -> None:
+    from app.services.email_queue import email_queue
+
+    try:
+        await asyncio.wait_for(email_queue.join(), timeout=10)
+    except asyncio.TimeoutError:
+        logger.warning(f"Email queue not drained at shutdown: {email_queue.stats()}")
+
+
+def _stop_password_hashing() -> None:
+    from app.services.password_hashing import password_hashing
+
+    password_hashing.shutdown()
+
+
+def _stop_text_extraction() -> None:
+    from app.services.text_extraction import text_extraction
+
+    text_extraction.shutdown()
+
+
+resources = ResourceRegistry()
+resources.register("db", _db_engine, close=_dispose_engine, warm=_warm_db)
+resources.register("schema", _schema_capabilities, warm=_load_schema_capabilities)
+resources.register("http", _build_http_client, close=_close_http_client)
+resources.register("storage", _build_storage)
+resources.register("s3", _build_s3_client, eager=_s3_configured())
+resources.register("gemini", _build_gemini, eager=environment.WARM_AI_CLIENTS)
+resources.on_shutdown(_stop_password_hashing)
+resources.on_shutdown(_stop_text_extraction)
+resources.on_shutdown(_drain_email_queue)
+resources.on_shutdown(_stop_notification_bus)
+
+
+def get_http_client():
+    """Shared pooled httpx.AsyncClient; pass per-call headers/timeouts to its methods."""
+    return resources.get("http")
+
+
+@asynccontextmanager
+async def http_session() -> AsyncIterator[Any]:
+    """`async with http_session() as client:` borrows the shared client without closing it."""
+    yield get_http_client()
+
+
+def get_s3_client():
+    """Shared boto3 S3 client, or None when S3 credentials are not configured."""
+    return resources.get("s3")
+
+
+# ---- gauges ---------------------------------------------------------------
+
+def _db_pool_stats() -> Dict[tuple, float]:
+    from app.db.session import engine
+
+    pool = engine.pool
+    stats = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        if reader is not None:
+            stats[(name,)] = float(reader())
+    return stats
+
+
+def _background_service_stats() -> Dict[tuple, float]:
+    from app.services.email_queue import email_queue
+    from app.services.notification_events import notification_bus
+    from app.services.password_hashing import password_hashing
+    from app.services.text_extraction import text_extraction
+
+    stats = {}
+    for service, values in (
+        ("email_queue", email_queue.stats()),
+        ("notification_bus", notification_bus.stats()),
+        ("password_hashing", password_hashing.stats()),
+        ("text_extraction", text_extraction.stats()),
+    ):
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stats[(service, key)] = float(value)
+    return stats
+
+
+metrics.gauge("db_pool_connections", "SQLAlchemy pool state", _db_pool_stats, ["state"])
+metrics.gauge("app_background_service", "Background service counters", _background_service_stats, ["service", "stat"])
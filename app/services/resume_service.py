@@ -1,21 +1,23 @@
 import logging
 import os
-import boto3
-from botocore.exceptions import ClientError
 from typing import Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime
-import PyPDF2
 import io
-from docx import Document
 import asyncio
 
 from app.models.employee import Resume, Employee, ResumeStatus
 from app.schemas.employee import ResumeResponse, ResumeAnalysisResponse
 from app.services.gemini_service import gemini_service
+from app.utils.lazy import deferred, lazy_import
 
 logger = logging.getLogger(__name__)
 
+boto3 = lazy_import("boto3")
+botocore_exceptions = lazy_import("botocore.exceptions")
+PyPDF2 = lazy_import("PyPDF2")
+docx = lazy_import("docx")
+
 
 class ResumeService:
     """Service for resume upload and AI parsing"""
@@ -66,7 +68,7 @@ class ResumeService:
                     )
                     file_url = f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
                     logger.info(f"Resume uploaded to S3: {s3_key}")
-                except ClientError as e:
+                except botocore_exceptions.ClientError as e:
                     logger.error(f"S3 upload failed: {e}")
                     # Fallback to local storage indication
                     file_url = f"/local/resumes/{employee_id}/{file_name}"
@@ -126,7 +128,7 @@ class ResumeService:
             await Resume.update(resume_id, status=ResumeStatus.PARSING.value)
 
             # Extract text based on file type
-            resume_text = self._extract_text_from_file(file_content, file_type)
+            resume_text = await asyncio.to_thread(self._extract_text_from_file, file_content, file_type)
 
             if not resume_text:
                 raise ValueError("Could not extract text from resume")
@@ -202,7 +204,7 @@ class ResumeService:
         """Extract text from DOCX file"""
         try:
             doc_file = io.BytesIO(file_content)
-            doc = Document(doc_file)
+            doc = docx.Document(doc_file)
             
             text = ""
             for paragraph in doc.paragraphs:
@@ -243,5 +245,5 @@ class ResumeService:
 
 
 # Global instance
-resume_service = ResumeService()
+resume_service = deferred(ResumeService)
 
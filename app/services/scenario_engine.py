@@ -0,0 +1,237 @@
+"""
+Scenario Engine
+Projects planning scenarios as NumPy arrays instead of row by row:
+
+- project: every scenario x year x business unit in one pass
+- sensitivity: final-year profit and margin over a grid of revenue/expense
+  growth shifts (percentage points added to every year's rate)
+- simulate: Monte-Carlo draws of correlated revenue and expense growth,
+  reduced to per-year percentiles and probabilities; individual draws are
+  never kept
+
+Growth rates are annual percentages. Year 1 applies the first rate to the
+base year, year 2 compounds the second rate on top, and so on.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_DRAWS = 20000
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+@dataclass
+class ProjectionInputs:
+    scenario_keys: List[str]
+    unit_names: List[str]
+    start_year: int
+    base_revenue: np.ndarray  # (U,)
+    base_expenses: np.ndarray  # (U,)
+    revenue_growth: np.ndarray  # (S, Y) percent
+    expense_growth: np.ndarray  # (S, Y) percent
+    unit_offsets: np.ndarray  # (U,) percentage points added to a unit's revenue growth
+
+    @property
+    def years(self) -> List[int]:
+        return [self.start_year + i for i in range(self.revenue_growth.shape[1])]
+
+
+@dataclass
+class ProjectionResult:
+    inputs: ProjectionInputs
+    revenue: np.ndarray  # (S, Y, U)
+    expenses: np.ndarray  # (S, Y, U)
+
+    @property
+    def total_revenue(self) -> np.ndarray:
+        return self.revenue.sum(axis=-1)
+
+    @property
+    def total_expenses(self) -> np.ndarray:
+        return self.expenses.sum(axis=-1)
+
+    @property
+    def total_profit(self) -> np.ndarray:
+        return self.total_revenue - self.total_expenses
+
+    @property
+    def margin_percent(self) -> np.ndarray:
+        return _margin(self.total_revenue, self.total_profit)
+
+    def rows(self, scenario_index: int) -> List[Dict[str, Any]]:
+        """Per-year totals of one scenario, shaped like finance_projections rows."""
+        revenue, expenses = self.total_revenue[scenario_index], self.total_expenses[scenario_index]
+        profit, margin = self.total_profit[scenario_index], self.margin_percent[scenario_index]
+        return [
+            {
+                "year": year,
+                "revenue": round(float(revenue[i]), 2),
+                "expenses": round(float(expenses[i]), 2),
+                "profit": round(float(profit[i]), 2),
+                "margin_percent": round(float(margin[i]), 2),
+            }
+            for i, year in enumerate(self.inputs.years)
+        ]
+
+
+def _margin(revenue: np.ndarray, profit: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(revenue > 0, profit / revenue * 100, 0.0)
+
+
+def _fit_rates(rates: Sequence[float], years: int) -> List[float]:
+    """Pad a scenario's rate list to `years` by repeating its last rate (or truncate it)."""
+    values = [float(rate) for rate in rates] or [0.0]
+    return (values + [values[-1]] * years)[:years]
+
+
+def _compound(growth_percent: np.ndarray) -> np.ndarray:
+    """Cumulative growth factors along the last (year) axis."""
+    return np.cumprod(1 + growth_percent / 100, axis=-1)
+
+
+def build_inputs(
+    scenarios: Sequence[Tuple[str, Sequence[float]]],
+    years: int,
+    start_year: int,
+    base_revenue: Sequence[float],
+    base_expenses: Sequence[float],
+    unit_names: Optional[Sequence[str]] = None,
+    expense_growth_ratio: float = 0.75,
+    expense_growth: Optional[Dict[str, Sequence[float]]] = None,
+    unit_offsets: Optional[Sequence[float]] = None,
+) -> ProjectionInputs:
+    """
+    Assemble engine inputs from (scenario key, revenue growth rates) pairs.
+    Expense growth defaults to `expense_growth_ratio` x revenue growth unless a
+    scenario has explicit rates in `expense_growth`.
+    """
+    if not scenarios:
+        raise ValueError("At least one scenario is required")
+    if years < 1:
+        raise ValueError("Projection needs at least one year")
+    revenue = np.asarray(base_revenue, dtype=float)
+    expenses = np.asarray(base_expenses, dtype=float)
+    if revenue.shape != expenses.shape or revenue.ndim != 1 or len(revenue) == 0:
+        raise ValueError("Base revenue and expenses need one value per business unit")
+
+    revenue_growth = np.array([_fit_rates(rates, years) for _, rates in scenarios])
+    expense_growth = expense_growth or {}
+    expense_rows = [
+        _fit_rates(expense_growth[key], years) if key in expense_growth else list(revenue_growth[i] * expense_growth_ratio)
+        for i, (key, _) in enumerate(scenarios)
+    ]
+    offsets = np.zeros(len(revenue)) if unit_offsets is None else np.asarray(unit_offsets, dtype=float)
+    if offsets.shape != revenue.shape:
+        raise ValueError("Unit growth offsets need one value per business unit")
+
+    return ProjectionInputs(
+        scenario_keys=[key for key, _ in scenarios],
+        unit_names=list(unit_names) if unit_names else [f"Unit {i + 1}" for i in range(len(revenue))],
+        start_year=start_year,
+        base_revenue=revenue,
+        base_expenses=expenses,
+        revenue_growth=revenue_growth,
+        expense_growth=np.array(expense_rows, dtype=float),
+        unit_offsets=offsets,
+    )
+
+
+def project(inputs: ProjectionInputs) -> ProjectionResult:
+    """Deterministic projection of every scenario, year and business unit."""
+    # (S, Y, 1) + (U,) -> (S, Y, U), compounded over the year axis
+    revenue_rates = inputs.revenue_growth[:, :, None] + inputs.unit_offsets
+    revenue = inputs.base_revenue * np.cumprod(1 + revenue_rates / 100, axis=1)
+    expenses = inputs.base_expenses * _compound(inputs.expense_growth)[:, :, None]
+    return ProjectionResult(inputs=inputs, revenue=revenue, expenses=expenses)
+
+
+def sensitivity(
+    inputs: ProjectionInputs,
+    revenue_shifts: Sequence[float],
+    expense_shifts: Sequence[float],
+) -> Dict[str, np.ndarray]:
+    """
+    Final-year profit and margin for every scenario x revenue shift x expense
+    shift, each shape (S, R, E).
+    """
+    dr = np.asarray(revenue_shifts, dtype=float)
+    de = np.asarray(expense_shifts, dtype=float)
+    # Revenue: (S, R, Y, U); only the final year is kept
+    revenue_rates = inputs.revenue_growth[:, None, :, None] + dr[None, :, None, None] + inputs.unit_offsets
+    revenue = (inputs.base_revenue * np.prod(1 + revenue_rates / 100, axis=2)).sum(axis=-1)  # (S, R)
+    expense_rates = inputs.expense_growth[:, None, :] + de[None, :, None]
+    expenses = inputs.base_expenses.sum() * np.prod(1 + expense_rates / 100, axis=-1)  # (S, E)
+    profit = revenue[:, :, None] - expenses[:, None, :]
+    return {
+        "revenue": revenue,
+        "expenses": expenses,
+        "profit": profit,
+        "margin_percent": _margin(np.broadcast_to(revenue[:, :, None], profit.shape), profit),
+    }
+
+
+def _summarize(values: np.ndarray, percentiles: Sequence[int]) -> Dict[str, Any]:
+    """Mean and percentiles over the draw axis (0) of a (D, Y) or (D,) array."""
+    summary = {"mean": np.round(values.mean(axis=0), 2).tolist()}
+    for p, row in zip(percentiles, np.percentile(values, percentiles, axis=0)):
+        summary[f"p{p}"] = np.round(row, 2).tolist()
+    return summary
+
+
+def simulate(
+    inputs: ProjectionInputs,
+    draws: int = 5000,
+    revenue_volatility: float = 3.0,
+    expense_volatility: float = 1.5,
+    correlation: float = 0.5,
+    seed: Optional[int] = None,
+    percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+    targets: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Monte-Carlo projection: each draw perturbs every year's revenue and expense
+    growth with normal shocks (standard deviations in percentage points,
+    correlated by `correlation`). Returns one summary per scenario; `targets`
+    optionally gives a final-year profit per scenario whose attainment
+    probability is reported.
+    """
+    if not 1 <= draws <= MAX_DRAWS:
+        raise ValueError(f"draws must be between 1 and {MAX_DRAWS}")
+    if not -1 <= correlation <= 1:
+        raise ValueError("correlation must be between -1 and 1")
+
+    rng = np.random.default_rng(seed)
+    S, Y = inputs.revenue_growth.shape
+    z_revenue = rng.standard_normal((draws, S, Y))
+    z_expense = correlation * z_revenue + np.sqrt(1 - correlation ** 2) * rng.standard_normal((draws, S, Y))
+
+    revenue_rates = inputs.revenue_growth + revenue_volatility * z_revenue  # (D, S, Y)
+    expense_rates = inputs.expense_growth + expense_volatility * z_expense
+    # Unit offsets shift each unit's rate; summing units after compounding keeps the mix exact
+    unit_factors = np.cumprod(1 + (revenue_rates[..., None] + inputs.unit_offsets) / 100, axis=2)  # (D, S, Y, U)
+    revenue = (inputs.base_revenue * unit_factors).sum(axis=-1)
+    expenses = inputs.base_expenses.sum() * _compound(expense_rates)
+    profit = revenue - expenses
+    margin = _margin(revenue, profit)
+
+    summaries = []
+    for s, key in enumerate(inputs.scenario_keys):
+        summary: Dict[str, Any] = {
+            "scenario_key": key,
+            "years": inputs.years,
+            "revenue": _summarize(revenue[:, s], percentiles),
+            "expenses": _summarize(expenses[:, s], percentiles),
+            "profit": _summarize(profit[:, s], percentiles),
+            "margin_percent": _summarize(margin[:, s], percentiles),
+            "probability_of_loss": np.round((profit[:, s] < 0).mean(axis=0), 4).tolist(),
+            "cumulative_profit": _summarize(profit[:, s].sum(axis=1), percentiles),
+        }
+        if targets is not None and targets[s] is not None:
+            summary["target_profit"] = round(float(targets[s]), 2)
+            summary["probability_of_target"] = round(float((profit[:, s, -1] >= targets[s]).mean()), 4)
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,266 @@
+"""
+Scenario Projection
+Loads planning scenarios, the planning configuration and the latest budget's
+business units into the scenario engine, and stores what comes out:
+
+- recalculated projections replace `finance_projections` rows
+- sensitivity grids are returned, not stored
+- Monte-Carlo runs keep one summary row per scenario in
+  `finance_scenario_simulations`
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.finance_planning import (
+    FinanceAnnualBudget,
+    FinancePlanningConfig,
+    FinancePlanningScenario,
+    FinanceProjection,
+    FinanceScenarioSimulation,
+)
+from app.schemas.finance import (
+    ScenarioProjectionParams,
+    ScenarioSensitivityCell,
+    ScenarioSensitivityRequest,
+    ScenarioSensitivityResponse,
+    ScenarioSensitivityResult,
+    ScenarioSimulationRequest,
+    ScenarioSimulationSummary,
+)
+from app.services import scenario_engine
+from app.utils.logger import get_logger
+
+logger = get_logger("scenario_projection")
+
+# Same defaults get_scenarios_from_db reports when no planning config exists
+DEFAULT_PLANNING_YEARS = 3
+DEFAULT_BASE_REVENUE = 5_000_000.0
+DEFAULT_BASE_EXPENSES = 4_000_000.0
+
+
+async def _load_scenarios(
+    db: AsyncSession,
+    scenario_keys: Optional[Sequence[str]] = None,
+) -> List[FinancePlanningScenario]:
+    query = select(FinancePlanningScenario).order_by(FinancePlanningScenario.id)
+    if scenario_keys:
+        query = query.where(FinancePlanningScenario.scenario_key.in_(list(scenario_keys)))
+    result = await db.execute(query)
+    scenarios = list(result.scalars().all())
+    if not scenarios:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No planning scenarios found")
+    return scenarios
+
+
+def split_base_year(
+    units: Sequence[Any],
+    base_revenue: float,
+    base_expenses: float,
+) -> Tuple[List[str], List[float], List[float]]:
+    """
+    Split the base year across business units by their share of budgeted
+    revenue and expense (revenue share when nothing is budgeted as expense);
+    one "Total" unit when no unit has revenue.
+    """
+    units = [unit for unit in units if (unit.revenue or 0) > 0]
+    total_revenue = sum(unit.revenue for unit in units)
+    total_expense = sum(unit.expense or 0 for unit in units)
+    if not units or total_revenue <= 0:
+        return ["Total"], [base_revenue], [base_expenses]
+    return (
+        [unit.name for unit in units],
+        [base_revenue * unit.revenue / total_revenue for unit in units],
+        [
+            base_expenses * ((unit.expense or 0) / total_expense if total_expense > 0 else unit.revenue / total_revenue)
+            for unit in units
+        ],
+    )
+
+
+async def _base_units(
+    db: AsyncSession,
+    base_revenue: float,
+    base_expenses: float,
+    use_business_units: bool,
+) -> Tuple[List[str], List[float], List[float]]:
+    """Base year per business unit of the latest budget; one "Total" unit otherwise."""
+    units: List[Any] = []
+    if use_business_units:
+        result = await db.execute(
+            select(FinanceAnnualBudget)
+            .options(selectinload(FinanceAnnualBudget.business_units))
+            .order_by(FinanceAnnualBudget.budget_year.desc(), FinanceAnnualBudget.id.desc())
+            .limit(1)
+        )
+        budget = result.scalar_one_or_none()
+        units = list(budget.business_units) if budget else []
+    return split_base_year(units, base_revenue, base_expenses)
+
+
+async def load_projection_inputs(
+    db: AsyncSession,
+    params: ScenarioProjectionParams,
+    scenario_keys: Optional[Sequence[str]] = None,
+) -> Tuple[List[FinancePlanningScenario], scenario_engine.ProjectionInputs]:
+    scenarios = await _load_scenarios(db, scenario_keys)
+
+    config_result = await db.execute(select(FinancePlanningConfig).limit(1))
+    config = config_result.scalar_one_or_none()
+    years = (config.planning_period_years if config else None) or DEFAULT_PLANNING_YEARS
+    base_revenue = (config.base_year_revenue if config else None) or DEFAULT_BASE_REVENUE
+    base_expenses = (config.base_year_expenses if config else None) or DEFAULT_BASE_EXPENSES
+
+    unit_names, unit_revenue, unit_expenses = await _base_units(
+        db, base_revenue, base_expenses, params.use_business_units
+    )
+    inputs = scenario_engine.build_inputs(
+        scenarios=[
+            (scenario.scenario_key, scenario.growth_rates if isinstance(scenario.growth_rates, list) else [])
+            for scenario in scenarios
+        ],
+        years=years,
+        start_year=date.today().year + 1,
+        base_revenue=unit_revenue,
+        base_expenses=unit_expenses,
+        unit_names=unit_names,
+        expense_growth_ratio=params.expense_growth_ratio,
+        expense_growth=params.expense_growth_rates,
+    )
+    return scenarios, inputs
+
+
+async def recalculate_projections(
+    db: AsyncSession,
+    params: Optional[ScenarioProjectionParams] = None,
+    scenario_keys: Optional[Sequence[str]] = None,
+) -> scenario_engine.ProjectionResult:
+    """Recompute and replace the projection rows of the given scenarios (default: all)."""
+    scenarios, inputs = await load_projection_inputs(db, params or ScenarioProjectionParams(), scenario_keys)
+    result = scenario_engine.project(inputs)
+
+    scenario_ids = [scenario.id for scenario in scenarios]
+    await db.execute(delete(FinanceProjection).where(FinanceProjection.scenario_id.in_(scenario_ids)))
+    rows = [
+        {"scenario_id": scenario.id, **row}
+        for index, scenario in enumerate(scenarios)
+        for row in result.rows(index)
+    ]
+    await db.execute(insert(FinanceProjection), rows)
+    logger.info(f"Recalculated {len(rows)} projection rows for {len(scenarios)} scenarios")
+    return result
+
+
+async def run_sensitivity(
+    db: AsyncSession,
+    params: ScenarioSensitivityRequest,
+) -> ScenarioSensitivityResponse:
+    """Final-year profit and margin for each scenario over a grid of growth shifts."""
+    _, inputs = await load_projection_inputs(db, params)
+    grid = scenario_engine.sensitivity(inputs, params.revenue_shifts, params.expense_shifts)
+    final_year = inputs.years[-1]
+    results = []
+    for s, key in enumerate(inputs.scenario_keys):
+        cells = [
+            ScenarioSensitivityCell(
+                revenue_shift=revenue_shift,
+                expense_shift=expense_shift,
+                revenue=round(float(grid["revenue"][s, r]), 2),
+                expenses=round(float(grid["expenses"][s, e]), 2),
+                profit=round(float(grid["profit"][s, r, e]), 2),
+                margin_percent=round(float(grid["margin_percent"][s, r, e]), 2),
+            )
+            for r, revenue_shift in enumerate(params.revenue_shifts)
+            for e, expense_shift in enumerate(params.expense_shifts)
+        ]
+        results.append(ScenarioSensitivityResult(scenario_key=key, year=final_year, cells=cells))
+    return ScenarioSensitivityResponse(results=results)
+
+
+def _simulation_summary(row: FinanceScenarioSimulation, scenario_key: str) -> ScenarioSimulationSummary:
+    return ScenarioSimulationSummary(
+        id=row.id,
+        scenario_key=scenario_key,
+        draws=row.draws,
+        seed=row.seed,
+        parameters=row.parameters,
+        summary=row.summary,
+        created_at=row.created_at,
+    )
+
+
+async def run_simulation(
+    db: AsyncSession,
+    params: ScenarioSimulationRequest,
+    user_id: Optional[uuid.UUID] = None,
+) -> List[ScenarioSimulationSummary]:
+    """
+    Monte-Carlo run over the requested scenarios. The attainment target for a
+    scenario is its deterministic final-year profit times its bonus threshold.
+    """
+    scenarios, inputs = await load_projection_inputs(db, params, params.scenario_keys)
+    deterministic = scenario_engine.project(inputs).total_profit[:, -1]
+    targets = [
+        float(deterministic[s]) * (scenario.bonus_threshold or 100.0) / 100
+        for s, scenario in enumerate(scenarios)
+    ]
+    # A few hundred milliseconds at the draw cap; keep it off the event loop
+    summaries = await asyncio.to_thread(
+        scenario_engine.simulate,
+        inputs,
+        draws=params.draws,
+        revenue_volatility=params.revenue_volatility,
+        expense_volatility=params.expense_volatility,
+        correlation=params.correlation,
+        seed=params.seed,
+        targets=targets,
+    )
+
+    parameters = {
+        "revenue_volatility": params.revenue_volatility,
+        "expense_volatility": params.expense_volatility,
+        "correlation": params.correlation,
+        "expense_growth_ratio": params.expense_growth_ratio,
+        "business_units": inputs.unit_names,
+        "base_revenue": round(float(inputs.base_revenue.sum()), 2),
+        "base_expenses": round(float(inputs.base_expenses.sum()), 2),
+    }
+    created_at = datetime.utcnow()  # set here so the rows can be returned without a refresh
+    rows = [
+        FinanceScenarioSimulation(
+            scenario_id=scenario.id,
+            draws=params.draws,
+            seed=params.seed,
+            parameters={**parameters, "growth_rates": inputs.revenue_growth[s].tolist()},
+            summary=summary,
+            created_by=user_id,
+            created_at=created_at,
+        )
+        for s, (scenario, summary) in enumerate(zip(scenarios, summaries))
+    ]
+    db.add_all(rows)
+    await db.flush()
+    return [_simulation_summary(row, scenario.scenario_key) for row, scenario in zip(rows, scenarios)]
+
+
+async def latest_simulations(db: AsyncSession) -> List[ScenarioSimulationSummary]:
+    """Most recent simulation summary of each scenario."""
+    result = await db.execute(
+        select(FinanceScenarioSimulation, FinancePlanningScenario.scenario_key)
+        .join(FinancePlanningScenario, FinancePlanningScenario.id == FinanceScenarioSimulation.scenario_id)
+        .distinct(FinanceScenarioSimulation.scenario_id)
+        .order_by(
+            FinanceScenarioSimulation.scenario_id,
+            FinanceScenarioSimulation.created_at.desc(),
+            FinanceScenarioSimulation.id.desc(),
+        )
+    )
+    return [_simulation_summary(row, scenario_key) for row, scenario_key in result.all()]
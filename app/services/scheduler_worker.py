@@ -0,0 +1,320 @@
+"""
+Scheduler Worker
+Processes queued opportunity scheduler runs outside of HTTP requests.
+
+The API only enqueues an `OpportunitySchedulerRun`; a worker (`python manage.py
+scheduler-worker`) leases queued runs with `SELECT ... FOR UPDATE SKIP LOCKED`
+and works through due sources and agents one at a time:
+
+1. claim the next due item in a short transaction (row lock + next_run_at lease)
+2. fetch the page with no transaction or pooled connection held
+3. store the results in a second short transaction
+4. for sources, enrich the stored drafts' detail pages (app/services/enrichment_pipeline.py),
+   writing each draft back in its own transaction as its result arrives
+
+Several workers can run side by side; a run or item whose lease expires (worker
+crash) is picked up again by the next worker.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+
+from app.db.session import get_transaction
+from app.environment import environment
+from app.models.opportunity_source import (
+    OpportunityAgent,
+    OpportunitySchedulerRun,
+    OpportunitySource,
+    SchedulerRunKind,
+    SchedulerRunStatus,
+)
+from app.services.enrichment_pipeline import enrich_temp_opportunities
+from app.services.opportunity_scheduler import OpportunitySchedulerService
+from app.services.source_templates import SourceTemplateService
+from app.utils.logger import get_logger
+from app.utils.scraper import process_urls
+
+logger = get_logger("scheduler_worker")
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when another worker has taken over the run this worker was processing."""
+
+
+async def enqueue_scheduler_run(
+    kind: SchedulerRunKind, requested_by: Optional[uuid.UUID] = None
+) -> OpportunitySchedulerRun:
+    """Queue a run in its own transaction so a worker can see it immediately."""
+    async with get_transaction() as db:
+        run = OpportunitySchedulerRun(
+            id=uuid.uuid4(),
+            kind=kind,
+            status=SchedulerRunStatus.queued,
+            requested_by=requested_by,
+            created_at=datetime.utcnow(),
+        )
+        db.add(run)
+        await db.flush()
+    logger.info(f"Queued scheduler run {run.id} ({kind.value})")
+    return run
+
+
+def _empty_results(kind: SchedulerRunKind) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    if kind in (SchedulerRunKind.sources, SchedulerRunKind.all):
+        results["sources"] = {"sources_processed": 0, "total_opportunities_created": 0, "errors": []}
+    if kind in (SchedulerRunKind.agents, SchedulerRunKind.all):
+        results["agents"] = {"agents_processed": 0, "total_opportunities_created": 0, "errors": []}
+    return results
+
+
+async def _fetch(
+    url: str, template: Optional[Dict[str, Any]] = None, learn: bool = False, enrich: bool = True
+) -> List[Dict[str, Any]]:
+    try:
+        return await process_urls([url], extraction_template=template, learn_templates=learn, enrich_details=enrich)
+    except Exception as e:
+        logger.error(f"Error fetching {url}: {e}")
+        return [{"error": str(e)}]
+
+
+async def _release_claim(model: Any, item_id: uuid.UUID) -> None:
+    """Make a claimed source or agent due again, so the next run retries it instead of waiting out the lease."""
+    try:
+        async with get_transaction() as db:
+            await db.execute(update(model).where(model.id == item_id).values(next_run_at=datetime.utcnow()))
+    except Exception as e:
+        logger.error(f"Error releasing claim on {model.__name__} {item_id}: {e}")
+
+
+class SchedulerWorker:
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        lease_seconds: Optional[int] = None,
+        poll_interval: float = 15.0,
+        schedule: bool = True,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease = timedelta(seconds=lease_seconds or environment.SCHEDULER_LEASE_SECONDS)
+        self.poll_interval = poll_interval
+        self.schedule = schedule
+        self._stopping = False
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    # ---- run leasing -----------------------------------------------------
+
+    async def claim_run(self) -> Optional[Tuple[uuid.UUID, SchedulerRunKind]]:
+        """Lease the oldest queued run, or a running one whose worker's lease expired."""
+        async with get_transaction() as db:
+            now = datetime.utcnow()
+            stmt = (
+                select(OpportunitySchedulerRun)
+                .where(
+                    or_(
+                        OpportunitySchedulerRun.status == SchedulerRunStatus.queued,
+                        (OpportunitySchedulerRun.status == SchedulerRunStatus.running)
+                        & (OpportunitySchedulerRun.lease_expires_at < now),
+                    )
+                )
+                .order_by(OpportunitySchedulerRun.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            run = (await db.execute(stmt)).scalar_one_or_none()
+            if run is None:
+                return None
+
+            run.status = SchedulerRunStatus.running
+            run.lease_owner = self.worker_id
+            run.lease_expires_at = now + self.lease
+            run.started_at = run.started_at or now
+            return run.id, run.kind
+
+    async def _heartbeat(self, run_id: uuid.UUID, results: Dict[str, Any]) -> None:
+        async with get_transaction() as db:
+            updated = await db.execute(
+                update(OpportunitySchedulerRun)
+                .where(
+                    OpportunitySchedulerRun.id == run_id,
+                    OpportunitySchedulerRun.lease_owner == self.worker_id,
+                )
+                .values(results=results, lease_expires_at=datetime.utcnow() + self.lease)
+            )
+            if updated.rowcount == 0:
+                raise LeaseLostError(f"Scheduler run {run_id} was taken over by another worker")
+
+    async def _finish(
+        self, run_id: uuid.UUID, status: SchedulerRunStatus, results: Dict[str, Any], error: Optional[str] = None
+    ) -> None:
+        async with get_transaction() as db:
+            await db.execute(
+                update(OpportunitySchedulerRun)
+                .where(
+                    OpportunitySchedulerRun.id == run_id,
+                    OpportunitySchedulerRun.lease_owner == self.worker_id,
+                )
+                .values(
+                    status=status,
+                    results=results,
+                    error_message=error,
+                    finished_at=datetime.utcnow(),
+                    lease_owner=None,
+                    lease_expires_at=None,
+                )
+            )
+
+    async def _enqueue_if_due(self) -> bool:
+        """In schedule mode, queue an "all" run when items are due and nothing is pending."""
+        async with get_transaction() as db:
+            pending = await db.execute(
+                select(OpportunitySchedulerRun.id)
+                .where(OpportunitySchedulerRun.status.in_([SchedulerRunStatus.queued, SchedulerRunStatus.running]))
+                .limit(1)
+            )
+            if pending.scalar_one_or_none() is not None:
+                return False
+
+            scheduler = OpportunitySchedulerService(db)
+            sources_due = await scheduler.get_sources_due_for_scraping()
+            agents_due = await scheduler.get_agents_due_for_execution()
+            if not sources_due and not agents_due:
+                return False
+
+        await enqueue_scheduler_run(SchedulerRunKind.all)
+        return True
+
+    # ---- item processing -------------------------------------------------
+
+    async def _process_next_source(self, processed: List[uuid.UUID]) -> Optional[Dict[str, Any]]:
+        async with get_transaction() as db:
+            scheduler = OpportunitySchedulerService(db)
+            source = await scheduler.claim_due_source(self.lease, exclude=processed)
+            if source is None:
+                return None
+            source_id, url = source.id, source.url
+            already_scraped = await scheduler.is_url_already_scraped(source.url, source.org_id)
+            template = None if already_scraped else await SourceTemplateService(db).get_active(source_id)
+        processed.append(source_id)
+
+        # scrape_source short-circuits on already-scraped URLs before using the results.
+        # Only the listing is fetched here; detail pages are enriched after the drafts are stored.
+        scrape_results = None if already_scraped else await _fetch(url, template, learn=True, enrich=False)
+
+        try:
+            async with get_transaction() as db:
+                source = await db.get(OpportunitySource, source_id)
+                if source is None:
+                    return {"opportunities_created": 0, "errors": [f"Source {source_id} deleted during run"]}
+                result = await OpportunitySchedulerService(db).scrape_source(source, scrape_results=scrape_results)
+        except Exception as e:
+            logger.error(f"Error storing results for source {source_id}: {e}")
+            await _release_claim(OpportunitySource, source_id)
+            return {"opportunities_created": 0, "errors": [f"Source {source_id}: {e}"]}
+
+        if scrape_results is not None:
+            try:
+                # Each draft is updated in its own short transaction as its enrichment completes
+                await enrich_temp_opportunities(uuid.UUID(temp_id) for temp_id in result.get("temp_opportunity_ids", []))
+            except Exception as e:
+                logger.error(f"Error enriching opportunities for source {source_id}: {e}")
+                result["errors"].append(f"Source {source_id} enrichment: {e}")
+        return result
+
+    async def _process_next_agent(self, processed: List[uuid.UUID]) -> Optional[Dict[str, Any]]:
+        async with get_transaction() as db:
+            agent = await OpportunitySchedulerService(db).claim_due_agent(self.lease, exclude=processed)
+            if agent is None:
+                return None
+            agent_id, url = agent.id, agent.base_url
+        processed.append(agent_id)
+
+        scrape_results = await _fetch(url)
+
+        try:
+            async with get_transaction() as db:
+                agent = await db.get(OpportunityAgent, agent_id)
+                if agent is None:
+                    return {"opportunities_created": 0, "errors": [f"Agent {agent_id} deleted during run"]}
+                return await OpportunitySchedulerService(db).execute_agent(agent, scrape_results=scrape_results)
+        except Exception as e:
+            logger.error(f"Error storing results for agent {agent_id}: {e}")
+            await _release_claim(OpportunityAgent, agent_id)
+            return {"opportunities_created": 0, "errors": [f"Agent {agent_id}: {e}"]}
+
+    async def process_run(self, run_id: uuid.UUID, kind: SchedulerRunKind) -> Dict[str, Any]:
+        logger.info(f"Worker {self.worker_id} processing scheduler run {run_id} ({kind.value})")
+        results = _empty_results(kind)
+        try:
+            if "sources" in results:
+                totals, processed = results["sources"], []
+                while not self._stopping:
+                    item = await self._process_next_source(processed)
+                    if item is None:
+                        break
+                    totals["sources_processed"] += 1
+                    totals["total_opportunities_created"] += item["opportunities_created"]
+                    totals["errors"].extend(item["errors"])
+                    await self._heartbeat(run_id, results)
+
+            if "agents" in results:
+                totals, processed = results["agents"], []
+                while not self._stopping:
+                    item = await self._process_next_agent(processed)
+                    if item is None:
+                        break
+                    totals["agents_processed"] += 1
+                    totals["total_opportunities_created"] += item["opportunities_created"]
+                    totals["errors"].extend(item["errors"])
+                    await self._heartbeat(run_id, results)
+        except LeaseLostError as e:
+            logger.warning(str(e))
+            return results
+        except Exception as e:
+            logger.exception(f"Scheduler run {run_id} failed: {e}")
+            await self._finish(run_id, SchedulerRunStatus.failed, results, str(e))
+            return results
+
+        if self._stopping:
+            # Leave the run leased; it is resumed once the lease expires
+            return results
+
+        await self._finish(run_id, SchedulerRunStatus.succeeded, results)
+        logger.info(f"Scheduler run {run_id} completed: {results}")
+        return results
+
+    # ---- loops -----------------------------------------------------------
+
+    async def drain(self) -> int:
+        """Process queued runs until none are left; returns the number processed."""
+        processed = 0
+        while not self._stopping:
+            claimed = await self.claim_run()
+            if claimed is None:
+                break
+            await self.process_run(*claimed)
+            processed += 1
+        return processed
+
+    async def run(self, once: bool = False) -> None:
+        logger.info(f"Scheduler worker {self.worker_id} started (lease {self.lease}, schedule={self.schedule})")
+        while not self._stopping:
+            try:
+                processed = await self.drain()
+                if not processed and self.schedule and await self._enqueue_if_due():
+                    continue
+            except Exception as e:
+                logger.exception(f"Scheduler worker loop error: {e}")
+            if once:
+                break
+            await asyncio.sleep(self.poll_interval)
+        logger.info(f"Scheduler worker {self.worker_id} stopped")
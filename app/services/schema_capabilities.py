@@ -0,0 +1,124 @@
+"""
+Schema Capabilities
+Which optional tables and columns this database actually has, introspected
+once instead of probing information_schema on every request.
+
+- Loaded at startup by the resource registry (app/services/resources.py);
+  outside the API process the first lookup loads it
+- One catalog query reads every column of the current schema, plus the
+  Alembic revision the database is stamped with
+- Code that changes the schema at runtime calls `refresh()` afterwards
+- Migrations run by another process (`manage.py upgrade`, a deploy job) are
+  picked up without a restart: once SCHEMA_CAPABILITIES_TTL_SECONDS has passed
+  the next lookup re-reads the Alembic revision and reloads the columns only
+  when it changed (0 disables the check)
+
+    if await schema_capabilities.has_column("users", "username"):
+        ...
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+from sqlalchemy import text
+
+from app.environment import environment
+from app.utils.logger import get_logger
+
+logger = get_logger("schema_capabilities")
+
+
+class SchemaCapabilities:
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self._columns: Dict[str, FrozenSet[str]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._checked_at = 0.0
+        self.ttl_seconds = environment.SCHEMA_CAPABILITIES_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.revision: Optional[str] = None
+        self.loaded = False
+
+    def _stale(self) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - self._checked_at >= self.ttl_seconds
+
+    async def load(self, engine: Any = None) -> None:
+        if engine is None:
+            from app.db.session import engine
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    """
+                    SELECT table_name, column_name
+                    FROM information_schema.columns
+                    WHERE table_schema = current_schema()
+                    """
+                )
+            )
+            tables: Dict[str, set] = {}
+            for table_name, column_name in result:
+                tables.setdefault(table_name, set()).add(column_name)
+            revision = None
+            if "alembic_version" in tables:
+                revision = (await conn.execute(text("SELECT version_num FROM alembic_version LIMIT 1"))).scalar()
+        self._columns = {table: frozenset(columns) for table, columns in tables.items()}
+        self.revision = revision
+        self.loaded = True
+        self._checked_at = time.monotonic()
+        logger.info(f"Schema capabilities loaded: {len(self._columns)} tables at revision {revision}")
+
+    async def revalidate(self, engine: Any = None) -> None:
+        """Reload only if the database was migrated since the last load."""
+        if engine is None:
+            from app.db.session import engine
+        try:
+            async with engine.connect() as conn:
+                revision = (await conn.execute(text("SELECT version_num FROM alembic_version LIMIT 1"))).scalar()
+        except Exception as e:
+            # Keep serving the cached view rather than failing the request; retry after the next TTL
+            logger.warning(f"Schema revision check failed: {e}")
+            self._checked_at = time.monotonic()
+            return
+        if revision != self.revision:
+            logger.info(f"Schema revision changed from {self.revision} to {revision}, reloading capabilities")
+            await self.load(engine)
+        else:
+            self._checked_at = time.monotonic()
+
+    async def ensure_loaded(self) -> None:
+        if self.loaded and not self._stale():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.loaded:
+                await self.load()
+            elif self._stale():
+                await self.revalidate()
+
+    async def refresh(self) -> None:
+        await self.load()
+
+    async def columns(self, table: str) -> FrozenSet[str]:
+        await self.ensure_loaded()
+        return self._columns.get(table, frozenset())
+
+    async def has_table(self, table: str) -> bool:
+        await self.ensure_loaded()
+        return table in self._columns
+
+    async def has_column(self, table: str, column: str) -> bool:
+        await self.ensure_loaded()
+        return column in self._columns.get(table, frozenset())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "tables": len(self._columns),
+            "revision": self.revision,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# Global instance
+schema_capabilities = SchemaCapabilities()
@@ -0,0 +1,170 @@
+"""
+Search
+Ranked full-text and fuzzy search over opportunities, accounts, contacts,
+vendors and procurement documents in one query.
+
+- Each table has a generated, weighted `search_vector` (tsvector) with a GIN
+  index, and pg_trgm GIN indexes on its name columns
+  (alembic: search_indexes_20261018)
+- Rows match on `search_vector @@ websearch_to_tsquery(...)`, trigram
+  similarity or a substring of a name column; rank is ts_rank plus the best
+  name similarity, so typos and partial names still rank sensibly
+- Databases without the migration fall back to ILIKE matching, unranked
+
+    hits = await SearchService(db).search(user.org_id, "bridge rehab", ["opportunity", "account"])
+"""
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, String, cast, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.account import Account
+from app.models.contact import Contact
+from app.models.opportunity import Opportunity
+from app.models.procurement import PurchaseOrder, PurchaseRequisition, RFQ, VendorInvoice
+from app.models.vendor import Vendor
+from app.services.schema_capabilities import schema_capabilities
+from app.utils.logger import get_logger
+
+logger = get_logger("search")
+
+SEARCH_CONFIG = "english"
+MAX_QUERY_LENGTH = 200
+# Weight of name similarity relative to the (0..1 normalised) full-text rank
+SIMILARITY_WEIGHT = 0.5
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    model: Any
+    id_column: str
+    title_column: str
+    subtitle_column: Optional[str]
+    # Short name-like columns matched by trigram similarity and substring
+    name_columns: Tuple[str, ...]
+    # Vendors are shared across organizations
+    org_scoped: bool = True
+
+
+SEARCH_TARGETS: Dict[str, SearchTarget] = {
+    "opportunity": SearchTarget(Opportunity, "id", "project_name", "client_name", ("project_name", "client_name")),
+    "account": SearchTarget(Account, "account_id", "client_name", "market_sector", ("client_name",)),
+    "contact": SearchTarget(Contact, "id", "name", "email", ("name", "email")),
+    "vendor": SearchTarget(
+        Vendor, "id", "vendor_name", "organisation", ("vendor_name", "organisation"), org_scoped=False
+    ),
+    "requisition": SearchTarget(PurchaseRequisition, "id", "description", "custom_id", ("custom_id",)),
+    "purchase_order": SearchTarget(PurchaseOrder, "id", "description", "vendor_name", ("custom_id", "vendor_name")),
+    "rfq": SearchTarget(RFQ, "id", "title", "custom_id", ("title", "custom_id")),
+    "invoice": SearchTarget(VendorInvoice, "id", "invoice_number", "vendor_name", ("invoice_number", "vendor_name")),
+}
+
+
+def _tsquery(term: str) -> ColumnElement:
+    # websearch syntax: quoted phrases, OR, and -exclusions from the search box
+    return func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), term)
+
+
+def _vector(model: Any) -> ColumnElement:
+    # Generated column, not mapped on the models
+    return literal_column(f"{model.__tablename__}.search_vector")
+
+
+def column_match(model: Any, name: str, term: str, indexed: bool) -> ColumnElement:
+    """Whether one name column matches: trigram similarity (when indexed) or a substring."""
+    column = getattr(model, name)
+    substring = column.ilike(f"%{term}%")
+    if not indexed:
+        return substring
+    return or_(column.op("%")(term), substring)
+
+
+def text_match(model: Any, term: str) -> ColumnElement:
+    """Full-text match against the table's weighted `search_vector`."""
+    return _vector(model).op("@@")(_tsquery(term))
+
+
+def search_condition(model: Any, name_columns: Sequence[str], term: str, indexed: bool) -> ColumnElement:
+    """WHERE clause for a search term; `indexed` is whether the table has `search_vector`."""
+    matches = [column_match(model, name, term, indexed) for name in name_columns]
+    if not indexed:
+        return or_(*matches)
+    return or_(text_match(model, term), *matches)
+
+
+def search_rank(model: Any, name_columns: Sequence[str], term: str, indexed: bool) -> ColumnElement:
+    """Relevance for ORDER BY: weighted ts_rank (normalised to 0..1) plus the best name similarity."""
+    if not indexed:
+        return cast(literal(0.0), Float)
+    similarity = func.greatest(
+        *[func.coalesce(func.similarity(getattr(model, name), term), 0.0) for name in name_columns],
+        0.0,
+    )
+    # Normalisation 32 maps rank to rank / (rank + 1)
+    return func.ts_rank(_vector(model), _tsquery(term), 32) + SIMILARITY_WEIGHT * similarity
+
+
+async def is_indexed(model: Any) -> bool:
+    return await schema_capabilities.has_column(model.__tablename__, "search_vector")
+
+
+class SearchService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(
+        self,
+        org_id: uuid.UUID,
+        query: str,
+        types: Optional[Sequence[str]] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Best matches across `types` (default: every target), highest rank first."""
+        term = (query or "").strip()[:MAX_QUERY_LENGTH]
+        if not term:
+            return []
+
+        selects = []
+        for kind in types or SEARCH_TARGETS:
+            target = SEARCH_TARGETS[kind]
+            model = target.model
+            indexed = await is_indexed(model)
+            rank = search_rank(model, target.name_columns, term, indexed)
+            subtitle = (
+                func.left(cast(getattr(model, target.subtitle_column), String), 200)
+                if target.subtitle_column
+                else cast(literal(None), String)
+            )
+            stmt = select(
+                cast(literal(kind), String).label("type"),
+                cast(getattr(model, target.id_column), String).label("id"),
+                func.left(cast(getattr(model, target.title_column), String), 200).label("title"),
+                subtitle.label("subtitle"),
+                rank.label("rank"),
+            ).where(search_condition(model, target.name_columns, term, indexed))
+            if target.org_scoped:
+                stmt = stmt.where(model.org_id == org_id)
+            # Trim each branch before the union so one large table cannot dominate the sort
+            selects.append(stmt.order_by(rank.desc()).limit(limit))
+
+        if not selects:
+            return []
+        combined = union_all(*selects).subquery()
+        result = await self.db.execute(
+            select(combined).order_by(combined.c.rank.desc(), combined.c.title).limit(limit)
+        )
+        return [
+            {
+                "type": row.type,
+                "id": row.id,
+                "title": row.title,
+                "subtitle": row.subtitle,
+                "rank": round(float(row.rank or 0.0), 4),
+            }
+            for row in result
+        ]
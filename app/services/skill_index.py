@@ -0,0 +1,165 @@
+"""
+Skill Index Service
+Serves skill lookups for an organization from the `employee_skills` inverted
+index (normalized skill token -> employee ids) instead of loading every
+employee row and intersecting skill lists in Python.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import String, delete, func, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.employee import Employee, EmployeeSkill
+from app.utils.logger import get_logger
+from app.utils.skills import normalize_skill, normalize_skills
+
+logger = get_logger("skill_index")
+
+TEAM_STATUSES = ("accepted", "active")
+CANDIDATE_STATUSES = ("pending", "review")
+
+
+class SkillIndexService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_org_skills(
+        self,
+        org_id: uuid.UUID,
+        statuses: Optional[Sequence[str]] = TEAM_STATUSES,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """Distinct skills available in the org, most common first."""
+        stmt = (
+            select(func.min(EmployeeSkill.label))
+            .where(EmployeeSkill.org_id == org_id)
+            .group_by(EmployeeSkill.skill)
+            .order_by(func.count(EmployeeSkill.employee_id).desc(), EmployeeSkill.skill)
+        )
+        if statuses:
+            stmt = stmt.join(Employee, Employee.id == EmployeeSkill.employee_id).where(
+                Employee.status.in_(statuses)
+            )
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.db.execute(stmt)
+        return [row[0] for row in result.all()]
+
+    async def match_skills(
+        self,
+        org_id: uuid.UUID,
+        skills: Sequence[str],
+        statuses: Optional[Sequence[str]] = None,
+        fuzzy: bool = False,
+        limit: Optional[int] = None,
+    ) -> Dict[uuid.UUID, List[str]]:
+        """
+        Map employee id -> matched query skill tokens, ordered by match count.
+
+        Exact mode compares normalized tokens. Fuzzy mode also accepts a token
+        that contains, or is contained in, the indexed skill ("hvac" ~ "commercial hvac").
+        """
+        tokens = normalize_skills(skills)
+        if not tokens:
+            return {}
+
+        if fuzzy:
+            branches = [
+                select(EmployeeSkill.employee_id, literal(token, String).label("token")).where(
+                    EmployeeSkill.org_id == org_id,
+                    or_(
+                        EmployeeSkill.skill == token,
+                        EmployeeSkill.skill.contains(token, autoescape=True),
+                        literal(token, String).contains(EmployeeSkill.skill),
+                    ),
+                )
+                for token in tokens
+            ]
+            hits = union_all(*branches).subquery("hits")
+        else:
+            hits = (
+                select(EmployeeSkill.employee_id, EmployeeSkill.skill.label("token"))
+                .where(EmployeeSkill.org_id == org_id, EmployeeSkill.skill.in_(tokens))
+                .subquery("hits")
+            )
+
+        matched_count = func.count(func.distinct(hits.c.token))
+        stmt = (
+            select(hits.c.employee_id, func.array_agg(func.distinct(hits.c.token)))
+            .group_by(hits.c.employee_id)
+            .order_by(matched_count.desc(), hits.c.employee_id)
+        )
+        if statuses:
+            stmt = stmt.join(Employee, Employee.id == hits.c.employee_id).where(
+                Employee.status.in_(statuses)
+            )
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.db.execute(stmt)
+        return {row[0]: list(row[1]) for row in result.all()}
+
+    async def find_matching_employees(
+        self,
+        org_id: uuid.UUID,
+        required_skills: Sequence[str],
+        statuses: Optional[Sequence[str]] = TEAM_STATUSES,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Top-k employees by number of required skills they cover."""
+        required = normalize_skills(required_skills)
+        if not required:
+            return []
+
+        matches = await self.match_skills(org_id, required, statuses=statuses, limit=limit)
+        if not matches:
+            return []
+
+        result = await self.db.execute(select(Employee).where(Employee.id.in_(list(matches))))
+        employees = {emp.id: emp for emp in result.scalars().all()}
+
+        ranked: List[Dict[str, Any]] = []
+        for employee_id, matched_skills in matches.items():
+            emp = employees.get(employee_id)
+            if not emp:
+                continue
+            ranked.append({
+                "id": str(emp.id),
+                "name": emp.name,
+                "job_title": emp.job_title,
+                "matched_skills": matched_skills,
+                "match_percentage": round(len(matched_skills) / len(required) * 100, 1),
+                "all_skills": list(dict.fromkeys((emp.skills or []) + (emp.ai_suggested_skills or []))),
+            })
+
+        ranked.sort(key=lambda x: x["match_percentage"], reverse=True)
+        return ranked
+
+    async def rebuild_org(self, org_id: uuid.UUID) -> int:
+        """Rebuild the index for one organization; returns the number of rows written."""
+        await self.db.execute(delete(EmployeeSkill).where(EmployeeSkill.org_id == org_id))
+
+        result = await self.db.execute(select(Employee).where(Employee.company_id == org_id))
+        rows: List[Dict[str, Any]] = []
+        for emp in result.scalars().all():
+            rows.extend(EmployeeSkill.build_rows(emp))
+
+        if rows:
+            await self.db.execute(EmployeeSkill.__table__.insert(), rows)
+
+        logger.info(f"Rebuilt skill index for org {org_id}: {len(rows)} entries")
+        return len(rows)
+
+
+def skill_coverage(required_skills: Sequence[str], available_skills: Sequence[str]) -> float:
+    """Percentage of required skills present in the available set, using normalized tokens."""
+    required = set(normalize_skills(required_skills))
+    if not required:
+        return 100.0
+
+    available = {normalize_skill(s) for s in available_skills}
+    return len(required & available) / len(required) * 100
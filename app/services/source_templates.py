@@ -0,0 +1,86 @@
+"""
+Source Templates
+Stores the extraction template learned for each opportunity source.
+
+- A source scrape passes the active template to `process_urls`, which applies
+  it and reports what happened under the result's "extraction" key
+- `record()` keeps newly induced templates, counts hits, and deactivates a
+  template after MAX_CONSECUTIVE_MISSES misses so the next scrape learns again
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.opportunity_source import OpportunitySource, OpportunitySourceTemplate
+from app.utils.logger import get_logger
+
+logger = get_logger("source_templates")
+
+MAX_CONSECUTIVE_MISSES = 3
+
+
+class SourceTemplateService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_active(self, source_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        result = await self.db.execute(
+            select(OpportunitySourceTemplate.selectors).where(
+                OpportunitySourceTemplate.source_id == source_id,
+                OpportunitySourceTemplate.is_active.is_(True),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def record(self, source: OpportunitySource, extraction: Optional[Dict[str, Any]]) -> None:
+        """Apply a `match_listing` outcome to the source's stored template."""
+        if not extraction:
+            return
+        method = extraction.get("method")
+        if method in ("builtin", "none"):
+            return
+
+        now = datetime.utcnow()
+        stored = await self.db.get(OpportunitySourceTemplate, source.id)
+
+        if method in ("structure", "model") and extraction.get("template"):
+            if stored is None:
+                stored = OpportunitySourceTemplate(
+                    source_id=source.id,
+                    org_id=source.org_id,
+                    selectors=extraction["template"],
+                    induced_by=method,
+                    version=1,
+                    hit_count=0,
+                    consecutive_misses=0,
+                    is_active=True,
+                )
+                self.db.add(stored)
+            else:
+                stored.selectors = extraction["template"]
+                stored.induced_by = method
+                stored.version += 1
+                stored.consecutive_misses = 0
+                stored.is_active = True
+            stored.validated_at = now
+            stored.last_matched_at = now
+            logger.info(f"Stored {method} extraction template v{stored.version} for source {source.id}")
+        elif stored is None:
+            return
+        elif method == "template":
+            stored.hit_count += 1
+            stored.consecutive_misses = 0
+            stored.last_matched_at = now
+        elif method == "miss":
+            stored.consecutive_misses += 1
+            if stored.consecutive_misses >= MAX_CONSECUTIVE_MISSES and stored.is_active:
+                stored.is_active = False
+                logger.warning(
+                    f"Extraction template for source {source.id} stopped matching; relearning on next scrape"
+                )
+        await self.db.flush()
@@ -0,0 +1,601 @@
+"""
+Object storage layer shared by every upload/download path.
+
+Two backends implement the same async interface:
+- LocalStorageBackend: files under LOCAL_STORAGE_ROOT (default "uploads")
+- S3StorageBackend: one shared boto3 client, blocking calls run in worker threads,
+  large bodies go through managed multipart transfers
+
+Uploads are streamed in chunks into a spooled buffer (memory up to 1MB, then a
+temp file) while their SHA-256 is computed, so the request body is never held
+in memory in full and identical content can be stored once per key prefix.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, BinaryIO, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+
+from app.environment import environment
+from app.utils.logger import get_logger
+
+logger = get_logger("storage")
+
+CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_MEMORY = 1024 * 1024
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+PRESIGN_EXPIRES_SECONDS = 900
+
+ByteRange = Tuple[int, Optional[int]]
+UploadSource = Union[UploadFile, AsyncIterable[bytes], bytes]
+
+
+class FileTooLargeError(ValueError):
+    """Raised while streaming an upload that exceeds the caller's size limit."""
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    sha256: str
+    content_type: Optional[str]
+    url: Optional[str]
+    backend: str
+    deduplicated: bool = False
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    content_type: Optional[str] = None
+
+
+@dataclass
+class SpooledUpload:
+    file: BinaryIO
+    size: int
+    sha256: str
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def _iter_source(source: UploadSource, chunk_size: int) -> AsyncIterator[bytes]:
+    if isinstance(source, (bytes, bytearray)):
+        for start in range(0, len(source), chunk_size):
+            yield bytes(source[start:start + chunk_size])
+        return
+    if isinstance(source, UploadFile):
+        while True:
+            chunk = await source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    async for chunk in source:
+        yield chunk
+
+
+async def spool_upload(
+    source: UploadSource,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> SpooledUpload:
+    """Copy an upload into a spooled temp file chunk by chunk, hashing as it goes."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in _iter_source(source, chunk_size):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise FileTooLargeError(f"Upload exceeds {max_bytes} bytes")
+            digest.update(chunk)
+            # Past the in-memory threshold writes hit disk, so keep them off the loop
+            await asyncio.to_thread(spool.write, chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return SpooledUpload(file=spool, size=size, sha256=digest.hexdigest())
+
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[ByteRange]:
+    """Parse a single "bytes=start-end" range; returns None when absent or unsatisfiable."""
+    if not range_header or not range_header.startswith("bytes=") or size <= 0:
+        return None
+
+    spec = range_header[len("bytes="):].split(",")[0].strip()
+    start_str, _, end_str = spec.partition("-")
+    try:
+        if not start_str:
+            length = int(end_str)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(start_str)
+        end = int(end_str) if end_str else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def build_storage_name(original_name: str) -> str:
+    base_name = os.path.basename(original_name or "file")
+    sanitized = re.sub(r"[^A-Za-z0-9_.-]", "_", base_name)
+    return f"{uuid.uuid4().hex}_{sanitized}"[:255]
+
+
+class StorageBackend(ABC):
+    name: str = "abstract"
+
+    @abstractmethod
+    async def put_file(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        ...
+
+    @abstractmethod
+    async def read(self, key: str, byte_range: Optional[ByteRange] = None) -> bytes:
+        ...
+
+    @abstractmethod
+    def iter_chunks(
+        self, key: str, byte_range: Optional[ByteRange] = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def public_url(self, key: str) -> Optional[str]:
+        ...
+
+    async def presign_download(
+        self, key: str, expires_in: int = PRESIGN_EXPIRES_SECONDS, filename: Optional[str] = None
+    ) -> Optional[str]:
+        """Direct-download URL, or None when the backend can only be read through the API."""
+        return None
+
+    async def presign_upload(
+        self, key: str, content_type: Optional[str] = None, expires_in: int = PRESIGN_EXPIRES_SECONDS
+    ) -> Optional[Dict[str, Any]]:
+        """Direct-upload ticket, or None when uploads must go through the API."""
+        return None
+
+    def resolve_key(self, location: str) -> Optional[str]:
+        """Map a stored file_path/file_url back to an object key for this backend."""
+        return location or None
+
+
+class LocalStorageBackend(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    async def put_file(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> None:
+        path = self._path(key)
+
+        def _write() -> None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".upload-")
+            try:
+                with os.fdopen(fd, "wb") as destination:
+                    shutil.copyfileobj(fileobj, destination, CHUNK_SIZE)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        await asyncio.to_thread(_write)
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        path = self._path(key)
+        try:
+            size = await asyncio.to_thread(os.path.getsize, path)
+        except OSError:
+            return None
+        return ObjectInfo(key=key, size=size)
+
+    async def read(self, key: str, byte_range: Optional[ByteRange] = None) -> bytes:
+        path = self._path(key)
+
+        def _read() -> bytes:
+            with open(path, "rb") as source:
+                if not byte_range:
+                    return source.read()
+                start, end = byte_range
+                source.seek(start)
+                return source.read(-1 if end is None else end - start + 1)
+
+        return await asyncio.to_thread(_read)
+
+    async def iter_chunks(
+        self, key: str, byte_range: Optional[ByteRange] = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        start, end = byte_range or (0, None)
+        source = await asyncio.to_thread(open, path, "rb")
+        try:
+            await asyncio.to_thread(source.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await asyncio.to_thread(source.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(source.close)
+
+    async def delete(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            await asyncio.to_thread(os.remove, path)
+        except FileNotFoundError:
+            pass
+
+    def public_url(self, key: str) -> Optional[str]:
+        return None
+
+    def resolve_key(self, location: str) -> Optional[str]:
+        if not location:
+            return None
+        if location.startswith(("http://", "https://")):
+            # URLs served by the dev static mount: {api}/uploads/<key>
+            path = urlparse(location).path
+            marker = f"/{os.path.basename(self.root)}/"
+            if not path.startswith(marker):
+                return None
+            return path[len(marker):] or None
+        if location.startswith("/local/"):
+            return location[len("/local/"):] or None
+        if os.path.isabs(location):
+            location = os.path.abspath(location)
+            if not location.startswith(self.root + os.sep):
+                return None
+            return os.path.relpath(location, self.root)
+        return location
+
+
+class S3StorageBackend(StorageBackend):
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+    ):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url.rstrip("/") if endpoint_url else None
+        # boto3 clients are thread-safe; one client serves every worker thread
+        self.client = boto3.client(
+            "s3",
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            region_name=region or "us-east-1",
+            endpoint_url=self.endpoint_url,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=MULTIPART_CHUNK_SIZE,
+            max_concurrency=4,
+        )
+
+    async def put_file(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> None:
+        extra_args = {"ContentType": content_type} if content_type else None
+        await asyncio.to_thread(
+            self.client.upload_fileobj,
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config,
+        )
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return ObjectInfo(key=key, size=head["ContentLength"], content_type=head.get("ContentType"))
+
+    def _get_object(self, key: str, byte_range: Optional[ByteRange]) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if byte_range:
+            start, end = byte_range
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        return self.client.get_object(**params)
+
+    async def read(self, key: str, byte_range: Optional[ByteRange] = None) -> bytes:
+        def _read() -> bytes:
+            return self._get_object(key, byte_range)["Body"].read()
+
+        return await asyncio.to_thread(_read)
+
+    async def iter_chunks(
+        self, key: str, byte_range: Optional[ByteRange] = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(self._get_object, key, byte_range)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    def public_url(self, key: str) -> Optional[str]:
+        if self.endpoint_url:
+            return f"{self.endpoint_url}/{self.bucket}/{key}"
+        region_segment = f".{self.region}" if self.region else ""
+        return f"https://{self.bucket}.s3{region_segment}.amazonaws.com/{key}"
+
+    async def presign_download(
+        self, key: str, expires_in: int = PRESIGN_EXPIRES_SECONDS, filename: Optional[str] = None
+    ) -> Optional[str]:
+        params: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if filename:
+            safe_name = filename.replace('"', "")
+            params["ResponseContentDisposition"] = f'attachment; filename="{safe_name}"'
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url, "get_object", Params=params, ExpiresIn=expires_in
+        )
+
+    async def presign_upload(
+        self, key: str, content_type: Optional[str] = None, expires_in: int = PRESIGN_EXPIRES_SECONDS
+    ) -> Optional[Dict[str, Any]]:
+        params: Dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        headers: Dict[str, str] = {}
+        if content_type:
+            params["ContentType"] = content_type
+            headers["Content-Type"] = content_type
+        url = await asyncio.to_thread(
+            self.client.generate_presigned_url, "put_object", Params=params, ExpiresIn=expires_in
+        )
+        return {"method": "PUT", "url": url, "headers": headers, "expires_in": expires_in}
+
+    def resolve_key(self, location: str) -> Optional[str]:
+        if not location:
+            return None
+        if not location.startswith(("http://", "https://")):
+            return location if not os.path.isabs(location) else None
+
+        parsed = urlparse(location)
+        path = parsed.path.lstrip("/")
+        if self.endpoint_url and location.startswith(self.endpoint_url):
+            _, _, key = path.partition("/")
+            return key or None
+        if parsed.netloc.startswith(f"{self.bucket}."):
+            return path or None
+        if path.startswith(f"{self.bucket}/"):
+            return path[len(self.bucket) + 1:] or None
+        return None
+
+
+class StorageService:
+    """High-level upload/download operations on top of the configured backend."""
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    async def save(
+        self,
+        prefix: str,
+        filename: str,
+        source: UploadSource,
+        content_type: Optional[str] = None,
+        *,
+        dedup: bool = True,
+        max_bytes: Optional[int] = None,
+    ) -> StoredObject:
+        """
+        Stream an upload into storage under `prefix`.
+
+        With `dedup`, the key is derived from the content hash so re-uploading the
+        same bytes under the same prefix reuses the existing object.
+        """
+        spooled = await spool_upload(source, max_bytes=max_bytes)
+        try:
+            if dedup:
+                extension = os.path.splitext(filename or "")[1].lower()[:10]
+                key = f"{prefix.strip('/')}/{spooled.sha256}{extension}"
+                existing = await self.backend.stat(key)
+                if existing and existing.size == spooled.size:
+                    logger.info(f"Storage dedup hit for {key}")
+                    return self._stored(key, spooled, content_type, deduplicated=True)
+            else:
+                key = f"{prefix.strip('/')}/{build_storage_name(filename)}"
+
+            await self.backend.put_file(key, spooled.file, spooled.size, content_type)
+            logger.info(f"Stored {spooled.size} bytes at {self.backend.name}:{key}")
+            return self._stored(key, spooled, content_type)
+        finally:
+            spooled.close()
+
+    def _stored(
+        self, key: str, spooled: SpooledUpload, content_type: Optional[str], deduplicated: bool = False
+    ) -> StoredObject:
+        return StoredObject(
+            key=key,
+            size=spooled.size,
+            sha256=spooled.sha256,
+            content_type=content_type,
+            url=self.backend.public_url(key),
+            backend=self.backend.name,
+            deduplicated=deduplicated,
+        )
+
+    async def read(self, location: str, byte_range: Optional[ByteRange] = None) -> Optional[bytes]:
+        key = self.backend.resolve_key(location)
+        if not key:
+            return None
+        try:
+            return await self.backend.read(key, byte_range)
+        except Exception as exc:
+            logger.warning(f"Failed to read {self.backend.name}:{key}: {exc}")
+            return None
+
+    async def stat(self, location: str) -> Optional[ObjectInfo]:
+        key = self.backend.resolve_key(location)
+        return await self.backend.stat(key) if key else None
+
+    async def delete(self, location: str) -> None:
+        key = self.backend.resolve_key(location)
+        if not key:
+            return
+        try:
+            await self.backend.delete(key)
+        except Exception as exc:
+            logger.warning(f"Failed to delete {self.backend.name}:{key}: {exc}")
+
+    def public_url(self, key: str) -> Optional[str]:
+        return self.backend.public_url(key)
+
+    async def presign_download(
+        self, location: str, filename: Optional[str] = None, expires_in: int = PRESIGN_EXPIRES_SECONDS
+    ) -> Optional[str]:
+        key = self.backend.resolve_key(location)
+        return await self.backend.presign_download(key, expires_in, filename) if key else None
+
+    async def presign_upload(
+        self, prefix: str, filename: str, content_type: Optional[str] = None,
+        expires_in: int = PRESIGN_EXPIRES_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        key = f"{prefix.strip('/')}/{build_storage_name(filename)}"
+        ticket = await self.backend.presign_upload(key, content_type, expires_in)
+        if ticket is None:
+            return None
+        return {"key": key, **ticket}
+
+    async def range_response(
+        self,
+        location: str,
+        range_header: Optional[str] = None,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> StreamingResponse:
+        """Stream an object through the API, honouring a single HTTP Range request."""
+        key = self.backend.resolve_key(location)
+        info = await self.backend.stat(key) if key else None
+        if not info:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stored file not found")
+
+        headers = {"Accept-Ranges": "bytes"}
+        if filename:
+            safe_name = filename.replace('"', "")
+            headers["Content-Disposition"] = f'attachment; filename="{safe_name}"'
+
+        byte_range = parse_range_header(range_header, info.size)
+        if range_header and byte_range is None:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{info.size}"},
+            )
+
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+        else:
+            headers["Content-Length"] = str(info.size)
+            status_code = status.HTTP_200_OK
+
+        return StreamingResponse(
+            self.backend.iter_chunks(key, byte_range),
+            status_code=status_code,
+            media_type=media_type or info.content_type or "application/octet-stream",
+            headers=headers,
+        )
+
+
+def _build_backend() -> StorageBackend:
+    s3_configured = all([
+        environment.AWS_ACCESS_KEY_ID,
+        environment.AWS_SECRET_ACCESS_KEY,
+        environment.AWS_S3_BUCKET_NAME,
+    ])
+    use_s3 = environment.STORAGE_BACKEND == "s3" or (
+        environment.STORAGE_BACKEND == "auto" and s3_configured
+    )
+    if use_s3:
+        logger.info(f"Object storage: S3 bucket {environment.AWS_S3_BUCKET_NAME}")
+        return S3StorageBackend(
+            bucket=environment.AWS_S3_BUCKET_NAME,
+            region=environment.AWS_S3_REGION,
+            access_key_id=environment.AWS_ACCESS_KEY_ID,
+            secret_access_key=environment.AWS_SECRET_ACCESS_KEY,
+            endpoint_url=environment.AWS_S3_ENDPOINT_URL,
+        )
+
+    logger.info(f"Object storage: local disk at {environment.LOCAL_STORAGE_ROOT}")
+    return LocalStorageBackend(environment.LOCAL_STORAGE_ROOT)
+
+
+_storage: Optional[StorageService] = None
+
+
+def get_storage() -> StorageService:
+    """Process-wide storage service; the backend client is built on first use."""
+    global _storage
+    if _storage is None:
+        _storage = StorageService(_build_backend())
+    return _storage
+
+
+def set_storage(storage: Optional[StorageService]) -> None:
+    """Swap the process-wide storage (tests point this at a local dir or S3 stand-in)."""
+    global _storage
+    _storage = storage
@@ -1,22 +1,27 @@
-from supabase import create_client, Client
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+from app.utils.lazy import lazy_import
 from app.utils.logger import get_logger
 from app.environment import environment
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+supabase = lazy_import("supabase")
+
 logger = get_logger("supabase")
 
 SUPABASE_URL = environment.SUPABASE_URL
 SUPABASE_SERVICE_ROLE_KEY = environment.SUPABASE_SERVICE_ROLE_KEY
 
-def get_supabase_client() -> Optional[Client]:
+def get_supabase_client() -> Optional["Client"]:
 
     if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
         logger.error("Supabase environment variables are not properly configured")
         return None
 
     try:
-        return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        return supabase.create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
     except Exception as err:
         logger.error(f"Error initializing Supabase client: {str(e)}")
         return None
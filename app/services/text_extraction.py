@@ -0,0 +1,216 @@
+"""
+Text Extraction Service
+Extracts text from uploaded and scraped documents off the event loop.
+
+- Parsing (pdfminer, docx2txt, openpyxl) runs in a shared process pool
+- Documents are handled as in-memory buffers, never written to temp files
+- Results are cached by content SHA-256, so re-analysing the same contract
+  or invoice does not parse it again; concurrent requests for the same
+  bytes share one extraction
+- Large PDFs are split into page batches that are parsed in parallel and can
+  be streamed page by page, stopping early once enough text is collected
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.utils import text_extractors
+from app.utils.logger import get_logger
+
+logger = get_logger("text_extraction")
+
+T = TypeVar("T")
+
+LARGE_PDF_BYTES = 5 * 1024 * 1024
+PDF_PAGE_BATCH = 8
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_CHARS = 64 * 1024 * 1024
+
+CacheKey = Tuple[str, Optional[int]]
+
+
+class TextExtractionService:
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._executor: Optional[Executor] = None
+        self._cache: "OrderedDict[CacheKey, str]" = OrderedDict()
+        self._cache_chars = 0
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ---- execution -------------------------------------------------------
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            # spawn: worker processes must not inherit the loop, DB pool or logger threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Started text extraction pool with {self.max_workers} workers")
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            logger.warning("Text extraction pool broken; restarting and retrying in a thread")
+            self._executor = None
+            return await asyncio.to_thread(func, *args)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ---- cache -----------------------------------------------------------
+
+    def _cache_get(self, key: CacheKey) -> Optional[str]:
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+        return text
+
+    def _cache_put(self, key: CacheKey, text: str) -> None:
+        if len(text) > CACHE_MAX_CHARS:
+            return
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._cache_chars -= len(previous)
+        self._cache[key] = text
+        self._cache_chars += len(text)
+        while self._cache and (
+            len(self._cache) > CACHE_MAX_ENTRIES or self._cache_chars > CACHE_MAX_CHARS
+        ):
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_chars -= len(evicted)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    # ---- public API ------------------------------------------------------
+
+    async def extract(
+        self,
+        content: bytes,
+        filename: str,
+        max_chars: Optional[int] = None,
+    ) -> str:
+        """
+        Extract text from a PDF/DOCX/XLSX/TXT document.
+
+        `max_chars` lets large PDFs stop after enough pages; such partial results
+        are cached separately from full extractions. Returns "" on failure.
+        """
+        if not content:
+            return ""
+
+        extension = text_extractors.file_extension(filename)
+        digest = await asyncio.to_thread(self.content_hash, content)
+        full_key: CacheKey = (digest, None)
+
+        cached = self._cache_get(full_key)
+        if cached is None and max_chars:
+            cached = self._cache_get((digest, max_chars))
+        if cached is not None:
+            self.hits += 1
+            return cached[:max_chars] if max_chars else cached
+
+        partial = bool(max_chars) and extension == "pdf" and len(content) >= LARGE_PDF_BYTES
+        key: CacheKey = (digest, max_chars) if partial else full_key
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            text = await asyncio.shield(inflight)
+            return text[:max_chars] if max_chars else text
+
+        self.misses += 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._extract_uncached(content, extension, max_chars if partial else None)
+            self._cache_put(key, text)
+            future.set_result(text)
+        except Exception as exc:
+            logger.error(f"Text extraction failed for {filename}: {exc}")
+            text = ""
+            future.set_result(text)
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.cancel()
+
+        return text[:max_chars] if max_chars else text
+
+    async def _extract_uncached(self, content: bytes, extension: str, max_chars: Optional[int]) -> str:
+        if extension == "pdf" and len(content) >= LARGE_PDF_BYTES:
+            parts = []
+            collected = 0
+            async for _, page_text in self.iter_pdf_pages(content):
+                parts.append(page_text)
+                collected += len(page_text)
+                if max_chars and collected >= max_chars:
+                    break
+            text = "\n".join(parts)
+        else:
+            text = await self._run(text_extractors.extract_text, content, extension)
+
+        logger.info(f"Extracted {len(text)} characters from {extension or 'unknown'} document")
+        return text
+
+    async def iter_pdf_pages(
+        self,
+        content: bytes,
+        batch_size: int = PDF_PAGE_BATCH,
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) for a PDF in page order.
+
+        Page batches are parsed concurrently in the pool, at most one batch per
+        worker ahead of the consumer, so memory stays bounded on huge files.
+        """
+        page_count = await self._run(text_extractors.count_pdf_pages, content)
+        batches = [
+            list(range(start, min(start + batch_size, page_count)))
+            for start in range(0, page_count, batch_size)
+        ]
+
+        pending: "OrderedDict[int, asyncio.Task]" = OrderedDict()
+        next_batch = 0
+        try:
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < self.max_workers:
+                    pending[next_batch] = asyncio.ensure_future(
+                        self._run(text_extractors.extract_pdf_pages, content, batches[next_batch])
+                    )
+                    next_batch += 1
+
+                index, task = pending.popitem(last=False)
+                page_texts = await task
+                for page_number, page_text in zip(batches[index], page_texts):
+                    yield page_number, page_text
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "cached_chars": self._cache_chars,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance
+text_extraction = TextExtractionService()
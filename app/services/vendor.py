@@ -18,8 +18,10 @@ from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 import jwt
 import bcrypt
+from sqlalchemy import update
 
-from app.models.vendor import Vendor, VendorStatus, VendorQualification
+from app.db.session import get_transaction
+from app.models.vendor import Vendor, VendorStatus, VendorQualification, VendorScorecard
 
 from app.schemas.vendor import (
     VendorCreateRequest,
@@ -30,6 +32,7 @@ from app.schemas.vendor import (
     VendorQualificationResponse,
 )
 from app.environment import environment
+from app.services.password_hashing import password_hashing
 from app.utils.logger import logger
 from app.utils.error import MegapolisHTTPException
 
@@ -53,7 +56,7 @@ def hash_password(password: str) -> str:
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
     # Hash using bcrypt directly
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=environment.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -65,6 +68,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
+def bcrypt_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a "$2b$12$..." hash, None if it isn't one."""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
 def create_vendor_token(vendor_id: str, email: str) -> Dict[str, str]:
 
     token_expiry = datetime.utcnow() + timedelta(days=30)
@@ -138,10 +148,17 @@ async def authenticate_vendor(email: str, password: str) -> Optional[Dict]:
         logger.warning(f"Vendor does not have login credentials (supplier record only): {email}")
         return None
     
-    if not verify_password(password, vendor.password_hash):
+    if not await password_hashing.run(verify_password, password, vendor.password_hash):
         logger.warning(f"Invalid password for vendor: {email}")
         return None
     
+    rounds = bcrypt_rounds(vendor.password_hash)
+    if rounds is not None and rounds < environment.BCRYPT_ROUNDS:
+        new_hash = await password_hashing.run(hash_password, password)
+        async with get_transaction() as db:
+            await db.execute(update(Vendor).where(Vendor.id == vendor.id).values(password_hash=new_hash))
+        logger.info(f"Upgraded password hash for vendor {vendor.id}")
+    
     token_data = create_vendor_token(str(vendor.id), vendor.email)
     
     logger.info(f"Vendor authenticated sucessfully: {email}")
@@ -487,13 +504,67 @@ async def get_all_vendor_qualifications(skip: int = 0, limit: int = 100, active_
         return responses
 
 
+def _performance_trend(total_orders: int, on_time_delivery_rate: float) -> str:
+    if total_orders == 0:
+        return "new"
+    if total_orders == 1:
+        # For single order, default to stable (not enough data to determine trend)
+        return "stable"
+    if total_orders >= 5:
+        if on_time_delivery_rate >= 90:
+            return "improving"
+        if on_time_delivery_rate >= 70:
+            return "stable"
+        return "declining"
+    if total_orders >= 3:
+        return "stable" if on_time_delivery_rate >= 80 else "declining"
+    # 2 orders - default to stable
+    return "stable"
+
+def performance_from_scorecard(vendor: Vendor, scorecard: Optional[VendorScorecard]) -> Dict:
+    """Performance metrics of a vendor from its scorecard row (no row: no activity yet)."""
+    from decimal import Decimal
+    
+    total_orders = scorecard.total_orders if scorecard else 0
+    orders_spend = float(scorecard.orders_spend or 0) if scorecard else 0.0
+    invoices_spend = float(scorecard.invoices_spend or 0) if scorecard else 0.0
+    # Use purchase orders spend as primary (committed spend), fallback to invoices if no orders
+    total_spend = orders_spend if orders_spend > 0 else invoices_spend
+    
+    total_milestones = scorecard.milestones_total if scorecard else 0
+    on_time_delivery_rate = (
+        scorecard.milestones_on_time / total_milestones * 100 if total_milestones > 0 else 0.0
+    )
+    average_delivery_time = (
+        scorecard.delivery_days_sum / scorecard.delivery_days_count
+        if scorecard and scorecard.delivery_days_count > 0 else 0.0
+    )
+    last_order_date = scorecard.last_order_at if scorecard else None
+    
+    # Calculate quality rating (placeholder - can be enhanced with actual ratings)
+    quality_rating = 4.5 if total_orders > 0 else 0.0
+    communication_rating = 4.3 if total_orders > 0 else 0.0
+    overall_rating = (quality_rating + communication_rating) / 2
+    
+    return {
+        "vendor_id": str(vendor.id),
+        "vendor_name": vendor.vendor_name,
+        "total_orders": total_orders,
+        "total_spend": Decimal(str(total_spend)),
+        "average_delivery_time": average_delivery_time,
+        "on_time_delivery_rate": on_time_delivery_rate,
+        "quality_rating": quality_rating,
+        "communication_rating": communication_rating,
+        "overall_rating": overall_rating,
+        "performance_trend": _performance_trend(total_orders, on_time_delivery_rate),
+        "last_order_date": last_order_date.isoformat() if last_order_date else None,
+    }
+
 async def get_vendor_performance(vendor_id: str) -> Optional[Dict]:
     """Calculate vendor performance from real data (orders, invoices, delivery times)"""
     from uuid import UUID
-    from sqlalchemy import select, func
     from app.db.session import get_session
-    from app.models.procurement import PurchaseOrder, VendorInvoice, DeliveryMilestone
-    from decimal import Decimal
+    from app.services.vendor_scorecards import VendorScorecardService
     
     try:
         uuid_id = UUID(vendor_id)
@@ -501,102 +572,16 @@ async def get_vendor_performance(vendor_id: str) -> Optional[Dict]:
         return None
     
     async with get_session() as session:
-        # Get vendor
-        vendor_result = await session.execute(select(Vendor).where(Vendor.id == uuid_id))
-        vendor = vendor_result.scalar_one_or_none()
+        vendor, scorecard = await VendorScorecardService(session).get(uuid_id)
         if not vendor:
             return None
-        
-        # Count total orders
-        orders_result = await session.execute(
-            select(func.count(PurchaseOrder.id)).where(PurchaseOrder.vendor_id == uuid_id)
-        )
-        total_orders = int(orders_result.scalar_one() or 0)
-        
-        # Calculate total spend from purchase orders (primary source - committed spend)
-        orders_spend_result = await session.execute(
-            select(func.sum(PurchaseOrder.amount)).where(PurchaseOrder.vendor_id == uuid_id)
-        )
-        orders_spend = float(orders_spend_result.scalar_one() or 0)
-        
-        # Calculate total spend from invoices (actual invoiced amount)
-        invoices_result = await session.execute(
-            select(func.sum(VendorInvoice.amount)).where(VendorInvoice.vendor_id == uuid_id)
-        )
-        invoices_spend = float(invoices_result.scalar_one() or 0)
-        
-        # Use purchase orders spend as primary (committed spend), fallback to invoices if no orders
-        total_spend = orders_spend if orders_spend > 0 else invoices_spend
-        
-        # Calculate on-time delivery rate from milestones
-        milestones_result = await session.execute(
-            select(DeliveryMilestone)
-            .join(PurchaseOrder)
-            .where(PurchaseOrder.vendor_id == uuid_id)
-        )
-        milestones = list(milestones_result.scalars().all())
-        
-        on_time_count = 0
-        total_milestones = len(milestones)
-        delivery_times = []
-        
-        for milestone in milestones:
-            if milestone.completed_date and milestone.due_date:
-                delivery_times.append((milestone.completed_date - milestone.due_date).days)
-                if milestone.completed_date <= milestone.due_date:
-                    on_time_count += 1
-        
-        on_time_delivery_rate = (on_time_count / total_milestones * 100) if total_milestones > 0 else 0.0
-        average_delivery_time = sum(delivery_times) / len(delivery_times) if delivery_times else 0.0
-        
-        # Get last order date
-        last_order_result = await session.execute(
-            select(PurchaseOrder.created_at)
-            .where(PurchaseOrder.vendor_id == uuid_id)
-            .order_by(PurchaseOrder.created_at.desc())
-            .limit(1)
-        )
-        last_order_date = last_order_result.scalar_one_or_none()
-        
-        # Calculate quality rating (placeholder - can be enhanced with actual ratings)
-        quality_rating = 4.5 if total_orders > 0 else 0.0
-        communication_rating = 4.3 if total_orders > 0 else 0.0
-        overall_rating = (quality_rating + communication_rating) / 2
-        
-        # Determine performance trend based on actual data
-        if total_orders == 0:
-            performance_trend = "new"
-        elif total_orders == 1:
-            # For single order, default to stable (not enough data to determine trend)
-            performance_trend = "stable"
-        elif total_orders >= 5:
-            if on_time_delivery_rate >= 90:
-                performance_trend = "improving"
-            elif on_time_delivery_rate >= 70:
-                performance_trend = "stable"
-            else:
-                performance_trend = "declining"
-        elif total_orders >= 3:
-            if on_time_delivery_rate >= 80:
-                performance_trend = "stable"
-            else:
-                performance_trend = "declining"
-        else:
-            # 2 orders - default to stable
-            performance_trend = "stable"
-        
-        from decimal import Decimal
-        
-        return {
-            "vendor_id": str(vendor.id),
-            "vendor_name": vendor.vendor_name,
-            "total_orders": total_orders,
-            "total_spend": Decimal(str(total_spend)),
-            "average_delivery_time": average_delivery_time,
-            "on_time_delivery_rate": on_time_delivery_rate,
-            "quality_rating": quality_rating,
-            "communication_rating": communication_rating,
-            "overall_rating": overall_rating,
-            "performance_trend": performance_trend,
-            "last_order_date": last_order_date.isoformat() if last_order_date else None,
-        }
+        return performance_from_scorecard(vendor, scorecard)
+
+async def list_vendor_performance() -> List[Dict]:
+    """Performance metrics of every vendor, read from the scorecard rollup in one query."""
+    from app.db.session import get_session
+    from app.services.vendor_scorecards import VendorScorecardService
+    
+    async with get_session() as session:
+        rows = await VendorScorecardService(session).list_all()
+    return [performance_from_scorecard(vendor, scorecard) for vendor, scorecard in rows]
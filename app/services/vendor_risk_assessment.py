@@ -7,15 +7,16 @@ qualifications and risk levels.
 """
 
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
 from app.db.session import get_session
-from app.models.vendor import Vendor, VendorQualification
-from app.models.procurement import PurchaseOrder, VendorInvoice
+from app.models.vendor import Vendor, VendorQualification, VendorScorecard
 from app.utils.logger import logger
 from app.utils.error import MegapolisHTTPException
 from app.services.ai_suggestions import AISuggestionService
+from app.services.vendor_scorecards import VendorScorecardService
 
 
 class VendorRiskAssessmentService:
@@ -65,41 +66,25 @@ class VendorRiskAssessmentService:
     
     async def _collect_vendor_data(self, vendor_id: UUID, session) -> Dict:
         """Collect all relevant data about a vendor"""
-        # Get vendor details first
-        vendor_result = await session.execute(
-            select(Vendor).where(Vendor.id == vendor_id)
-        )
-        vendor = vendor_result.scalar_one_or_none()
-        
-        # Get order statistics
-        orders_result = await session.execute(
-            select(
-                func.count(PurchaseOrder.id).label('total_orders'),
-                func.sum(PurchaseOrder.amount).label('total_spend'),
-                func.avg(PurchaseOrder.amount).label('avg_order_value'),
-                func.max(PurchaseOrder.created_at).label('last_order_date')
-            ).where(PurchaseOrder.vendor_id == vendor_id)
-        )
-        order_stats = orders_result.one_or_none()
-        
-        # Get invoice statistics
-        invoices_result = await session.execute(
-            select(
-                func.count(VendorInvoice.id).label('total_invoices'),
-                func.sum(VendorInvoice.amount).label('total_invoiced'),
-                func.avg(VendorInvoice.amount).label('avg_invoice_value')
-            ).where(VendorInvoice.vendor_id == vendor_id)
-        )
-        invoice_stats = invoices_result.one_or_none()
+        vendor, scorecard = await VendorScorecardService(session).get(vendor_id)
         
         # Get current qualification
         qual_result = await session.execute(
             select(VendorQualification)
             .where(VendorQualification.vendor_id == vendor_id, VendorQualification.is_active == True)
             .order_by(VendorQualification.created_at.desc())
+            .limit(1)
         )
         qualification = qual_result.scalar_one_or_none()
         
+        return self._vendor_data(vendor, scorecard, qualification)
+    
+    @staticmethod
+    def _vendor_data(
+        vendor: Optional[Vendor],
+        scorecard: Optional[VendorScorecard],
+        qualification: Optional[VendorQualification],
+    ) -> Dict:
         return {
             "vendor": {
                 "name": vendor.vendor_name if vendor else "Unknown",
@@ -108,15 +93,15 @@ class VendorRiskAssessmentService:
                 "status": vendor.status.value if vendor and vendor.status else None,
             },
             "orders": {
-                "total": order_stats.total_orders if order_stats else 0,
-                "total_spend": float(order_stats.total_spend) if order_stats and order_stats.total_spend else 0.0,
-                "avg_value": float(order_stats.avg_order_value) if order_stats and order_stats.avg_order_value else 0.0,
-                "last_order": order_stats.last_order_date if order_stats else None,
+                "total": scorecard.total_orders if scorecard else 0,
+                "total_spend": float(scorecard.orders_spend) if scorecard and scorecard.orders_spend else 0.0,
+                "avg_value": float(scorecard.avg_order_value) if scorecard and scorecard.avg_order_value else 0.0,
+                "last_order": scorecard.last_order_at if scorecard else None,
             },
             "invoices": {
-                "total": invoice_stats.total_invoices if invoice_stats else 0,
-                "total_invoiced": float(invoice_stats.total_invoiced) if invoice_stats and invoice_stats.total_invoiced else 0.0,
-                "avg_value": float(invoice_stats.avg_invoice_value) if invoice_stats and invoice_stats.avg_invoice_value else 0.0,
+                "total": scorecard.total_invoices if scorecard else 0,
+                "total_invoiced": float(scorecard.invoices_spend) if scorecard and scorecard.invoices_spend else 0.0,
+                "avg_value": float(scorecard.avg_invoice_value) if scorecard and scorecard.avg_invoice_value else 0.0,
             },
             "qualification": {
                 "score": float(qualification.qualification_score) if qualification and qualification.qualification_score else None,
@@ -257,6 +242,8 @@ class VendorRiskAssessmentService:
         if vendor_data['orders']['last_order']:
             last_order_date = vendor_data['orders']['last_order']
             if isinstance(last_order_date, datetime):
+                if last_order_date.tzinfo is not None:
+                    last_order_date = last_order_date.astimezone(timezone.utc).replace(tzinfo=None)
                 days_since_order = (datetime.utcnow() - last_order_date).days
                 if days_since_order > 90:
                     factors.append(f"No orders in {days_since_order} days")
@@ -321,20 +308,39 @@ class VendorRiskAssessmentService:
         }
     
     async def assess_all_vendors(self, org_id: Optional[str] = None) -> List[Dict]:
-        """Assess risk for all vendors (or vendors in an organization)"""
+        """
+        Rule-based risk for every vendor from one query over vendors, their
+        scorecards and latest active qualification. The per-vendor AI call is
+        skipped here: its answer is not used in the result.
+        """
+        latest_qualification = (
+            select(VendorQualification)
+            .where(VendorQualification.is_active == True)
+            .distinct(VendorQualification.vendor_id)
+            .order_by(VendorQualification.vendor_id, VendorQualification.created_at.desc())
+            .subquery()
+        )
+        qualification = aliased(VendorQualification, latest_qualification)
+        
         async with get_session() as session:
-            query = select(Vendor)
+            query = (
+                select(Vendor, VendorScorecard, qualification)
+                .outerjoin(VendorScorecard, VendorScorecard.vendor_id == Vendor.id)
+                .outerjoin(qualification, qualification.vendor_id == Vendor.id)
+                .order_by(Vendor.vendor_name)
+            )
             if org_id:
                 # Filter by organization if needed
                 pass  # Add org_id filter when vendor model has org_id
             
             result = await session.execute(query)
-            vendors = list(result.scalars().all())
             
             assessments = []
-            for vendor in vendors:
+            for vendor, scorecard, vendor_qualification in result.all():
                 try:
-                    assessment = await self.assess_vendor_risk(str(vendor.id))
+                    assessment = self._fallback_risk_assessment(
+                        self._vendor_data(vendor, scorecard, vendor_qualification)
+                    )
                     assessment["vendor_id"] = str(vendor.id)
                     assessment["vendor_name"] = vendor.vendor_name
                     assessments.append(assessment)
@@ -343,4 +349,3 @@ class VendorRiskAssessmentService:
                     continue
             
             return assessments
-
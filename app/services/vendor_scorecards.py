@@ -0,0 +1,141 @@
+"""
+Vendor Scorecards
+Maintains `vendor_scorecards`: per-vendor order, invoice and delivery
+milestone totals.
+
+`refresh()` recomputes the given vendors (or all of them) with one grouped
+`INSERT ... SELECT ... ON CONFLICT DO UPDATE`; procurement writes call it for
+the vendors they touch. Performance and risk views read the rollup instead
+of aggregating each vendor's orders, invoices and milestones per request.
+
+Before recomputing, `refresh()` locks the vendor rows (`FOR NO KEY UPDATE`,
+in id order). A second transaction refreshing the same vendor waits for the
+first to commit, and its recompute then sees the committed rows, so the
+later upsert never overwrites a newer total with a stale one. The lock does
+not conflict with the key-share locks taken by foreign keys to the vendor.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.procurement import PurchaseOrder
+from app.models.vendor import Vendor, VendorScorecard
+from app.utils.logger import get_logger
+
+logger = get_logger("vendor_scorecards")
+
+_REFRESH_SQL = """
+INSERT INTO vendor_scorecards (
+    vendor_id, total_orders, orders_spend, avg_order_value, last_order_at,
+    total_invoices, invoices_spend, avg_invoice_value,
+    milestones_total, milestones_on_time, delivery_days_sum, delivery_days_count,
+    refreshed_at
+)
+SELECT
+    v.id,
+    COALESCE(po.total_orders, 0), COALESCE(po.spend, 0), po.avg_value, po.last_order_at,
+    COALESCE(inv.total_invoices, 0), COALESCE(inv.spend, 0), inv.avg_value,
+    COALESCE(ms.total, 0), COALESCE(ms.on_time, 0), COALESCE(ms.days_sum, 0), COALESCE(ms.days_count, 0),
+    now()
+FROM vendors v
+LEFT JOIN (
+    SELECT vendor_id, count(*) AS total_orders, sum(amount) AS spend,
+           avg(amount) AS avg_value, max(created_at) AS last_order_at
+    FROM purchase_orders
+    WHERE vendor_id IS NOT NULL {order_filter}
+    GROUP BY vendor_id
+) po ON po.vendor_id = v.id
+LEFT JOIN (
+    SELECT vendor_id, count(*) AS total_invoices, sum(amount) AS spend, avg(amount) AS avg_value
+    FROM vendor_invoices
+    WHERE vendor_id IS NOT NULL {invoice_filter}
+    GROUP BY vendor_id
+) inv ON inv.vendor_id = v.id
+LEFT JOIN (
+    SELECT o.vendor_id,
+           count(*) AS total,
+           count(*) FILTER (WHERE m.completed_date <= m.due_date) AS on_time,
+           sum(floor(extract(epoch FROM m.completed_date - m.due_date) / 86400))
+               FILTER (WHERE m.completed_date IS NOT NULL) AS days_sum,
+           count(m.completed_date) AS days_count
+    FROM delivery_milestones m
+    JOIN purchase_orders o ON o.id = m.po_id
+    WHERE o.vendor_id IS NOT NULL {milestone_filter}
+    GROUP BY o.vendor_id
+) ms ON ms.vendor_id = v.id
+{vendor_filter}
+ON CONFLICT (vendor_id) DO UPDATE SET
+    total_orders = EXCLUDED.total_orders,
+    orders_spend = EXCLUDED.orders_spend,
+    avg_order_value = EXCLUDED.avg_order_value,
+    last_order_at = EXCLUDED.last_order_at,
+    total_invoices = EXCLUDED.total_invoices,
+    invoices_spend = EXCLUDED.invoices_spend,
+    avg_invoice_value = EXCLUDED.avg_invoice_value,
+    milestones_total = EXCLUDED.milestones_total,
+    milestones_on_time = EXCLUDED.milestones_on_time,
+    delivery_days_sum = EXCLUDED.delivery_days_sum,
+    delivery_days_count = EXCLUDED.delivery_days_count,
+    refreshed_at = EXCLUDED.refreshed_at
+"""
+
+_LOCK_ALL_VENDORS_SQL = "SELECT id FROM vendors ORDER BY id FOR NO KEY UPDATE"
+_LOCK_SOME_VENDORS_SQL = (
+    "SELECT id FROM vendors WHERE id = ANY(CAST(:vendor_ids AS uuid[])) ORDER BY id FOR NO KEY UPDATE"
+)
+
+_ALL_VENDORS_SQL = _REFRESH_SQL.format(order_filter="", invoice_filter="", milestone_filter="", vendor_filter="")
+_SOME_VENDORS_SQL = _REFRESH_SQL.format(
+    order_filter="AND vendor_id = ANY(CAST(:vendor_ids AS uuid[]))",
+    invoice_filter="AND vendor_id = ANY(CAST(:vendor_ids AS uuid[]))",
+    milestone_filter="AND o.vendor_id = ANY(CAST(:vendor_ids AS uuid[]))",
+    vendor_filter="WHERE v.id = ANY(CAST(:vendor_ids AS uuid[]))",
+)
+
+
+class VendorScorecardService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refresh(self, vendor_ids: Optional[Iterable[Optional[uuid.UUID]]] = None) -> None:
+        """Recompute the scorecards of `vendor_ids` (None values are skipped), or of every vendor."""
+        if vendor_ids is None:
+            await self.db.execute(text(_LOCK_ALL_VENDORS_SQL))
+            await self.db.execute(text(_ALL_VENDORS_SQL))
+            logger.info("Rebuilt all vendor scorecards")
+            return
+        ids = sorted({vendor_id for vendor_id in vendor_ids if vendor_id is not None}, key=str)
+        if ids:
+            await self.db.execute(text(_LOCK_SOME_VENDORS_SQL), {"vendor_ids": ids})
+            await self.db.execute(text(_SOME_VENDORS_SQL), {"vendor_ids": ids})
+
+    async def refresh_for_orders(self, po_ids: Iterable[Optional[uuid.UUID]]) -> None:
+        """Recompute the vendors of the given purchase orders (milestone changes)."""
+        ids = [po_id for po_id in po_ids if po_id is not None]
+        if not ids:
+            return
+        result = await self.db.execute(
+            select(PurchaseOrder.vendor_id).where(PurchaseOrder.id.in_(ids)).distinct()
+        )
+        await self.refresh(result.scalars().all())
+
+    async def get(self, vendor_id: uuid.UUID) -> Tuple[Optional[Vendor], Optional[VendorScorecard]]:
+        result = await self.db.execute(
+            select(Vendor, VendorScorecard)
+            .outerjoin(VendorScorecard, VendorScorecard.vendor_id == Vendor.id)
+            .where(Vendor.id == vendor_id)
+        )
+        row = result.first()
+        return (row[0], row[1]) if row else (None, None)
+
+    async def list_all(self) -> List[Tuple[Vendor, Optional[VendorScorecard]]]:
+        result = await self.db.execute(
+            select(Vendor, VendorScorecard)
+            .outerjoin(VendorScorecard, VendorScorecard.vendor_id == Vendor.id)
+            .order_by(Vendor.vendor_name)
+        )
+        return [(vendor, card) for vendor, card in result.all()]
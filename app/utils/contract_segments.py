@@ -0,0 +1,137 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Sequence
+
+
+# Lines that open a new clause: "Article 4", "SECTION 12.", "3.2 Payment Terms", "7) Termination"
+_KEYWORD_HEADING = re.compile(r"^\s*(?i:article|section|clause|schedule|exhibit)\s+[\dIVXLC]+(?:\.\d+)*\b")
+_NUMBERED_HEADING = re.compile(r"^\s*\d{1,3}(?:\.\d{1,3})*[.)]?\s+[A-Z]")
+_LEADING_NUMBER = re.compile(
+    r"^\s*(?:(?i:article|section|clause|schedule|exhibit)\s+[\dIVXLC]+|\d+)(?:\.\d+)*[.:)]?\s+"
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+MIN_SEGMENT_CHARS = 200
+MAX_SEGMENT_CHARS = 4000
+TARGET_PARAGRAPH_CHARS = 1500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def normalize_clause_text(text: str) -> str:
+    """Lowercase, drop the section number and collapse whitespace so renumbered or reflowed clauses hash the same."""
+    text = _LEADING_NUMBER.sub("", text.strip(), count=1)
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def segment_hash(segment: str) -> str:
+    return text_hash(normalize_clause_text(segment))
+
+
+def _is_heading(line: str) -> bool:
+    return bool(_KEYWORD_HEADING.match(line) or _NUMBERED_HEADING.match(line))
+
+
+def _split_long(segment: str) -> List[str]:
+    if len(segment) <= MAX_SEGMENT_CHARS:
+        return [segment]
+
+    parts: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", segment):
+        if current and len(current) + len(paragraph) > MAX_SEGMENT_CHARS:
+            parts.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+        while len(current) > MAX_SEGMENT_CHARS:
+            parts.append(current[:MAX_SEGMENT_CHARS])
+            current = current[MAX_SEGMENT_CHARS:]
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_clauses(text: str) -> List[str]:
+    """
+    Split contract text into clause-sized segments.
+
+    Segments start at section headings when the document has them, otherwise at
+    paragraph breaks; short fragments are merged into their predecessor and very
+    long sections are split on paragraphs.
+    """
+    lines = text.splitlines()
+    has_headings = sum(1 for line in lines if _is_heading(line)) >= 2
+
+    raw: List[str] = []
+    if has_headings:
+        current: List[str] = []
+        for line in lines:
+            if _is_heading(line) and current:
+                raw.append("\n".join(current))
+                current = []
+            current.append(line)
+        if current:
+            raw.append("\n".join(current))
+    else:
+        current_text = ""
+        for paragraph in re.split(r"\n\s*\n", text):
+            if current_text and len(current_text) + len(paragraph) > TARGET_PARAGRAPH_CHARS:
+                raw.append(current_text)
+                current_text = ""
+            current_text = f"{current_text}\n\n{paragraph}" if current_text else paragraph
+        if current_text:
+            raw.append(current_text)
+
+    segments: List[str] = []
+    for segment in raw:
+        segment = segment.strip()
+        if not segment:
+            continue
+        if segments and len(segment) < MIN_SEGMENT_CHARS:
+            segments[-1] = f"{segments[-1]}\n{segment}"
+        else:
+            segments.append(segment)
+
+    result: List[str] = []
+    for segment in segments:
+        result.extend(_split_long(segment))
+    return result
+
+
+def segment_title(segment: str, max_length: int = 100) -> str:
+    first_line = segment.strip().splitlines()[0] if segment.strip() else ""
+    return first_line.strip()[:max_length]
+
+
+def best_segment(snippet: str, segments: Sequence[str], normalized: Optional[Dict[int, str]] = None) -> Optional[int]:
+    """
+    Index of the segment a model-quoted snippet most likely came from.
+
+    Tries a direct substring match on normalized text first, then falls back to
+    the segment with the highest word overlap.
+    """
+    if not segments:
+        return None
+
+    normalized = normalized or {i: normalize_clause_text(s) for i, s in enumerate(segments)}
+    probe = " ".join(_WORD.findall(snippet.lower()))
+    if not probe:
+        return None
+
+    head = probe[:80]
+    for index, text in normalized.items():
+        if head in text:
+            return index
+
+    probe_words = set(probe.split())
+    best_index, best_score = None, 0.0
+    for index, text in normalized.items():
+        words = set(text.split())
+        if not words:
+            continue
+        score = len(probe_words & words) / len(probe_words)
+        if score > best_score:
+            best_index, best_score = index, score
+    return best_index
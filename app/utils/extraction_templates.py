@@ -0,0 +1,282 @@
+"""
+Extraction templates
+CSS selectors that pull opportunity listings out of a source's pages without
+a model call.
+
+A template is a plain dict, stored per source in `opportunity_source_templates`:
+
+    {"item": ".results > li.card", "title": "h3 a", "link": "h3 a",
+     "status": ".badge", "summary": "p.teaser"}
+
+- `apply_template` runs a template deterministically against a ParsedPage
+- `validate_template` decides whether a template's output is a real listing
+- `induce_template` finds repeated DOM blocks (the listing) and derives selectors
+- `induce_template_with_model` asks Gemini for selectors once, when the DOM
+  heuristics fail; the result is validated like any other template
+
+Only CSS selectors are supported (BeautifulSoup has no XPath engine).
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from app.utils.html_page import ParsedPage
+from app.utils.logger import get_logger
+
+logger = get_logger("extraction_templates")
+
+TEMPLATE_FIELDS = ("item", "title", "link", "status", "summary")
+MIN_INDUCED_ITEMS = 3
+MIN_UNIQUE_LINK_RATIO = 0.8
+
+# Listing layouts recognised without learning anything
+BUILTIN_TEMPLATES: List[Dict[str, Optional[str]]] = [
+    {
+        "item": ".page-projects-list__item",
+        "title": ".page-projects-list__item-title a",
+        "link": None,
+        "status": ".page-projects-list__item-status-status",
+        "summary": ".page-projects-list__item-summary",
+    },
+]
+
+_SKIP_ANCESTORS = {"nav", "header", "footer", "form", "select"}
+_STATUS_CLASS = re.compile(r"status|state|phase|badge|stage", re.IGNORECASE)
+_SUMMARY_CLASS = re.compile(r"summary|desc|excerpt|teaser|intro|abstract|body", re.IGNORECASE)
+# Generated or state classes that differ between otherwise identical items
+_UNSTABLE_CLASS = re.compile(r"\d{2,}|^(active|odd|even|first|last|selected|is-|js-)", re.IGNORECASE)
+
+MODEL_TEMPLATE_PROMPT = """You are given the HTML of a page listing projects, tenders or opportunities.
+Return ONLY JSON with CSS selectors that extract the listing:
+{{
+  "item": selector matching every listing entry (one element per opportunity),
+  "title": selector relative to the item for the title element,
+  "link": selector relative to the item for the <a> to the detail page, or null if the title is the link,
+  "status": selector relative to the item for the status text, or null,
+  "summary": selector relative to the item for the short description, or null
+}}
+Use classes and tag names that appear in the HTML. No XPath, no markdown.
+
+HTML:
+\"\"\"{html}\"\"\""""
+
+
+def _text(element: Any) -> str:
+    return element.get_text(" ", strip=True) if element is not None else ""
+
+
+def apply_template(
+    page: ParsedPage, template: Dict[str, Any], base_url: str, max_items: int = 20
+) -> List[Dict[str, Any]]:
+    """Run a template against a page; returns opportunities in the scraper's listing shape."""
+    item_selector = template.get("item")
+    title_selector = template.get("title")
+    if not item_selector or not title_selector:
+        return []
+    try:
+        items = page.soup.select(item_selector)
+    except Exception as e:
+        logger.debug(f"Invalid item selector {item_selector!r}: {e}")
+        return []
+
+    opportunities: List[Dict[str, Any]] = []
+    seen_titles: set[str] = set()
+    for item in items:
+        try:
+            title_element = item.select_one(title_selector)
+            link_element = item.select_one(template["link"]) if template.get("link") else None
+            status_element = item.select_one(template["status"]) if template.get("status") else None
+            summary_element = item.select_one(template["summary"]) if template.get("summary") else None
+        except Exception as e:
+            logger.debug(f"Invalid field selector in template: {e}")
+            return []
+        if title_element is None:
+            continue
+
+        title = title_element.get_text(strip=True)
+        if not title or title in seen_titles:
+            continue
+        seen_titles.add(title)
+
+        if link_element is None:
+            if title_element.name == "a":
+                link_element = title_element
+            elif item.name == "a":
+                link_element = item
+            else:
+                link_element = title_element.find("a", href=True) or item.find("a", href=True)
+        detail_href = (link_element.get("href") or "") if link_element is not None else ""
+        detail_url = urljoin(base_url, detail_href.strip()) if detail_href.strip() else None
+
+        summary = _text(summary_element) or None
+        status = status_element.get_text(strip=True) if status_element is not None else None
+        if summary and status and summary.endswith(status):
+            summary = summary[: -len(status)].rstrip(" -:;,.")
+
+        opportunities.append(
+            {
+                "title": title,
+                "status": status or None,
+                "description": summary,
+                "detail_url": detail_url,
+                "client": None,
+                "location": None,
+                "budget_text": None,
+                "deadline": None,
+                "tags": [],
+            }
+        )
+        if len(opportunities) >= max_items:
+            break
+    return opportunities
+
+
+def validate_template(
+    opportunities: List[Dict[str, Any]], base_url: str, min_items: int = 1
+) -> bool:
+    """A listing is credible when enough items have a title and distinct detail links."""
+    linked = [item for item in opportunities if item.get("title") and item.get("detail_url")]
+    if len(linked) < min_items:
+        return False
+    detail_urls = {item["detail_url"] for item in linked}
+    if len(linked) > 1 and (len(detail_urls) / len(linked) < MIN_UNIQUE_LINK_RATIO or detail_urls == {base_url}):
+        return False
+    return True
+
+
+# ---- structural induction -------------------------------------------------
+
+def _classes(element: Any) -> List[str]:
+    return sorted(c for c in (element.get("class") or []) if not _UNSTABLE_CLASS.search(c))
+
+
+def _signature(element: Any) -> str:
+    return element.name + "".join(f".{c}" for c in _classes(element))
+
+
+def _css(element: Any) -> str:
+    element_id = element.get("id")
+    if element_id and not _UNSTABLE_CLASS.search(element_id) and re.fullmatch(r"[A-Za-z][\w-]*", element_id):
+        return f"#{element_id}"
+    return _signature(element)
+
+
+def _relative_selector(element: Any, item: Any) -> str:
+    """Selector for `element` within `item`: its own signature, scoped by the nearest classed ancestor."""
+    own = _signature(element)
+    parent = element.parent
+    while parent is not None and parent is not item:
+        if _classes(parent) or re.fullmatch(r"h[1-6]", parent.name or ""):
+            return f"{_signature(parent)} {own}"
+        parent = parent.parent
+    return own
+
+
+def _most_common(values: List[Optional[str]], min_share: float = 0.6) -> Optional[str]:
+    present = [value for value in values if value]
+    if not present:
+        return None
+    value, count = Counter(present).most_common(1)[0]
+    return value if count / len(values) >= min_share else None
+
+
+def _field_selectors(items: List[Any]) -> Optional[Dict[str, Optional[str]]]:
+    titles: List[Optional[str]] = []
+    statuses: List[Optional[str]] = []
+    summaries: List[Optional[str]] = []
+    for item in items:
+        anchor = next((a for a in item.find_all("a", href=True) if len(_text(a)) >= 4), None)
+        if anchor is None:
+            titles.append(None)
+            continue
+        heading = anchor.find_parent(re.compile(r"^h[1-6]$"))
+        if heading is not None and any(parent is item for parent in heading.parents):
+            titles.append(f"{_signature(heading)} a")
+        else:
+            titles.append(_relative_selector(anchor, item))
+
+        title_text = _text(anchor)
+        status = next(
+            (el for el in item.find_all(True) if _STATUS_CLASS.search(" ".join(el.get("class") or [])) and _text(el)),
+            None,
+        )
+        statuses.append(_relative_selector(status, item) if status is not None else None)
+
+        summary = next(
+            (
+                el
+                for el in item.find_all(True)
+                if (el.name == "p" or _SUMMARY_CLASS.search(" ".join(el.get("class") or [])))
+                and len(_text(el)) > len(title_text)
+                and not any(parent is el for parent in anchor.parents)
+            ),
+            None,
+        )
+        summaries.append(_relative_selector(summary, item) if summary is not None else None)
+
+    title = _most_common(titles)
+    if title is None:
+        return None
+    return {"title": title, "link": None, "status": _most_common(statuses), "summary": _most_common(summaries)}
+
+
+def induce_template(page: ParsedPage, base_url: str) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Find the page's listing as the largest group of same-shaped sibling blocks
+    that each carry a titled link, derive selectors for it, and keep them only
+    if they validate.
+    """
+    candidates: List[tuple[float, Any, List[Any]]] = []
+    for parent in page.soup.find_all(True):
+        if parent.name in _SKIP_ANCESTORS or parent.find_parent(list(_SKIP_ANCESTORS)) is not None:
+            continue
+        groups: Dict[str, List[Any]] = defaultdict(list)
+        for child in parent.find_all(True, recursive=False):
+            groups[_signature(child)].append(child)
+        for group in groups.values():
+            if len(group) < MIN_INDUCED_ITEMS:
+                continue
+            linked = [child for child in group if any(len(_text(a)) >= 4 for a in child.find_all("a", href=True))]
+            if len(linked) < MIN_INDUCED_ITEMS or len(linked) / len(group) < 0.6:
+                continue
+            avg_text = sum(min(len(_text(child)), 400) for child in linked) / len(linked)
+            if avg_text < 20:
+                # Menus and tag clouds: many links, little text each
+                continue
+            candidates.append((len(linked) * avg_text, parent, linked))
+
+    for _, parent, items in sorted(candidates, key=lambda candidate: candidate[0], reverse=True)[:5]:
+        fields = _field_selectors(items)
+        if fields is None:
+            continue
+        template = {"item": f"{_css(parent)} > {_signature(items[0])}", **fields}
+        opportunities = apply_template(page, template, base_url)
+        if validate_template(opportunities, base_url, min_items=MIN_INDUCED_ITEMS):
+            return template
+    return None
+
+
+def induce_template_with_model(page: ParsedPage, base_url: str, model: Any) -> Optional[Dict[str, Optional[str]]]:
+    """One Gemini call for selectors; None unless the returned template validates."""
+    body = page.soup.body or page.soup
+    html = re.sub(r"\s+", " ", str(body))[:15000]
+    try:
+        response = model.generate_content(MODEL_TEMPLATE_PROMPT.format(html=html))
+        raw = (response.text if response else "").strip().strip("`")
+        if raw.startswith("json"):
+            raw = raw[4:]
+        proposed = json.loads(raw)
+    except Exception as e:
+        logger.debug(f"Template induction via model failed for {base_url}: {e}")
+        return None
+    if not isinstance(proposed, dict):
+        return None
+    template = {field: (proposed.get(field) or None) for field in TEMPLATE_FIELDS}
+    opportunities = apply_template(page, template, base_url)
+    if validate_template(opportunities, base_url, min_items=MIN_INDUCED_ITEMS):
+        return template
+    return None
@@ -0,0 +1,163 @@
+"""
+Parsed HTML pages
+A fetched page parsed once and shared by every extractor that reads it,
+instead of each extractor building its own BeautifulSoup tree.
+
+- Parsed with lxml when it is installed, otherwise the stdlib html.parser
+- Scripts, styles and noscript blocks are dropped once, at parse time
+- Visible text, links, images, headings and document candidates are
+  computed on first access and cached on the page
+
+    page = ParsedPage(html, url)
+    page.text, page.links, page.documents()
+"""
+from __future__ import annotations
+
+import importlib.util
+from functools import cached_property
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import urljoin
+
+from app.utils.lazy import lazy_import
+
+bs4 = lazy_import("bs4")
+
+# find_spec checks for lxml without importing it at startup
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+DOCUMENT_EXTENSIONS = (
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+    ".dwg", ".dgn", ".zip", ".rar", ".txt", ".csv", ".xml",
+)
+DOCUMENT_KEYWORDS = (
+    "download", "document", "pdf", "specification", "spec", "drawing",
+    "plan", "report", "study", "assessment", "rfp", "tender", "bid",
+    "attachment", "resource", "file", "manual", "guide",
+)
+DOCUMENT_SECTION_KEYWORDS = ("document", "download", "resource", "attachment", "file")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp")
+
+
+class PageLink(NamedTuple):
+    href: str
+    url: str
+    text: str
+    element: Any
+
+
+class ParsedPage:
+    def __init__(self, html: str, url: str = ""):
+        self.html = html or ""
+        self.url = url
+
+    @cached_property
+    def soup(self) -> Any:
+        soup = bs4.BeautifulSoup(self.html, HTML_PARSER)
+        for tag in soup(["script", "style", "noscript"]):
+            tag.extract()
+        return soup
+
+    @cached_property
+    def text(self) -> str:
+        raw = self.soup.get_text(separator="\n")
+        return "\n".join(line.strip() for line in raw.splitlines() if line.strip())
+
+    @cached_property
+    def title(self) -> str:
+        return self.soup.title.get_text(strip=True) if self.soup.title else ""
+
+    @cached_property
+    def headings(self) -> Dict[str, List[str]]:
+        """h1..h3 texts in document order, keyed by tag name."""
+        found: Dict[str, List[str]] = {"h1": [], "h2": [], "h3": []}
+        for heading in self.soup.find_all(["h1", "h2", "h3"]):
+            text = heading.get_text(" ", strip=True)
+            if text:
+                found[heading.name].append(text)
+        return found
+
+    @cached_property
+    def links(self) -> List[PageLink]:
+        """Every `<a href>` with its absolute URL and link text."""
+        links: List[PageLink] = []
+        for element in self.soup.find_all("a", href=True):
+            href = (element.get("href") or "").strip()
+            if not href:
+                continue
+            links.append(PageLink(href, urljoin(self.url, href), element.get_text(" ", strip=True), element))
+        return links
+
+    @cached_property
+    def images(self) -> List[str]:
+        images: List[str] = []
+        for element in self.soup.find_all("img", src=True):
+            url = urljoin(self.url, element["src"].strip())
+            if url.lower().split("?")[0].endswith(IMAGE_EXTENSIONS) and url not in images:
+                images.append(url)
+        return images
+
+    def documents(self) -> List[Dict[str, Any]]:
+        """
+        Document links: by file extension, by keyword in the URL or link text,
+        under a parent mentioning documents, or inside a document/download section.
+        """
+        if "_documents" not in self.__dict__:
+            self.__dict__["_documents"] = self._find_documents()
+        return list(self.__dict__["_documents"])
+
+    def _find_documents(self) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        seen_urls: set[str] = set()
+
+        for link in self.links:
+            normalized_href = link.href.lower()
+            normalized_text = link.text.lower()
+            has_doc_extension = any(ext in normalized_href for ext in DOCUMENT_EXTENSIONS)
+            has_doc_keyword = any(
+                keyword in normalized_href or keyword in normalized_text for keyword in DOCUMENT_KEYWORDS
+            )
+            parent = link.element.parent
+            parent_text = parent.get_text(" ", strip=True).lower() if parent else ""
+            has_parent_indicator = any(keyword in parent_text for keyword in DOCUMENT_SECTION_KEYWORDS)
+            if not (has_doc_extension or has_doc_keyword or has_parent_indicator):
+                continue
+            if link.url in seen_urls:
+                continue
+            seen_urls.add(link.url)
+
+            doc_type = next((ext[1:].upper() for ext in DOCUMENT_EXTENSIONS if ext in normalized_href), None)
+            title = link.text or None
+            if not title:
+                filename = link.href.split("/")[-1].split("?")[0]
+                if filename and "." in filename:
+                    title = filename
+            documents.append({"title": title or "Document", "url": link.url, "type": doc_type, "description": None})
+
+        sections = self.soup.find_all(
+            ["section", "div"],
+            class_=lambda x: x and any(keyword in x.lower() for keyword in DOCUMENT_SECTION_KEYWORDS),
+        )
+        for section in sections:
+            for element in section.find_all("a", href=True):
+                href = element.get("href")
+                if not href:
+                    continue
+                url = urljoin(self.url, href)
+                if url in seen_urls:
+                    continue
+                text = element.get_text(" ", strip=True)
+                if text or any(ext in href.lower() for ext in DOCUMENT_EXTENSIONS):
+                    seen_urls.add(url)
+                    documents.append({"title": text or "Document", "url": url, "type": None, "description": None})
+
+        return documents
+
+
+def page_of(scraped: Dict[str, Any], url: Optional[str] = None) -> ParsedPage:
+    """The ParsedPage behind a `scrape_text_with_bs4` result, parsing its HTML if it has none."""
+    page = scraped.get("page")
+    if isinstance(page, ParsedPage):
+        return page
+    page = ParsedPage(scraped.get("html") or "", url or scraped.get("url") or "")
+    scraped["page"] = page
+    return page
@@ -0,0 +1,104 @@
+"""
+Lazy imports and deferred singletons.
+
+Heavy SDKs (Gemini, boto3, PDF/DOCX parsers, BeautifulSoup) and the clients
+built from them are loaded on first use instead of when the app is imported,
+so a worker that never touches an integration never pays for it.
+
+    boto3 = lazy_import("boto3")                     # imported on boto3.client(...)
+    gemini_service = deferred(GeminiService)         # constructed on first attribute access
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Any, Callable, Optional, TypeVar, cast
+
+T = TypeVar("T")
+
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str, on_load: Optional[Callable[[Any], None]] = None):
+        self.__dict__["_name"] = name
+        self.__dict__["_on_load"] = on_load
+        self.__dict__["_module"] = None
+
+    def _load(self) -> Any:
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+class Deferred:
+    """Proxy that builds its target with `factory()` on first attribute access."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.__dict__["_factory"] = factory
+        self.__dict__["_target"] = None
+
+    def get(self) -> Any:
+        target = self.__dict__["_target"]
+        if target is None:
+            with _lock:
+                target = self.__dict__["_target"]
+                if target is None:
+                    target = self._factory()
+                    self.__dict__["_target"] = target
+        return target
+
+    @property
+    def built(self) -> bool:
+        return self.__dict__["_target"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self.get(), attr, value)
+
+    def __repr__(self) -> str:
+        if self.built:
+            return repr(self.__dict__["_target"])
+        return f"<deferred {getattr(self._factory, '__qualname__', self._factory)} (not built)>"
+
+
+def lazy_import(name: str, on_load: Optional[Callable[[Any], None]] = None) -> Any:
+    """Return a module proxy for `name`; `on_load(module)` runs once after the real import."""
+    return LazyModule(name, on_load)
+
+
+def deferred(factory: Callable[[], T]) -> T:
+    """Return a proxy for `factory()` that is only called when the object is first used."""
+    return cast(T, Deferred(factory))
+
+
+def _configure_gemini(module: Any) -> None:
+    from app.environment import environment
+
+    module.configure(api_key=environment.GEMINI_API_KEY)
+
+
+# Shared Gemini SDK handle, configured with the app's API key on first use
+genai = lazy_import("google.generativeai", on_load=_configure_gemini)
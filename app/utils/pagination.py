@@ -0,0 +1,236 @@
+"""
+Pagination
+Keyset (cursor) pagination and cheaper totals for list endpoints.
+
+- Rows are ordered by `(sort, id)`; `next_cursor` encodes the last row's
+  values so the next page is `WHERE (sort, id) < (:sort, :id)` instead of
+  OFFSET, which stays fast however deep the client pages
+- `page` keeps working (OFFSET) for callers that have no cursor
+- Totals follow the `count` mode:
+    exact    - COUNT(*) over the filtered query (previous behaviour)
+    capped   - counts at most COUNT_CAP rows; larger totals report the cap
+    estimate - capped count, and past the cap the planner's row estimate
+               (which Postgres derives from pg_class.reltuples and column
+               statistics); no full scan either way
+  Non-exact totals set `total_is_estimate`
+- Only the first page counts: `next_cursor` carries the total, and cursor
+  pages report it again instead of re-running the count
+
+    page = await paginate(
+        self.db, query, sort=Opportunity.created_at, id_column=Opportunity.id,
+        size=size, page=page, cursor=cursor, count=count, key="created_at",
+    )
+    page.items, page.total, page.next_cursor
+"""
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Literal, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement, ColumnElement
+
+from app.utils.logger import get_logger
+
+logger = get_logger("pagination")
+
+CountMode = Literal["exact", "capped", "estimate"]
+COUNT_CAP = 10000
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any]
+    total: int
+    total_is_estimate: bool
+    next_cursor: Optional[str]
+
+    def total_pages(self, size: int) -> int:
+        return (self.total + size - 1) // size if self.total > 0 else 0
+
+
+# ---- cursors ---------------------------------------------------------------
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"u": str(value)}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _load(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "u" in value:
+            return uuid.UUID(value["u"])
+        if "n" in value:
+            return Decimal(value["n"])
+    return value
+
+
+def encode_cursor(key: str, values: Sequence[Any], total: Optional[tuple[int, bool]] = None) -> str:
+    body: dict = {"k": key, "v": [_dump(value) for value in values]}
+    if total is not None:
+        body["t"] = [total[0], total[1]]
+    payload = json.dumps(body, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_payload(cursor: str, key: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get("k") != key:
+            raise ValueError(f"cursor was issued for sort {payload.get('k')!r}")
+        values = payload["v"]
+        # Always (sort value, id)
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError("cursor must hold a sort value and an id")
+        return payload
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
+
+def decode_cursor(cursor: str, key: str) -> List[Any]:
+    """Values stored in a cursor; 400 if it is malformed or was issued for another sort."""
+    try:
+        return [_load(value) for value in _decode_payload(cursor, key)["v"]]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {e}")
+
+
+def cursor_total(cursor: str, key: str) -> Optional[tuple[int, bool]]:
+    """(total, is_estimate) carried by a cursor from the first page, if any."""
+    total = _decode_payload(cursor, key).get("t")
+    if (
+        isinstance(total, list) and len(total) == 2
+        and isinstance(total[0], int) and not isinstance(total[0], bool) and total[0] >= 0
+        and isinstance(total[1], bool)
+    ):
+        return total[0], total[1]
+    return None
+
+
+# ---- counts ----------------------------------------------------------------
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <select>, compiled with the select's own bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def _planner_estimate(db: AsyncSession, query: Select) -> Optional[int]:
+    try:
+        # Savepoint: a failed EXPLAIN must not abort the request's transaction
+        async with db.begin_nested():
+            plan = (await db.execute(_Explain(query))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug(f"Planner row estimate failed: {e}")
+        return None
+
+
+async def count_rows(db: AsyncSession, query: Select, mode: CountMode = "exact") -> tuple[int, bool]:
+    """(total, is_estimate) for a filtered, unordered query."""
+    query = query.order_by(None)
+    if mode == "exact":
+        return (await db.execute(select(func.count()).select_from(query.subquery()))).scalar() or 0, False
+
+    capped = (
+        await db.execute(select(func.count()).select_from(query.limit(COUNT_CAP + 1).subquery()))
+    ).scalar() or 0
+    if capped <= COUNT_CAP:
+        return capped, False
+    if mode == "estimate":
+        estimate = await _planner_estimate(db, query)
+        if estimate is not None:
+            return max(estimate, COUNT_CAP), True
+    return COUNT_CAP, True
+
+
+# ---- pages -----------------------------------------------------------------
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    *,
+    sort: ColumnElement,
+    id_column: ColumnElement,
+    size: int,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    count: CountMode = "exact",
+    descending: bool = True,
+    key: str = "created_at",
+) -> KeysetPage:
+    """
+    One page of `query` (a select of a single entity, filters applied, no
+    ORDER BY), ordered by `(sort, id_column)`. `sort` must not be NULL; wrap
+    nullable columns in coalesce(). `key` names the sort in the cursor, so a
+    cursor from one sort order is rejected by another. Cursor pages reuse the
+    total carried by the cursor; `count` applies to the first page.
+    """
+    carried = cursor_total(cursor, key) if cursor else None
+    if carried is not None:
+        total, is_estimate = carried
+    else:
+        total, is_estimate = await count_rows(db, query, count)
+
+    ordered = query.add_columns(sort.label("_keyset_sort"), id_column.label("_keyset_id"))
+    if cursor:
+        boundary = tuple_(sort, id_column)
+        values = tuple(decode_cursor(cursor, key))
+        ordered = ordered.where(boundary < values if descending else boundary > values)
+    elif page > 1:
+        ordered = ordered.offset((page - 1) * size)
+    ordered = ordered.order_by(
+        *((sort.desc(), id_column.desc()) if descending else (sort.asc(), id_column.asc()))
+    ).limit(size + 1)
+
+    rows = (await db.execute(ordered)).all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+    next_cursor = (
+        encode_cursor(key, [rows[-1]._keyset_sort, rows[-1]._keyset_id], total=(total, is_estimate))
+        if has_more and rows
+        else None
+    )
+    return KeysetPage(
+        items=[row[0] for row in rows],
+        total=total,
+        total_is_estimate=is_estimate,
+        next_cursor=next_cursor,
+    )
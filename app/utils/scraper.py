@@ -2,30 +2,32 @@ import json
 from datetime import datetime
 from urllib.parse import urljoin
 import httpx
-from bs4 import BeautifulSoup
-import google.generativeai as genai
-from app.environment import environment
+from app.services.resources import http_session
+from app.utils.extraction_templates import (
+    BUILTIN_TEMPLATES,
+    apply_template,
+    induce_template,
+    induce_template_with_model,
+    validate_template,
+)
+from app.utils.html_page import ParsedPage, page_of
+from app.utils.lazy import deferred, genai
 from app.utils.logger import get_logger
-from typing import List, Dict, Union, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
-async def scrape_text_with_bs4(url: str) -> Dict[str, Union[str, Dict[str, str]]]:
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+async def fetch_html(url: str) -> Dict[str, Any]:
+    """Download `url`; returns {"url", "final_url", "html"} or {"url", "error"}."""
     try:
         # Increase timeout to 30 seconds for slow websites
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, headers=headers) as client:
-            response = await client.get(url)
+        async with http_session() as client:
+            response = await client.get(url, headers=BROWSER_HEADERS, timeout=30.0, follow_redirects=True)
             response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            for tag in soup(["script", "style", "noscript"]):
-                tag.extract()
-
-            text = soup.get_text(separator="\n")
-            visible_text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
-
-            return {"url": url, "text": visible_text, "html": response.text}
+            return {"url": url, "final_url": str(response.url), "html": response.text}
 
     except httpx.TimeoutException as e:
         return {"url": url, "error": f"Website timeout after 30 seconds: {type(e).__name__}"}
@@ -37,6 +39,27 @@ async def scrape_text_with_bs4(url: str) -> Dict[str, Union[str, Dict[str, str]]
         error_msg = str(e) if str(e) else f"{type(e).__name__}: Unknown error"
         return {"url": url, "error": f"Failed to scrape: {error_msg}"}
 
+
+def parse_fetched(fetched: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a fetch_html result into a scrape_text_with_bs4 result (CPU-bound: parses the page)."""
+    if "error" in fetched:
+        return fetched
+    try:
+        page = ParsedPage(fetched["html"], fetched.get("final_url") or fetched["url"])
+        return {"url": fetched["url"], "text": page.text, "html": fetched["html"], "page": page}
+    except Exception as e:
+        error_msg = str(e) if str(e) else f"{type(e).__name__}: Unknown error"
+        return {"url": fetched["url"], "error": f"Failed to scrape: {error_msg}"}
+
+
+async def scrape_text_with_bs4(url: str) -> Dict[str, Any]:
+    """
+    Fetch `url` and return {"url", "text", "html", "page"}, or {"url", "error"}.
+    `page` is the ParsedPage the text came from; pass the result to extractors
+    so they reuse that parse instead of parsing the HTML again.
+    """
+    return parse_fetched(await fetch_html(url))
+
 extract_contact_info_function = {
     "name": "extract_contact_info",
     "description": "Extracts business or individual contact details from website content.",
@@ -71,8 +94,7 @@ extract_contact_info_function = {
     }
 }
 
-genai.configure(api_key=environment.GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-pro")
+model = deferred(lambda: genai.GenerativeModel("gemini-pro"))
 
 PROJECT_DETAILS_PROMPT = """You are an infrastructure opportunity analyst. Review the provided project page content and return ONLY valid JSON matching this schema:
 {{
@@ -150,7 +172,7 @@ def _normalize_string_list(value: Any) -> List[str]:
     return []
 
 
-def extract_documents_from_html(html: str, base_url: str) -> List[Dict[str, Any]]:
+def extract_documents_from_html(html: str, base_url: str, page: Optional[ParsedPage] = None) -> List[Dict[str, Any]]:
     """
     Enhanced document extraction that finds all document links including:
     - PDFs, Word docs, Excel, PowerPoint
@@ -158,118 +180,24 @@ def extract_documents_from_html(html: str, base_url: str) -> List[Dict[str, Any]
     - Links in document/resource sections
     - Download links
     """
-    if not html:
-        return []
-    soup = BeautifulSoup(html, "html.parser")
-    documents: List[Dict[str, Any]] = []
-    seen_urls: set[str] = set()
-    
-    # Document file extensions to look for
-    doc_extensions = [
-        ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
-        ".dwg", ".dgn", ".zip", ".rar", ".txt", ".csv", ".xml"
-    ]
-    
-    # Keywords that indicate document links
-    doc_keywords = [
-        "download", "document", "pdf", "specification", "spec", "drawing",
-        "plan", "report", "study", "assessment", "rfp", "tender", "bid",
-        "attachment", "resource", "file", "manual", "guide"
-    ]
-    
-    # Find all links
-    for link in soup.find_all("a"):
-        href = link.get("href")
-        if not href:
-            continue
-        
-        text = link.get_text(" ", strip=True).strip()
-        normalized_href = href.lower()
-        normalized_text = text.lower() if text else ""
-        
-        # Check if it's a document by extension
-        has_doc_extension = any(ext in normalized_href for ext in doc_extensions)
-        
-        # Check if it's a document by keyword in URL or text
-        has_doc_keyword = any(keyword in normalized_href or keyword in normalized_text for keyword in doc_keywords)
-        
-        # Also check parent elements for document indicators
-        parent_text = ""
-        parent = link.parent
-        if parent:
-            parent_text = parent.get_text(" ", strip=True).lower()
-        has_parent_indicator = any(keyword in parent_text for keyword in ["document", "download", "resource", "attachment", "file"])
-        
-        # Include if it matches any criteria
-        if not (has_doc_extension or has_doc_keyword or has_parent_indicator):
-            continue
-        
-        # Convert to absolute URL
-        absolute_url = urljoin(base_url, href)
-        
-        # Skip duplicates
-        if absolute_url in seen_urls:
-            continue
-        seen_urls.add(absolute_url)
-        
-        # Determine document type
-        doc_type = None
-        for ext in doc_extensions:
-            if ext in normalized_href:
-                doc_type = ext[1:].upper()  # Remove dot and uppercase
-                break
-        
-        # Extract title - prefer link text, fallback to filename
-        title = text if text else None
-        if not title:
-            # Try to get title from filename
-            filename = href.split("/")[-1].split("?")[0]
-            if filename and "." in filename:
-                title = filename
-        
-        documents.append({
-            "title": title or "Document",
-            "url": absolute_url,
-            "type": doc_type,
-            "description": None,  # Will be filled by AI if available
-        })
-    
-    # Also look for document links in specific sections
-    doc_sections = soup.find_all(["section", "div"], class_=lambda x: x and any(
-        keyword in x.lower() for keyword in ["document", "resource", "download", "attachment", "file"]
-    ))
-    
-    for section in doc_sections:
-        for link in section.find_all("a", href=True):
-            href = link.get("href")
-            if not href:
-                continue
-            absolute_url = urljoin(base_url, href)
-            if absolute_url not in seen_urls:
-                text = link.get_text(" ", strip=True).strip()
-                if text or any(ext in href.lower() for ext in doc_extensions):
-                    seen_urls.add(absolute_url)
-                    documents.append({
-                        "title": text or "Document",
-                        "url": absolute_url,
-                        "type": None,
-                        "description": None,
-                    })
-    
-    return documents
+    if page is None:
+        if not html:
+            return []
+        page = ParsedPage(html, base_url)
+    return page.documents()
 
 
 async def enrich_opportunity_details(
     detail_url: str,
-    prefetched_page: Optional[Dict[str, Union[str, Dict[str, str]]]] = None,
+    prefetched_page: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
+    """Fetch one detail page and enrich it with its own model call (see enrichment_pipeline for batches)."""
     detail_page = prefetched_page or await scrape_text_with_bs4(detail_url)
     if "text" not in detail_page:
         return {"detail_error": detail_page.get("error")}
 
     text = detail_page["text"]
-    html = detail_page.get("html") or ""
-    documents = extract_documents_from_html(html, detail_url)
+    documents = page_of(detail_page, detail_url).documents()
 
     prompt = PROJECT_DETAILS_PROMPT.format(content=_truncate_text(text))
     structured: Dict[str, Any] = {}
@@ -280,7 +208,23 @@ async def enrich_opportunity_details(
     except Exception:
         structured = {}
 
-    if not structured.get("contacts"):
+    return finalize_details(structured, text, documents, detail_url)
+
+
+def finalize_details(
+    structured: Dict[str, Any],
+    text: str,
+    documents: List[Dict[str, Any]],
+    detail_url: str,
+    contact_fallback: bool = True,
+) -> Dict[str, Any]:
+    """
+    Normalize the model's PROJECT_DETAILS_PROMPT output for one page: contacts
+    (optionally via extract_info when the model found none), location, scope,
+    documents found in the HTML, and the project value as a number.
+    """
+    structured = dict(structured or {})
+    if contact_fallback and not structured.get("contacts"):
         fallback_contact = extract_info(text)
         if isinstance(fallback_contact, dict):
             structured["contacts"] = [
@@ -357,54 +301,23 @@ def extract_info(text: str) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Gemini call failed: {str(e)}"}
 
-def extract_opportunities(text: str, html: str, base_url: str, max_items: int = 20) -> List[Dict[str, Any]]:
-    from bs4 import BeautifulSoup
+def extract_opportunities(
+    text: str,
+    html: str,
+    base_url: str,
+    max_items: int = 20,
+    page: Optional[ParsedPage] = None,
+) -> List[Dict[str, Any]]:
 
     parsed_opportunities: List[Dict[str, Any]] = []
 
-    if html:
-        soup = BeautifulSoup(html, "html.parser")
-
-        project_items = soup.select(".page-projects-list__item")
-        seen_titles: set[str] = set()
-
-        for item in project_items:
-            title_element = item.select_one(".page-projects-list__item-title a")
-            if not title_element:
-                continue
-
-            title = title_element.get_text(strip=True)
-            if not title or title in seen_titles:
-                continue
-            seen_titles.add(title)
-
-            detail_href = title_element.get("href") or ""
-            detail_url = urljoin(base_url, detail_href.strip())
-
-            summary_element = item.select_one(".page-projects-list__item-summary")
-            summary = summary_element.get_text(" ", strip=True) if summary_element else None
-
-            status_element = item.select_one(".page-projects-list__item-status-status")
-            status = status_element.get_text(strip=True) if status_element else None
+    if page is None and html:
+        page = ParsedPage(html, base_url)
 
-            if summary and status and summary.endswith(status):
-                summary = summary[: -len(status)].rstrip(" -:;,.")
-
-            parsed_opportunities.append(
-                {
-                    "title": title,
-                    "status": status,
-                    "description": summary,
-                    "detail_url": detail_url,
-                    "client": None,
-                    "location": None,
-                    "budget_text": None,
-                    "deadline": None,
-                    "tags": [],
-                }
-            )
-
-            if len(parsed_opportunities) >= max_items:
+    if page is not None and page.html:
+        for template in BUILTIN_TEMPLATES:
+            parsed_opportunities = apply_template(page, template, base_url, max_items)
+            if parsed_opportunities:
                 break
 
     if parsed_opportunities:
@@ -488,6 +401,49 @@ Return ONLY valid JSON, no additional text or markdown formatting."""
         return []
 
 
+def match_listing(
+    page: ParsedPage,
+    base_url: str,
+    template: Optional[Dict[str, Any]] = None,
+    learn: bool = False,
+    max_items: int = 20,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Extract a listing with selectors instead of a full-page model prompt.
+
+    Tries the source's stored template, then the built-in layouts, then (when
+    `learn`) induces a new template from repeated DOM blocks or, failing that,
+    from one selector-only model call. Returns the opportunities (empty when
+    nothing matched) and an outcome for the template store:
+    {"method": "template" | "builtin" | "structure" | "model" | "miss" | "none",
+     "template": selectors to keep, or None}.
+    """
+    outcome: Dict[str, Any] = {"method": "none", "template": None}
+    if template:
+        opportunities = apply_template(page, template, base_url, max_items)
+        if validate_template(opportunities, base_url):
+            return opportunities, {"method": "template", "template": template}
+        outcome = {"method": "miss", "template": None}
+
+    for builtin in BUILTIN_TEMPLATES:
+        opportunities = apply_template(page, builtin, base_url, max_items)
+        if validate_template(opportunities, base_url):
+            if outcome["method"] == "none":
+                outcome = {"method": "builtin", "template": None}
+            return opportunities, outcome
+
+    if not learn or not page.html:
+        return [], outcome
+
+    induced, method = induce_template(page, base_url), "structure"
+    if induced is None:
+        induced, method = induce_template_with_model(page, base_url, model), "model"
+    if induced is None:
+        return [], outcome
+    get_logger("scraper").info(f"Learned {method} extraction template for {base_url}: {induced}")
+    return apply_template(page, induced, base_url, max_items), {"method": method, "template": induced}
+
+
 async def crawl_site_recursively(
     base_url: str,
     max_depth: int = 2,
@@ -506,7 +462,7 @@ async def crawl_site_recursively(
     Returns:
         List of URLs that appear to be project/opportunity pages
     """
-    from urllib.parse import urljoin, urlparse
+    from urllib.parse import urlparse
     
     if project_keywords is None:
         project_keywords = [
@@ -533,21 +489,12 @@ async def crawl_site_recursively(
             if "error" in page:
                 continue
             
-            html = page.get("html", "")
-            if not html:
+            if not page.get("html"):
                 continue
             
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Extract all links
-            for link in soup.find_all("a", href=True):
-                href = link.get("href")
-                if not href:
-                    continue
-                
-                # Convert to absolute URL
-                full_url = urljoin(current_url, href)
-                parsed = urlparse(full_url)
+            # Links were resolved against the page's final URL when it was parsed
+            for link in page_of(page, current_url).links:
+                parsed = urlparse(link.url)
                 
                 # Only follow links from same domain
                 if parsed.netloc != base_domain:
@@ -578,7 +525,14 @@ async def crawl_site_recursively(
     return project_urls
 
 
-async def process_urls(urls: List[str], recursive: bool = False, max_depth: int = 2) -> List[Dict[str, Any]]:
+async def process_urls(
+    urls: List[str],
+    recursive: bool = False,
+    max_depth: int = 2,
+    extraction_template: Optional[Dict[str, Any]] = None,
+    learn_templates: bool = False,
+    enrich_details: bool = True,
+) -> List[Dict[str, Any]]:
     """
     Process URLs to extract opportunities.
     
@@ -586,6 +540,11 @@ async def process_urls(urls: List[str], recursive: bool = False, max_depth: int
         urls: List of URLs to process
         recursive: If True, recursively crawl each URL to find project pages
         max_depth: Maximum depth for recursive crawling (if recursive=True)
+        extraction_template: Stored selectors for this source (see match_listing)
+        learn_templates: Induce a template when none matches; the outcome is
+            returned under "extraction" for the caller to store
+        enrich_details: Merge detail-page enrichment into each opportunity; callers
+            that store listings first and enrich them afterwards pass False
     
     Returns:
         List of results with opportunities found
@@ -609,27 +568,32 @@ async def process_urls(urls: List[str], recursive: bool = False, max_depth: int
                 
                 if "text" in page:
                     info = extract_info(page["text"])
-                    base_opportunities = extract_opportunities(
-                        page["text"],
-                        page.get("html") or "",
-                        process_url,
+                    parsed_page = page_of(page, process_url)
+                    base_opportunities, extraction = match_listing(
+                        parsed_page, process_url, extraction_template, learn_templates
                     )
-                    enriched_opportunities: List[Dict[str, Any]] = []
-                    for opportunity in base_opportunities:
-                        detail_url = opportunity.get("detail_url")
-                        detail_payload: Dict[str, Any] = {}
-                        if detail_url:
-                            detail_payload = await enrich_opportunity_details(detail_url)
-                        elif len(base_opportunities) == 1:
-                            detail_payload = await enrich_opportunity_details(process_url, prefetched_page=page)
-                        
-                        merged = {**opportunity}
-                        merged.update(
-                            {k: v for k, v in detail_payload.items() if v is not None}
+                    if not base_opportunities:
+                        base_opportunities = extract_opportunities(
+                            page["text"],
+                            page.get("html") or "",
+                            process_url,
+                            page=parsed_page,
                         )
-                        enriched_opportunities.append(merged)
+                    enriched_opportunities = base_opportunities
+                    if enrich_details:
+                        # Local import: the pipeline builds on this module's fetch/prompt helpers
+                        from app.services.enrichment_pipeline import enrich_listing
+
+                        enriched_opportunities = await enrich_listing(base_opportunities, process_url, page)
                     
-                    results.append({"url": process_url, "info": info, "opportunities": enriched_opportunities})
+                    results.append(
+                        {
+                            "url": process_url,
+                            "info": info,
+                            "opportunities": enriched_opportunities,
+                            "extraction": extraction,
+                        }
+                    )
                 else:
                     results.append({"url": process_url, "error": page.get("error", "Unknown error")})
         
@@ -0,0 +1,72 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+
+# Common aliases folded onto a single canonical token so that "ReactJS",
+# "react.js" and "React" land in the same bucket of the skill index.
+SKILL_SYNONYMS: Dict[str, str] = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react js": "react",
+    "react.js": "react",
+    "node": "nodejs",
+    "node js": "nodejs",
+    "node.js": "nodejs",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "py": "python",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "k8s": "kubernetes",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "pm": "project management",
+    "project mgmt": "project management",
+    "qa": "quality assurance",
+    "qc": "quality control",
+    "cad": "autocad",
+    "auto cad": "autocad",
+    "bim": "building information modeling",
+    "heating ventilation and air conditioning": "hvac",
+    "mep": "mechanical electrical and plumbing",
+    "osha": "osha compliance",
+    "html/css": "html css",
+    "html and css": "html css",
+}
+
+_STRIP_CHARS = re.compile(r"[^a-z0-9+#./ ]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_skill(skill: Optional[str]) -> str:
+    """Fold a free-text skill into its canonical index token ('' when empty)."""
+    if not skill:
+        return ""
+
+    token = unicodedata.normalize("NFKD", skill).encode("ascii", "ignore").decode("ascii")
+    token = token.lower().replace("&", " and ")
+    token = _STRIP_CHARS.sub(" ", token)
+    token = _WHITESPACE.sub(" ", token).strip(" ./")
+    if not token:
+        return ""
+
+    return SKILL_SYNONYMS.get(token, token)
+
+
+def normalize_skills(skills: Iterable[Optional[str]]) -> List[str]:
+    """Normalize a list of skills, dropping blanks and duplicates while keeping order."""
+    seen: Dict[str, None] = {}
+    for skill in skills or []:
+        token = normalize_skill(skill)
+        if token and len(token) <= 100:
+            seen.setdefault(token, None)
+    return list(seen)
+
+
+__all__ = ["SKILL_SYNONYMS", "normalize_skill", "normalize_skills"]
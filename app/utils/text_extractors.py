@@ -0,0 +1,78 @@
+"""
+Pure text extractors that run inside extraction worker processes.
+
+Everything here works on in-memory bytes (no temp files) and only imports
+stdlib plus the parser libraries, so spawning a worker stays cheap.
+"""
+import io
+from typing import List, Optional, Sequence
+
+PDF_EXTENSIONS = {"pdf"}
+DOCX_EXTENSIONS = {"doc", "docx"}
+XLSX_EXTENSIONS = {"xlsx"}
+TEXT_EXTENSIONS = {"txt", "csv", "md"}
+
+
+def file_extension(filename: Optional[str]) -> str:
+    if not filename or "." not in filename:
+        return ""
+    return filename.rsplit(".", 1)[-1].lower()
+
+
+def extract_pdf(content: bytes, page_numbers: Optional[Sequence[int]] = None) -> str:
+    from pdfminer.high_level import extract_text
+
+    return extract_text(io.BytesIO(content), page_numbers=page_numbers) or ""
+
+
+def extract_pdf_pages(content: bytes, page_numbers: Sequence[int]) -> List[str]:
+    """Text of each requested (0-based) page, in order, from a single parse pass."""
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    pages: List[str] = []
+    for layout in extract_pages(io.BytesIO(content), page_numbers=page_numbers):
+        pages.append("".join(
+            element.get_text() for element in layout if isinstance(element, LTTextContainer)
+        ))
+    return pages
+
+
+def count_pdf_pages(content: bytes) -> int:
+    from pdfminer.pdfpage import PDFPage
+
+    return sum(1 for _ in PDFPage.get_pages(io.BytesIO(content)))
+
+
+def extract_docx(content: bytes) -> str:
+    import docx2txt
+
+    return docx2txt.process(io.BytesIO(content)) or ""
+
+
+def extract_xlsx(content: bytes) -> str:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    lines: List[str] = []
+    for sheet in workbook.worksheets:
+        lines.append(f"\nSheet: {sheet.title}")
+        for row in sheet.iter_rows(values_only=True):
+            row_text = " | ".join(str(cell) if cell is not None else "" for cell in row)
+            if row_text.strip(" |"):
+                lines.append(row_text)
+    workbook.close()
+    return "\n".join(lines)
+
+
+def extract_text(content: bytes, extension: str) -> str:
+    """Dispatch on file extension; unsupported types return an empty string."""
+    if extension in PDF_EXTENSIONS:
+        return extract_pdf(content)
+    if extension in DOCX_EXTENSIONS:
+        return extract_docx(content)
+    if extension in XLSX_EXTENSIONS:
+        return extract_xlsx(content)
+    if extension in TEXT_EXTENSIONS:
+        return content.decode("utf-8", errors="ignore")
+    return ""
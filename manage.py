@@ -90,6 +90,222 @@ def stamp_head() -> None:
     )
 
 
+@app.command(name="scheduler-worker")
+def scheduler_worker(
+    once: bool = typer.Option(False, "--once", help="Process queued/due work once and exit"),
+    poll_interval: float = typer.Option(15.0, help="Seconds to sleep between polls when idle"),
+    schedule: bool = typer.Option(True, help="Also queue runs for sources/agents that are due"),
+    worker_id: Optional[str] = typer.Option(None, help="Lease owner name (default: host:pid)"),
+) -> None:
+    """Run the opportunity scheduler worker (scrapes and AI agents) outside the API process."""
+    import asyncio
+    import signal
+
+    from app.services.scheduler_worker import SchedulerWorker
+
+    worker = SchedulerWorker(worker_id=worker_id, poll_interval=poll_interval, schedule=schedule)
+
+    async def _main() -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, worker.stop)
+            except NotImplementedError:
+                pass
+        await worker.run(once=once)
+
+    asyncio.run(_main())
+
+
+@app.command(name="rebuild-finance-actuals")
+def rebuild_finance_actuals(
+    org_id: Optional[str] = typer.Option(None, help="Only rebuild this organization (default: all)"),
+) -> None:
+    """Recompute the monthly finance actuals table from expenses and invoices."""
+    import asyncio
+    import uuid
+
+    from app.db.session import get_transaction
+    from app.services.finance_actuals import FinanceActualsService
+
+    async def _main() -> int:
+        async with get_transaction() as db:
+            return await FinanceActualsService(db).rebuild(uuid.UUID(org_id) if org_id else None)
+
+    typer.echo(f"Wrote {asyncio.run(_main())} monthly actuals rows")
+
+
+@app.command(name="rebuild-vendor-scorecards")
+def rebuild_vendor_scorecards() -> None:
+    """Recompute every vendor's scorecard rollup from orders, invoices and milestones."""
+    import asyncio
+
+    from app.db.session import get_transaction
+    from app.services.vendor_scorecards import VendorScorecardService
+
+    async def _main() -> None:
+        async with get_transaction() as db:
+            await VendorScorecardService(db).refresh()
+
+    asyncio.run(_main())
+    typer.echo("Vendor scorecards rebuilt")
+
+
+@app.command(name="recompute-account-health")
+def recompute_account_health(
+    org_id: Optional[str] = typer.Option(None, help="Only rescore this organization (default: all)"),
+) -> None:
+    """Rescore every account's health (nightly); one transaction per organization."""
+    import asyncio
+    import uuid
+
+    from sqlalchemy import select
+
+    from app.db.session import get_transaction
+    from app.models.organization import Organization
+    from app.services.ai_health_scoring import AccountHealthScoringService
+
+    async def _main() -> tuple[int, int]:
+        if org_id:
+            org_ids = [uuid.UUID(org_id)]
+        else:
+            async with get_transaction() as db:
+                org_ids = list((await db.execute(select(Organization.id))).scalars().all())
+        service = AccountHealthScoringService()
+        scored = failed = 0
+        for current in org_ids:
+            async with get_transaction() as db:
+                counts = await service.recompute_org_health_scores(current, db)
+            scored += counts["scored"]
+            failed += counts["failed"]
+        return scored, failed
+
+    scored, failed = asyncio.run(_main())
+    typer.echo(f"Rescored {scored} accounts ({failed} failed)")
+
+
+# SDKs that should only load when a feature uses them (see app/utils/lazy.py)
+DEFERRED_IMPORTS = (
+    "google.generativeai", "boto3", "botocore", "PyPDF2", "docx", "bs4",
+    "supabase", "numpy", "pdfminer", "docx2txt", "requests", "lxml",
+)
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """(module, depth, self us, cumulative us) rows from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+@app.command(name="importtime")
+def importtime(
+    module: str = typer.Option("app.main", help="Module to import"),
+    top: int = typer.Option(25, help="Number of slowest imports to list"),
+    strict: bool = typer.Option(False, "--strict", help="Exit 1 if a deferred SDK is imported at startup"),
+) -> None:
+    """Profile cold-start imports with `python -X importtime` and summarize the slowest modules."""
+    import sys
+    from collections import defaultdict
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env_with_db_url(environment.DATABASE_URL),
+    )
+    if result.returncode != 0:
+        typer.echo(result.stderr[-2000:], err=True)
+        raise typer.Exit(1)
+
+    rows = _parse_importtime(result.stderr)
+    total_ms = sum(self_us for _, _, self_us, _ in rows) / 1000
+    typer.echo(f"import {module}: {total_ms:.0f} ms across {len(rows)} modules\n")
+
+    typer.echo(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, _, self_us, cumulative_us in sorted(rows, key=lambda row: row[3], reverse=True)[:top]:
+        typer.echo(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    by_package: dict[str, int] = defaultdict(int)
+    for name, _, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    typer.echo(f"\n{'self ms':>9}  top-level package")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        typer.echo(f"{self_us / 1000:>9.1f}  {package}")
+
+    imported = {name for name, _, _, _ in rows}
+    eager = sorted(name for name in DEFERRED_IMPORTS if name in imported)
+    if eager:
+        typer.echo(f"\nDeferred SDKs imported at startup: {', '.join(eager)}")
+        if strict:
+            raise typer.Exit(1)
+    else:
+        typer.echo("\nNo deferred SDKs imported at startup")
+
+
+@app.command(name="bench-login")
+def bench_login(
+    attempts: int = typer.Option(64, help="Password verifications per run"),
+    concurrency: int = typer.Option(16, help="Logins in flight at once"),
+    rounds: int = typer.Option(0, help="bcrypt cost (default: BCRYPT_ROUNDS)"),
+) -> None:
+    """Compare login password checks inline on the event loop against the hashing pool."""
+    import asyncio
+    import time
+
+    from passlib.context import CryptContext
+
+    from app.services.password_hashing import password_hashing
+
+    rounds = rounds or environment.BCRYPT_ROUNDS
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    password = "Benchmark-Password-1"
+    hashed = context.hash(password)
+
+    async def _run(pooled: bool) -> tuple[float, float, float]:
+        semaphore = asyncio.Semaphore(concurrency)
+        stalls: list[float] = []
+        done = asyncio.Event()
+
+        async def _ticker() -> None:
+            # How late a 10 ms sleep wakes up is how long other requests would wait
+            while not done.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                stalls.append(time.perf_counter() - started - 0.01)
+
+        async def _login() -> None:
+            async with semaphore:
+                if pooled:
+                    valid = await password_hashing.run(context.verify, password, hashed)
+                else:
+                    valid = context.verify(password, hashed)
+                assert valid
+
+        ticker = asyncio.create_task(_ticker())
+        started = time.perf_counter()
+        await asyncio.gather(*(_login() for _ in range(attempts)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ticker
+        return elapsed, max(stalls, default=0.0), sorted(stalls)[int(len(stalls) * 0.99)] if stalls else 0.0
+
+    typer.echo(
+        f"{attempts} logins, {concurrency} concurrent, bcrypt cost {rounds}, "
+        f"{password_hashing.max_workers} hashing workers\n"
+    )
+    typer.echo(f"{'mode':<8} {'logins/s':>9} {'total s':>8} {'max loop stall ms':>18} {'p99 stall ms':>13}")
+    for label, pooled in (("inline", False), ("pool", True)):
+        elapsed, worst, p99 = asyncio.run(_run(pooled))
+        typer.echo(f"{label:<8} {attempts / elapsed:>9.1f} {elapsed:>8.2f} {worst * 1000:>18.1f} {p99 * 1000:>13.1f}")
+    password_hashing.shutdown()
+
+
 @app.command()
 def initdb() -> None:
     subprocess.run(["alembic", "upgrade", "head"], check=True, env=env_with_db_url(environment.DATABASE_URL))
@@ -0,0 +1,130 @@
+"""
+Unit tests for the account health and tier scorers over batch-loaded features
+"""
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.models.account import Account, ClientType
+from app.services.account_features import AccountFeatures
+from app.services.ai_health_scoring import AccountHealthScoringService
+from app.services.ai_tiering import AITieringService, TierLevel
+from app.services.health_score import HealthScoreService
+
+
+def _account(**overrides) -> Account:
+    values = {
+        "account_id": uuid.uuid4(),
+        "client_name": "Acme Corp",
+        "client_type": ClientType.tier_2,
+        "market_sector": "Technology",
+        "company_website": "https://acme.example",
+        "hosting_area": "Central Office",
+        "total_value": 250000,
+        "notes": "Key account",
+        "primary_contact_id": uuid.uuid4(),
+        "client_address_id": uuid.uuid4(),
+    }
+    values.update(overrides)
+    return Account(**values)
+
+
+def _features(account=None, **overrides) -> AccountFeatures:
+    values = {
+        "account": account or _account(),
+        "has_primary_contact": True,
+        "contact_name": True,
+        "contact_email": True,
+        "contact_phone": True,
+        "contact_fields_not_null": 3,
+        "address_fields": 4,
+        "notes_count": 6,
+        "recent_notes": 5,
+        "recent_notes_since_midnight": 5,
+    }
+    values.update(overrides)
+    return AccountFeatures(**values)
+
+
+@pytest.mark.unit
+def test_contact_fields_counts_non_empty_fields():
+    assert _features(contact_email=False).contact_fields == 2
+
+
+@pytest.mark.unit
+def test_health_score_service_ignores_empty_contact_fields():
+    # Baseline checked `if contact.email`: an empty string scores nothing
+    service = HealthScoreService()
+    full = service._calculate_data_quality(_features())
+    empty_email = service._calculate_data_quality(_features(contact_email=False, contact_fields_not_null=3))
+    assert full - empty_email == 10
+
+
+@pytest.mark.unit
+def test_health_score_service_communication_bands():
+    service = HealthScoreService()
+    assert [service._calculate_communication_frequency(_features(recent_notes=n)) for n in (0, 1, 3, 5)] == [
+        25, 50, 75, 100
+    ]
+
+
+@pytest.mark.unit
+def test_health_score_service_score_components():
+    result = HealthScoreService()._score_features(_features())
+    assert set(result["components"]) == {"data_quality", "communication", "business_value", "completeness"}
+    assert result["risk_level"] == "low"
+
+
+@pytest.mark.unit
+def test_ai_health_contact_completeness_counts_not_null_fields():
+    # Baseline checked `is not None`: an empty string still counts
+    service = AccountHealthScoringService()
+    features = _features(contact_email=False, contact_fields_not_null=3)
+    assert service._calculate_contact_completeness(features) == Decimal("100")
+    assert service._calculate_contact_completeness(_features(has_primary_contact=False)) == Decimal("0")
+
+
+@pytest.mark.unit
+def test_ai_health_address_and_notes_completeness():
+    service = AccountHealthScoringService()
+    assert service._calculate_address_completeness(_features(address_fields=None)) == Decimal("0")
+    assert service._calculate_address_completeness(_features(address_fields=2)) == Decimal("50.0")
+    assert service._calculate_notes_completeness(_features(notes_count=0)) == Decimal("50")
+    no_notes = _features(account=_account(notes=None), notes_count=0)
+    assert service._calculate_notes_completeness(no_notes) == Decimal("0")
+
+
+@pytest.mark.unit
+async def test_ai_health_score_account():
+    response = await AccountHealthScoringService()._score_account(_features())
+    assert response.communication_frequency == Decimal("10")
+    assert response.ai_health_score > 0
+    assert set(response.score_breakdown) == {"data_quality", "communication", "win_rate", "revenue_growth"}
+
+
+@pytest.mark.unit
+def test_tiering_relationship_uses_non_empty_contact_fields():
+    service = AITieringService()
+    complete = service._analyze_relationship_strength(_features(recent_notes_since_midnight=0))
+    partial = service._analyze_relationship_strength(
+        _features(contact_phone=False, contact_fields_not_null=3, recent_notes_since_midnight=0)
+    )
+    assert complete["score"] == 70
+    assert partial["score"] == 60
+
+
+@pytest.mark.unit
+def test_tiering_risk_penalises_silence():
+    service = AITieringService()
+    assert service._analyze_risk_level(_features(recent_notes_since_midnight=0))["score"] == 35
+    assert service._analyze_risk_level(_features(recent_notes_since_midnight=2))["score"] == 50
+
+
+@pytest.mark.unit
+def test_tiering_suggestion_from_features():
+    account = _account(total_value=2000000, client_type=ClientType.tier_3)
+    suggestion = AITieringService()._suggest_from_features(_features(account=account))
+    assert suggestion["account_id"] == str(account.account_id)
+    assert suggestion["current_tier"] == "tier_3"
+    assert suggestion["suggested_tier"] in {tier.value for tier in TierLevel}
@@ -0,0 +1,117 @@
+"""
+Unit tests for password hash upgrades on login
+"""
+import hashlib
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from passlib.hash import bcrypt
+
+from app.services import auth_service
+from app.services.auth_service import AuthService
+
+PASSWORD = "correct horse battery"
+
+
+def _sha256_hash(password: str, salt: str = "abc123") -> str:
+    return f"sha256:{salt}:{hashlib.sha256((password + salt).encode('utf-8')).hexdigest()}"
+
+
+def _low_cost_bcrypt(password: str) -> str:
+    return bcrypt.using(rounds=4).hash(password)
+
+
+@pytest.mark.unit
+def test_sha256_hash_is_upgraded_to_bcrypt():
+    valid, new_hash = AuthService.verify_and_update_password(PASSWORD, _sha256_hash(PASSWORD))
+    assert valid
+    assert new_hash and new_hash.startswith("$2")
+    assert AuthService.verify_password(PASSWORD, new_hash)
+
+
+@pytest.mark.unit
+def test_low_cost_bcrypt_hash_is_upgraded():
+    valid, new_hash = AuthService.verify_and_update_password(PASSWORD, _low_cost_bcrypt(PASSWORD))
+    assert valid
+    assert new_hash is not None
+    assert not auth_service.pwd_context.needs_update(new_hash)
+
+
+@pytest.mark.unit
+def test_current_hash_is_kept():
+    current = auth_service.pwd_context.hash(PASSWORD)
+    assert AuthService.verify_and_update_password(PASSWORD, current) == (True, None)
+
+
+@pytest.mark.unit
+def test_wrong_password_is_never_rehashed():
+    assert AuthService.verify_and_update_password("wrong password", _sha256_hash(PASSWORD)) == (False, None)
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return self._row
+
+
+class _FakeSession:
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+        self.open_sessions = 0
+        self.transactions = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result(self.row)
+
+    @asynccontextmanager
+    async def session(self):
+        self.open_sessions += 1
+        try:
+            yield self
+        finally:
+            self.open_sessions -= 1
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        async with self.session():
+            yield self
+
+
+@pytest.mark.unit
+async def test_authenticate_user_stores_upgraded_hash(monkeypatch):
+    user_id = uuid.uuid4()
+    session = _FakeSession({"id": user_id, "email": "legacy@example.com", "password_hash": _sha256_hash(PASSWORD)})
+
+    async def no_username_column(table, column):
+        return False
+
+    sessions_open_while_hashing = []
+    run_hashing = auth_service.password_hashing.run
+
+    async def hashing(fn, *args):
+        sessions_open_while_hashing.append(session.open_sessions)
+        return await run_hashing(fn, *args)
+
+    monkeypatch.setattr(auth_service, "get_session", session.session)
+    monkeypatch.setattr(auth_service, "get_transaction", session.transaction)
+    monkeypatch.setattr(auth_service.schema_capabilities, "has_column", no_username_column)
+    monkeypatch.setattr(auth_service.password_hashing, "run", hashing)
+
+    user = await AuthService.authenticate_user("legacy@example.com", PASSWORD)
+
+    assert user is not None and user.id == user_id
+    assert user.password_hash.startswith("$2")
+    # No connection is held while waiting for the hashing pool
+    assert sessions_open_while_hashing == [0]
+    # The lookup, then the UPDATE that stores the new hash in its own transaction
+    assert len(session.statements) == 2
+    assert session.transactions == 1
@@ -0,0 +1,50 @@
+"""
+Unit tests for clause library matching
+"""
+import pytest
+
+from app.services.clause_index import MATCH_THRESHOLD, ClauseEntry, ClauseIndex
+
+LIABILITY = (
+    "The Consultant shall not be liable for indirect or consequential damages, and its total "
+    "liability under this Agreement shall not exceed $1,000,000."
+)
+PAYMENT = "Invoices are payable within thirty days of receipt by the Client."
+
+
+def _index() -> ClauseIndex:
+    documents = [
+        (ClauseEntry("1", "Limitation of Liability", "Liability", "green", "library language", LIABILITY), LIABILITY),
+        (ClauseEntry("2", "Payment Terms", "Payment", "green", "library language", PAYMENT), PAYMENT),
+    ]
+    return ClauseIndex.build("fp", documents)
+
+
+@pytest.mark.unit
+def test_reflowed_and_renumbered_clause_is_an_exact_match():
+    match = _index().best_match("12.3  THE CONSULTANT shall not be liable for indirect or consequential\n"
+                                "damages, and its total liability under this Agreement shall not exceed $1,000,000.")
+    assert match.entry.clause_id == "1"
+    assert match.exact
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "variant",
+    [
+        LIABILITY.replace("shall not be liable", "shall be liable"),
+        LIABILITY.replace("$1,000,000", "$5,000,000"),
+    ],
+)
+def test_negated_or_changed_cap_is_similar_but_not_exact(variant):
+    match = _index().best_match(variant)
+    assert match.entry.clause_id == "1"
+    assert match.score >= MATCH_THRESHOLD
+    assert not match.exact
+
+
+@pytest.mark.unit
+def test_index_round_trips_through_json():
+    index = ClauseIndex.from_json(_index().to_json())
+    assert index.entries[1].text == PAYMENT
+    assert index.best_match(PAYMENT).exact
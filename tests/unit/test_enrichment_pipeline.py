@@ -0,0 +1,108 @@
+"""
+Unit tests for enrichment pipeline response parsing and batch failures
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import enrichment_pipeline
+from app.services.enrichment_pipeline import (
+    EnrichmentJob,
+    EnrichmentPipeline,
+    _Extracted,
+    parse_batch_response,
+)
+
+
+@pytest.mark.unit
+def test_parse_pages_object_by_id():
+    payload = {"pages": [{"id": "p1", "overview": "b"}, {"id": "p0", "overview": "a"}]}
+    assert [page["overview"] for page in parse_batch_response(payload, 2)] == ["a", "b"]
+
+
+@pytest.mark.unit
+def test_parse_top_level_list():
+    payload = [{"id": "p0", "overview": "a"}, {"id": "p1", "overview": "b"}]
+    assert [page["overview"] for page in parse_batch_response(payload, 2)] == ["a", "b"]
+
+
+@pytest.mark.unit
+def test_parse_list_without_ids_falls_back_to_position():
+    payload = [{"overview": "a"}, {"overview": "b"}]
+    assert [page["overview"] for page in parse_batch_response(payload, 2)] == ["a", "b"]
+
+
+@pytest.mark.unit
+def test_parse_missing_pages_are_empty():
+    payload = {"pages": [{"id": "p0", "overview": "a"}, "junk"]}
+    assert parse_batch_response(payload, 3) == [{"id": "p0", "overview": "a"}, {}, {}]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("payload", [{}, [], "text", None, 3, {"pages": "nope"}])
+def test_parse_unusable_payloads(payload):
+    assert parse_batch_response(payload, 2) == [{}, {}]
+
+
+@pytest.mark.unit
+def test_parse_single_page_object():
+    assert parse_batch_response({"overview": "a"}, 1) == [{"overview": "a"}]
+
+
+def _batch(count):
+    return [
+        _Extracted(EnrichmentJob(index, f"https://example.com/{index}"), f"page {index}", [])
+        for index in range(count)
+    ]
+
+
+@pytest.mark.unit
+def test_ask_model_accepts_top_level_array(monkeypatch):
+    answer = json.dumps([{"id": "p0", "overview": "a"}, {"id": "p1", "overview": "b"}])
+    fake_model = SimpleNamespace(generate_content=lambda prompt: SimpleNamespace(text=answer))
+    monkeypatch.setattr(enrichment_pipeline, "model", fake_model)
+
+    async def ignore(job, details):
+        pass
+
+    outputs = EnrichmentPipeline(ignore)._ask_model(_batch(2))
+    assert [output["overview"] for output in outputs] == ["a", "b"]
+
+
+@pytest.mark.unit
+async def test_failed_batch_emits_detail_error(monkeypatch):
+    results = {}
+
+    async def collect(job, details):
+        results[job.key] = details
+
+    pipeline = EnrichmentPipeline(collect)
+
+    def explode(batch):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(pipeline, "_ask_model", explode)
+    await pipeline._complete(_batch(2))
+
+    assert set(results) == {0, 1}
+    assert all("model unavailable" in details["detail_error"] for details in results.values())
+
+
+@pytest.mark.unit
+async def test_model_error_is_recorded_not_marked_done(monkeypatch):
+    def unavailable(prompt):
+        raise TimeoutError("deadline exceeded")
+
+    monkeypatch.setattr(enrichment_pipeline, "model", SimpleNamespace(generate_content=unavailable))
+    results = {}
+
+    async def collect(job, details):
+        results[job.key] = details
+
+    await EnrichmentPipeline(collect)._complete(_batch(2))
+    assert all("deadline exceeded" in details["detail_error"] for details in results.values())
+
+    record = SimpleNamespace(ai_metadata=None)
+    enrichment_pipeline.apply_details_to_temp(record, results[0])
+    assert record.ai_metadata["enrichment"]["status"] == "error"
@@ -0,0 +1,101 @@
+"""
+Unit tests for extraction template induction, application and validation
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.extraction_templates import (
+    BUILTIN_TEMPLATES,
+    apply_template,
+    induce_template,
+    induce_template_with_model,
+    validate_template,
+)
+from app.utils.html_page import ParsedPage
+
+BASE_URL = "https://tenders.example.gov/projects"
+
+
+def _listing_html(count: int = 4) -> str:
+    cards = "".join(
+        f"""
+        <li class="card">
+          <h3 class="card-title"><a href="/projects/{index}">Bridge rehabilitation package {index}</a></h3>
+          <span class="badge status">Open</span>
+          <p class="teaser">Design and construction of the river crossing upgrade, phase {index} of the programme.</p>
+        </li>"""
+        for index in range(count)
+    )
+    return f"""
+    <html><body>
+      <nav><ul class="menu"><li><a href="/">Home</a></li><li><a href="/about">About us</a></li>
+        <li><a href="/contact">Contact</a></li><li><a href="/news">News room</a></li></ul></nav>
+      <main><ul class="results">{cards}</ul></main>
+    </body></html>"""
+
+
+@pytest.mark.unit
+def test_induce_template_finds_the_listing():
+    page = ParsedPage(_listing_html(), BASE_URL)
+    template = induce_template(page, BASE_URL)
+
+    assert template is not None
+    assert template["item"] == "ul.results > li.card"
+    opportunities = apply_template(page, template, BASE_URL)
+    assert len(opportunities) == 4
+    assert opportunities[0]["title"] == "Bridge rehabilitation package 0"
+    assert opportunities[0]["detail_url"] == "https://tenders.example.gov/projects/0"
+    assert opportunities[0]["status"] == "Open"
+    assert opportunities[0]["description"].startswith("Design and construction")
+
+
+@pytest.mark.unit
+def test_induce_template_ignores_short_listings_and_navigation():
+    page = ParsedPage(_listing_html(count=2), BASE_URL)
+    assert induce_template(page, BASE_URL) is None
+
+
+@pytest.mark.unit
+def test_learned_template_applies_to_a_later_page():
+    template = induce_template(ParsedPage(_listing_html(), BASE_URL), BASE_URL)
+    later = apply_template(ParsedPage(_listing_html(count=6), BASE_URL), template, BASE_URL)
+    assert len(later) == 6
+
+
+@pytest.mark.unit
+def test_apply_template_with_invalid_selector_returns_nothing():
+    page = ParsedPage(_listing_html(), BASE_URL)
+    assert apply_template(page, {"item": "li[[", "title": "a"}, BASE_URL) == []
+    assert apply_template(page, {"item": "li.card"}, BASE_URL) == []
+
+
+@pytest.mark.unit
+def test_validate_template_requires_distinct_links():
+    same_link = [{"title": f"Item {i}", "detail_url": BASE_URL} for i in range(3)]
+    distinct = [{"title": f"Item {i}", "detail_url": f"{BASE_URL}/{i}"} for i in range(3)]
+    assert not validate_template(same_link, BASE_URL)
+    assert validate_template(distinct, BASE_URL, min_items=3)
+    assert not validate_template(distinct, BASE_URL, min_items=4)
+
+
+@pytest.mark.unit
+def test_builtin_template_shape():
+    for template in BUILTIN_TEMPLATES:
+        assert template["item"] and template["title"]
+
+
+def _model_answering(answer: str):
+    return SimpleNamespace(generate_content=lambda prompt: SimpleNamespace(text=answer))
+
+
+@pytest.mark.unit
+def test_model_template_is_kept_only_when_it_validates():
+    page = ParsedPage(_listing_html(), BASE_URL)
+    good = json.dumps({"item": "li.card", "title": "h3 a", "link": None, "status": ".badge", "summary": "p"})
+    bad = json.dumps({"item": "table.results tr", "title": "td a"})
+
+    assert induce_template_with_model(page, BASE_URL, _model_answering(f"```json{good}```"))["item"] == "li.card"
+    assert induce_template_with_model(page, BASE_URL, _model_answering(bad)) is None
+    assert induce_template_with_model(page, BASE_URL, _model_answering("not json")) is None
@@ -0,0 +1,96 @@
+"""
+Unit tests for the monthly finance actuals fact table maintenance
+"""
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.procurement import ExpenseStatus
+from app.services.finance_actuals import (
+    ActualContribution,
+    FinanceActualsService,
+    category_key,
+    expense_contribution,
+)
+
+ORG = uuid.uuid4()
+
+
+class _Session:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+def _expense(status, category="Travel", amount="120.50"):
+    return SimpleNamespace(
+        org_id=ORG, status=status, category=category, amount=Decimal(amount),
+        expense_date=datetime(2026, 3, 14, 10, 0),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", ["Travel", " travel ", "TRAVEL", "Travel\n"])
+def test_category_key_normalizes_case_and_whitespace(name):
+    assert category_key(name) == "travel"
+
+
+@pytest.mark.unit
+def test_category_key_collapses_inner_whitespace():
+    assert category_key("Office   Supplies") == "office supplies"
+    assert category_key(None) == ""
+
+
+@pytest.mark.unit
+def test_expense_contribution_splits_approved_and_reimbursed():
+    assert expense_contribution(_expense(ExpenseStatus.APPROVED)).source == "expense"
+    reimbursed = expense_contribution(_expense(ExpenseStatus.REIMBURSED))
+    assert reimbursed.source == "reimbursed"
+    assert reimbursed.month == date(2026, 3, 1)
+    assert reimbursed.amount == Decimal("120.50")
+
+
+@pytest.mark.unit
+def test_unapproved_expense_contributes_nothing():
+    assert expense_contribution(_expense(ExpenseStatus.PENDING)) is None
+
+
+@pytest.mark.unit
+async def test_reimbursing_moves_amount_between_sources():
+    db = _Session()
+    before = expense_contribution(_expense(ExpenseStatus.APPROVED, category="travel"))
+    after = expense_contribution(_expense(ExpenseStatus.REIMBURSED, category=" Travel "))
+    await FinanceActualsService(db).apply(before, after)
+
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    assert params["category_key_m0"] == "travel"
+    assert params["expense_amount_m0"] == Decimal("-120.50")
+    assert params["expense_count_m0"] == -1
+    assert params["reimbursed_amount_m0"] == Decimal("120.50")
+    assert params["reimbursed_count_m0"] == 1
+
+
+@pytest.mark.unit
+async def test_unchanged_contribution_writes_nothing():
+    db = _Session()
+    contribution = ActualContribution(ORG, "Travel", date(2026, 3, 1), "expense", Decimal("10"))
+    await FinanceActualsService(db).apply(contribution, contribution)
+    assert db.statements == []
+
+
+@pytest.mark.unit
+async def test_budget_totals_count_only_the_requested_sources():
+    db = _Session(rows=[("travel", Decimal("300"))])
+    totals = await FinanceActualsService(db).totals_by_category(ORG, date(2026, 1, 1), date(2027, 1, 1))
+    assert totals == {"travel": Decimal("300")}
+    sql = str(db.statements[0])
+    assert "expense_amount" in sql
+    assert "reimbursed_amount" not in sql and "invoice_amount" not in sql
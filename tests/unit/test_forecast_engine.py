@@ -0,0 +1,79 @@
+"""
+Unit tests for the statistical forecast engine
+"""
+import numpy as np
+import pytest
+
+from app.services.forecast_engine import METHODS, forecast_series, growth_factors, resolve_method
+
+
+def _seasonal_series(years: int = 3) -> np.ndarray:
+    months = np.arange(years * 12)
+    return 1000 + 10 * months + 150 * np.sin(2 * np.pi * months / 12)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method", METHODS)
+def test_forecast_shape_and_bands(method):
+    forecast = forecast_series(_seasonal_series(), horizon=6, method=method)
+    assert forecast.method == method
+    assert forecast.point.shape == forecast.lower.shape == forecast.upper.shape == (6,)
+    assert np.all(forecast.lower <= forecast.point)
+    assert np.all(forecast.point <= forecast.upper)
+
+
+@pytest.mark.unit
+def test_forecast_is_deterministic():
+    first = forecast_series(_seasonal_series(), horizon=12)
+    second = forecast_series(_seasonal_series(), horizon=12)
+    assert first.method == second.method
+    np.testing.assert_allclose(first.point, second.point)
+
+
+@pytest.mark.unit
+def test_auto_picks_a_known_method_with_backtest_error():
+    forecast = forecast_series(_seasonal_series(), horizon=3, method="auto")
+    assert forecast.method in METHODS
+    assert forecast.backtest_error is not None and forecast.backtest_error >= 0
+
+
+@pytest.mark.unit
+def test_linear_trend_is_extrapolated():
+    forecast = forecast_series([10, 20, 30, 40, 50, 60], horizon=2, method="linear", seasonal=False)
+    np.testing.assert_allclose(forecast.point, [70, 80], rtol=1e-6)
+
+
+@pytest.mark.unit
+def test_non_negative_clips_forecasts():
+    forecast = forecast_series([50, 40, 30, 20, 10, 5], horizon=6, method="linear", seasonal=False)
+    assert np.all(forecast.point >= 0)
+    assert np.all(forecast.lower >= 0)
+
+
+@pytest.mark.unit
+def test_forecast_needs_three_points():
+    with pytest.raises(ValueError):
+        forecast_series([1, 2], horizon=3)
+
+
+@pytest.mark.unit
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        forecast_series([1, 2, 3, 4], horizon=1, method="prophet")
+
+
+@pytest.mark.unit
+def test_resolve_method_maps_model_names():
+    assert resolve_method("Exponential Smoothing") == "holt_winters"
+    assert resolve_method("Linear Regression") == "linear"
+    assert resolve_method("Seasonal Naive") == "seasonal_naive"
+    assert resolve_method(None) == "auto"
+    assert resolve_method("Something else") == "auto"
+
+
+@pytest.mark.unit
+def test_growth_factors_compound_monthly():
+    factors = growth_factors(12, 12.0)
+    assert factors.shape == (12,)
+    assert factors[0] == pytest.approx(1.01)
+    assert factors[-1] == pytest.approx(1.01 ** 12)
@@ -0,0 +1,66 @@
+"""
+Unit tests for per-organization custom ID generation
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import app.models.procurement  # noqa: F401  (registers the procurement tables)
+from app.services.id_generator import IDGenerator
+
+
+class _IssuedIds:
+    """Fake session: custom_id lookups hit the IDs issued so far."""
+
+    def __init__(self):
+        self.issued = set()
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        value = statement.compile().params["custom_id_1"]
+        return SimpleNamespace(first=lambda: (value,) if value in self.issued else None)
+
+
+@pytest.fixture
+def shared_prefix(monkeypatch):
+    async def get_org_prefix(org_id, db):
+        return "AB"
+
+    async def try_next_value(db, org_id, entity, prefix, scope=""):
+        # Each organization has its own counter, so both start at 1
+        return 1
+
+    monkeypatch.setattr(IDGenerator, "get_org_prefix", staticmethod(get_org_prefix))
+    monkeypatch.setattr(IDGenerator, "try_next_value", staticmethod(try_next_value))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "generate, kind",
+    [
+        (IDGenerator.generate_requisition_id, "REQ"),
+        (IDGenerator.generate_po_id, "PO"),
+        (IDGenerator.generate_rfq_id, "RFQ"),
+        (IDGenerator.generate_expense_id, "EXP"),
+    ],
+)
+async def test_orgs_sharing_a_prefix_get_distinct_ids(shared_prefix, generate, kind):
+    db = _IssuedIds()
+    first = await generate(str(uuid.uuid4()), db)
+    db.issued.add(first)
+    second = await generate(str(uuid.uuid4()), db)
+
+    assert first == f"{kind}-AB0001"
+    assert second != first
+    assert second.startswith(f"{kind}-AB")
+
+
+@pytest.mark.unit
+async def test_custom_id_taken_checks_the_entity_table():
+    db = _IssuedIds()
+    db.issued.add("PO-AB0001")
+    assert await IDGenerator.custom_id_taken("purchase_order", "PO-AB0001", db)
+    assert not await IDGenerator.custom_id_taken("purchase_order", "PO-AB0002", db)
+    assert "purchase_orders" in str(db.statements[0])
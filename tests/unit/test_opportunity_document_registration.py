@@ -0,0 +1,102 @@
+"""
+Unit tests for registering directly uploaded opportunity documents
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.opportunity_document import OpportunityDocumentCreate
+from app.services.opportunity_document import (
+    MAX_DOCUMENT_BYTES,
+    DocumentLocationError,
+    OpportunityDocumentService,
+)
+from app.services.storage import FileTooLargeError, LocalStorageBackend, StorageService, set_storage
+
+
+class _Session:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def refresh(self, obj):
+        obj.id = uuid.uuid4()
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    set_storage(StorageService(LocalStorageBackend(str(tmp_path))))
+    opportunity = SimpleNamespace(id=uuid.uuid4())
+
+    async def ensure_schema(self):
+        pass
+
+    async def ensure_opportunity_exists(self, opportunity_id):
+        return opportunity
+
+    monkeypatch.setattr(OpportunityDocumentService, "_ensure_schema", ensure_schema)
+    monkeypatch.setattr(OpportunityDocumentService, "_ensure_opportunity_exists", ensure_opportunity_exists)
+    yield OpportunityDocumentService(_Session()), opportunity.id, tmp_path
+    set_storage(None)
+
+
+def _document(file_path: str) -> OpportunityDocumentCreate:
+    return OpportunityDocumentCreate(
+        file_name="rfp.pdf", original_name="rfp.pdf", file_type="application/pdf", file_size=1,
+        category="rfp", purpose="bid", file_path=file_path,
+    )
+
+
+def _upload(root, key: str, size: int) -> None:
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+
+@pytest.mark.unit
+def test_owned_key_only_accepts_the_opportunity_prefix(service):
+    documents, opportunity_id, _ = service
+    prefix = f"opportunities/{opportunity_id}"
+    assert documents.owned_key(opportunity_id, f"{prefix}/rfp.pdf") == f"{prefix}/rfp.pdf"
+    assert documents.owned_key(opportunity_id, f"opportunities/{uuid.uuid4()}/rfp.pdf") is None
+    assert documents.owned_key(opportunity_id, f"{prefix}/../other/rfp.pdf") is None
+    assert documents.owned_key(opportunity_id, "/etc/passwd") is None
+    assert documents.owned_key(opportunity_id, None) is None
+
+
+@pytest.mark.unit
+async def test_register_uses_the_stored_size(service):
+    documents, opportunity_id, root = service
+    key = f"opportunities/{opportunity_id}/rfp.pdf"
+    _upload(root, key, 2048)
+
+    await documents.create_document(opportunity_id, _document(key), current_user=None)
+    stored = documents.db.added[0]
+    assert stored.file_path == key
+    assert stored.file_size == 2048
+
+
+@pytest.mark.unit
+async def test_register_rejects_and_deletes_oversized_uploads(service):
+    documents, opportunity_id, root = service
+    key = f"opportunities/{opportunity_id}/huge.pdf"
+    _upload(root, key, MAX_DOCUMENT_BYTES + 1)
+
+    with pytest.raises(FileTooLargeError):
+        await documents.create_document(opportunity_id, _document(key), current_user=None)
+    assert not (root / key).exists()
+    assert documents.db.added == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("file_path", ["opportunities/other/rfp.pdf", "/etc/passwd", "invoices/2026/q3.pdf"])
+async def test_register_rejects_keys_outside_the_opportunity(service, file_path):
+    documents, opportunity_id, _ = service
+    with pytest.raises(DocumentLocationError):
+        await documents.create_document(opportunity_id, _document(file_path), current_user=None)
@@ -0,0 +1,121 @@
+"""
+Unit tests for keyset pagination cursors and the planner-estimate EXPLAIN
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.opportunity import Opportunity
+from app.utils.pagination import KeysetPage, _Explain, cursor_total, decode_cursor, encode_cursor, paginate
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "sort_value",
+    [datetime(2026, 10, 18, 9, 30), date(2026, 10, 18), Decimal("1250.50"), 42, "Bridge", uuid.uuid4()],
+)
+def test_cursor_round_trip(sort_value):
+    row_id = uuid.uuid4()
+    cursor = encode_cursor("created_at:desc", [sort_value, row_id])
+    assert decode_cursor(cursor, "created_at:desc") == [sort_value, row_id]
+
+
+@pytest.mark.unit
+def test_cursor_from_another_sort_is_rejected():
+    cursor = encode_cursor("created_at:desc", [datetime(2026, 1, 1), uuid.uuid4()])
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "project_value:asc")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        _raw_cursor({"k": "created_at", "v": [1]}),
+        _raw_cursor({"k": "created_at", "v": [1, 2, 3]}),
+        _raw_cursor({"k": "created_at", "v": "1,2"}),
+        _raw_cursor({"k": "created_at"}),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "created_at")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.unit
+def test_total_pages():
+    page = KeysetPage(items=[], total=41, total_is_estimate=False, next_cursor=None)
+    assert page.total_pages(20) == 3
+    assert KeysetPage(items=[], total=0, total_is_estimate=False, next_cursor=None).total_pages(20) == 0
+
+
+@pytest.mark.unit
+def test_explain_keeps_search_patterns_as_bound_parameters():
+    query = select(Opportunity).where(Opportunity.project_name.ilike("%bridge%"))
+    compiled = _Explain(query).compile(dialect=postgresql.dialect())
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "%bridge%" not in str(compiled)
+    assert "%bridge%" in compiled.params.values()
+
+
+@pytest.mark.unit
+def test_cursor_carries_the_first_page_total():
+    cursor = encode_cursor("created_at", [datetime(2026, 1, 1), uuid.uuid4()], total=(10001, True))
+    assert cursor_total(cursor, "created_at") == (10001, True)
+    assert cursor_total(encode_cursor("created_at", [1, 2]), "created_at") is None
+    assert cursor_total(_raw_cursor({"k": "created_at", "v": [1, 2], "t": [-5, False]}), "created_at") is None
+
+
+class _Row(tuple):
+    """Result row: the entity plus the keyset columns paginate() adds."""
+
+    def __new__(cls):
+        row = super().__new__(cls, (object(),))
+        row._keyset_sort = datetime(2026, 1, 1)
+        row._keyset_id = uuid.uuid4()
+        return row
+
+
+class _Session:
+    """Answers counts with `total` and pages with `size + 1` rows."""
+
+    def __init__(self, total, size):
+        self.total = total
+        self.size = size
+        self.counts = 0
+
+    async def execute(self, statement):
+        if "count(" in str(statement):
+            self.counts += 1
+            return SimpleNamespace(scalar=lambda: self.total)
+        return SimpleNamespace(all=lambda: [_Row() for _ in range(self.size + 1)])
+
+
+@pytest.mark.unit
+async def test_cursor_pages_skip_the_count():
+    query = select(Opportunity)
+    kwargs = dict(sort=Opportunity.created_at, id_column=Opportunity.id, size=2, key="created_at")
+
+    db = _Session(total=41, size=2)
+    first = await paginate(db, query, **kwargs)
+    assert (first.total, db.counts) == (41, 1)
+
+    second = await paginate(db, query, cursor=first.next_cursor, **kwargs)
+    assert second.total == 41
+    assert db.counts == 1
+    assert cursor_total(second.next_cursor, "created_at") == (41, False)
@@ -0,0 +1,150 @@
+"""
+Unit tests for the vectorized scenario engine and the base-year unit split
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import scenario_engine
+from app.services.scenario_engine import build_inputs, project, sensitivity, simulate
+from app.services.scenario_projection import split_base_year
+
+
+def _inputs(**overrides):
+    values = {
+        "scenarios": [("base", [10.0]), ("downside", [-5.0, 0.0])],
+        "years": 3,
+        "start_year": 2027,
+        "base_revenue": [600.0, 400.0],
+        "base_expenses": [500.0, 300.0],
+        "unit_names": ["East", "West"],
+    }
+    values.update(overrides)
+    return build_inputs(**values)
+
+
+@pytest.mark.unit
+def test_build_inputs_pads_rates_and_derives_expense_growth():
+    inputs = _inputs()
+    np.testing.assert_allclose(inputs.revenue_growth, [[10, 10, 10], [-5, 0, 0]])
+    np.testing.assert_allclose(inputs.expense_growth, [[7.5, 7.5, 7.5], [-3.75, 0, 0]])
+    assert inputs.years == [2027, 2028, 2029]
+
+
+@pytest.mark.unit
+def test_build_inputs_uses_explicit_expense_growth():
+    inputs = _inputs(expense_growth={"base": [2.0]})
+    np.testing.assert_allclose(inputs.expense_growth[0], [2, 2, 2])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"scenarios": []},
+        {"years": 0},
+        {"base_expenses": [1.0]},
+        {"unit_offsets": [1.0, 2.0, 3.0]},
+    ],
+)
+def test_build_inputs_rejects_bad_shapes(overrides):
+    with pytest.raises(ValueError):
+        _inputs(**overrides)
+
+
+@pytest.mark.unit
+def test_project_compounds_growth():
+    result = project(_inputs())
+    assert result.revenue.shape == (2, 3, 2)
+    np.testing.assert_allclose(result.total_revenue[0], [1100, 1210, 1331])
+    np.testing.assert_allclose(result.total_expenses[0], 800 * 1.075 ** np.arange(1, 4))
+
+
+@pytest.mark.unit
+def test_unit_offsets_shift_only_that_unit():
+    result = project(_inputs(unit_offsets=[5.0, 0.0]))
+    np.testing.assert_allclose(result.revenue[0, 0], [600 * 1.15, 400 * 1.10])
+
+
+@pytest.mark.unit
+def test_rows_match_totals():
+    result = project(_inputs())
+    rows = result.rows(0)
+    assert [row["year"] for row in rows] == [2027, 2028, 2029]
+    assert rows[0]["revenue"] == 1100.0
+    assert rows[0]["profit"] == round(1100.0 - 800 * 1.075, 2)
+    assert rows[0]["margin_percent"] == round((1100.0 - 860.0) / 1100.0 * 100, 2)
+
+
+@pytest.mark.unit
+def test_sensitivity_zero_shift_matches_projection():
+    inputs = _inputs()
+    grid = sensitivity(inputs, revenue_shifts=[-2.0, 0.0, 2.0], expense_shifts=[0.0, 1.0])
+    assert grid["profit"].shape == (2, 3, 2)
+    np.testing.assert_allclose(grid["profit"][:, 1, 0], project(inputs).total_profit[:, -1])
+    # More revenue growth never lowers profit
+    assert np.all(np.diff(grid["profit"][:, :, 0], axis=1) > 0)
+
+
+@pytest.mark.unit
+def test_simulate_is_reproducible_with_seed():
+    inputs = _inputs()
+    first = simulate(inputs, draws=500, seed=7, targets=[100.0, None])
+    second = simulate(inputs, draws=500, seed=7, targets=[100.0, None])
+    assert first == second
+    assert [summary["scenario_key"] for summary in first] == ["base", "downside"]
+    assert 0 <= first[0]["probability_of_target"] <= 1
+    assert "probability_of_target" not in first[1]
+    assert first[0]["profit"]["p5"][-1] <= first[0]["profit"]["p50"][-1] <= first[0]["profit"]["p95"][-1]
+
+
+@pytest.mark.unit
+def test_simulate_without_volatility_equals_projection():
+    inputs = _inputs()
+    summary = simulate(inputs, draws=10, revenue_volatility=0.0, expense_volatility=0.0, seed=1)
+    np.testing.assert_allclose(summary[0]["profit"]["mean"], np.round(project(inputs).total_profit[0], 2))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("kwargs", [{"draws": 0}, {"draws": scenario_engine.MAX_DRAWS + 1}, {"correlation": 1.5}])
+def test_simulate_validates_arguments(kwargs):
+    with pytest.raises(ValueError):
+        simulate(_inputs(), **kwargs)
+
+
+def _unit(name, revenue, expense):
+    return SimpleNamespace(name=name, revenue=revenue, expense=expense)
+
+
+@pytest.mark.unit
+def test_split_base_year_by_budget_shares():
+    names, revenue, expenses = split_base_year(
+        [_unit("East", 300.0, 100.0), _unit("West", 100.0, 300.0), _unit("Idle", 0.0, 50.0)], 1000.0, 800.0
+    )
+    assert names == ["East", "West"]
+    assert revenue == pytest.approx([750.0, 250.0])
+    assert expenses == pytest.approx([200.0, 600.0])
+
+
+@pytest.mark.unit
+def test_split_base_year_uses_revenue_share_without_budgeted_expense():
+    _, _, expenses = split_base_year([_unit("East", 300.0, None), _unit("West", 100.0, 0.0)], 1000.0, 800.0)
+    assert expenses == pytest.approx([600.0, 200.0])
+
+
+@pytest.mark.unit
+def test_split_base_year_without_units():
+    assert split_base_year([], 1000.0, 800.0) == (["Total"], [1000.0], [800.0])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", [-1, 2**31])
+def test_simulation_seed_must_fit_the_integer_column(seed):
+    from pydantic import ValidationError
+
+    from app.schemas.finance import ScenarioSimulationRequest
+
+    assert ScenarioSimulationRequest(seed=2**31 - 1).seed == 2**31 - 1
+    with pytest.raises(ValidationError):
+        ScenarioSimulationRequest(seed=seed)
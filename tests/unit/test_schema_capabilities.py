@@ -0,0 +1,78 @@
+"""
+Unit tests for schema capability caching and revision re-checks
+"""
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import schema_capabilities as module
+from app.services.schema_capabilities import SchemaCapabilities
+
+
+class _FakeEngine:
+    def __init__(self, revision, columns):
+        self.revision = revision
+        self.columns = columns
+        self.column_reads = 0
+        self.revision_reads = 0
+
+    @asynccontextmanager
+    async def connect(self):
+        engine = self
+
+        class _Conn:
+            async def execute(self, statement):
+                if "information_schema" in str(statement):
+                    engine.column_reads += 1
+                    return iter(engine.columns)
+                engine.revision_reads += 1
+                return SimpleNamespace(scalar=lambda: engine.revision)
+
+        yield _Conn()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = _FakeEngine("rev_a", [("users", "id"), ("alembic_version", "version_num")])
+    monkeypatch.setattr("app.db.session.engine", fake)
+    return fake
+
+
+@pytest.mark.unit
+async def test_lookups_use_the_cache_within_the_ttl(engine):
+    capabilities = SchemaCapabilities(ttl_seconds=300)
+    assert await capabilities.has_column("users", "id")
+    assert not await capabilities.has_column("users", "username")
+    assert engine.column_reads == 1
+    assert engine.revision_reads == 1
+
+
+@pytest.mark.unit
+async def test_expired_cache_reloads_only_when_the_revision_changed(engine, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+    capabilities = SchemaCapabilities(ttl_seconds=60)
+    await capabilities.ensure_loaded()
+
+    clock[0] += 61
+    assert not await capabilities.has_column("users", "username")
+    assert engine.column_reads == 1  # same revision: only the version was re-read
+
+    engine.revision = "rev_b"
+    engine.columns = engine.columns + [("users", "username")]
+    clock[0] += 61
+    assert await capabilities.has_column("users", "username")
+    assert engine.column_reads == 2
+    assert capabilities.revision == "rev_b"
+
+
+@pytest.mark.unit
+async def test_zero_ttl_never_rechecks(engine, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+    capabilities = SchemaCapabilities(ttl_seconds=0)
+    await capabilities.ensure_loaded()
+    clock[0] += 10_000
+    await capabilities.has_table("users")
+    assert engine.revision_reads == 1
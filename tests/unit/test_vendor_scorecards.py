@@ -0,0 +1,93 @@
+"""
+Unit tests for the vendor scorecard refresh
+"""
+import re
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.vendor_scorecards import (
+    _ALL_VENDORS_SQL,
+    _LOCK_SOME_VENDORS_SQL,
+    _SOME_VENDORS_SQL,
+    VendorScorecardService,
+)
+
+
+class _Session:
+    """Records executed statements; selects return `vendor_ids`."""
+
+    def __init__(self, vendor_ids=()):
+        self.vendor_ids = list(vendor_ids)
+        self.calls = []
+
+    async def execute(self, statement, params=None):
+        self.calls.append((str(statement), params))
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.vendor_ids))
+
+
+def _insert_columns(sql: str):
+    columns = re.search(r"INSERT INTO vendor_scorecards \((.*?)\)\s*SELECT", sql, re.S).group(1)
+    return [column.strip() for column in columns.split(",")]
+
+
+@pytest.mark.unit
+def test_refresh_sql_updates_every_inserted_column():
+    inserted = _insert_columns(_ALL_VENDORS_SQL)
+    updated = re.findall(r"^\s+(\w+) = EXCLUDED\.\1", _ALL_VENDORS_SQL, re.M)
+    assert updated == inserted[1:]
+    assert "ON CONFLICT (vendor_id)" in _ALL_VENDORS_SQL
+
+
+@pytest.mark.unit
+def test_vendor_filter_is_applied_to_every_aggregate():
+    assert "{" not in _SOME_VENDORS_SQL
+    assert _SOME_VENDORS_SQL.count(":vendor_ids") == 4
+    assert ":vendor_ids" not in _ALL_VENDORS_SQL
+
+
+@pytest.mark.unit
+async def test_refresh_locks_vendors_before_recomputing():
+    first, second = uuid.uuid4(), uuid.uuid4()
+    db = _Session()
+    await VendorScorecardService(db).refresh([second, None, first, second])
+
+    assert [sql for sql, _ in db.calls] == [_LOCK_SOME_VENDORS_SQL, _SOME_VENDORS_SQL]
+    assert "FOR NO KEY UPDATE" in db.calls[0][0]
+    expected = sorted([first, second], key=str)
+    assert [params["vendor_ids"] for _, params in db.calls] == [expected, expected]
+
+
+@pytest.mark.unit
+async def test_refresh_without_vendors_does_nothing():
+    db = _Session()
+    await VendorScorecardService(db).refresh([None])
+    assert db.calls == []
+
+
+@pytest.mark.unit
+async def test_full_rebuild_locks_all_vendors():
+    db = _Session()
+    await VendorScorecardService(db).refresh()
+    assert "FOR NO KEY UPDATE" in db.calls[0][0]
+    assert db.calls[1][0] == _ALL_VENDORS_SQL
+
+
+@pytest.mark.unit
+async def test_refresh_for_orders_refreshes_the_orders_vendors():
+    vendor_id = uuid.uuid4()
+    db = _Session(vendor_ids=[vendor_id])
+    await VendorScorecardService(db).refresh_for_orders([uuid.uuid4(), None])
+
+    lookup = db.calls[0][0]
+    assert "FROM purchase_orders" in lookup and "DISTINCT" in lookup
+    assert db.calls[1][1] == {"vendor_ids": [vendor_id]}
+    assert db.calls[2][0] == _SOME_VENDORS_SQL
+
+
+@pytest.mark.unit
+async def test_refresh_for_orders_without_orders_does_nothing():
+    db = _Session()
+    await VendorScorecardService(db).refresh_for_orders([None])
+    assert db.calls == []